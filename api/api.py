@@ -6,11 +6,13 @@ from fastapi import Depends, FastAPI
 from fastapi.requests import Request
 
 from core.auth.auth_middleware import auth_required
+from core.database.connection_pool import pool_stats
+from core.handler.ticker_k_line_handler import TickerKLineHandler
 from core.models.api_log import ApiLog
 from core.service.api_log_repository import ApiLogRepository
 
 # 导入路由模块
-from .routers import news, scheduler, ticker
+from .routers import news, scheduler, strategy, ticker
 
 app = FastAPI(
     title="InvestNote API",
@@ -27,6 +29,7 @@ AUTH_ENABLED = os.getenv("AUTH_ENABLED", "true").lower() == "true"
 app.include_router(ticker.router)
 app.include_router(news.router)
 app.include_router(scheduler.router)
+app.include_router(strategy.router)
 
 
 @app.get("/")
@@ -46,6 +49,18 @@ async def health_check():
     }
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """进程内缓存统计：条数、估算字节数、命中/未命中/淘汰/过期次数"""
+    return {"status": "success", "data": {"kline": TickerKLineHandler.cache_stats()}}
+
+
+@app.get("/db/pool/stats")
+async def db_pool_stats():
+    """数据库连接池统计：空闲/借出连接数及创建、借出、等待、超时、回收次数"""
+    return {"status": "success", "data": pool_stats()}
+
+
 @app.get("/me")
 async def get_current_user(current_user: dict[str, Any] = Depends(auth_required())):
     """获取当前认证用户的信息
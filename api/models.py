@@ -8,3 +8,15 @@ class PageRequest(BaseModel):
     page_size: int = 10
     search: Optional[str] = None
     sort: Optional[list[str]] = None
+    # 游标分页：传入时忽略 page，首页传空字符串，之后传上一页返回的 next_cursor
+    cursor: Optional[str] = None
+    # 游标分页时是否返回总数（短期缓存，可能滞后）
+    with_total: bool = True
+
+
+class StrategyBatchRequest(BaseModel):
+    # 完整股票代码，如 SH.600000、HK.00700
+    codes: list[str]
+    days: int = 250
+    # 排行榜排序指标，见 core.analysis.batch_evaluator.LEADERBOARD_METRICS
+    metric: str = "total_score"
@@ -65,22 +65,47 @@ async def get_news_articles(
     source_id: Optional[int] = None,
     hours: Optional[int] = 24,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
 ):
     """获取新闻文章列表
 
     支持分页、搜索、按新闻源筛选、按时间范围筛选
+
+    传入 cursor 时使用游标分页（首页传空字符串，之后传上一页返回的 next_cursor），
+    忽略 page；with_total 为 false 时不返回总数，总数为短期缓存的值
     """
     try:
         # 使用Repository模式查询新闻文章
         repository = NewsArticleRepository()
-        articles, total = await repository.query_articles(
-            page=page,
-            page_size=page_size,
-            search=search,
-            source_id=source_id,
-            hours=hours,
-            status=status,
-        )
+        if cursor is not None:
+            try:
+                articles, next_cursor = await repository.query_articles_after(
+                    page_size=page_size,
+                    search=search,
+                    source_id=source_id,
+                    hours=hours,
+                    status=status,
+                    cursor=cursor,
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e)) from e
+            total = (
+                await repository.count_articles(
+                    search, source_id, hours, status, cached=True
+                )
+                if with_total
+                else None
+            )
+        else:
+            articles, total = await repository.query_articles(
+                page=page,
+                page_size=page_size,
+                search=search,
+                source_id=source_id,
+                hours=hours,
+                status=status,
+            )
 
         # 转换为字典
         articles_data = []
@@ -110,6 +135,20 @@ async def get_news_articles(
                 }
             )
 
+        if cursor is not None:
+            return {
+                "status": "success",
+                "data": {
+                    "articles": articles_data,
+                    "pagination": {
+                        "page_size": page_size,
+                        "total": total,
+                        "next_cursor": next_cursor,
+                        "has_next": next_cursor is not None,
+                    },
+                },
+            }
+
         # 计算分页信息
         total_pages = (total + page_size - 1) // page_size
 
@@ -128,6 +167,8 @@ async def get_news_articles(
             },
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
 
@@ -5,9 +5,7 @@
 包含新闻定时抓取、调度器管理、股票数据更新等功能
 """
 
-import math
 import os
-import time
 from datetime import datetime
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException
@@ -55,12 +53,14 @@ async def cron_update_ticker_score(
     # current_user: Dict[str, Any] = Depends(auth_required(["ADMIN"])) if AUTH_ENABLED else None
 ):
     """
-    批量更新指定市场的ticker_score，分批处理，每批100只，间隔1秒，批次间隔1分钟。
+    并发更新指定市场的ticker_score，拉取按数据源限流，计算在进程池中执行，
+    结果由单个写线程分批写库。并发与限流参数见 UPDATE_* 和 RATE_LIMIT_* 环境变量。
 
     需要管理员权限访问。从ticker.py路由迁移而来，统一调度器管理。
     """
     from core.data_source_helper import DataSourceHelper
     from core.service.ticker_repository import TickerRepository
+    from core.update_pipeline import PipelineConfig
 
     # 市场映射
     market_map = {
@@ -81,28 +81,40 @@ async def cron_update_ticker_score(
         for t in tickers
         if t.code.startswith(prefix) or (market == "zh" and t.code.startswith("SH"))
     ]
-    total = len(tickers)
-    batch_size = 100
-    batch_count = math.ceil(total / batch_size)
+    config = PipelineConfig.from_env()
 
+    # 同一市场同一交易日再次触发时跳过已完成的股票，进度见 /update/status
     def batch_update():
-        ds = DataSourceHelper()
-        for i in range(batch_count):
-            batch = tickers[i * batch_size : (i + 1) * batch_size]
-            if not batch:
-                continue
-            ds._update_tickers(batch)
-            time.sleep(60)  # 每批间隔1分钟
+        DataSourceHelper()._update_tickers(tickers, config=config, job_name=market)
 
     background_tasks.add_task(batch_update)
     return {
         "status": "started",
-        "total": total,
-        "batch_size": batch_size,
-        "batch_count": batch_count,
+        "total": len(tickers),
+        "fetch_workers": config.fetch_workers,
+        "compute_workers": config.compute_workers,
+        "write_batch": config.write_batch,
     }
 
 
+@router.get("/cron/ticker/{market}/update/status")
+async def get_ticker_update_status(market: str):
+    """
+    获取指定市场最近一次批量更新任务的进度
+
+    返回已更新、跳过、失败和剩余的股票数，以及按本次运行速度估算的剩余秒数（eta）
+    """
+    from core.service.update_job_repository import UpdateJobRepository
+
+    if market not in ("hk", "zh", "us"):
+        raise HTTPException(status_code=400, detail="market参数错误，只支持hk/zh/us")
+    repo = UpdateJobRepository()
+    job = repo.get_latest(market)
+    if job is None:
+        raise HTTPException(status_code=404, detail="没有该市场的更新任务")
+    return {"status": "success", "data": repo.progress(job)}
+
+
 @router.post("/cron/news")
 async def cron_fetch_news(
     background_tasks: BackgroundTasks,
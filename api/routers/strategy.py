@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+策略分析相关API路由
+包含多只股票的策略批量评估与排行榜
+"""
+
+import os
+import threading
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from core.analysis.batch_evaluator import (
+    LEADERBOARD_METRICS,
+    BatchStrategyEvaluator,
+    leaderboard,
+)
+from core.data_source_helper import DataSourceHelper
+from core.strategy import DEFAULT_STRATEGIES
+from core.utils.blocking import run_blocking
+
+from ..models import StrategyBatchRequest
+
+# 创建路由器 - 不设置prefix，保持原有路径结构
+router = APIRouter(tags=["策略"])
+
+_evaluator: Optional[BatchStrategyEvaluator] = None
+_evaluator_lock = threading.Lock()
+
+
+def get_batch_evaluator() -> BatchStrategyEvaluator:
+    """
+    进程内共用的批量评估器，所有请求复用同一个进程池
+
+    进程数由 API_STRATEGY_WORKERS 控制（默认2），并发请求的股票在同一进程池中排队
+    """
+    global _evaluator
+    with _evaluator_lock:
+        if _evaluator is None:
+            _evaluator = BatchStrategyEvaluator(
+                DEFAULT_STRATEGIES,
+                workers=int(os.getenv("API_STRATEGY_WORKERS", "2")),
+            )
+        return _evaluator
+
+
+def _records(table) -> list[dict]:
+    """DataFrame 转为记录列表，NaN 转为 None 以便序列化为 JSON"""
+    return table.astype(object).where(table.notna(), None).to_dict(orient="records")
+
+
+def _evaluate_batch(request: StrategyBatchRequest) -> dict:
+    """批量评估并生成排行榜，在线程池中执行，计算在进程池中进行"""
+    with DataSourceHelper() as data_source:
+        table = get_batch_evaluator().run(
+            (code, data_source.get_kline_data(code, request.days))
+            for code in request.codes
+        )
+    board = leaderboard(table, request.metric).reset_index()
+    return {"results": _records(table), "leaderboard": _records(board)}
+
+
+@router.post("/strategies/batch")
+async def evaluate_strategies_batch(request: StrategyBatchRequest):
+    """批量评估多只股票上的默认策略，返回逐股票的结果表和按策略汇总的排行榜
+
+    如果启用了鉴权，则只有认证用户可以访问
+    """
+    if not request.codes:
+        raise HTTPException(status_code=400, detail="codes 不能为空")
+    if request.metric not in LEADERBOARD_METRICS:
+        raise HTTPException(status_code=400, detail=f"未知的排序指标: {request.metric}")
+    try:
+        data = await run_blocking(_evaluate_batch, request)
+        return {"status": "success", "data": data}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
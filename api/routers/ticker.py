@@ -11,6 +11,15 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException
 
 from core.data_source_helper import DataSourceHelper
+from core.enum.ticker_k_type import TickerKType
+from core.service.async_ticker_repository import (
+    AsyncTickerIndicatorRepository,
+    AsyncTickerRepository,
+    AsyncTickerScoreRepository,
+    AsyncTickerStrategyRepository,
+)
+from core.service.ticker_latest_repository import TickerLatestRepository
+from core.utils.blocking import run_blocking
 
 from ..models import PageRequest
 
@@ -20,7 +29,44 @@ router = APIRouter(tags=["股票"])
 # 加载环境变量
 AUTH_ENABLED = os.getenv("AUTH_ENABLED", "true").lower() == "true"
 
-data_source = DataSourceHelper()
+
+def _get_ticker_data(code: str, days: Optional[int]) -> tuple:
+    """拉取K线并计算评分，返回 (股票, K线, 评分)，在线程池中执行
+
+    每次调用创建并关闭自己的 DataSourceHelper：仓库连接不在线程间共享，
+    也不在请求之间占用连接池
+    """
+    with DataSourceHelper() as data_source:
+        return data_source.get_ticker_data(code, days)
+
+
+def _get_indicator_status(code: str, days: Optional[int]) -> Optional[tuple]:
+    """按实时K线增量推进指标状态，返回 (股票, 时间, 指标状态)，在线程池中执行"""
+    with DataSourceHelper() as data_source:
+        return data_source.get_indicator_status_on_time(code, days)
+
+
+def _load_ticker_page(request: PageRequest) -> tuple:
+    """查询一页股票列表，返回 (总数, 记录, 下一页游标)，在线程池中执行
+
+    Raises:
+        ValueError: 游标无效
+    """
+    repository = TickerLatestRepository()
+    limit = request.page_size
+    if request.cursor is not None:
+        rows, next_cursor = repository.get_page_after(
+            request.search, request.sort, limit, request.cursor
+        )
+        total = (
+            repository.count(request.search, cached=True)
+            if request.with_total
+            else None
+        )
+        return total, rows, next_cursor
+    offset = (request.page - 1) * limit
+    total, rows = repository.get_page(request.search, request.sort, limit, offset)
+    return total, rows, None
 
 
 @router.post("/pages")
@@ -30,87 +76,16 @@ async def get_ticker_pages(request: PageRequest):
     如果启用了鉴权，则只有认证用户可以访问
     """
     try:
-        import os
         from datetime import datetime
 
-        from core.service.ticker_repository import TickerRepository
-
-        # 获取ticker数据
-        repo = TickerRepository()
-
-        # 获取占位符类型
-        db_type = os.getenv("DB_TYPE", "sqlite").lower()
-        placeholder = "?" if db_type == "sqlite" else "%s"
-
-        # 构建SQL查询条件
-        search_condition = ""
-        params = []
-
-        if request.search:
-            search_condition = (
-                f"AND (t.code LIKE {placeholder} OR t.name LIKE {placeholder})"
+        # 从最新评分汇总表分页查询，搜索按代码/名称前缀匹配；
+        # 同步仓库在线程池中执行，不阻塞事件循环
+        try:
+            total, ticker_results, next_cursor = await run_blocking(
+                _load_ticker_page, request
             )
-            search_pattern = f"%{request.search}%"
-            params.extend([search_pattern, search_pattern])
-
-        # 计算总数
-        count_sql = f"""
-            SELECT COUNT(*) AS total
-            FROM ticker t
-            WHERE t.is_deleted = 0 AND t.status = 1 {search_condition}
-        """
-        count_result = repo.db.query_one(count_sql, tuple(params) if params else ())
-        total = count_result.get("total", 0) if count_result else 0
-
-        # 处理排序
-        order_by_clause = "ORDER BY t.code"  # 默认排序
-
-        # 支持的排序字段映射
-        sort_field_mapping = {
-            "code": "t.code",
-            "name": "t.name",
-            "score": "ts.score",
-            "update_time": "ts.time_key",
-        }
-
-        if request.sort:
-            sort_clauses = []
-            for sort_item in request.sort:
-                direction = "DESC" if sort_item.startswith("-") else "ASC"
-                field_name = (
-                    sort_item[1:]
-                    if sort_item.startswith("+") or sort_item.startswith("-")
-                    else sort_item
-                )
-
-                # 检查字段是否在支持的排序字段列表中
-                if field_name in sort_field_mapping:
-                    db_field = sort_field_mapping[field_name]
-                    sort_clauses.append(f"{db_field} {direction}")
-
-            if sort_clauses:
-                order_by_clause = f"ORDER BY {', '.join(sort_clauses)}"
-
-        # 分页查询
-        limit = request.page_size
-        offset = (request.page - 1) * limit
-        params_with_pagination = params.copy()
-        params_with_pagination.extend([limit, offset])
-
-        # 使用LEFT JOIN查询ticker和最新score数据
-        sql = f"""
-            SELECT
-                t.code,
-                t.name,
-                ts.score as score,
-                ts.time_key as update_time
-            FROM ticker t
-            LEFT JOIN ticker_score ts ON t.id = ts.ticker_id
-            WHERE t.is_deleted = 0 AND t.status = 1 {search_condition}
-            {order_by_clause}
-            LIMIT {placeholder} OFFSET {placeholder}
-        """
-        ticker_results = repo.db.query(sql, tuple(params_with_pagination))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
 
         # 处理结果
         ticker_list = []
@@ -143,15 +118,17 @@ async def get_ticker_pages(request: PageRequest):
 
             ticker_list.append(ticker_data)
 
-        return {
-            "status": "success",
-            "data": {
-                "total": total,
-                "page": request.page,
-                "page_size": request.page_size,
-                "list": ticker_list,
-            },
+        data = {
+            "total": total,
+            "page": request.page,
+            "page_size": request.page_size,
+            "list": ticker_list,
         }
+        if request.cursor is not None:
+            data["next_cursor"] = next_cursor
+        return {"status": "success", "data": data}
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
 
@@ -166,8 +143,15 @@ async def get_ticker_data(market: str, ticker_code: str, days: Optional[int] = 6
     如果启用了鉴权，则只有认证用户可以访问
     """
     try:
-        code = data_source.get_ticker_code(market, ticker_code)
-        ticker, kl_data, score_data = data_source.get_ticker_data(code, days)
+        code = DataSourceHelper.get_ticker_code(market, ticker_code)
+        # 股票不存在时直接返回，不占用线程池
+        if await AsyncTickerRepository().get_by_code(code) is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Stock not found: {market}.{ticker_code} (code: {code})",
+            )
+        # 获取数据涉及数据源请求和计算，在线程池中执行
+        ticker, kl_data, score_data = await run_blocking(_get_ticker_data, code, days)
 
         # 检查股票是否存在
         if ticker is None:
@@ -210,3 +194,113 @@ async def get_ticker_data(market: str, ticker_code: str, days: Optional[int] = 6
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/ticker/{market}/{ticker_code}/on_time")
+async def get_ticker_on_time(market: str, ticker_code: str, days: Optional[int] = 600):
+    """获取盘中实时K线对应的各指标状态，复用缓存的流式状态增量计算
+
+    如果启用了鉴权，则只有认证用户可以访问
+    """
+    try:
+        code = DataSourceHelper.get_ticker_code(market, ticker_code)
+        if await AsyncTickerRepository().get_by_code(code) is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Stock not found: {market}.{ticker_code} (code: {code})",
+            )
+        data = await run_blocking(_get_indicator_status, code, days)
+        if data is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"K-line data not found: {market}.{ticker_code}",
+            )
+        ticker, time_key, indicators = data
+
+        return {
+            "status": "success",
+            "ticker": {
+                "code": ticker.code,
+                "name": ticker.name,
+            },
+            "time_key": time_key,
+            "indicators": [
+                {
+                    "indicator_key": key,
+                    "score": float(value["score"]) if value else None,
+                    "status": int(value["status"]) if value else None,
+                    "days": int(value["days"]) if value else None,
+                }
+                for key, value in indicators.items()
+            ],
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/ticker/{market}/{ticker_code}/history")
+async def get_ticker_history(
+    market: str,
+    ticker_code: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    """获取已保存的评分历史及最新的策略、指标结果，只读数据库，不重新计算
+
+    如果启用了鉴权，则只有认证用户可以访问
+    """
+    try:
+        code = DataSourceHelper.get_ticker_code(market, ticker_code)
+        ticker = await AsyncTickerRepository().get_by_code(code)
+        if ticker is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Stock not found: {market}.{ticker_code} (code: {code})",
+            )
+
+        kl_type = TickerKType.DAY.value
+        scores = await AsyncTickerScoreRepository().get_scores(
+            ticker.id, start, end, limit
+        )
+        strategies = await AsyncTickerStrategyRepository().get_items_by_ticker_id(
+            ticker.id, kl_type
+        )
+        indicators = await AsyncTickerIndicatorRepository().get_items_by_ticker_id(
+            ticker.id, kl_type
+        )
+
+        return {
+            "status": "success",
+            "ticker": {
+                "code": ticker.code,
+                "name": ticker.name,
+            },
+            "scores": [
+                score.model_dump(exclude={"id", "ticker_id", "status", "create_time"})
+                for score in scores
+            ],
+            "strategies": [
+                {
+                    "strategy_key": item.strategy_key,
+                    "time_key": item.time_key,
+                    "data": item.data,
+                    "pos_data": item.pos_data,
+                }
+                for item in strategies
+            ],
+            "indicators": [
+                {
+                    "indicator_key": item.indicator_key,
+                    "time_key": item.time_key,
+                    "history": item.history,
+                }
+                for item in indicators
+            ],
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
@@ -427,6 +427,20 @@ class TickerScoreUpdate(Node):
         updated_stocks = []
         data_helper = DataSourceHelper()
 
+        # 先批量查出所有股票及其评分，避免逐只查询数据库
+        standard_codes = {}
+        for stock in mentioned_stocks:
+            if isinstance(stock, dict) and stock.get("code"):
+                market = stock.get("market", "zh")
+                try:
+                    standard_codes[
+                        (market, stock["code"])
+                    ] = data_helper.get_ticker_code(market, stock["code"])
+                except ValueError:
+                    continue
+        tickers = data_helper.ticker_repo.get_by_codes(standard_codes.values())
+        scores = data_helper.get_ticker_scores(list(tickers.values()), days=600)
+
         for i, stock in enumerate(mentioned_stocks, 1):
             stock_code = stock.get("code") if isinstance(stock, dict) else None
             stock_name = stock.get("name") if isinstance(stock, dict) else None
@@ -443,12 +457,16 @@ class TickerScoreUpdate(Node):
             )
 
             try:
-                # 🔥 使用智能get_ticker_score函数，避免重复API调用
-                standard_code = data_helper.get_ticker_code(stock_market, stock_code)
-                score_data = data_helper.get_ticker_score(standard_code, days=600)
+                # 🔥 评分由 get_ticker_scores 批量获取，避免重复API调用
+                standard_code = standard_codes.get((stock_market, stock_code))
+                if standard_code is None:
+                    standard_code = data_helper.get_ticker_code(
+                        stock_market, stock_code
+                    )
 
                 # 获取股票基础信息
-                ticker_data = data_helper.ticker_repo.get_by_code(standard_code)
+                ticker_data = tickers.get(standard_code)
+                score_data = scores.get(ticker_data.id) if ticker_data else None
 
                 # 检查ticker_data是否为None（股票不存在于数据库中）
                 if ticker_data is None:
@@ -3,6 +3,15 @@ from enum import Enum
 import numpy as np
 import pandas as pd
 
+from core.analysis.backtest_kernel import (
+    CLOSE_TYPES,
+    COST_TYPES,
+    KernelConfig,
+    KernelResult,
+    prepare_bars,
+    run_kernel,
+)
+
 
 class PositionSizing(Enum):
     FIXED = "fixed"  # 固定金额
@@ -84,229 +93,13 @@ class AdvancedBacktestEngine:
         if simple_mode:
             # 使用类似StrategyCalculator的简化逻辑
             return self._run_simple_backtest(strategy_obj, kl_data)
-        # 初始化结果数据结构
-        result = {
-            "equity_curve": [],  # 资金曲线
-            "positions": [],  # 持仓记录
-            "trades": [],  # 交易记录
-            "metrics": {},  # 绩效指标
-            "pos_data": [],  # 策略信号
-            "costs": {},  # 交易成本分析
-        }
 
-        # 获取策略生成的信号
         pos_data = strategy_obj.calculate(kl_data)
+        kernel_result = run_kernel(
+            prepare_bars(kl_data, pos_data, self.atr_period), self.kernel_config()
+        )
+        result = self._expand_kernel_result(kernel_result)
         result["pos_data"] = pos_data
-        length = len(kl_data)
-
-        # 计算ATR
-        df = pd.DataFrame(kl_data)
-        df["tr"] = self._calculate_tr(df)
-        df["atr"] = df["tr"].rolling(window=self.atr_period).mean()
-
-        # 初始化交易状态
-        current_capital = self.initial_capital  # 当前资金
-
-        holdings = 0  # 当前持仓数量
-        current_position = None  # 当前持仓信息
-        highest_price = 0  # 用于跟踪止损
-        pyramid_level = 0  # 当前金字塔加仓级数
-
-        # 记录每日资金曲线
-        for i in range(length):
-            day_data = kl_data[i]
-
-            # 行情数据
-            open_price = day_data["open"]
-            high_price = day_data["high"]
-            low_price = day_data["low"]
-            close_price = day_data["close"]
-            date = day_data["time_key"]
-            current_atr = df.iloc[i]["atr"] if not pd.isna(df.iloc[i]["atr"]) else 0
-
-            # 当日交易信号
-            current_signal = pos_data[i]
-            prev_signal = pos_data[i - 1] if i > 0 else 0
-
-            # 检查是否满足时间止损条件
-            if current_position and self.time_stop_days:
-                days_in_trade = (
-                    pd.to_datetime(date)
-                    - pd.to_datetime(current_position["entry_date"])
-                ).days
-                if days_in_trade >= self.time_stop_days:
-                    # 执行时间止损
-                    self._close_position(
-                        result,
-                        current_position,
-                        holdings,
-                        open_price,
-                        date,
-                        "time_stop",
-                    )
-                    current_capital = result["equity_curve"][-1]["capital"]
-                    current_position = None
-                    holdings = 0
-                    highest_price = 0
-                    pyramid_level = 0
-
-            # 记录是否当天已有交易
-            day_traded = False
-
-            # 当信号变化时进行交易
-            if current_signal != prev_signal:
-                # 有持仓且信号发生反转或变为中性，则平仓
-                if holdings != 0 and (
-                    current_signal == 0 or current_signal == -prev_signal
-                ):
-                    self._close_position(
-                        result, current_position, holdings, open_price, date
-                    )
-                    current_capital = result["equity_curve"][-1]["capital"]
-                    current_position = None
-                    holdings = 0
-                    highest_price = 0
-                    pyramid_level = 0
-                    day_traded = True
-
-                # 开新仓位（只在当天没有交易时执行）
-                if (
-                    not day_traded
-                    and current_signal != 0
-                    and (
-                        current_position is None
-                        or current_signal != current_position["direction"]
-                    )
-                ):
-                    # 计算仓位大小
-                    position_size = self._calculate_position_size(
-                        current_capital, open_price, current_signal, current_atr
-                    )
-                    if position_size > 0:
-                        new_position = self._open_position(
-                            position_size, open_price, current_signal, date, current_atr
-                        )
-                        if new_position:
-                            current_position = new_position
-                            holdings = new_position["size"]
-                            highest_price = open_price
-                            pyramid_level = 1
-                            day_traded = True
-
-                            # 更新可用资金
-                            if current_signal == 1:  # 做多
-                                # 做多时，扣除全部买入成本
-                                current_capital -= (
-                                    new_position["entry_price"] * holdings
-                                    + new_position["commission"]
-                                    + new_position["slippage"]
-                                )
-                            else:  # 做空
-                                # 做空时，我们押金全部资金，但只需要支付交易成本
-                                current_capital -= (
-                                    new_position["commission"]
-                                    + new_position["slippage"]
-                                )
-
-            # 金字塔加仓检查（只在当天没有交易时执行）
-            elif (
-                not day_traded
-                and current_position
-                and current_signal == current_position["direction"]
-                and pyramid_level < self.max_pyramid_levels
-                and self.position_sizing == PositionSizing.PYRAMID
-            ):
-                # 计算是否满足加仓条件
-                if self._check_pyramid_conditions(
-                    current_position, close_price, current_atr
-                ):
-                    # 计算加仓大小
-                    pyramid_size = self._calculate_pyramid_size(
-                        current_capital, close_price, current_signal, pyramid_level
-                    )
-                    if pyramid_size > 0:
-                        pyramid_position = self._open_position(
-                            pyramid_size, close_price, current_signal, date, current_atr
-                        )
-                        if pyramid_position:
-                            holdings += pyramid_position["size"]
-                            pyramid_level += 1
-                            # 更新可用资金
-                            if current_signal == 1:  # 做多
-                                current_capital -= (
-                                    pyramid_position["entry_price"]
-                                    * pyramid_position["size"]
-                                    + pyramid_position["commission"]
-                                    + pyramid_position["slippage"]
-                                )
-                            else:  # 做空
-                                current_capital -= (
-                                    pyramid_position["commission"]
-                                    + pyramid_position["slippage"]
-                                )
-
-            # 更新止损价格
-            if not day_traded and current_position:
-                stop_price = self._calculate_stop_loss(
-                    current_position,
-                    high_price,
-                    low_price,
-                    current_atr,
-                    StopLossType.COMPOSITE,
-                )
-                # 检查是否触发止损
-                if (current_position["direction"] == 1 and low_price <= stop_price) or (
-                    current_position["direction"] == -1 and high_price >= stop_price
-                ):
-                    # 执行止损
-                    self._close_position(
-                        result,
-                        current_position,
-                        holdings,
-                        stop_price,
-                        date,
-                        "stop_loss",
-                    )
-                    current_capital = result["equity_curve"][-1]["capital"]
-                    current_position = None
-                    holdings = 0
-                    highest_price = 0
-                    pyramid_level = 0
-                    day_traded = True
-                else:
-                    # 更新跟踪止损价格
-                    highest_price = (
-                        max(highest_price, high_price)
-                        if current_position["direction"] == 1
-                        else min(highest_price, low_price)
-                    )
-
-            # 计算当日总资产价值
-            portfolio_value = current_capital
-            if holdings != 0 and current_position:
-                # 如果是做多，加上股票价值；如果是做空，资金已经全部可用
-                if current_position["direction"] == 1:
-                    portfolio_value += close_price * holdings
-
-            # 记录资金曲线
-            equity_point = {
-                "date": date,
-                "capital": current_capital,
-                "holdings": holdings,
-                "holding_value": close_price * holdings
-                if holdings != 0
-                and current_position
-                and current_position["direction"] == 1
-                else 0,
-                "total_value": portfolio_value,
-                "pyramid_level": pyramid_level,
-            }
-            result["equity_curve"].append(equity_point)
-
-        # 如果结束时还有持仓，以最后价格平仓
-        # if holdings != 0 and current_position:
-        #     last_price = kl_data[-1]['close']
-        #     self._close_position(result, current_position, holdings, last_price, kl_data[-1]['time_key'], 'end_of_data')
 
         # 计算绩效指标
         result["metrics"] = self._calculate_performance_metrics(result)
@@ -320,6 +113,93 @@ class AdvancedBacktestEngine:
 
         return result
 
+    def kernel_config(self) -> KernelConfig:
+        """当前参数对应的回测内核参数"""
+        return KernelConfig(
+            initial_capital=self.initial_capital,
+            position_sizing=self.position_sizing.value,
+            max_position_pct=self.max_position_pct,
+            stop_loss_pct=self.stop_loss_pct,
+            trailing_stop_pct=self.trailing_stop_pct,
+            slippage_pct=self.slippage_pct,
+            commission_pct=self.commission_pct,
+            pyramid_factor=self.pyramid_factor,
+            max_pyramid_levels=self.max_pyramid_levels,
+            time_stop_days=self.time_stop_days,
+            shares_per_unit=self.shares_per_unit,
+            stop_type=StopLossType.COMPOSITE.value,
+        )
+
+    def run_backtest_columnar(self, strategy_obj, kl_data) -> KernelResult:
+        """运行回测，按列返回资金曲线、交易和交易成本
+
+        不展开成字典、不计算绩效指标，也不累计到引擎的交易成本统计，
+        适合参数扫描等需要大量回测的场景
+
+        Args:
+            strategy_obj: 策略对象
+            kl_data: K线数据
+        """
+        pos_data = strategy_obj.calculate(kl_data)
+        return run_kernel(
+            prepare_bars(kl_data, pos_data, self.atr_period), self.kernel_config()
+        )
+
+    def _expand_kernel_result(self, kernel_result: KernelResult) -> dict:
+        """把内核的列式结果展开成 run_backtest 的字典格式，并累计交易成本统计"""
+        time_key = kernel_result.time_key.tolist()
+        equity = {key: value.tolist() for key, value in kernel_result.equity.items()}
+        trades = {key: value.tolist() for key, value in kernel_result.trades.items()}
+        costs = {key: value.tolist() for key, value in kernel_result.costs.items()}
+
+        for i in range(len(costs["index"])):
+            self.total_commission += costs["commission"][i]
+            self.total_slippage += costs["slippage"][i]
+            self.transaction_costs.append(
+                {
+                    "date": time_key[costs["index"][i]],
+                    "type": COST_TYPES[costs["type"][i]],
+                    "price": costs["price"][i],
+                    "size": costs["size"][i],
+                    "commission": costs["commission"][i],
+                    "slippage": costs["slippage"][i],
+                }
+            )
+
+        return {
+            "equity_curve": [
+                {
+                    "date": time_key[i],
+                    "capital": equity["capital"][i],
+                    "holdings": equity["holdings"][i],
+                    "holding_value": equity["holding_value"][i],
+                    "total_value": equity["total_value"][i],
+                    "pyramid_level": equity["pyramid_level"][i],
+                }
+                for i in range(len(time_key))
+            ],
+            "positions": [],
+            "trades": [
+                {
+                    "entry_date": time_key[trades["entry_index"][i]],
+                    "entry_price": trades["entry_price"][i],
+                    "exit_date": time_key[trades["exit_index"][i]],
+                    "exit_price": trades["exit_price"][i],
+                    "direction": trades["direction"][i],
+                    "size": trades["size"][i],
+                    "profit": trades["profit"][i],
+                    "profit_pct": trades["profit_pct"][i],
+                    "commission": trades["commission"][i],
+                    "slippage": trades["slippage"][i],
+                    "close_type": CLOSE_TYPES[trades["close_type"][i]],
+                }
+                for i in range(len(trades["entry_index"]))
+            ],
+            "metrics": {},
+            "pos_data": [],
+            "costs": {},
+        }
+
     def _run_simple_backtest(self, strategy_obj, kl_data):
         """使用简化逻辑运行回测（类似StrategyCalculator）
 
@@ -496,225 +376,6 @@ class AdvancedBacktestEngine:
 
         return result
 
-    def _calculate_tr(self, df):
-        """计算真实波幅TR"""
-        high = df["high"]
-        low = df["low"]
-        close = df["close"]
-        prev_close = close.shift(1)
-        tr1 = high - low
-        tr2 = (high - prev_close).abs()
-        tr3 = (low - prev_close).abs()
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return tr
-
-    def _calculate_position_size(self, capital, price, direction, atr):
-        """计算仓位大小"""
-        if self.position_sizing == PositionSizing.FIXED:
-            return min(capital, self.initial_capital * self.max_position_pct)
-
-        elif self.position_sizing == PositionSizing.PERCENT:
-            return capital * self.max_position_pct
-
-        elif self.position_sizing == PositionSizing.KELLY:
-            # 使用历史交易数据计算凯利仓位
-            win_rate = 0.55  # 假设胜率
-            win_loss_ratio = 1.5  # 假设盈亏比
-            kelly_pct = win_rate - ((1 - win_rate) / win_loss_ratio)
-            kelly_pct = max(0, min(kelly_pct, self.max_position_pct))
-            return capital * kelly_pct
-
-        elif self.position_sizing == PositionSizing.VOLATILITY:
-            # 基于ATR的波动率调整仓位
-            if atr > 0:
-                volatility_factor = 1 / (atr / price)
-                position_pct = min(
-                    self.max_position_pct * volatility_factor, self.max_position_pct
-                )
-                return capital * position_pct
-            return capital * self.max_position_pct
-
-        elif self.position_sizing == PositionSizing.PYRAMID:
-            return capital * self.max_position_pct
-
-        return capital * self.max_position_pct
-
-    def _calculate_pyramid_size(self, capital, price, direction, level):
-        """计算金字塔加仓大小"""
-        base_size = capital * self.max_position_pct
-        return base_size * (self.pyramid_factor**level)
-
-    def _check_pyramid_conditions(self, position, current_price, current_atr):
-        """检查是否满足金字塔加仓条件"""
-        if position["direction"] == 1:
-            return current_price > position["entry_price"] + current_atr
-        else:
-            return current_price < position["entry_price"] - current_atr
-
-    def _calculate_stop_loss(
-        self, position, high_price, low_price, atr, stop_type=StopLossType.FIXED
-    ):
-        """计算止损价格"""
-        if stop_type == StopLossType.FIXED:
-            return position["entry_price"] * (
-                1 - self.stop_loss_pct * position["direction"]
-            )
-
-        elif stop_type == StopLossType.TRAILING:
-            # 如果没有设置跟踪止损百分比，使用固定止损
-            if self.trailing_stop_pct is None:
-                return self._calculate_stop_loss(
-                    position, high_price, low_price, atr, StopLossType.FIXED
-                )
-
-            if position["direction"] == 1:
-                return high_price * (1 - self.trailing_stop_pct)
-            else:
-                return low_price * (1 + self.trailing_stop_pct)
-
-        elif stop_type == StopLossType.ATR:
-            return position["entry_price"] - (atr * 2 * position["direction"])
-
-        elif stop_type == StopLossType.COMPOSITE:
-            # 综合考虑多个止损条件
-            fixed_stop = position["entry_price"] * (
-                1 - self.stop_loss_pct * position["direction"]
-            )
-
-            # 计算跟踪止损（如果设置了跟踪止损百分比）
-            trailing_stop = None
-            if self.trailing_stop_pct is not None:
-                trailing_stop = (
-                    high_price * (1 - self.trailing_stop_pct)
-                    if position["direction"] == 1
-                    else low_price * (1 + self.trailing_stop_pct)
-                )
-
-            atr_stop = position["entry_price"] - (atr * 2 * position["direction"])
-
-            if position["direction"] == 1:
-                # 做多时取最高止损价
-                if trailing_stop is not None:
-                    return max(fixed_stop, trailing_stop, atr_stop)
-                else:
-                    return max(fixed_stop, atr_stop)
-            else:
-                # 做空时取最低止损价
-                if trailing_stop is not None:
-                    return min(fixed_stop, trailing_stop, atr_stop)
-                else:
-                    return min(fixed_stop, atr_stop)
-
-        return position["entry_price"] * (
-            1 - self.stop_loss_pct * position["direction"]
-        )
-
-    def _open_position(self, position_size, price, direction, date, atr):
-        """开仓"""
-        # 计算开仓价格（考虑滑点）
-        entry_price = self._apply_slippage(price, direction)
-
-        # 计算可买入数量
-        # 先计算可买入的手数
-        max_units = int(position_size / (entry_price * self.shares_per_unit))
-        # 再计算实际股数
-        max_shares = max_units * self.shares_per_unit
-        if max_shares <= 0:
-            return None
-
-        # 计算交易成本
-        commission = entry_price * max_shares * self.commission_pct
-        slippage = abs(entry_price - price) * max_shares
-
-        self.total_commission += commission
-        self.total_slippage += slippage
-
-        self.transaction_costs.append(
-            {
-                "date": date,
-                "type": "open",
-                "price": entry_price,
-                "size": max_shares,
-                "commission": commission,
-                "slippage": slippage,
-            }
-        )
-
-        return {
-            "entry_date": date,
-            "entry_price": entry_price,
-            "direction": direction,
-            "size": max_shares,
-            "stop_loss": self._calculate_stop_loss(
-                {"entry_price": entry_price, "direction": direction}, price, price, atr
-            ),
-            "commission": commission,
-            "slippage": slippage,
-        }
-
-    def _close_position(
-        self, result, position, holdings, price, date, close_type="normal"
-    ):
-        """平仓"""
-        # 计算平仓价格（考虑滑点）
-        exit_price = self._apply_slippage(price, -position["direction"])
-
-        # 计算收益
-        profit = (
-            (exit_price - position["entry_price"]) * holdings * position["direction"]
-        )
-
-        # 计算交易成本
-        commission = exit_price * holdings * self.commission_pct
-        slippage = abs(exit_price - price) * holdings
-
-        # 计算净收益（用于记录交易利润）
-        buy_cost = position["commission"] + position["slippage"]
-        sell_cost = commission + slippage
-        net_profit = profit - buy_cost - sell_cost
-
-        # 更新账户资金
-        if position["direction"] == 1:  # 做多平仓
-            # 做多平仓时，收回卖出所得资金
-            result["equity_curve"][-1]["capital"] += exit_price * holdings - sell_cost
-        else:  # 做空平仓
-            # 做空平仓时，只加上净收益
-            result["equity_curve"][-1]["capital"] += profit - sell_cost
-
-        self.total_commission += commission
-        self.total_slippage += slippage
-
-        self.transaction_costs.append(
-            {
-                "date": date,
-                "type": "close",
-                "price": exit_price,
-                "size": holdings,
-                "commission": commission,
-                "slippage": slippage,
-            }
-        )
-
-        # 记录交易
-        trade = {
-            "entry_date": position["entry_date"],
-            "entry_price": position["entry_price"],
-            "exit_date": date,
-            "exit_price": exit_price,
-            "direction": position["direction"],
-            "size": holdings,
-            "profit": net_profit,
-            "profit_pct": net_profit / (position["entry_price"] * holdings),
-            "commission": commission + position["commission"],
-            "slippage": slippage + position["slippage"],
-            "close_type": close_type,
-        }
-        result["trades"].append(trade)
-
-    def _apply_slippage(self, price, direction):
-        """应用滑点模型"""
-        return price * (1 + self.slippage_pct * direction)
-
     def _analyze_transaction_costs(self):
         """分析交易成本"""
         if not self.transaction_costs:
@@ -0,0 +1,534 @@
+"""
+回测内核
+
+AdvancedBacktestEngine.run_backtest 的逐K线状态机（固定/跟踪/ATR/复合止损、
+金字塔加仓、时间止损、滑点与手续费）改为在预先提取的 NumPy 数组上运行：
+行情、ATR、信号、时间戳（纳秒）一次性取出，循环内只做标量运算，不再逐行
+df.iloc、pd.to_datetime 和为每个资金曲线点分配字典。
+
+结果按列返回（资金曲线、交易、交易成本均为数组），浮点运算顺序与原实现一致，
+展开成字典后与原结果逐项相等。
+"""
+
+import math
+from dataclasses import dataclass, fields
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from core.schema.k_line import as_kline_frame
+
+# 仓位管理与止损类型的整数编码，与 PositionSizing、StopLossType 的取值对应
+SIZING_CODES = {"fixed": 0, "percent": 1, "kelly": 2, "volatility": 3, "pyramid": 4}
+STOP_CODES = {"fixed": 0, "trailing": 1, "atr": 2, "time": 3, "composite": 4}
+# 平仓类型，trades["close_type"] 为其下标
+CLOSE_TYPES = ("normal", "time_stop", "stop_loss")
+# 交易成本类型，costs["type"] 为其下标
+COST_TYPES = ("open", "close")
+
+# kernel_metrics 返回的指标
+METRICS = (
+    "total_trades",
+    "win_rate",
+    "total_return",
+    "annual_return",
+    "max_drawdown",
+    "volatility",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "profit_factor",
+)
+# 越小越好的指标，其余指标越大越好
+MINIMIZE_METRICS = ("max_drawdown", "volatility")
+
+DAY_NS = 86_400_000_000_000
+# 凯利仓位使用的假设胜率与盈亏比
+_KELLY_WIN_RATE = 0.55
+_KELLY_WIN_LOSS_RATIO = 1.5
+
+
+@dataclass(frozen=True)
+class KernelConfig:
+    """回测参数，与 AdvancedBacktestEngine 的同名属性对应"""
+
+    initial_capital: float = 100000
+    position_sizing: str = "fixed"
+    max_position_pct: float = 0.2
+    stop_loss_pct: float = 0.05
+    trailing_stop_pct: Optional[float] = None
+    slippage_pct: float = 0.001
+    commission_pct: float = 0.0003
+    pyramid_factor: float = 0.5
+    max_pyramid_levels: int = 3
+    time_stop_days: Optional[int] = 10
+    shares_per_unit: int = 100
+    stop_type: str = "composite"
+
+
+@dataclass
+class BarArrays:
+    """回测所需的行情列"""
+
+    time_key: np.ndarray  # 原始时间键（object）
+    date_ns: np.ndarray  # 时间戳，int64 纳秒
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    atr: np.ndarray  # 前 atr_period-1 根为0
+    signal: np.ndarray  # 策略信号 -1/0/1
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def window(self, start: int, stop: int) -> "BarArrays":
+        """取 [start, stop) 区间的视图，ATR 与信号沿用全序列上的计算结果"""
+        return BarArrays(
+            **{
+                field.name: getattr(self, field.name)[start:stop]
+                for field in fields(self)
+            }
+        )
+
+
+@dataclass
+class KernelResult:
+    """
+    按列保存的回测结果
+
+    time_key: 各K线的原始时间键，equity/trades/costs 中的下标指向它
+    equity: date_index、capital、holdings、holding_value、total_value、pyramid_level
+    trades: entry_index、exit_index、entry_price、exit_price、direction、size、
+        profit、profit_pct、commission、slippage、close_type（CLOSE_TYPES 下标）
+    costs: 按发生顺序的交易成本，index、type（COST_TYPES 下标）、price、size、
+        commission、slippage
+    """
+
+    time_key: np.ndarray
+    equity: dict[str, np.ndarray]
+    trades: dict[str, np.ndarray]
+    costs: dict[str, np.ndarray]
+
+
+def prepare_bars(kl_data, signals, atr_period: int = 14) -> BarArrays:
+    """
+    提取回测所需的数组
+
+    Args:
+        kl_data: K线数据（KLine/字典列表或 KLineFrame）
+        signals: 策略信号序列，长度与K线相同
+        atr_period: ATR 周期
+
+    Returns:
+        BarArrays
+    """
+    frame = as_kline_frame(kl_data)
+    high = pd.Series(frame.high)
+    low = pd.Series(frame.low)
+    close = pd.Series(frame.close)
+    # 与逐K线原实现计算 TR 相同的 pandas 运算，保证结果逐位一致
+    prev_close = close.shift(1)
+    tr = pd.concat(
+        [high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1
+    ).max(axis=1)
+    atr = tr.rolling(window=atr_period).mean().fillna(0)
+    time_key = frame.time_key
+    date_ns = (
+        pd.to_datetime(pd.Series(time_key), format="mixed")
+        .to_numpy(dtype="datetime64[ns]")
+        .astype(np.int64)
+        if len(time_key)
+        else np.empty(0, dtype=np.int64)
+    )
+    return BarArrays(
+        time_key=time_key,
+        date_ns=date_ns,
+        open=np.asarray(frame.open, dtype=np.float64),
+        high=high.to_numpy(),
+        low=low.to_numpy(),
+        close=close.to_numpy(),
+        atr=atr.to_numpy(),
+        signal=np.asarray(signals, dtype=np.int64),
+    )
+
+
+def run_kernel(bars: BarArrays, config: KernelConfig) -> KernelResult:
+    """
+    在数组上运行回测状态机
+
+    规则与 AdvancedBacktestEngine 的逐K线实现相同：信号变化时按开盘价平仓/开仓，
+    信号不变时按收盘价金字塔加仓，当天未交易时按止损价止损，持仓天数达到
+    time_stop_days 时按开盘价平仓。平仓资金记入前一个资金曲线点（与原实现一致）。
+
+    Args:
+        bars: prepare_bars 的结果
+        config: 回测参数
+
+    Returns:
+        KernelResult
+    """
+    n = len(bars)
+    opens = bars.open.tolist()
+    highs = bars.high.tolist()
+    lows = bars.low.tolist()
+    closes = bars.close.tolist()
+    atrs = bars.atr.tolist()
+    signals = bars.signal.tolist()
+    dates = bars.date_ns.tolist()
+
+    initial_capital = config.initial_capital
+    sizing = SIZING_CODES[config.position_sizing]
+    stop_type = STOP_CODES[config.stop_type]
+    max_pct = config.max_position_pct
+    stop_pct = config.stop_loss_pct
+    trailing_pct = config.trailing_stop_pct
+    slippage_pct = config.slippage_pct
+    commission_pct = config.commission_pct
+    pyramid_factor = config.pyramid_factor
+    max_levels = config.max_pyramid_levels
+    time_stop_days = config.time_stop_days
+    unit = config.shares_per_unit
+    pyramid_enabled = sizing == SIZING_CODES["pyramid"]
+
+    eq_capital = [0.0] * n
+    eq_holdings = [0] * n
+    eq_holding_value = [0.0] * n
+    eq_total = [0.0] * n
+    eq_level = [0] * n
+    trades: dict[str, list] = {key: [] for key in _TRADE_COLUMNS}
+    costs: dict[str, list] = {key: [] for key in _COST_COLUMNS}
+
+    def open_position(position_size, price, direction, i):
+        entry_price = price * (1 + slippage_pct * direction)
+        shares = int(position_size / (entry_price * unit)) * unit
+        if shares <= 0:
+            return None
+        commission = entry_price * shares * commission_pct
+        slippage = abs(entry_price - price) * shares
+        _append(costs, i, 0, entry_price, shares, commission, slippage)
+        return entry_price, shares, commission, slippage
+
+    def close_position(i, price, close_type):
+        # 平仓资金记入前一个资金曲线点，返回该点的资金
+        exit_price = price * (1 + slippage_pct * -direction)
+        profit = (exit_price - entry_price) * holdings * direction
+        commission = exit_price * holdings * commission_pct
+        slippage = abs(exit_price - price) * holdings
+        buy_cost = entry_commission + entry_slippage
+        sell_cost = commission + slippage
+        net_profit = profit - buy_cost - sell_cost
+        if direction == 1:
+            eq_capital[i - 1] += exit_price * holdings - sell_cost
+        else:
+            eq_capital[i - 1] += profit - sell_cost
+        _append(costs, i, 1, exit_price, holdings, commission, slippage)
+        _append(
+            trades,
+            entry_index,
+            i,
+            entry_price,
+            exit_price,
+            direction,
+            holdings,
+            net_profit,
+            net_profit / (entry_price * holdings),
+            commission + entry_commission,
+            slippage + entry_slippage,
+            close_type,
+        )
+        return eq_capital[i - 1]
+
+    capital = initial_capital
+    holdings = 0
+    level = 0
+    in_position = False
+    direction = 0
+    entry_index = 0
+    entry_price = entry_commission = entry_slippage = 0.0
+
+    for i in range(n):
+        open_price = opens[i]
+        high_price = highs[i]
+        low_price = lows[i]
+        close_price = closes[i]
+        atr = atrs[i]
+        signal = signals[i]
+        prev_signal = signals[i - 1] if i > 0 else 0
+
+        # 时间止损
+        if in_position and time_stop_days:
+            if (dates[i] - dates[entry_index]) // DAY_NS >= time_stop_days:
+                capital = close_position(i, open_price, 1)
+                in_position = False
+                holdings = 0
+                level = 0
+
+        day_traded = False
+
+        if signal != prev_signal:
+            # 信号反转或变为中性时平仓
+            if holdings != 0 and (signal == 0 or signal == -prev_signal):
+                capital = close_position(i, open_price, 0)
+                in_position = False
+                holdings = 0
+                level = 0
+                day_traded = True
+
+            if (
+                not day_traded
+                and signal != 0
+                and (not in_position or signal != direction)
+            ):
+                position_size = _position_size(
+                    sizing, capital, initial_capital, max_pct, open_price, atr
+                )
+                if position_size > 0:
+                    opened = open_position(position_size, open_price, signal, i)
+                    if opened:
+                        entry_price, holdings, entry_commission, entry_slippage = opened
+                        in_position = True
+                        direction = signal
+                        entry_index = i
+                        level = 1
+                        day_traded = True
+                        if signal == 1:
+                            capital -= (
+                                entry_price * holdings
+                                + entry_commission
+                                + entry_slippage
+                            )
+                        else:
+                            capital -= entry_commission + entry_slippage
+
+        # 金字塔加仓
+        elif (
+            in_position
+            and signal == direction
+            and level < max_levels
+            and pyramid_enabled
+        ):
+            if (
+                close_price > entry_price + atr
+                if direction == 1
+                else close_price < entry_price - atr
+            ):
+                pyramid_size = capital * max_pct * (pyramid_factor**level)
+                if pyramid_size > 0:
+                    added = open_position(pyramid_size, close_price, signal, i)
+                    if added:
+                        price, size, commission, slippage = added
+                        holdings += size
+                        level += 1
+                        if signal == 1:
+                            capital -= price * size + commission + slippage
+                        else:
+                            capital -= commission + slippage
+
+        # 止损
+        if not day_traded and in_position:
+            stop_price = _stop_price(
+                stop_type,
+                entry_price,
+                direction,
+                high_price,
+                low_price,
+                atr,
+                stop_pct,
+                trailing_pct,
+            )
+            if (direction == 1 and low_price <= stop_price) or (
+                direction == -1 and high_price >= stop_price
+            ):
+                capital = close_position(i, stop_price, 2)
+                in_position = False
+                holdings = 0
+                level = 0
+
+        eq_capital[i] = capital
+        eq_holdings[i] = holdings
+        eq_level[i] = level
+        if holdings != 0 and in_position and direction == 1:
+            eq_holding_value[i] = close_price * holdings
+            eq_total[i] = capital + close_price * holdings
+        else:
+            eq_holding_value[i] = 0
+            eq_total[i] = capital
+
+    equity = {
+        "date_index": np.arange(n, dtype=np.int64),
+        "capital": np.asarray(eq_capital, dtype=np.float64),
+        "holdings": np.asarray(eq_holdings, dtype=np.int64),
+        "holding_value": np.asarray(eq_holding_value, dtype=np.float64),
+        "total_value": np.asarray(eq_total, dtype=np.float64),
+        "pyramid_level": np.asarray(eq_level, dtype=np.int64),
+    }
+    return KernelResult(
+        time_key=bars.time_key,
+        equity=equity,
+        trades={
+            key: np.asarray(values, dtype=_TRADE_COLUMNS[key])
+            for key, values in trades.items()
+        },
+        costs={
+            key: np.asarray(values, dtype=_COST_COLUMNS[key])
+            for key, values in costs.items()
+        },
+    )
+
+
+def kernel_metrics(
+    bars: BarArrays, result: KernelResult, initial_capital: float
+) -> dict[str, float]:
+    """
+    由列式结果计算主要绩效指标，口径同 AdvancedBacktestEngine 的绩效指标
+
+    Args:
+        bars: 回测使用的行情
+        result: run_kernel 的结果
+        initial_capital: 初始资金
+
+    Returns:
+        dict: 键见 METRICS
+    """
+    total_days = (
+        (bars.date_ns[-1] - bars.date_ns[0]) // DAY_NS if len(bars) else 0
+    )
+    return equity_metrics(
+        result.equity["total_value"],
+        result.trades["profit"],
+        int(total_days),
+        initial_capital,
+    )
+
+
+def equity_metrics(
+    total_value: np.ndarray,
+    profit: np.ndarray,
+    total_days: int,
+    initial_capital: float,
+) -> dict[str, float]:
+    """
+    由资金曲线和每笔交易的净利润计算 METRICS 中的指标
+
+    Args:
+        total_value: 每根K线的总资产
+        profit: 每笔交易的净利润
+        total_days: 资金曲线首尾相隔的自然日数，用于年化
+        initial_capital: 初始资金
+    """
+    total_trades = len(profit)
+    if len(total_value) == 0:
+        return dict.fromkeys(METRICS, 0.0) | {"total_trades": 0}
+
+    total_return = (total_value[-1] - initial_capital) / initial_capital
+    annual_return = (
+        (1 + total_return) ** (365 / total_days) - 1 if total_days > 0 else 0.0
+    )
+    peak = np.maximum.accumulate(total_value)
+    max_drawdown = float(np.max((peak - total_value) / peak))
+
+    daily_returns = np.diff(total_value) / total_value[:-1]
+    std = np.std(daily_returns) if len(daily_returns) else 1e-8
+    mean = np.mean(daily_returns) if len(daily_returns) else 0.0
+    downside = daily_returns[daily_returns < 0]
+    downside_std = np.std(downside) if len(downside) else 1e-8
+    gross_profit = profit[profit > 0].sum()
+    gross_loss = profit[profit <= 0].sum()
+
+    return {
+        "total_trades": total_trades,
+        "win_rate": float((profit > 0).sum() / total_trades) if total_trades else 0.0,
+        "total_return": float(total_return),
+        "annual_return": float(annual_return),
+        "max_drawdown": max_drawdown,
+        "volatility": float(std * np.sqrt(252)) if len(daily_returns) else 0.0,
+        "sharpe_ratio": float(np.sqrt(252) * mean / std) if std > 0 else 0.0,
+        "sortino_ratio": (
+            float(np.sqrt(252) * mean / downside_std) if downside_std > 0 else 0.0
+        ),
+        "profit_factor": (
+            float(abs(gross_profit / gross_loss)) if gross_loss != 0 else float("inf")
+        ),
+    }
+
+
+def metric_sort_key(metrics: dict[str, float], metric: str) -> tuple:
+    """
+    按指标排序用的键，升序排序时最好的在前，NaN 排在最后
+
+    Args:
+        metrics: 指标字典
+        metric: 指标名，见 METRICS
+    """
+    value = metrics[metric]
+    if math.isnan(value):
+        return (True, 0)
+    return (False, value if metric in MINIMIZE_METRICS else -value)
+
+
+_TRADE_COLUMNS = {
+    "entry_index": np.int64,
+    "exit_index": np.int64,
+    "entry_price": np.float64,
+    "exit_price": np.float64,
+    "direction": np.int64,
+    "size": np.int64,
+    "profit": np.float64,
+    "profit_pct": np.float64,
+    "commission": np.float64,
+    "slippage": np.float64,
+    "close_type": np.int64,
+}
+_COST_COLUMNS = {
+    "index": np.int64,
+    "type": np.int64,
+    "price": np.float64,
+    "size": np.int64,
+    "commission": np.float64,
+    "slippage": np.float64,
+}
+
+
+def _append(columns: dict[str, list], *values) -> None:
+    for column, value in zip(columns.values(), values):
+        column.append(value)
+
+
+def _position_size(sizing, capital, initial_capital, max_pct, price, atr):
+    """按仓位管理策略计算开仓金额，与逐K线原实现相同"""
+    if sizing == 0:
+        return min(capital, initial_capital * max_pct)
+    if sizing == 2:
+        kelly_pct = _KELLY_WIN_RATE - ((1 - _KELLY_WIN_RATE) / _KELLY_WIN_LOSS_RATIO)
+        return capital * max(0, min(kelly_pct, max_pct))
+    if sizing == 3 and atr > 0:
+        volatility_factor = 1 / (atr / price)
+        return capital * min(max_pct * volatility_factor, max_pct)
+    return capital * max_pct
+
+
+def _stop_price(
+    stop_type, entry_price, direction, high, low, atr, stop_pct, trailing_pct
+):
+    """复合止损价格，与逐K线原实现相同"""
+    fixed_stop = entry_price * (1 - stop_pct * direction)
+    if stop_type == 1:
+        if trailing_pct is None:
+            return fixed_stop
+        return high * (1 - trailing_pct) if direction == 1 else low * (1 + trailing_pct)
+    atr_stop = entry_price - (atr * 2 * direction)
+    if stop_type == 2:
+        return atr_stop
+    if stop_type != 4:
+        return fixed_stop
+    if trailing_pct is None:
+        return (
+            max(fixed_stop, atr_stop) if direction == 1 else min(fixed_stop, atr_stop)
+        )
+    trailing_stop = (
+        high * (1 - trailing_pct) if direction == 1 else low * (1 + trailing_pct)
+    )
+    if direction == 1:
+        return max(fixed_stop, trailing_stop, atr_stop)
+    return min(fixed_stop, trailing_stop, atr_stop)
@@ -0,0 +1,283 @@
+"""
+多只股票的策略批量评估
+
+对一组股票逐只运行 StrategyEvaluator：每只股票的市场环境只分类一次、每个策略只
+计算一次信号，股票之间在进程池中并行。每只股票的每个策略输出一行紧凑的指标，
+可写成 CSV/Parquet，并按策略汇总成跨股票的排行榜。
+"""
+
+import copy
+import multiprocessing
+import os
+import threading
+from collections.abc import Iterable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+from core.analysis.advanced_backtest_engine import AdvancedBacktestEngine
+from core.analysis.strategy_evaluator import StrategyEvaluator
+from core.schema.k_line import as_kline_frame
+
+# 结果表的列
+RESULT_COLUMNS = (
+    "code",
+    "strategy",
+    "bars",
+    "start",
+    "end",
+    "total_trades",
+    "win_rate",
+    "total_return",
+    "annual_return",
+    "max_drawdown",
+    "volatility",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "total_score",
+    "rating",
+    "bull_win_rate",
+    "bear_win_rate",
+    "error",
+)
+
+# 排行榜中按策略取平均的指标
+LEADERBOARD_METRICS = (
+    "win_rate",
+    "total_return",
+    "annual_return",
+    "max_drawdown",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "total_score",
+)
+
+
+def evaluate_ticker(
+    code: str, kl_data, strategies: Sequence, engine: AdvancedBacktestEngine
+) -> list[dict[str, Any]]:
+    """
+    评估一只股票上的全部策略
+
+    Args:
+        code: 股票代码
+        kl_data: K线数据
+        strategies: 策略对象列表
+        engine: 回测引擎模板，每只股票使用一份副本，交易成本统计不会跨股票累计
+
+    Returns:
+        每个策略一行，列见 RESULT_COLUMNS；评估失败时只返回一行，error 为异常信息
+    """
+    frame = as_kline_frame(kl_data)
+    base = {
+        "code": code,
+        "bars": len(frame),
+        "start": frame.time_key[0] if len(frame) else None,
+        "end": frame.time_key[-1] if len(frame) else None,
+    }
+    if len(frame) == 0:
+        return [_row(base, error="无K线数据")]
+
+    evaluator = StrategyEvaluator()
+    evaluator.backtest_engine = copy.deepcopy(engine)
+    initial_capital = evaluator.backtest_engine.initial_capital
+    try:
+        # 市场环境分析按字典访问K线
+        results = evaluator.evaluate_strategies(strategies, frame.to_dicts())
+    except Exception as e:
+        return [_row(base, error=f"{type(e).__name__}: {e}")]
+
+    rows = []
+    for key, result in results.items():
+        metrics = result["backtest_result"]["metrics"]
+        equity_curve = result["backtest_result"]["equity_curve"]
+        regimes = result["regime_analysis"]
+        bull, bear = regimes.get("bull"), regimes.get("bear")
+        rows.append(
+            _row(
+                base,
+                strategy=key,
+                total_trades=metrics["total_trades"],
+                win_rate=metrics["win_rate"],
+                total_return=(
+                    equity_curve[-1]["total_value"] / initial_capital - 1
+                    if equity_curve
+                    else 0.0
+                ),
+                annual_return=metrics["annual_return"],
+                max_drawdown=metrics["max_drawdown"],
+                volatility=metrics["volatility"],
+                sharpe_ratio=metrics["sharpe_ratio"],
+                sortino_ratio=metrics["sortino_ratio"],
+                total_score=result["rating"]["total_score"],
+                rating=result["rating"]["rating"],
+                bull_win_rate=bull["win_rate"] if bull else None,
+                bear_win_rate=bear["win_rate"] if bear else None,
+            )
+        )
+    return rows
+
+
+def _row(base: dict, **values) -> dict[str, Any]:
+    row = dict.fromkeys(RESULT_COLUMNS)
+    row.update(base)
+    row.update(values)
+    return row
+
+
+# 子进程（或单进程模式下本进程）中的评估上下文
+_context: dict[str, Any] = {}
+
+
+def _init_context(strategies: Sequence, engine: AdvancedBacktestEngine) -> None:
+    _context.clear()
+    _context.update(strategies=strategies, engine=engine)
+
+
+def _evaluate(task: tuple[str, Any]) -> list[dict[str, Any]]:
+    code, kl_data = task
+    return evaluate_ticker(code, kl_data, _context["strategies"], _context["engine"])
+
+
+class BatchStrategyEvaluator:
+    """
+    多只股票的策略批量评估
+
+    策略列表和回测引擎在子进程启动时传入一次，任务只传递股票代码和K线。
+    同时在途的股票数有上限，K线可以由生成器边加载边提交。进程池在首次 run 时创建，
+    之后的 run（包括多个线程同时调用）复用同一进程池，用完后调用 close（或使用
+    with 语句）释放。
+
+    Example:
+        with BatchStrategyEvaluator(DEFAULT_STRATEGIES, workers=4) as batch:
+            table = batch.run((code, source.get_kline_data(code)) for code in codes)
+        write_results(table, "output/strategies.parquet")
+        print(leaderboard(table))
+    """
+
+    def __init__(
+        self,
+        strategies: Sequence,
+        engine: Optional[AdvancedBacktestEngine] = None,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ):
+        """
+        Args:
+            strategies: 策略对象列表
+            engine: 回测引擎，默认使用 AdvancedBacktestEngine 的默认参数
+            workers: 进程数，默认为CPU核数，为0时在本进程中计算
+            max_pending: 同时在途的股票数上限，默认为进程数的4倍
+        """
+        self.strategies = list(strategies)
+        self.engine = engine or AdvancedBacktestEngine()
+        self.workers = (os.cpu_count() or 1) if workers is None else max(workers, 0)
+        self.max_pending = max_pending or max(self.workers, 1) * 4
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "BatchStrategyEvaluator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_context,
+                    initargs=(self.strategies, self.engine),
+                )
+            return self._executor
+
+    def run(self, klines: Iterable[tuple[str, Any]]) -> pd.DataFrame:
+        """
+        评估全部股票
+
+        Args:
+            klines: (股票代码, K线数据) 序列，K线为 None 的股票记为无数据
+
+        Returns:
+            DataFrame，列见 RESULT_COLUMNS，按输入顺序、策略顺序排列
+        """
+        if self.workers == 0:
+            _init_context(self.strategies, self.engine)
+            rows = [row for task in klines for row in _evaluate(task)]
+            return pd.DataFrame(rows, columns=list(RESULT_COLUMNS))
+
+        executor = self._get_executor()
+        results: dict[int, list] = {}
+        pending = {}
+        try:
+            for index, task in enumerate(klines):
+                if len(pending) >= self.max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results[pending.pop(future)] = future.result()
+                pending[executor.submit(_evaluate, task)] = index
+            for future in list(pending):
+                results[pending[future]] = future.result()
+                del pending[future]
+        finally:
+            # 出错时取消本次 run 尚未开始的任务，进程池留给之后的 run
+            for future in pending:
+                future.cancel()
+        rows = [row for index in sorted(results) for row in results[index]]
+        return pd.DataFrame(rows, columns=list(RESULT_COLUMNS))
+
+    def close(self) -> None:
+        """关闭进程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+def leaderboard(table: pd.DataFrame, metric: str = "total_score") -> pd.DataFrame:
+    """
+    按策略汇总的跨股票排行榜
+
+    Args:
+        table: BatchStrategyEvaluator.run 的结果
+        metric: 排序指标，取 LEADERBOARD_METRICS 中的一个，按其均值降序
+            （max_drawdown 升序）
+
+    Returns:
+        以策略为索引的 DataFrame：tickers（有效股票数）、total_trades（交易总数）、
+        positive_ratio（收益为正的股票占比）及 LEADERBOARD_METRICS 各指标的均值
+    """
+    if metric not in LEADERBOARD_METRICS:
+        raise ValueError(f"未知的排序指标: {metric}")
+    valid = table[table["error"].isna()]
+    grouped = valid.groupby("strategy")
+    board = grouped[list(LEADERBOARD_METRICS)].mean()
+    board.insert(0, "tickers", grouped["code"].nunique())
+    board.insert(1, "total_trades", grouped["total_trades"].sum())
+    positive = grouped["total_return"].agg(lambda returns: (returns > 0).mean())
+    board.insert(2, "positive_ratio", positive)
+    return board.sort_values(metric, ascending=metric == "max_drawdown")
+
+
+def write_results(table: pd.DataFrame, path: str) -> Path:
+    """
+    写出结果表，扩展名为 .parquet 时写 Parquet（需要 pyarrow），否则写 CSV
+
+    Args:
+        table: 结果表
+        path: 输出文件路径，目录不存在时创建
+
+    Returns:
+        输出文件路径
+    """
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if output.suffix == ".parquet":
+        table.to_parquet(output, index=False)
+    else:
+        table.to_csv(output, index=False)
+    return output
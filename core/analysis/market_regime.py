@@ -160,9 +160,17 @@ class MarketRegimeClassifier:
 
         return market_strength
 
-    def analyze_strategy_by_regime(self, strategy_trades, kl_data):
-        """分析策略在不同市场环境下的表现"""
-        regimes = self.classify(kl_data)
+    def analyze_strategy_by_regime(self, strategy_trades, kl_data, regimes=None):
+        """分析策略在不同市场环境下的表现
+
+        Args:
+            strategy_trades: 策略的交易记录
+            kl_data: K线数据
+            regimes: 同一份K线上 classify 的结果（可选），同一只股票评估多个策略时
+                传入以免重复分类
+        """
+        if regimes is None:
+            regimes = self.classify(kl_data)
 
         # 将分类结果转换为字典，便于查找
         regime_dict = {}
@@ -0,0 +1,346 @@
+"""
+策略参数扫描
+
+在 get_params/set_params 暴露的参数空间上做网格、随机和逐次减半
+（successive halving）搜索，按指定指标排序。
+
+每组参数只计算一次策略信号并在回测内核上回测（见 backtest_kernel），不做
+StrategyEvaluator 的市场环境、分期业绩分析；选出的参数可用 evaluate 生成完整报告。
+
+多进程时K线列数组放在共享内存中，子进程启动时挂载一次，任务只传递参数字典，
+不会为每个任务序列化一份K线。子进程内按K线区间缓存 FeatureStore，不同参数
+用到的相同均线等基础序列只计算一次。
+"""
+
+import itertools
+import math
+import multiprocessing
+import os
+import random
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory
+from typing import Any, Optional
+
+import numpy as np
+
+from core.analysis.backtest_kernel import (
+    METRICS,
+    BarArrays,
+    KernelConfig,
+    kernel_metrics,
+    metric_sort_key,
+    prepare_bars,
+    run_kernel,
+)
+from core.analysis.strategy_evaluator import StrategyEvaluator
+from core.schema.k_line import KLINE_COLUMNS, KLineFrame, as_kline_frame
+from core.utils.feature_store import FeatureStore
+
+
+@dataclass
+class SweepResult:
+    """一组参数的回测结果"""
+
+    params: dict[str, Any]
+    metrics: dict[str, float]
+    bars: int  # 回测使用的K线数（逐次减半的早期轮次只用最近一段）
+
+
+def grid_params(
+    space: Mapping[str, Iterable],
+    where: Optional[Callable[[dict], bool]] = None,
+) -> list[dict[str, Any]]:
+    """
+    参数网格
+
+    Args:
+        space: 参数名到候选值的映射，如 {"p1": range(5, 30, 2), "p2": [21, 34]}
+        where: 过滤不合理组合的条件，如 lambda p: p["p1"] < p["p2"]
+
+    Returns:
+        参数字典列表
+    """
+    names = list(space)
+    combos = (
+        dict(zip(names, values))
+        for values in itertools.product(*(list(space[name]) for name in names))
+    )
+    return [params for params in combos if where is None or where(params)]
+
+
+def random_params(
+    space: Mapping[str, Iterable],
+    n: int,
+    seed: Optional[int] = None,
+    where: Optional[Callable[[dict], bool]] = None,
+) -> list[dict[str, Any]]:
+    """
+    从参数网格中不重复地随机抽取 n 组
+
+    Args:
+        space: 同 grid_params
+        n: 抽取组数，超过网格大小时返回整个网格（打乱顺序）
+        seed: 随机种子
+        where: 同 grid_params
+    """
+    candidates = grid_params(space, where)
+    rng = random.Random(seed)
+    return rng.sample(candidates, min(n, len(candidates)))
+
+
+def rank_results(results: list[SweepResult], metric: str) -> list[SweepResult]:
+    """
+    按指标排序，最好的在前，NaN 排在最后
+
+    Args:
+        results: 回测结果
+        metric: 指标名，见 backtest_kernel.METRICS
+    """
+    if metric not in METRICS:
+        raise ValueError(f"未知的排序指标: {metric}")
+    return sorted(results, key=lambda result: metric_sort_key(result.metrics, metric))
+
+
+# 子进程（或单进程模式下本进程）中的回测上下文
+_context: dict[str, Any] = {}
+
+
+def _init_context(
+    strategy_cls: type,
+    frame: KLineFrame,
+    config: KernelConfig,
+    atr_period: int,
+    shm: Optional[shared_memory.SharedMemory] = None,
+) -> None:
+    _context.clear()
+    _context.update(
+        strategy_cls=strategy_cls,
+        frame=frame,
+        config=config,
+        atr_period=atr_period,
+        shm=shm,
+        slices={},
+    )
+
+
+def _init_worker(
+    strategy_cls: type,
+    shm_name: str,
+    shape: tuple[int, int],
+    time_key: list,
+    config: KernelConfig,
+    atr_period: int,
+) -> None:
+    """子进程初始化：挂载共享内存中的K线列数组"""
+    # spawn 启动的子进程与父进程共用资源跟踪器，共享内存由父进程在 close 中释放
+    shm = shared_memory.SharedMemory(name=shm_name)
+    values = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    values.flags.writeable = False
+    frame = KLineFrame.from_values(values, time_key)
+    _init_context(strategy_cls, frame, config, atr_period, shm)
+
+
+def _slice_context(start: int) -> tuple[KLineFrame, FeatureStore, BarArrays]:
+    """按起始下标缓存K线区间、特征缓存和行情数组"""
+    slices = _context["slices"]
+    if start not in slices:
+        frame = _context["frame"][start:]
+        bars = prepare_bars(frame, np.zeros(len(frame)), _context["atr_period"])
+        slices[start] = (frame, FeatureStore(frame), bars)
+    return slices[start]
+
+
+def _evaluate(task: tuple[dict[str, Any], int]) -> SweepResult:
+    """回测一组参数，task 为 (参数, K线起始下标)"""
+    params, start = task
+    frame, features, bars = _slice_context(start)
+    strategy = _context["strategy_cls"]()
+    strategy.set_params(params)
+    signals = strategy.calculate(frame, context=features)
+    bars = replace(bars, signal=np.asarray(signals, dtype=np.int64))
+    config = _context["config"]
+    result = run_kernel(bars, config)
+    return SweepResult(
+        params=params,
+        metrics=kernel_metrics(bars, result, config.initial_capital),
+        bars=len(frame),
+    )
+
+
+class ParamSweep:
+    """
+    单只股票上的策略参数扫描
+
+    回测参数取自 StrategyEvaluator 的回测引擎。多进程时使用 spawn 启动子进程，
+    用完后调用 close（或使用 with 语句）释放进程池和共享内存。
+
+    Example:
+        with ParamSweep(MaBaseStrategy, kl_data, workers=4) as sweep:
+            space = {"p1": range(5, 30), "p2": range(10, 60, 2), "p3": [55, 89]}
+            best = sweep.successive_halving(random_params(space, 300, seed=1))[0]
+            report = sweep.evaluate(best.params)
+    """
+
+    def __init__(
+        self,
+        strategy_cls: type,
+        kl_data,
+        evaluator: Optional[StrategyEvaluator] = None,
+        metric: str = "sharpe_ratio",
+        workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            strategy_cls: 策略类，无参构造后用 set_params 设置参数
+            kl_data: K线数据
+            evaluator: 策略评估器，默认新建
+            metric: 排序指标，见 backtest_kernel.METRICS
+            workers: 进程数，默认为CPU核数，为0时在本进程中计算
+        """
+        if metric not in METRICS:
+            raise ValueError(f"未知的排序指标: {metric}")
+        self.strategy_cls = strategy_cls
+        self.frame = as_kline_frame(kl_data)
+        self.evaluator = evaluator or StrategyEvaluator()
+        self.metric = metric
+        self.kl_data = kl_data
+        self.workers = (os.cpu_count() or 1) if workers is None else max(workers, 0)
+        self._executor: Optional[Executor] = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+
+    def __enter__(self) -> "ParamSweep":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _kernel_config(self) -> KernelConfig:
+        return self.evaluator.backtest_engine.kernel_config()
+
+    def _get_executor(self) -> Optional[Executor]:
+        """多进程时创建进程池并把K线放入共享内存，单进程时初始化本进程的上下文"""
+        engine = self.evaluator.backtest_engine
+        if self.workers == 0:
+            _init_context(
+                self.strategy_cls, self.frame, self._kernel_config(), engine.atr_period
+            )
+            return None
+        if self._executor is None:
+            values = np.vstack([self.frame.column(name) for name in KLINE_COLUMNS])
+            self._shm = shared_memory.SharedMemory(create=True, size=values.nbytes)
+            np.ndarray(values.shape, dtype=np.float64, buffer=self._shm.buf)[:] = values
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(
+                    self.strategy_cls,
+                    self._shm.name,
+                    values.shape,
+                    self.frame.time_key.tolist(),
+                    self._kernel_config(),
+                    engine.atr_period,
+                ),
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """关闭进程池并释放共享内存"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def run(
+        self, candidates: Sequence[dict[str, Any]], bars: Optional[int] = None
+    ) -> list[SweepResult]:
+        """
+        回测一组候选参数并排序
+
+        Args:
+            candidates: 参数字典列表
+            bars: 只使用最近的若干根K线，默认使用全部
+
+        Returns:
+            按 metric 排序的结果，最好的在前
+        """
+        start = max(len(self.frame) - bars, 0) if bars else 0
+        tasks = [(dict(params), start) for params in candidates]
+        executor = self._get_executor()
+        if executor is None:
+            results = [_evaluate(task) for task in tasks]
+        else:
+            chunksize = max(1, len(tasks) // (self.workers * 4))
+            results = list(executor.map(_evaluate, tasks, chunksize=chunksize))
+        return rank_results(results, self.metric)
+
+    def grid(
+        self,
+        space: Mapping[str, Iterable],
+        where: Optional[Callable[[dict], bool]] = None,
+    ) -> list[SweepResult]:
+        """网格搜索，参数见 grid_params"""
+        return self.run(grid_params(space, where))
+
+    def random(
+        self,
+        space: Mapping[str, Iterable],
+        n: int,
+        seed: Optional[int] = None,
+        where: Optional[Callable[[dict], bool]] = None,
+    ) -> list[SweepResult]:
+        """随机搜索，参数见 random_params"""
+        return self.run(random_params(space, n, seed, where))
+
+    def successive_halving(
+        self,
+        candidates: Sequence[dict[str, Any]],
+        eta: int = 3,
+        min_bars: int = 120,
+    ) -> list[SweepResult]:
+        """
+        逐次减半搜索
+
+        第一轮在最近的一小段K线上回测全部候选，每轮保留最好的 1/eta、
+        K线长度乘以 eta，最后一轮使用全部K线。
+
+        Args:
+            candidates: 参数字典列表
+            eta: 每轮淘汰比例
+            min_bars: 第一轮至少使用的K线数
+
+        Returns:
+            最后一轮（全部K线）的排序结果
+        """
+        total = len(self.frame)
+        rounds = max(math.ceil(math.log(max(len(candidates), 1), eta)), 0)
+        survivors = list(candidates)
+        for round_index in range(rounds):
+            bars = max(total // eta ** (rounds - round_index), min_bars)
+            if bars >= total:
+                break
+            ranked = self.run(survivors, bars)
+            survivors = [
+                result.params for result in ranked[: math.ceil(len(ranked) / eta)]
+            ]
+        return self.run(survivors)
+
+    def evaluate(self, params: dict[str, Any]) -> dict:
+        """
+        用 StrategyEvaluator 对一组参数生成完整评估报告
+
+        Args:
+            params: 策略参数
+        """
+        strategy = self.strategy_cls()
+        strategy.set_params(params)
+        kl_data = self.kl_data
+        if isinstance(kl_data, KLineFrame):
+            # 市场环境分析按字典访问K线
+            kl_data = kl_data.to_dicts()
+        return self.evaluator.evaluate_strategy(strategy, kl_data)
@@ -0,0 +1,367 @@
+"""
+组合回测
+
+按 (日期 × 股票) 对齐的价格与评分矩阵模拟多只股票共用一份资金的组合：每个调仓日
+按前一日收盘后的评分（如 TrendScore）选出排名前 N 的股票，按等权或评分加权分配
+资金，以当日开盘价按各股票的每手股数成交，其余日子按收盘价估值。
+
+循环只沿日期进行，每个日期上的选股、下单与估值都是对全部股票的数组运算，
+几千只股票、几年的日线可以在秒级完成。
+"""
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from core.analysis.backtest_kernel import DAY_NS, equity_metrics
+from core.enum.ticker_group import TickerGroup, get_group_id_by_code
+from core.schema.k_line import as_kline_frame
+
+# 股票未提供每手股数（ticker.lot_size 为空或非正数）时按市场取的默认值
+DEFAULT_LOT_SIZES = {
+    TickerGroup.HK.value: 100,
+    TickerGroup.ZH.value: 100,
+    TickerGroup.US.value: 1,
+}
+
+# 资金分配方式：equal 每个持仓名额分配相同资金，score 按评分比例分配
+ALLOCATIONS = ("equal", "score")
+
+# 组合回测返回的指标
+PORTFOLIO_METRICS = (
+    "total_return",
+    "annual_return",
+    "max_drawdown",
+    "volatility",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "total_orders",
+    "turnover",
+    "total_commission",
+    "total_slippage",
+)
+
+
+@dataclass
+class PortfolioData:
+    """
+    按日期对齐的多只股票行情
+
+    open/close 为 (n_dates, n_tickers) 的 float64 矩阵，某只股票在某日没有K线时为 NaN。
+    rows[i] 为第 i 只股票每根K线在 dates 中的下标，用于把按K线排列的序列
+    （评分、信号）对齐成矩阵。
+    """
+
+    dates: np.ndarray  # 全部股票K线日期的并集，升序
+    codes: list[str]
+    open: np.ndarray
+    close: np.ndarray
+    rows: list[np.ndarray]
+
+    @classmethod
+    def from_klines(cls, klines: Mapping[str, object]) -> "PortfolioData":
+        """
+        由各股票的K线构建
+
+        Args:
+            klines: 股票代码到K线（list[KLine] 或 KLineFrame）的映射
+        """
+        codes = list(klines)
+        frames = [as_kline_frame(klines[code]) for code in codes]
+        keys = [frame.time_key.astype(str) for frame in frames]
+        dates = np.unique(np.concatenate(keys) if keys else np.empty(0, dtype=str))
+        shape = (len(dates), len(codes))
+        open_matrix = np.full(shape, np.nan)
+        close_matrix = np.full(shape, np.nan)
+        rows = []
+        for col, frame in enumerate(frames):
+            row = np.searchsorted(dates, keys[col])
+            open_matrix[row, col] = frame.open
+            close_matrix[row, col] = frame.close
+            rows.append(row)
+        return cls(dates.astype(object), codes, open_matrix, close_matrix, rows)
+
+    def align(self, series: Mapping[str, Sequence[float]]) -> np.ndarray:
+        """
+        把按各股票K线排列的序列对齐成 (n_dates, n_tickers) 矩阵
+
+        Args:
+            series: 股票代码到序列的映射，序列与该股票的K线等长，缺失的股票为 NaN
+        """
+        matrix = np.full(self.close.shape, np.nan)
+        for col, code in enumerate(self.codes):
+            if code in series:
+                values = np.asarray(series[code], dtype=np.float64)
+                matrix[self.rows[col], col] = values
+        return matrix
+
+
+def lot_sizes_for(tickers: Sequence, codes: Sequence[str]) -> np.ndarray:
+    """
+    按 codes 的顺序取各股票的每手股数
+
+    Args:
+        tickers: Ticker 列表，优先使用 ticker.lot_size
+        codes: 股票代码，不在 tickers 中或 lot_size 无效时按市场取 DEFAULT_LOT_SIZES
+    """
+    by_code = {ticker.code: ticker.lot_size for ticker in tickers}
+    sizes = []
+    for code in codes:
+        lot_size = by_code.get(code)
+        if not lot_size or lot_size <= 0:
+            lot_size = DEFAULT_LOT_SIZES.get(get_group_id_by_code(code), 100)
+        sizes.append(lot_size)
+    return np.asarray(sizes, dtype=np.int64)
+
+
+@dataclass
+class PortfolioResult:
+    """
+    组合回测结果
+
+    equity: 每个日期的 cash、holding_value、total_value、positions（持仓股票数）
+    orders: 按成交顺序的委托，date_index、ticker_index、shares（买为正、卖为负）、
+        price（含滑点）、commission、slippage
+    holdings: 回测结束时各股票的持股数
+    """
+
+    dates: np.ndarray
+    codes: list[str]
+    equity: dict[str, np.ndarray]
+    orders: dict[str, np.ndarray]
+    holdings: np.ndarray
+    metrics: dict[str, float]
+
+
+class PortfolioBacktester:
+    """
+    多只股票共用资金的组合回测引擎
+
+    Example:
+        data = PortfolioData.from_klines({code: kl_data for code, kl_data in ...})
+        # trend_scores[code] 为 TrendScore.calculate 的结果，每根K线一个 TickerScore
+        scores = data.align(
+            {code: [item.score for item in trend_scores[code]] for code in data.codes}
+        )
+        backtester = PortfolioBacktester(max_positions=20, rebalance_every=5)
+        result = backtester.run(data, scores, lot_sizes_for(tickers, data.codes))
+    """
+
+    def __init__(
+        self,
+        initial_capital=1000000,
+        max_positions=10,
+        rebalance_every=5,
+        allocation="equal",
+        min_score=None,
+        slippage_pct=0.001,
+        commission_pct=0.0003,
+    ):
+        """
+        初始化组合回测引擎
+
+        参数:
+        initial_capital: 初始资金
+        max_positions: 最大持仓股票数
+        rebalance_every: 调仓间隔（交易日数），1 为每日调仓
+        allocation: 资金分配方式，见 ALLOCATIONS
+        min_score: 入选的最低评分，None 表示不限制
+        slippage_pct: 滑点百分比
+        commission_pct: 手续费率
+        """
+        if allocation not in ALLOCATIONS:
+            raise ValueError(f"未知的资金分配方式: {allocation}")
+        if max_positions <= 0 or rebalance_every <= 0:
+            raise ValueError("max_positions 和 rebalance_every 必须大于0")
+        self.initial_capital = initial_capital
+        self.max_positions = max_positions
+        self.rebalance_every = rebalance_every
+        self.allocation = allocation
+        self.min_score = min_score
+        self.slippage_pct = slippage_pct
+        self.commission_pct = commission_pct
+
+    def run(
+        self,
+        data: PortfolioData,
+        scores: np.ndarray,
+        lot_sizes: Optional[np.ndarray] = None,
+    ) -> PortfolioResult:
+        """
+        运行组合回测
+
+        第 t 个调仓日使用第 t-1 日的评分排名，在第 t 日开盘成交：先卖出不再入选或
+        超配的部分，再买入；资金不足时按比例缩减买单。当日无K线的股票不能交易，
+        已有持仓保留并占用持仓名额，估值沿用最近的收盘价。
+
+        Args:
+            data: 对齐的行情
+            scores: (n_dates, n_tickers) 评分矩阵，越大越好，NaN 表示不参与排名
+            lot_sizes: 各股票的每手股数，默认全部为100
+
+        Returns:
+            PortfolioResult
+        """
+        n_dates, n_tickers = data.close.shape
+        if scores.shape != data.close.shape:
+            raise ValueError(f"评分矩阵形状不符: {scores.shape}")
+        lots = (
+            np.full(n_tickers, 100, dtype=np.int64)
+            if lot_sizes is None
+            else np.asarray(lot_sizes, dtype=np.int64)
+        )
+        marks = pd.DataFrame(data.close).ffill().fillna(0.0).to_numpy()
+        eligible = ~np.isnan(scores)
+        if self.min_score is not None:
+            eligible &= np.nan_to_num(scores, nan=-np.inf) >= self.min_score
+
+        cash = float(self.initial_capital)
+        shares = np.zeros(n_tickers, dtype=np.int64)
+        eq_cash = np.zeros(n_dates)
+        eq_holding = np.zeros(n_dates)
+        eq_positions = np.zeros(n_dates, dtype=np.int64)
+        orders: list[tuple] = []
+        traded_value = 0.0
+
+        for t in range(n_dates):
+            if t > 0 and (t - 1) % self.rebalance_every == 0:
+                cash, traded = self._rebalance(
+                    t,
+                    data.open[t],
+                    marks[t - 1],
+                    scores[t - 1],
+                    eligible[t - 1],
+                    lots,
+                    shares,
+                    cash,
+                    orders,
+                )
+                traded_value += traded
+            eq_cash[t] = cash
+            eq_holding[t] = shares @ marks[t]
+            eq_positions[t] = np.count_nonzero(shares)
+
+        total_value = eq_cash + eq_holding
+        order_columns = {
+            key: np.asarray([order[i] for order in orders], dtype=dtype)
+            for i, (key, dtype) in enumerate(_ORDER_COLUMNS.items())
+        }
+        metrics = self._metrics(data.dates, total_value, order_columns, traded_value)
+        return PortfolioResult(
+            dates=data.dates,
+            codes=data.codes,
+            equity={
+                "cash": eq_cash,
+                "holding_value": eq_holding,
+                "total_value": total_value,
+                "positions": eq_positions,
+            },
+            orders=order_columns,
+            holdings=shares,
+            metrics=metrics,
+        )
+
+    def _rebalance(
+        self, t, prices, marks, scores, eligible, lots, shares, cash, orders
+    ) -> tuple[float, float]:
+        """在第 t 日开盘调仓，原地修改 shares、追加 orders，返回 (现金, 成交额)"""
+        tradable = ~np.isnan(prices)
+        stuck = (shares != 0) & ~tradable
+        slots = max(self.max_positions - int(np.count_nonzero(stuck)), 0)
+
+        # 选出可交易股票中评分最高的 slots 只
+        candidates = np.flatnonzero(eligible & tradable)
+        if slots and len(candidates) > slots:
+            top = np.argpartition(-scores[candidates], slots - 1)[:slots]
+            candidates = candidates[top]
+        selected = candidates if slots else candidates[:0]
+
+        # 目标市值：等权时每个名额一份，评分加权时按正评分比例分配全部名额的资金
+        value = cash + float(shares @ np.where(tradable, prices, marks))
+        weights = np.zeros(len(selected))
+        if len(selected):
+            if self.allocation == "score":
+                positive = np.clip(scores[selected], 0, None)
+                total = positive.sum()
+                if total > 0:
+                    weights = positive / total * len(selected) / self.max_positions
+            else:
+                weights[:] = 1 / self.max_positions
+        target = shares.copy()
+        target[tradable] = 0
+        buy_price = prices[selected] * (1 + self.slippage_pct)
+        lot_value = buy_price * lots[selected]
+        units = (value * weights / lot_value).astype(np.int64)
+        target[selected] = units * lots[selected]
+
+        delta = target - shares
+        traded = 0.0
+
+        # 先卖出
+        sell = np.flatnonzero(delta < 0)
+        if len(sell):
+            price = prices[sell] * (1 - self.slippage_pct)
+            amount = price * -delta[sell]
+            commission = amount * self.commission_pct
+            slippage = (prices[sell] - price) * -delta[sell]
+            cash += float((amount - commission).sum())
+            traded += float(amount.sum())
+            shares[sell] = target[sell]
+            orders.extend(
+                zip([t] * len(sell), sell, delta[sell], price, commission, slippage)
+            )
+
+        # 再买入，资金不足时按比例缩减
+        buy = np.flatnonzero(delta > 0)
+        if len(buy):
+            price = prices[buy] * (1 + self.slippage_pct)
+            cost = (price * delta[buy] * (1 + self.commission_pct)).sum()
+            if cost > cash:
+                scaled = (delta[buy] * (cash / cost) // lots[buy]).astype(np.int64)
+                delta[buy] = scaled * lots[buy]
+                buy = buy[delta[buy] > 0]
+                price = prices[buy] * (1 + self.slippage_pct)
+            amount = price * delta[buy]
+            commission = amount * self.commission_pct
+            slippage = (price - prices[buy]) * delta[buy]
+            cash -= float((amount + commission).sum())
+            traded += float(amount.sum())
+            shares[buy] += delta[buy]
+            orders.extend(
+                zip([t] * len(buy), buy, delta[buy], price, commission, slippage)
+            )
+        return cash, traded
+
+    def _metrics(self, dates, total_value, orders, traded_value) -> dict[str, float]:
+        """组合绩效指标，键见 PORTFOLIO_METRICS"""
+        total_days = 0
+        if len(dates) > 1:
+            date_ns = (
+                pd.to_datetime(pd.Series(dates), format="mixed")
+                .to_numpy(dtype="datetime64[ns]")
+                .astype(np.int64)
+            )
+            total_days = int((date_ns[-1] - date_ns[0]) // DAY_NS)
+        metrics = equity_metrics(
+            total_value, np.empty(0), total_days, self.initial_capital
+        )
+        average_value = float(np.mean(total_value)) if len(total_value) else 0.0
+        return {key: metrics[key] for key in PORTFOLIO_METRICS if key in metrics} | {
+            "total_orders": len(orders["shares"]),
+            "turnover": traded_value / average_value if average_value > 0 else 0.0,
+            "total_commission": float(orders["commission"].sum()),
+            "total_slippage": float(orders["slippage"].sum()),
+        }
+
+
+_ORDER_COLUMNS = {
+    "date_index": np.int64,
+    "ticker_index": np.int64,
+    "shares": np.int64,
+    "price": np.float64,
+    "commission": np.float64,
+    "slippage": np.float64,
+}
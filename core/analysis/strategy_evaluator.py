@@ -3,6 +3,7 @@ import pandas as pd
 
 from core.analysis.advanced_backtest_engine import AdvancedBacktestEngine
 from core.analysis.market_regime import MarketRegimeClassifier
+from core.analysis.walk_forward import walk_forward
 
 
 class StrategyEvaluator:
@@ -12,7 +13,9 @@ class StrategyEvaluator:
         self.backtest_engine = AdvancedBacktestEngine()
         self.regime_classifier = MarketRegimeClassifier()
 
-    def evaluate_strategy(self, strategy_obj, kl_data, name=None, simple_mode=False):
+    def evaluate_strategy(
+        self, strategy_obj, kl_data, name=None, simple_mode=False, regimes=None
+    ):
         """全面评估单个策略
 
         Args:
@@ -20,6 +23,7 @@ class StrategyEvaluator:
             kl_data: K线数据
             name: 策略名称（可选）
             simple_mode: 是否使用简化模式进行回测（可选，默认False）
+            regimes: 同一份K线的市场环境分类结果（可选，默认重新分类）
 
         Returns:
             dict: 策略评估结果
@@ -31,7 +35,7 @@ class StrategyEvaluator:
 
         # 市场环境分析
         regime_analysis = self.regime_classifier.analyze_strategy_by_regime(
-            backtest_result["trades"], kl_data
+            backtest_result["trades"], kl_data, regimes
         )
 
         # 计算月度/季度/年度业绩
@@ -80,12 +84,63 @@ class StrategyEvaluator:
         Returns:
             dict: 多个策略的评估结果
         """
+        # 市场环境只与K线有关，所有策略共用一次分类结果
+        regimes = self.regime_classifier.classify(kl_data)
         results = {}
         for strategy in strategies:
             key = strategy.get_key()
-            results[key] = self.evaluate_strategy(strategy, kl_data, key, simple_mode)
+            results[key] = self.evaluate_strategy(
+                strategy, kl_data, key, simple_mode, regimes
+            )
         return results
 
+    def evaluate_walk_forward(
+        self,
+        strategy_obj,
+        kl_data,
+        train_bars=250,
+        test_bars=60,
+        step=None,
+        anchored=False,
+        param_candidates=None,
+        metric="sharpe_ratio",
+        workers=None,
+        name=None,
+    ):
+        """滚动前推评估单个策略
+
+        在相邻的样本内/样本外窗口上回测，可选地在每个样本内窗口上重新选参，
+        汇总各样本外窗口的指标，详见 core.analysis.walk_forward
+
+        Args:
+            strategy_obj: 策略对象
+            kl_data: K线数据
+            train_bars: 样本内K线数
+            test_bars: 样本外K线数
+            step: 窗口前移的K线数（可选，默认等于 test_bars）
+            anchored: 样本内窗口是否固定从第一根K线开始（可选，默认False）
+            param_candidates: 每个窗口重新选参的候选参数列表（可选，默认不选参）
+            metric: 选参使用的指标（可选，默认夏普比率）
+            workers: 并行进程数（可选，默认为CPU核数，为0时不使用子进程）
+            name: 策略名称（可选）
+
+        Returns:
+            dict: 各窗口结果（windows）与汇总的样本外指标（metrics）
+        """
+        result = walk_forward(
+            strategy_obj,
+            kl_data,
+            self.backtest_engine,
+            train_bars,
+            test_bars,
+            step=step,
+            anchored=anchored,
+            candidates=param_candidates,
+            metric=metric,
+            workers=workers,
+        )
+        return {"strategy_name": name or strategy_obj.get_key(), **result}
+
     def _calculate_period_performance(self, backtest_result):
         """计算不同时间周期的绩效"""
         # 创建每日权益曲线的DataFrame
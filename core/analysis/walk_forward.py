@@ -0,0 +1,307 @@
+"""
+滚动前推（walk-forward）评估
+
+把K线切成若干个相邻的样本内/样本外窗口：可选地在每个样本内窗口上从候选参数中
+选出最好的一组，再用它回测紧随其后的样本外窗口，最后把各样本外窗口的资金曲线
+按收益率首尾相接，汇总成整体的样本外指标。
+
+每组参数的策略信号只在全部K线上计算一次（共享同一个 FeatureStore），各窗口
+直接截取信号与行情数组，重叠的样本内窗口不会重复计算策略；指标的预热期也因此
+使用窗口之前的真实K线。多进程时每个子进程只在启动时接收一次行情与信号矩阵，
+任务只传递窗口下标。
+"""
+
+import copy
+import multiprocessing
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+import numpy as np
+
+from core.analysis.backtest_kernel import (
+    DAY_NS,
+    METRICS,
+    BarArrays,
+    KernelConfig,
+    equity_metrics,
+    kernel_metrics,
+    metric_sort_key,
+    prepare_bars,
+    run_kernel,
+)
+from core.schema.k_line import KLineFrame, as_kline_frame
+from core.utils.feature_store import FeatureStore
+
+
+@dataclass(frozen=True)
+class WalkForwardWindow:
+    """一个样本内/样本外窗口，均为左闭右开的K线下标区间"""
+
+    train_start: int
+    train_stop: int
+    test_start: int
+    test_stop: int
+
+
+@dataclass
+class WindowResult:
+    """一个窗口的评估结果"""
+
+    window: WalkForwardWindow
+    params: dict[str, Any]  # 样本外使用的参数
+    train_metrics: dict[str, float]
+    test_metrics: dict[str, float]
+    test_equity: np.ndarray  # 样本外每根K线的总资产
+    test_profit: np.ndarray  # 样本外每笔交易的净利润
+
+
+def walk_forward_windows(
+    total: int,
+    train_bars: int,
+    test_bars: int,
+    step: Optional[int] = None,
+    anchored: bool = False,
+) -> list[WalkForwardWindow]:
+    """
+    划分滚动窗口
+
+    第一个样本外窗口从第 train_bars 根K线开始，之后每次前移 step 根，
+    不足 test_bars 根的尾部不再单独成窗。
+
+    Args:
+        total: K线数
+        train_bars: 样本内K线数
+        test_bars: 样本外K线数
+        step: 窗口前移的K线数，默认等于 test_bars，不能小于 test_bars
+        anchored: 为 True 时样本内窗口固定从第一根K线开始（扩展窗口）
+
+    Returns:
+        按时间先后排列的窗口
+    """
+    step = step or test_bars
+    if train_bars <= 0 or test_bars <= 0:
+        raise ValueError("train_bars 和 test_bars 必须大于0")
+    if step < test_bars:
+        raise ValueError("step 不能小于 test_bars，样本外窗口不能重叠")
+    windows = []
+    test_start = train_bars
+    while test_start + test_bars <= total:
+        windows.append(
+            WalkForwardWindow(
+                train_start=0 if anchored else test_start - train_bars,
+                train_stop=test_start,
+                test_start=test_start,
+                test_stop=test_start + test_bars,
+            )
+        )
+        test_start += step
+    return windows
+
+
+def compute_signals(
+    strategy_obj, frame: KLineFrame, candidates: Optional[Sequence[dict]] = None
+) -> np.ndarray:
+    """
+    在全部K线上计算每组参数的策略信号
+
+    Args:
+        strategy_obj: 策略对象，候选参数在它的副本上用 set_params 设置
+        frame: K线数据
+        candidates: 候选参数，为空时只计算 strategy_obj 当前参数的信号
+
+    Returns:
+        (参数组数, K线数) 的 int64 信号矩阵
+    """
+    features = FeatureStore(frame)
+    if not candidates:
+        strategies = [strategy_obj]
+    else:
+        strategies = []
+        for params in candidates:
+            strategy = copy.deepcopy(strategy_obj)
+            strategy.set_params(dict(params))
+            strategies.append(strategy)
+    return np.asarray(
+        [strategy.calculate(frame, context=features) for strategy in strategies],
+        dtype=np.int64,
+    ).reshape(len(strategies), len(frame))
+
+
+def aggregate_windows(
+    results: Sequence[WindowResult], bars: BarArrays, initial_capital: float
+) -> dict[str, float]:
+    """
+    汇总样本外指标
+
+    各窗口的样本外回测都从 initial_capital 开始，这里把每个窗口的逐日收益率
+    （首日相对 initial_capital）依次拼接成一条资金曲线，按 METRICS 的口径计算
+    整体指标，另给出：
+        windows: 窗口数
+        positive_windows: 样本外收益为正的窗口占比
+        efficiency: 样本外平均年化收益 / 样本内平均年化收益（walk-forward
+            效率），样本内平均年化收益不为正时为0
+
+    Args:
+        results: 按时间先后排列的窗口结果
+        bars: 全部K线的行情数组
+        initial_capital: 初始资金
+    """
+    if not results:
+        return dict.fromkeys(METRICS, 0.0) | {
+            "total_trades": 0,
+            "windows": 0,
+            "positive_windows": 0.0,
+            "efficiency": 0.0,
+        }
+
+    returns = []
+    for result in results:
+        values = np.concatenate(([initial_capital], result.test_equity))
+        returns.append(np.diff(values) / values[:-1])
+    total_value = np.concatenate(
+        ([initial_capital], initial_capital * np.cumprod(1 + np.concatenate(returns)))
+    )
+    first, last = results[0].window, results[-1].window
+    total_days = (
+        bars.date_ns[last.test_stop - 1] - bars.date_ns[first.test_start]
+    ) // DAY_NS
+    metrics = equity_metrics(
+        total_value,
+        np.concatenate([result.test_profit for result in results]),
+        int(total_days),
+        initial_capital,
+    )
+
+    train_annual = np.mean([r.train_metrics["annual_return"] for r in results])
+    test_annual = np.mean([r.test_metrics["annual_return"] for r in results])
+    metrics.update(
+        windows=len(results),
+        positive_windows=float(
+            np.mean([r.test_metrics["total_return"] > 0 for r in results])
+        ),
+        efficiency=float(test_annual / train_annual) if train_annual > 0 else 0.0,
+    )
+    return metrics
+
+
+# 子进程（或单进程模式下本进程）中的评估上下文
+_context: dict[str, Any] = {}
+
+
+def _init_context(
+    bars: BarArrays,
+    signals: np.ndarray,
+    candidates: list[dict[str, Any]],
+    config: KernelConfig,
+    metric: str,
+) -> None:
+    _context.clear()
+    _context.update(
+        bars=bars, signals=signals, candidates=candidates, config=config, metric=metric
+    )
+
+
+def _backtest(row: int, start: int, stop: int):
+    """用第 row 组参数的信号回测 [start, stop) 区间，返回 (指标, 内核结果)"""
+    bars = replace(
+        _context["bars"].window(start, stop),
+        signal=_context["signals"][row, start:stop],
+    )
+    config = _context["config"]
+    result = run_kernel(bars, config)
+    return kernel_metrics(bars, result, config.initial_capital), result
+
+
+def _run_window(window: WalkForwardWindow) -> WindowResult:
+    """在样本内选出最好的参数，再回测样本外窗口"""
+    metric = _context["metric"]
+    scored = [
+        _backtest(row, window.train_start, window.train_stop)[0]
+        for row in range(len(_context["signals"]))
+    ]
+    best = min(range(len(scored)), key=lambda row: metric_sort_key(scored[row], metric))
+    test_metrics, result = _backtest(best, window.test_start, window.test_stop)
+    return WindowResult(
+        window=window,
+        params=dict(_context["candidates"][best]),
+        train_metrics=scored[best],
+        test_metrics=test_metrics,
+        test_equity=result.equity["total_value"],
+        test_profit=result.trades["profit"],
+    )
+
+
+def walk_forward(
+    strategy_obj,
+    kl_data,
+    engine,
+    train_bars: int,
+    test_bars: int,
+    step: Optional[int] = None,
+    anchored: bool = False,
+    candidates: Optional[Sequence[dict[str, Any]]] = None,
+    metric: str = "sharpe_ratio",
+    workers: Optional[int] = None,
+) -> dict:
+    """
+    滚动前推评估
+
+    Args:
+        strategy_obj: 策略对象
+        kl_data: K线数据
+        engine: AdvancedBacktestEngine，提供回测参数
+        train_bars: 样本内K线数
+        test_bars: 样本外K线数
+        step: 窗口前移的K线数，默认等于 test_bars
+        anchored: 样本内窗口是否固定从第一根K线开始
+        candidates: 每个窗口重新优化时的候选参数，为空时所有窗口使用
+            strategy_obj 的当前参数
+        metric: 样本内选参使用的指标，见 backtest_kernel.METRICS
+        workers: 进程数，默认为CPU核数，为0时在本进程中计算
+
+    Returns:
+        dict: windows 为各窗口的日期区间、参数、样本内/样本外指标，
+            metrics 为汇总的样本外指标（见 aggregate_windows）
+    """
+    if metric not in METRICS:
+        raise ValueError(f"未知的排序指标: {metric}")
+    frame = as_kline_frame(kl_data)
+    windows = walk_forward_windows(len(frame), train_bars, test_bars, step, anchored)
+    signals = compute_signals(strategy_obj, frame, candidates)
+    bars = prepare_bars(frame, np.zeros(len(frame)), engine.atr_period)
+    params = list(candidates) if candidates else [strategy_obj.get_params()]
+    initargs = (bars, signals, params, engine.kernel_config(), metric)
+
+    workers = (os.cpu_count() or 1) if workers is None else max(workers, 0)
+    workers = min(workers, len(windows))
+    if workers <= 1:
+        _init_context(*initargs)
+        results = [_run_window(window) for window in windows]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_context,
+            initargs=initargs,
+        ) as executor:
+            results = list(executor.map(_run_window, windows))
+
+    time_key = bars.time_key
+    return {
+        "windows": [
+            {
+                "train_start": time_key[result.window.train_start],
+                "train_end": time_key[result.window.train_stop - 1],
+                "test_start": time_key[result.window.test_start],
+                "test_end": time_key[result.window.test_stop - 1],
+                "params": result.params,
+                "train_metrics": result.train_metrics,
+                "test_metrics": result.test_metrics,
+            }
+            for result in results
+        ],
+        "metrics": aggregate_windows(results, bars, engine.initial_capital),
+    }
@@ -1,20 +1,30 @@
-import time
+import os
 from datetime import datetime
+from threading import Lock
 from typing import Optional
 
 import akshare as ak
 from dateutil.relativedelta import relativedelta
 
+from core.database.sqlite_writer import run_write
 from core.enum.ticker_type import TickerType
 from core.handler.ticker_analysis_handler import TickerAnalysisHandler
 from core.handler.ticker_k_line_handler import TickerKLineHandler
+from core.indicator import Indicator
 from core.models.ticker import Ticker
 from core.models.ticker_score import TickerScore
-from core.schema.k_line import KLine
+from core.schema.k_line import KLineFrame
 from core.service.market_repository import MarketRepository
 from core.service.ticker_repository import TickerRepository
 from core.service.ticker_score_repository import TickerScoreRepository
-from core.utils.utils import UtilsHelper
+from core.update_pipeline import (
+    PipelineConfig,
+    UpdatePipeline,
+    calculate_ticker_data,
+    write_ticker_result,
+)
+from core.utils.feature_store import FeatureStore
+from core.utils.lru_cache import LRUCache
 
 from .handler.ticker_handler import TickerHandler
 from .handler.ticker_indicator_handler import TickerIndicatorHandler
@@ -32,11 +42,37 @@ class DataSourceHelper:
     score_rule = None
     filter_rule = None
 
+    # 盘中指标流式状态，key为(code, 历史K线末根日期, 历史K线根数)，值为 {"states", "live"}
+    # states 为 Indicator.init_states 的可序列化状态，live 表示已推进过实时K线
+    _indicator_states = LRUCache(
+        max_entries=int(os.getenv("INDICATOR_STATE_MAX_ENTRIES", "1024")),
+        ttl=24 * 60 * 60,
+    )
+    # 状态原地更新，同一时刻只允许一个请求推进
+    _indicator_states_lock = Lock()
+
     def __init__(self):
         """初始化DataSourceHelper"""
         self.market_repo = MarketRepository()
         self.ticker_repo = TickerRepository()
         self.score_repo = TickerScoreRepository()
+        # 特征缓存命中统计，累计本实例处理过的所有股票
+        self.feature_stats = {"hits": 0, "misses": 0}
+
+    def close(self) -> None:
+        """
+        归还各仓库从连接池借出的数据库连接，之后本实例不能再访问数据库
+
+        实例持有连接直到关闭，不要作为模块级对象长期保留（API 中按请求创建）。
+        """
+        for repo in (self.market_repo, self.ticker_repo, self.score_repo):
+            repo.db.close()
+
+    def __enter__(self) -> "DataSourceHelper":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def set_strategies(self, strategies: Optional[list] = None):
         """
@@ -206,18 +242,63 @@ class DataSourceHelper:
             是否需要更新
         """
         try:
-            # 获取股票的最新评分记录
-            latest_scores = self.score_repo.get_items_by_ticker_id(ticker.id)
-            if not latest_scores or len(latest_scores) == 0:
+            # 获取股票的最新评分日期
+            score_date = self.score_repo.get_latest_time_key(ticker.id)
+            if not score_date:
                 # 没有评分记录，需要更新
                 return True
+            return self._need_update_by_score_date(
+                ticker, score_date, self._get_last_trading_date()
+            )
+
+        except Exception as e:
+            print(f"检查更新需求失败: {e}")
+            # 出错时保守处理，返回需要更新
+            return True
 
-            latest_score = latest_scores[0]  # 获取最新的评分
-            score_date = latest_score.time_key
+    def _need_update_tickers(self, tickers: list[Ticker]) -> dict[int, bool]:
+        """
+        批量检查多只股票是否需要更新，最新评分日期一次查询，最后交易日只取一次
+
+        Args:
+            tickers: 股票对象列表
 
-            # 获取最后交易日
+        Returns:
+            以股票ID为键的是否需要更新
+        """
+        try:
+            score_dates = self.score_repo.get_latest_time_keys(
+                ticker.id for ticker in tickers
+            )
+            if len(score_dates) == 0:
+                return {ticker.id: True for ticker in tickers}
             last_trading_date = self._get_last_trading_date()
+            return {
+                ticker.id: ticker.id not in score_dates
+                or self._need_update_by_score_date(
+                    ticker, score_dates[ticker.id], last_trading_date
+                )
+                for ticker in tickers
+            }
+        except Exception as e:
+            print(f"检查更新需求失败: {e}")
+            return {ticker.id: True for ticker in tickers}
+
+    def _need_update_by_score_date(
+        self, ticker: Ticker, score_date: str, last_trading_date: str
+    ) -> bool:
+        """
+        根据已保存的最新评分日期判断是否需要更新
+
+        Args:
+            ticker: 股票对象
+            score_date: 最新评分日期
+            last_trading_date: 最后交易日
 
+        Returns:
+            是否需要更新
+        """
+        try:
             # 如果评分日期早于最后交易日，需要更新
             if score_date < last_trading_date:
                 return True
@@ -276,26 +357,69 @@ class DataSourceHelper:
             # 2. 检查是否需要更新数据
             if not self._need_update_ticker_data(ticker):
                 # 不需要更新，直接返回现有评分数据
-                existing_scores = self.score_repo.get_items_by_ticker_id(ticker.id)
+                existing_scores = self.score_repo.get_scores(ticker.id, limit=days)
                 if existing_scores:
                     print(f"使用现有评分数据: {code} (共{len(existing_scores)}条记录)")
                     return existing_scores
 
             # 3. 需要更新数据，调用更新函数
-            print(f"更新股票数据: {code}")
-            ticker, kl_data, score_data = self._update_ticker(ticker, days)
-
-            if score_data:
-                print(f"成功获取评分数据: {code} (共{len(score_data)}条记录)")
-                return score_data
-            else:
-                print(f"未获取到评分数据: {code}")
-                return None
+            return self._update_ticker_score(ticker, days)
 
         except Exception as e:
             print(f"获取股票评分失败 {code}: {e}")
             return None
 
+    def get_ticker_scores(
+        self, tickers: list[Ticker], days: Optional[int] = 600
+    ) -> dict[int, Optional[list[TickerScore]]]:
+        """
+        批量获取多只股票的评分，同 get_ticker_score
+
+        是否需要更新、已有评分各用一次批量查询，只对需要更新的股票拉取数据
+
+        Args:
+            tickers: 股票对象列表
+            days: 获取的历史数据天数，默认600天
+
+        Returns:
+            以股票ID为键的 TickerScore 对象列表，获取失败的股票对应None
+        """
+        need_update = self._need_update_tickers(tickers)
+        existing = self.score_repo.get_many_by_ticker_ids(
+            (ticker.id for ticker in tickers if not need_update[ticker.id]),
+            limit=days,
+        )
+        result: dict[int, Optional[list[TickerScore]]] = {}
+        for ticker in tickers:
+            scores = existing.get(ticker.id)
+            if scores:
+                print(f"使用现有评分数据: {ticker.code} (共{len(scores)}条记录)")
+                result[ticker.id] = scores
+                continue
+            try:
+                result[ticker.id] = self._update_ticker_score(ticker, days)
+            except Exception as e:
+                print(f"获取股票评分失败 {ticker.code}: {e}")
+                result[ticker.id] = None
+        return result
+
+    def _update_ticker_score(
+        self, ticker: Ticker, days: Optional[int] = 600
+    ) -> Optional[list[TickerScore]]:
+        """
+        更新股票数据并返回评分
+        """
+        code = ticker.code
+        print(f"更新股票数据: {code}")
+        ticker, kl_data, score_data = self._update_ticker(ticker, days)
+
+        if score_data:
+            print(f"成功获取评分数据: {code} (共{len(score_data)}条记录)")
+            return score_data
+        else:
+            print(f"未获取到评分数据: {code}")
+            return None
+
     def _get_on_time_kline_data(self, ticker: Ticker, days: Optional[int] = 600):
         """
         获取指定股票的K线数据
@@ -335,46 +459,52 @@ class DataSourceHelper:
             if isinstance(ontime_date, (dt, date)):
                 ontime_date = ontime_date.strftime("%Y-%m-%d")
             if k_line_data is None:
-                k_line_data = [on_time_data]
+                k_line_data = KLineFrame.from_klines([on_time_data])
             elif isinstance(ontime_date, str) and time_key < ontime_date:
+                # 历史K线来自共享缓存，先复制再修改
+                k_line_data = k_line_data.copy()
                 k_line_data.append(on_time_data)
             elif time_key == ontime_date:
+                k_line_data = k_line_data.copy()
                 k_line_data[len(k_line_data) - 1] = on_time_data
         return time_key, k_line_data
 
     def _update_ticker_data(
-        self, ticker: Ticker, end_date: str, kl_data: list[KLine]
-    ) -> tuple[Ticker, list[KLine], list[TickerScore]]:
+        self, ticker: Ticker, end_date: str, kl_data: KLineFrame
+    ) -> tuple[Ticker, KLineFrame, list[TickerScore]]:
         """
-        更新指定股票的分析数据
+        更新指定股票的分析数据：在当前线程计算，策略、指标、估值和评分在同一事务中写入，
+        启用 SQLite 单写线程时排队写入（见 sqlite_writer.run_write）
         """
         score_data = []
         if kl_data:
-            # 使用格式化后的字符串日期
-            strategy_data = TickerStrategyHandler().update_ticker_strategy(
-                ticker, kl_data, end_date
-            )
-            indicator_data = TickerIndicatorHandler(
-                end_date, self.indicators
-            ).update_ticker_indicator(ticker, kl_data)
             valuation_data = TickerValuationHandler(
                 end_date, self.valuations
-            ).update_ticker_valuation(ticker)
-            score_data = TickerScoreHandler(self.score_rule).update_ticker_score(
-                ticker, kl_data, strategy_data, indicator_data, valuation_data
+            ).calculate(ticker)
+            result = calculate_ticker_data(
+                ticker,
+                end_date,
+                kl_data,
+                valuation_data,
+                self.indicators,
+                self.score_rule,
             )
+            run_write(lambda uow: write_ticker_result(uow, result))
+            self.feature_stats["hits"] += result["hits"]
+            self.feature_stats["misses"] += result["misses"]
+            score_data = result["score"]
         return ticker, kl_data, score_data
 
-    def _update_ticker(
-        self, ticker: Ticker, days: Optional[int] = 600, source: Optional[int] = None
-    ):
+    def _fetch_ticker_kl(
+        self,
+        ticker: Ticker,
+        start_date: str,
+        end_date: str,
+        source: Optional[int] = None,
+    ) -> Optional[KLineFrame]:
         """
-        更新指定股票数据
+        拉取指定股票的历史K线，实际使用的数据源与记录不同时同步source字段
         """
-        from core.service.ticker_repository import TickerRepository
-
-        # 统一获取和格式化日期
-        start_date, end_date = self._calc_start_end_date(days)
         kl_data, used_source = TickerKLineHandler().get_kl(
             ticker.code,
             source if source is not None else ticker.source,
@@ -390,41 +520,49 @@ class DataSourceHelper:
         ):
             TickerRepository().update(ticker.code, ticker.name, {"source": used_source})
             ticker.source = used_source
-        return self._update_ticker_data(ticker, end_date, kl_data)
+        return kl_data
 
-    def _update_tickers(
-        self, tickers: Optional[list] = None, days: Optional[int] = 600
+    def _update_ticker(
+        self, ticker: Ticker, days: Optional[int] = 600, source: Optional[int] = None
     ):
         """
         更新指定股票数据
         """
-        total = len(tickers)
-        end_date = self._get_end_date()
-        for i in range(total):
-            ticker = tickers[i]
-            UtilsHelper().run_process(
-                i,
-                total,
-                f"update({i + 1}/{total})",
-                f"({ticker.id}){ticker.code}",
-            )
-            k_score = TickerScoreRepository().get_items_by_ticker_id(ticker.id)
+        # 统一获取和格式化日期
+        start_date, end_date = self._calc_start_end_date(days)
+        kl_data = self._fetch_ticker_kl(ticker, start_date, end_date, source)
+        return self._update_ticker_data(ticker, end_date, kl_data)
 
-            if (
-                k_score is not None
-                and len(k_score) > 0
-                and k_score[0].time_key == end_date
-            ):
-                continue
-            try:
-                self._update_ticker(ticker, days, i % 2 + 1)
-            except Exception as e:
-                print(f"更新数据失败[{ticker.id}]{ticker.code} {str(e)}")
-            time.sleep(1)
+    def _update_tickers(
+        self,
+        tickers: Optional[list] = None,
+        days: Optional[int] = 600,
+        config: Optional[PipelineConfig] = None,
+        job_name: Optional[str] = None,
+    ) -> dict:
+        """
+        并发更新指定股票数据，拉取、计算和写库分阶段并行，见 UpdatePipeline
+
+        Args:
+            tickers: 股票列表
+            days: 拉取的历史天数
+            config: 并发配置，默认按环境变量创建
+            job_name: 任务名，指定时记录任务台账，中断后再次运行从断点续跑
+
+        Returns:
+            dict: 更新、跳过、失败的数量及耗时
+        """
+        stats = UpdatePipeline(self, config).run(tickers, days, job_name=job_name)
+        print(
+            f"特征缓存命中 {self.feature_stats['hits']} 次，"
+            f"未命中 {self.feature_stats['misses']} 次"
+        )
+        return stats
 
-    def get_ticker_code(self, market: str, ticker_code: str) -> str:
+    @staticmethod
+    def get_ticker_code(market: str, ticker_code: str) -> str:
         """
-        将原始股票代码转换为系统标准格式（包含市场前缀）
+        将原始股票代码转换为系统标准格式（包含市场前缀），不访问数据库
 
         Args:
             market: 市场标识（不区分大小写）
@@ -484,7 +622,7 @@ class DataSourceHelper:
             return
         # 统一获取和格式化日期
         start_date, end_date = self._calc_start_end_date(days)
-        k_line_data = TickerKLineHandler().get_kl(
+        k_line_data, _ = TickerKLineHandler().get_kl(
             ticker.code, ticker.source, start_date, end_date
         )
         return k_line_data
@@ -494,7 +632,7 @@ class DataSourceHelper:
         更新所有股票数据
         """
         tickers = TickerRepository().get_all_available()
-        self._update_tickers(tickers)
+        self._update_tickers(tickers, job_name="all")
 
     def update_tickers_start_with(self, start_key):
         """
@@ -502,11 +640,11 @@ class DataSourceHelper:
         """
         print("更新" + start_key + "开头的项目的数据")
         tickers = TickerRepository().get_all_available_start_with(start_key)
-        self._update_tickers(tickers)
+        self._update_tickers(tickers, job_name=f"start_with_{start_key}")
 
     def get_ticker_data(
         self, code: str, days: Optional[int] = 600
-    ) -> tuple[Ticker, list[KLine], list[TickerScore]]:
+    ) -> tuple[Ticker, KLineFrame, list[TickerScore]]:
         """
         获取指定股票数据
 
@@ -519,9 +657,9 @@ class DataSourceHelper:
             days: 获取的历史数据天数，默认600天
 
         Returns:
-            tuple[Ticker, List[KLine], List[TickerScore]]:
+            tuple[Ticker, KLineFrame, List[TickerScore]]:
                 - Ticker: 股票基础信息，如果股票不存在则返回None
-                - List[KLine]: K线数据列表
+                - KLineFrame: K线数据（列式，可按下标或迭代得到 KLine）
                 - List[TickerScore]: 评分数据列表
 
         Example:
@@ -546,13 +684,64 @@ class DataSourceHelper:
 
         # 从在线API获取K线数据和实时数据
         time_key, k_line_data = self._get_on_time_kline_data(ticker, days)
-        strategy_data = TickerStrategyHandler(time_key).calculate(k_line_data)
-        indicator_data = TickerIndicatorHandler(time_key).calculate(k_line_data)
+        features = FeatureStore(k_line_data)
+        strategy_data = TickerStrategyHandler(self.strategies).calculate(
+            k_line_data, features
+        )
+        indicator_data = TickerIndicatorHandler(time_key, self.indicators).calculate(
+            k_line_data, features
+        )
         score_data = TickerScoreHandler(self.score_rule).calculate(
             ticker, k_line_data, strategy_data, indicator_data, None
         )
         return ticker, k_line_data, score_data
 
+    def get_indicator_status_on_time(
+        self, code: str, days: Optional[int] = 600
+    ) -> Optional[tuple]:
+        """
+        获取即时指标状态，按实时K线增量推进缓存的流式状态，不重新全量计算
+
+        历史K线不变时复用缓存的状态：首次推进实时K线时追加，之后盘中刷新时
+        用 update_states(..., replace_last=True) 替换最后一根。评分序列依赖
+        完整的指标与策略历史，仍由 get_ticker_data_on_time 全量计算。
+
+        Args:
+            code: 股票代码
+            days: 历史K线天数
+
+        Returns:
+            Optional[tuple]: (股票, 时间, {指标键名: {"score", "status", "days"}})，
+                股票或K线不存在时返回 None
+        """
+        ticker = TickerRepository().get_by_code(code)
+        if ticker is None:
+            print("未找到目标数据")
+            return
+
+        time_key, k_line_data = self._get_on_time_kline_data(ticker, days)
+        if k_line_data is None or len(k_line_data) == 0:
+            print(f"未获取到K线数据: {code}")
+            return
+
+        history = k_line_data[:-1]
+        cache_key = (
+            ticker.code,
+            str(history.time_key[-1]) if len(history) > 0 else None,
+            len(history),
+        )
+        indicator = Indicator(self.indicators)
+        with self._indicator_states_lock:
+            entry = self._indicator_states.get(cache_key)
+            if entry is None:
+                entry = {"states": indicator.init_states(history), "live": False}
+            result = indicator.update_states(
+                entry["states"], k_line_data[-1], replace_last=entry["live"]
+            )
+            entry["live"] = True
+            self._indicator_states.put(cache_key, entry)
+        return ticker, time_key, result
+
     def analysis_ticker(self, code: str, days: Optional[int] = 600):
         """
         分析项目数据
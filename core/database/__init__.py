@@ -1,16 +1,31 @@
 # 设置db包的导入路径
+from .async_db import AsyncDbAdapter, get_async_engine
+from .connection_pool import ConnectionPool, PoolTimeoutError, get_pool, pool_stats
 from .database import get_database_config, get_database_url, is_database_available
 from .db_adapter import DbAdapter
 from .mysql_helper import MysqlHelper
 from .postgresql_helper import PostgresqlHelper
 from .sqlite_helper import SqliteHelper
+from .sqlite_writer import SqliteWriter, get_sqlite_writer, run_write
+from .unit_of_work import UnitOfWork, UnitOfWorkError
 
 __all__ = [
+    "AsyncDbAdapter",
+    "ConnectionPool",
     "DbAdapter",
+    "PoolTimeoutError",
     "PostgresqlHelper",
     "SqliteHelper",
+    "SqliteWriter",
+    "UnitOfWork",
+    "UnitOfWorkError",
     "MysqlHelper",
+    "get_async_engine",
     "get_database_url",
     "get_database_config",
     "is_database_available",
+    "get_pool",
+    "pool_stats",
+    "get_sqlite_writer",
+    "run_write",
 ]
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""
+异步数据库访问
+
+FastAPI 的 async 接口中直接调用 DbAdapter（pymysql/sqlite3）会阻塞整个事件循环。
+AsyncDbAdapter 基于 SQLAlchemy 异步引擎（aiosqlite/aiomysql/psycopg，见
+get_database_url），提供与 DbAdapter 相同的 query/query_one/execute 接口，
+SQL 参数统一使用 :name 形式。
+
+进程内共用一个引擎（连接池），在第一次使用时按 get_database_config 创建。
+"""
+
+import threading
+from typing import Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from .database import get_database_config
+
+_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+
+
+def create_engine_from_config() -> AsyncEngine:
+    """按环境变量创建异步引擎"""
+    config = get_database_config()
+    options: dict[str, Any] = {"echo": config["echo"], "pool_pre_ping": True}
+    if config["type"] != "sqlite":
+        options.update(
+            pool_size=config["pool_size"],
+            max_overflow=config["max_overflow"],
+            pool_recycle=config["pool_recycle"],
+        )
+    return create_async_engine(config["url"], **options)
+
+
+def get_async_engine() -> AsyncEngine:
+    """进程内共用的异步引擎"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine_from_config()
+    return _engine
+
+
+class AsyncDbAdapter:
+    """
+    异步数据库适配器，接口与 DbAdapter 对应，方法均为协程
+    """
+
+    def __init__(self, engine: Optional[AsyncEngine] = None):
+        """
+        Args:
+            engine: 可选的异步引擎，默认使用进程内共用的引擎
+        """
+        self.engine = engine if engine is not None else get_async_engine()
+
+    async def query(
+        self, sql: str, params: Optional[dict[str, Any]] = None
+    ) -> list[dict[str, Any]]:
+        """
+        执行查询
+
+        Args:
+            sql: SQL语句，参数使用 :name 形式
+            params: 参数字典
+
+        Returns:
+            结果行列表
+        """
+        async with self.engine.connect() as conn:
+            result = await conn.execute(text(sql), params or {})
+            return [dict(row) for row in result.mappings().all()]
+
+    async def query_one(
+        self, sql: str, params: Optional[dict[str, Any]] = None
+    ) -> Optional[dict[str, Any]]:
+        """执行查询，返回第一行或 None"""
+        async with self.engine.connect() as conn:
+            result = await conn.execute(text(sql), params or {})
+            row = result.mappings().first()
+            return dict(row) if row is not None else None
+
+    async def execute(self, sql: str, params: Optional[dict[str, Any]] = None) -> int:
+        """
+        在独立事务中执行写操作并提交
+
+        Returns:
+            影响的行数
+        """
+        async with self.engine.begin() as conn:
+            result = await conn.execute(text(sql), params or {})
+            return result.rowcount
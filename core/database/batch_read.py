@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+"""
+按股票ID批量读取
+
+仓库的 get_many_by_ticker_ids 用 WHERE ticker_id IN (...) 一次读取多只股票的记录，
+代替逐只查询。ID 按 IN_CHUNK_SIZE 分组，每组一条 SQL，避免超出数据库的参数个数
+限制（SQLite 旧版本为999）：筛选5000只股票的评分、策略、指标、估值只需几十条查询。
+"""
+
+import os
+from collections.abc import Hashable, Iterable, Iterator
+from typing import Optional, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+# 每条 IN (...) 查询的股票ID个数
+IN_CHUNK_SIZE = int(os.getenv("DB_IN_CHUNK_SIZE", "500"))
+
+
+def chunk_ids(ids: Iterable[T], size: Optional[int] = None) -> Iterator[list[T]]:
+    """
+    去重后按组返回ID（或股票代码等其他键），保持首次出现的顺序
+
+    Args:
+        ids: 股票ID
+        size: 每组个数，默认 IN_CHUNK_SIZE
+    """
+    size = size or IN_CHUNK_SIZE
+    unique = list(dict.fromkeys(ids))
+    for offset in range(0, len(unique), size):
+        yield unique[offset : offset + size]
+
+
+def in_clause(column: str, count: int, placeholder: str) -> str:
+    """
+    生成 column IN (?, ?, ...) 条件
+
+    Args:
+        column: 列名
+        count: 参数个数
+        placeholder: 占位符（? 或 %s）
+    """
+    return f"{column} IN ({', '.join([placeholder] * count)})"
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+
+"""
+进程级数据库连接池
+
+按数据库类型和连接目标（SQLite 文件路径或 MySQL/PostgreSQL 的主机、端口、库名、用户）
+各维护一个连接池，池中对象为 SqliteHelper/MysqlHelper/PostgresqlHelper。
+DbAdapter 默认从池中借出连接、在 close() 或被回收时归还，仓库类无需改动即可复用连接。
+
+- 容量：常驻 pool_size 个空闲连接，忙时可临时多建 max_overflow 个（归还时关闭），
+  全部借出后等待 timeout 秒仍无可用连接则抛出 PoolTimeoutError
+- 健康检查：空闲超过 ping_interval 秒的连接借出前执行 SELECT 1，失败则重建
+- 回收：创建超过 recycle 秒的连接在归还或借出时关闭重建，避免被服务端断开
+- 归还时回滚未提交的事务，保证下一个使用者拿到干净的连接
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any, Optional
+
+
+class PoolTimeoutError(RuntimeError):
+    """连接池已满且等待超时"""
+
+
+class ConnectionPool:
+    """线程安全的有界连接池"""
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        pool_size: int = 5,
+        max_overflow: int = 20,
+        timeout: float = 30,
+        recycle: Optional[float] = 3600,
+        ping_interval: Optional[float] = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            factory: 创建数据库助手对象（具有 cursor/commit/rollback/close）的函数
+            pool_size: 常驻连接数
+            max_overflow: 超出常驻连接数后最多再建的连接数
+            timeout: 无可用连接时的最长等待秒数
+            recycle: 连接最长存活秒数，为 None 时不回收
+            ping_interval: 空闲超过该秒数的连接借出前做健康检查，为 None 时不检查
+            clock: 计时函数，测试时可替换
+        """
+        if pool_size < 1:
+            raise ValueError(f"连接池大小必须大于0: {pool_size}")
+        self.factory = factory
+        self.pool_size = pool_size
+        self.max_overflow = max(max_overflow, 0)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self._clock = clock
+        self._cond = threading.Condition()
+        # 空闲连接：(helper, 创建时间, 归还时间)
+        self._idle: deque = deque()
+        # 借出的连接 id -> 创建时间
+        self._in_use: dict[int, float] = {}
+        # 正在锁外创建的连接数
+        self._creating = 0
+        self.created = 0
+        self.closed = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.recycled = 0
+        self.failed_pings = 0
+
+    @property
+    def size(self) -> int:
+        """当前连接总数（空闲 + 借出）"""
+        return len(self._idle) + len(self._in_use) + self._creating
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        借出一个连接，优先复用最近归还的空闲连接
+
+        Raises:
+            PoolTimeoutError: 等待超时
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = self._clock() + timeout
+        with self._cond:
+            while True:
+                while self._idle:
+                    helper, created_at, returned_at = self._idle.pop()
+                    if self._usable(helper, created_at, returned_at):
+                        self._in_use[id(helper)] = created_at
+                        self.checkouts += 1
+                        return helper
+                if self.size < self.pool_size + self.max_overflow:
+                    # 先占位再在锁外建连接，避免建连接时阻塞其他线程归还
+                    self._creating += 1
+                    break
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeoutError(f"数据库连接池已满（{self.size}），等待 {timeout} 秒超时")
+                self.waits += 1
+                self._cond.wait(remaining)
+        try:
+            helper = self.factory()
+        except Exception:
+            with self._cond:
+                self._creating -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._creating -= 1
+            self._in_use[id(helper)] = self._clock()
+            self.created += 1
+            self.checkouts += 1
+        return helper
+
+    def release(self, helper, discard: bool = False) -> None:
+        """
+        归还连接；discard 为 True、超出常驻数量或已到回收时间时关闭
+
+        Args:
+            helper: acquire 借出的连接
+            discard: 连接已损坏，直接关闭
+        """
+        with self._cond:
+            created_at = self._in_use.pop(id(helper), None)
+            if created_at is None:
+                return
+            self._cond.notify()
+            keep = (
+                not discard
+                and len(self._idle) < self.pool_size
+                and not self._expired(created_at)
+            )
+            if keep:
+                try:
+                    # 丢弃使用者未提交的事务
+                    helper.rollback()
+                except Exception:
+                    keep = False
+            if keep:
+                self._idle.append((helper, created_at, self._clock()))
+                return
+            if not discard and self._expired(created_at):
+                self.recycled += 1
+        self._close(helper)
+
+    def dispose(self) -> None:
+        """关闭全部空闲连接，借出中的连接在归还时关闭"""
+        with self._cond:
+            idle = [item[0] for item in self._idle]
+            self._idle.clear()
+        for helper in idle:
+            self._close(helper)
+
+    def stats(self) -> dict:
+        """
+        连接池统计
+
+        Returns:
+            dict: 容量配置、当前空闲/借出数量及创建、关闭、借出、等待、超时、
+                回收和健康检查失败次数
+        """
+        with self._cond:
+            return {
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "created": self.created,
+                "closed": self.closed,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "recycled": self.recycled,
+                "failed_pings": self.failed_pings,
+            }
+
+    def _expired(self, created_at: float) -> bool:
+        return self.recycle is not None and self._clock() - created_at >= self.recycle
+
+    def _usable(self, helper, created_at: float, returned_at: float) -> bool:
+        """借出前检查空闲连接，不可用时关闭（调用时持有锁）"""
+        if self._expired(created_at):
+            self.recycled += 1
+            self._close(helper)
+            return False
+        if (
+            self.ping_interval is not None
+            and self._clock() - returned_at >= self.ping_interval
+            and not _ping(helper)
+        ):
+            self.failed_pings += 1
+            self._close(helper)
+            return False
+        return True
+
+    def _close(self, helper) -> None:
+        self.closed += 1
+        try:
+            helper.close()
+        except Exception:
+            pass
+
+
+def _ping(helper) -> bool:
+    """执行 SELECT 1 检查连接是否可用"""
+    try:
+        cursor = helper.cursor
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        helper.rollback()
+        return True
+    except Exception:
+        return False
+
+
+_pools: dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def pool_enabled() -> bool:
+    """环境变量 DB_POOL_ENABLED 为 false 时 DbAdapter 每次新建连接"""
+    return os.getenv("DB_POOL_ENABLED", "true").lower() == "true"
+
+
+def _pool_key(db_type: str) -> tuple:
+    if db_type in ("postgres", "postgresql", "mysql"):
+        return (
+            db_type,
+            os.getenv("DB_HOST"),
+            os.getenv("DB_PORT"),
+            os.getenv("DB_NAME"),
+            os.getenv("DB_USER"),
+        )
+    return ("sqlite", os.getenv("SQLITE_DB_PATH", "investnote.db"))
+
+
+def _create_helper(db_type: str):
+    if db_type in ("postgres", "postgresql"):
+        from .postgresql_helper import PostgresqlHelper
+
+        return PostgresqlHelper()
+    if db_type == "mysql":
+        from .mysql_helper import MysqlHelper
+
+        return MysqlHelper()
+    from .sqlite_helper import SqliteHelper
+
+    # 池中连接会被不同线程先后借用（同一时刻只有一个使用者）
+    return SqliteHelper(
+        os.getenv("SQLITE_DB_PATH", "investnote.db"), check_same_thread=False
+    )
+
+
+def get_pool(db_type: str) -> ConnectionPool:
+    """
+    获取当前数据库配置对应的进程级连接池，不存在时按环境变量创建
+
+    DB_POOL_SIZE、DB_POOL_MAX_OVERFLOW、DB_POOL_TIMEOUT、DB_POOL_RECYCLE、
+    DB_POOL_PING_INTERVAL 分别对应 ConnectionPool 的同名参数
+    """
+    key = _pool_key(db_type)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                lambda: _create_helper(db_type),
+                pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+                max_overflow=int(os.getenv("DB_POOL_MAX_OVERFLOW", "20")),
+                timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+                recycle=float(os.getenv("DB_POOL_RECYCLE", "3600")),
+                ping_interval=float(os.getenv("DB_POOL_PING_INTERVAL", "30")),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def pool_stats() -> dict[str, dict]:
+    """所有连接池的统计，键为数据库类型与连接目标"""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {":".join(str(part) for part in key): pool.stats() for key, pool in pools}
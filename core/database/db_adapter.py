@@ -5,6 +5,8 @@ from typing import Optional, Union
 
 from dotenv import load_dotenv
 
+from .connection_pool import get_pool, pool_enabled
+
 # 加载环境变量
 load_dotenv()
 
@@ -13,14 +15,24 @@ class DbAdapter:
     """
     数据库适配器，根据环境配置选择使用不同数据库
     统一使用:name参数格式，由底层helper处理具体数据库的参数转换
+
+    默认从进程级连接池借出连接，close() 或对象被回收时归还，见 connection_pool
     """
 
-    def __init__(self):
+    def __init__(self, pooled: Optional[bool] = None):
         """
         初始化数据库适配器
+
+        Args:
+            pooled: 是否使用连接池，默认取环境变量 DB_POOL_ENABLED（未设置时启用）
         """
         # 使用统一的DB_TYPE环境变量
         self.db_type = os.getenv("DB_TYPE", "sqlite").lower()
+        self._pool = None
+        if pooled if pooled is not None else pool_enabled():
+            self._pool = get_pool(self.db_type)
+            self.db = self._pool.acquire()
+            return
 
         if self.db_type == "postgres" or self.db_type == "postgresql":
             # 使用PostgreSQL
@@ -89,9 +101,15 @@ class DbAdapter:
 
     def close(self) -> None:
         """
-        关闭数据库连接
+        关闭数据库连接，使用连接池时归还连接
         """
-        self.db.close()
+        db = self.__dict__.pop("db", None)
+        if db is None:
+            return
+        if self._pool is not None:
+            self._pool.release(db)
+        else:
+            db.close()
 
     def __del__(self) -> None:
         """
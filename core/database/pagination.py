@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+"""
+游标（keyset）分页
+
+按排序键比较代替 OFFSET：next_cursor 保存上一页最后一行的排序键，下一页用
+WHERE (k1, k2, ...) 在其之后 继续读取，每页的代价与页码无关。排序键最后一列
+必须唯一（通常为 id），保证顺序确定。
+
+NULL 按最小值处理（与 SQLite、MySQL 的排序一致）：升序排在最前，降序排在最后。
+PostgreSQL 默认把 NULL 当作最大值，ORDER BY 需由 order_by 生成，显式写出
+NULLS FIRST/LAST，使 SQL 的顺序与游标条件一致。
+
+总数查询按查询条件缓存 PAGE_TOTAL_TTL 秒（默认30秒），翻页时不重复 COUNT(*)，
+返回的总数可能滞后于最新数据。
+"""
+
+import base64
+import json
+import os
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from core.utils.lru_cache import LRUCache
+
+_total_cache = LRUCache(max_entries=1024, ttl=float(os.getenv("PAGE_TOTAL_TTL", "30")))
+
+
+def encode_cursor(fields: Sequence[str], values: Sequence[Any]) -> str:
+    """
+    编码游标
+
+    Args:
+        fields: 排序字段（带 +/- 方向），解码时校验与本次请求一致
+        values: 上一页最后一行的排序键，日期时间等按 str 保存
+
+    Returns:
+        str: URL 安全的不透明字符串
+    """
+    payload = json.dumps([list(fields), list(values)], default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, fields: Sequence[str]) -> list[Any]:
+    """
+    解码游标
+
+    Raises:
+        ValueError: 游标无效，或与本次请求的排序字段不一致
+    """
+    try:
+        saved_fields, values = json.loads(base64.urlsafe_b64decode(cursor))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+    if saved_fields != list(fields) or len(values) != len(fields):
+        raise ValueError("分页游标与排序条件不一致")
+    return values
+
+
+def keyset_condition(
+    keys: Sequence[tuple[str, bool]],
+    values: Sequence[Any],
+    bind: Callable[[Any], str],
+) -> str:
+    """
+    生成"排在游标之后"的条件
+
+    Args:
+        keys: 排序键 (SQL表达式, 是否降序)
+        values: 游标中的排序键值
+        bind: 登记参数并返回占位符的函数，适配 ?/%s 与 :name 两种参数风格
+
+    Returns:
+        str: SQL 条件，可直接用 AND 拼接
+    """
+    branches = []
+    for index, (expression, descending) in enumerate(keys):
+        value = values[index]
+        if value is None and descending:
+            # NULL 最小：降序时 NULL 已排在最后，该键上没有更靠后的值
+            continue
+        # 按条件在 SQL 中出现的顺序登记参数，位置参数才能一一对应
+        terms = [
+            f"{key} IS NULL" if key_value is None else f"{key} = {bind(key_value)}"
+            for (key, _), key_value in zip(keys[:index], values[:index])
+        ]
+        if value is None:
+            terms.append(f"{expression} IS NOT NULL")
+        elif descending:
+            terms.append(f"({expression} < {bind(value)} OR {expression} IS NULL)")
+        else:
+            terms.append(f"{expression} > {bind(value)}")
+        branches.append("(" + " AND ".join(terms) + ")")
+    return "(" + " OR ".join(branches) + ")" if branches else "1 = 0"
+
+
+def order_by(keys: Sequence[tuple[str, bool]], db_type: str) -> str:
+    """
+    生成与 keyset_condition 一致的排序列表（不含 ORDER BY 关键字）
+
+    Args:
+        keys: 排序键 (SQL表达式, 是否降序)
+        db_type: 数据库类型，PostgreSQL 时显式指定 NULL 的位置
+
+    Returns:
+        str: 如 "score DESC, id ASC"
+    """
+    postgres = db_type in ("postgres", "postgresql")
+    clauses = []
+    for expression, descending in keys:
+        clause = f"{expression} {'DESC' if descending else 'ASC'}"
+        if postgres:
+            clause += " NULLS LAST" if descending else " NULLS FIRST"
+        clauses.append(clause)
+    return ", ".join(clauses)
+
+
+def cached_total(key: Any, count: Callable[[], int]) -> int:
+    """
+    按查询条件缓存总数
+
+    Args:
+        key: 可哈希的查询条件
+        count: 缓存未命中时执行的计数函数
+    """
+    total = _total_cache.get(key)
+    if total is None:
+        total = count()
+        _total_cache.put(key, total)
+    return total
@@ -1,24 +1,58 @@
 #!/usr/bin/env python3
 
+import os
 import sqlite3
 from sqlite3 import Connection, Cursor
 from typing import Any, Optional, Union
 
 
+def sqlite_performance_enabled() -> bool:
+    """环境变量 SQLITE_PERFORMANCE 为 true 时启用 WAL 等性能配置和单写线程"""
+    return os.getenv("SQLITE_PERFORMANCE", "false").lower() == "true"
+
+
+def apply_performance_pragmas(conn: Connection) -> None:
+    """
+    性能配置：WAL 日志使读写互不阻塞，synchronous=NORMAL 在 WAL 下只在检查点同步磁盘，
+    并设置内存映射大小、页缓存大小和锁等待时间
+
+    SQLITE_MMAP_SIZE（字节）、SQLITE_CACHE_SIZE（负数为 KiB）、SQLITE_BUSY_TIMEOUT（毫秒）
+    """
+    mmap_size = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    cache_size = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+    busy_timeout = int(os.getenv("SQLITE_BUSY_TIMEOUT", "10000"))
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA mmap_size = {mmap_size}")
+    conn.execute(f"PRAGMA cache_size = {cache_size}")
+    conn.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+
+
 class SqliteHelper:
     """
     SQLite数据库助手类
     支持:name格式参数和标准参数格式
     """
 
-    def __init__(self, db_path: str = "investnote.db"):
+    def __init__(
+        self,
+        db_path: str = "investnote.db",
+        check_same_thread: bool = True,
+        performance: Optional[bool] = None,
+    ):
         """
         初始化SQLite数据库连接
 
         Args:
             db_path: SQLite数据库文件路径
+            check_same_thread: 是否只允许创建连接的线程使用，连接池中的连接设为 False
+            performance: 是否启用性能配置，默认取环境变量 SQLITE_PERFORMANCE
         """
         self.db_path = db_path
+        self.check_same_thread = check_same_thread
+        self.performance = (
+            performance if performance is not None else sqlite_performance_enabled()
+        )
         self.conn: Optional[Connection] = None
         self.cursor: Optional[Cursor] = None
         self._connect()
@@ -28,9 +62,13 @@ class SqliteHelper:
         建立SQLite数据库连接
         """
         try:
-            self.conn = sqlite3.connect(self.db_path, timeout=10)
+            self.conn = sqlite3.connect(
+                self.db_path, timeout=10, check_same_thread=self.check_same_thread
+            )
             # 启用外键约束
             self.conn.execute("PRAGMA foreign_keys = ON")
+            if self.performance:
+                apply_performance_pragmas(self.conn)
             # 配置返回字典形式的结果
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+"""
+SQLite 单写线程
+
+SQLite 同一时刻只允许一个写事务，批量更新和 API 请求各自写库时会互相等待锁，
+甚至报 database is locked。启用性能配置（SQLITE_PERFORMANCE=true）后：
+
+- 连接使用 WAL 日志，读取不再被写入阻塞（见 sqlite_helper.apply_performance_pragmas）
+- 所有写入提交到进程内唯一的写线程排队执行，写线程独占一个连接，
+  把队列中积压的写入合并为一个事务提交，每个写入任务各自对应一个保存点，
+  单个任务失败只回滚该任务（见 UnitOfWork）
+
+用法：
+
+    run_write(lambda uow: TickerStrategyRepository(uow).bulk_upsert(...))
+
+未启用性能配置或使用 MySQL/PostgreSQL 时，run_write 在当前线程用 UnitOfWork 执行。
+"""
+
+import atexit
+import os
+import queue
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any, Optional
+
+from .sqlite_helper import SqliteHelper, sqlite_performance_enabled
+from .unit_of_work import UnitOfWork
+
+
+class SqliteWriter:
+    """独占一个连接、按批提交的写线程"""
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        batch_size: int = 100,
+        max_queue: int = 1000,
+    ):
+        """
+        Args:
+            factory: 在写线程中创建数据库连接的函数
+            batch_size: 一个事务最多包含的写入任务数
+            max_queue: 排队任务数上限，队列满时 submit 阻塞
+        """
+        self.factory = factory
+        self.batch_size = max(batch_size, 1)
+        self._queue: queue.Queue = queue.Queue(max(max_queue, 1))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.jobs = 0
+        self.failed = 0
+        self.commits = 0
+
+    def submit(self, fn: Callable[[UnitOfWork], Any]) -> Future:
+        """
+        提交写入任务，任务在写线程中以 fn(uow) 调用
+
+        Returns:
+            Future: 任务所在事务提交后得到 fn 的返回值，任务或提交失败时为异常
+        """
+        future: Future = Future()
+        self._ensure_thread()
+        self._queue.put((fn, future))
+        # 写线程可能在入队前退出，确保有线程处理刚入队的任务
+        self._ensure_thread()
+        return future
+
+    def close(self) -> None:
+        """处理完已排队的任务后结束写线程"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(self._STOP)
+            thread.join()
+
+    def stats(self) -> dict:
+        """任务数、失败数、提交次数和当前排队数"""
+        return {
+            "jobs": self.jobs,
+            "failed": self.failed,
+            "commits": self.commits,
+            "queued": self._queue.qsize(),
+        }
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="sqlite-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        batch: list = []
+        try:
+            helper = self.factory()
+            try:
+                stopping = False
+                while not stopping:
+                    batch = [self._queue.get()]
+                    while len(batch) < self.batch_size:
+                        try:
+                            batch.append(self._queue.get_nowait())
+                        except queue.Empty:
+                            break
+                    if self._STOP in batch:
+                        stopping = True
+                        batch = [job for job in batch if job is not self._STOP]
+                    if batch:
+                        self._write(helper, batch)
+                    batch = []
+            finally:
+                helper.close()
+        except Exception as e:
+            # 连接创建失败或写循环异常退出：先让出线程位，下次 submit 重新启动写线程，
+            # 再让本批未完成和已排队的任务全部失败，等待结果的调用方不会一直阻塞
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+            self._fail(batch, e)
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not self._STOP:
+                    self._fail([job], e)
+
+    def _fail(self, batch: list, error: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                self.failed += 1
+                future.set_exception(error)
+
+    def _write(self, helper, batch: list) -> None:
+        done = []
+        try:
+            with UnitOfWork(helper, group_size=0) as uow:
+                for fn, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    self.jobs += 1
+                    try:
+                        with uow.ticker():
+                            result = fn(uow)
+                    except Exception as e:
+                        self.failed += 1
+                        future.set_exception(e)
+                    else:
+                        done.append((future, result))
+        except Exception as e:
+            # 提交失败，本批已执行的任务全部失败
+            for future, _ in done:
+                future.set_exception(e)
+            return
+        if done:
+            self.commits += 1
+        for future, result in done:
+            future.set_result(result)
+
+
+_writer: Optional[SqliteWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_sqlite_writer() -> Optional[SqliteWriter]:
+    """
+    进程级的 SQLite 写线程，仅在 DB_TYPE=sqlite 且启用性能配置时返回，否则为 None
+
+    SQLITE_WRITER_BATCH 为一个事务最多包含的写入任务数
+    """
+    global _writer
+    if os.getenv("DB_TYPE", "sqlite").lower() != "sqlite":
+        return None
+    if not sqlite_performance_enabled():
+        return None
+    with _writer_lock:
+        if _writer is None:
+            db_path = os.getenv("SQLITE_DB_PATH", "investnote.db")
+            _writer = SqliteWriter(
+                lambda: SqliteHelper(db_path, performance=True),
+                batch_size=int(os.getenv("SQLITE_WRITER_BATCH", "100")),
+            )
+            atexit.register(_writer.close)
+        return _writer
+
+
+def run_write(fn: Callable[[UnitOfWork], Any]) -> Any:
+    """
+    在一个事务中执行写入并等待提交，启用单写线程时交由写线程执行
+
+    Raises:
+        写入或提交失败时抛出对应异常，写入已回滚
+    """
+    writer = get_sqlite_writer()
+    if writer is not None:
+        return writer.submit(fn).result()
+    with UnitOfWork() as uow, uow.ticker():
+        return fn(uow)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+"""
+工作单元：把一只或多只股票的全部写入放进同一个事务
+
+仓库类照常调用 execute/commit/rollback，传入 UnitOfWork 作为 db_connection 后：
+
+- commit() 推迟到工作单元提交，每 group_size 只股票（或退出时）真正提交一次
+- 每只股票的写入在 ticker() 范围内，对应一个 SAVEPOINT，任一语句失败或仓库调用
+  rollback() 时只回滚该股票，已写入的其他股票不受影响，保证单只股票的策略、指标、
+  估值和评分要么全部写入、要么全部不写入
+- SQLite 上合并提交可大幅减少磁盘同步次数
+"""
+
+import os
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Optional, Union
+
+from .db_adapter import DbAdapter
+
+
+class UnitOfWorkError(RuntimeError):
+    """工作单元内的写入失败，该股票的写入已回滚"""
+
+
+class UnitOfWork:
+    """单连接、分组提交的事务范围"""
+
+    _SAVEPOINT = "ticker_write"
+
+    def __init__(
+        self, db_connection: Optional[Any] = None, group_size: Optional[int] = None
+    ):
+        """
+        Args:
+            db_connection: 可选的数据库连接（DbAdapter 或数据库助手），
+                未提供时从连接池借出，退出时归还
+            group_size: 每提交一次包含的股票数，默认取环境变量 DB_GROUP_COMMIT（未设置时为1），
+                为0时只在退出时提交
+        """
+        self._owned = db_connection is None
+        self.db = db_connection or DbAdapter()
+        # 底层助手，直接用其游标执行写语句，避免助手出错时回滚整个连接
+        self._helper = getattr(self.db, "db", self.db)
+        if group_size is None:
+            group_size = int(os.getenv("DB_GROUP_COMMIT", "1"))
+        self.group_size = max(group_size, 0)
+        self.pending = 0
+        self.commits = 0
+        self._in_ticker = False
+        self._failed: Optional[str] = None
+
+    def __enter__(self) -> "UnitOfWork":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.flush()
+            else:
+                self.db.rollback()
+                self.pending = 0
+        finally:
+            if self._owned:
+                self.db.close()
+
+    # 供仓库类使用的数据库接口
+
+    def execute(self, sql: str, params: Optional[Union[dict, tuple]] = None) -> None:
+        """
+        执行SQL语句，失败时抛出异常并由 ticker() 回滚到保存点
+        """
+        try:
+            sql, params = self._helper._convert_params(sql, params)
+            if params:
+                self._helper.cursor.execute(sql, params)
+            else:
+                self._helper.cursor.execute(sql)
+        except Exception as e:
+            self._failed = str(e)
+            raise
+
+    def query(
+        self, sql: str, params: Optional[Union[dict, tuple]] = None
+    ) -> list[dict]:
+        """查询数据"""
+        return self.db.query(sql, params)
+
+    def query_one(
+        self, sql: str, params: Optional[Union[dict, tuple]] = None
+    ) -> Optional[dict]:
+        """查询单条数据"""
+        return self.db.query_one(sql, params)
+
+    def commit(self) -> None:
+        """
+        仓库内部的提交推迟到工作单元提交
+        """
+
+    def rollback(self) -> None:
+        """
+        仓库内部出错时回滚：在 ticker() 范围内标记该股票失败，退出范围时回滚到保存点；
+        范围外回滚全部未提交的写入
+        """
+        if self._in_ticker:
+            self._failed = self._failed or "仓库写入失败"
+        else:
+            self.db.rollback()
+            self.pending = 0
+
+    @property
+    def cursor(self):
+        """底层游标"""
+        return self._helper.cursor
+
+    @property
+    def conn(self):
+        """底层连接"""
+        return self._helper.conn
+
+    # 事务范围
+
+    @contextmanager
+    def ticker(self) -> Iterator["UnitOfWork"]:
+        """
+        一只股票的写入范围，范围内出错时回滚该股票的全部写入
+
+        Raises:
+            UnitOfWorkError: 仓库内部捕获了写入错误（只记录日志）时抛出
+        """
+        if self._in_ticker:
+            raise RuntimeError("工作单元不支持嵌套的股票写入范围")
+        self._begin()
+        self._helper.cursor.execute(f"SAVEPOINT {self._SAVEPOINT}")
+        self._in_ticker = True
+        self._failed = None
+        try:
+            yield self
+            if self._failed is not None:
+                raise UnitOfWorkError(self._failed)
+        except BaseException:
+            self._helper.cursor.execute(f"ROLLBACK TO SAVEPOINT {self._SAVEPOINT}")
+            self._helper.cursor.execute(f"RELEASE SAVEPOINT {self._SAVEPOINT}")
+            raise
+        else:
+            self._helper.cursor.execute(f"RELEASE SAVEPOINT {self._SAVEPOINT}")
+            self.pending += 1
+            if self.group_size and self.pending >= self.group_size:
+                self.flush()
+        finally:
+            self._in_ticker = False
+            self._failed = None
+
+    def flush(self) -> None:
+        """提交已完成的写入"""
+        self.db.commit()
+        if self.pending:
+            self.pending = 0
+            self.commits += 1
+
+    def _begin(self) -> None:
+        """
+        SQLite 在事务外执行 SAVEPOINT 会自行开启事务，RELEASE 时随即提交，
+        先显式开启事务以便多只股票合并提交；MySQL/PostgreSQL 关闭了自动提交，无需处理
+        """
+        conn = getattr(self._helper, "conn", None)
+        if isinstance(conn, sqlite3.Connection) and not conn.in_transaction:
+            self._helper.cursor.execute("BEGIN")
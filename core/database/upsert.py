@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+"""
+按数据库类型生成多行 UPSERT 语句
+
+SQLite(3.24+)/PostgreSQL 使用 INSERT ... ON CONFLICT (...) DO UPDATE，
+MySQL 使用 INSERT ... ON DUPLICATE KEY UPDATE，依赖表上已有的 UNIQUE 约束。
+"""
+
+from collections.abc import Sequence
+
+
+def placeholder_for(db_type: str) -> str:
+    """SQL参数占位符"""
+    return "?" if db_type == "sqlite" else "%s"
+
+
+def build_upsert_sql(
+    db_type: str,
+    table: str,
+    columns: Sequence[str],
+    conflict_columns: Sequence[str],
+    update_columns: Sequence[str],
+    row_count: int,
+    keep_on_null: Sequence[str] = (),
+) -> str:
+    """
+    生成插入 row_count 行、冲突时更新 update_columns 的语句，参数按行依次展开
+
+    Args:
+        db_type: sqlite/mysql/postgres/postgresql
+        table: 表名
+        columns: 插入的列
+        conflict_columns: 唯一约束列（MySQL 不需要显式指定）
+        update_columns: 冲突时更新的列
+        row_count: 行数
+        keep_on_null: 新值为 NULL 时保留原值的列
+
+    Returns:
+        str: SQL语句
+    """
+    if row_count < 1:
+        raise ValueError("UPSERT 至少需要一行数据")
+    placeholder = placeholder_for(db_type)
+    row = "(" + ", ".join([placeholder] * len(columns)) + ")"
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES {', '.join([row] * row_count)}"
+    )
+    if db_type == "mysql":
+        new_value = "VALUES({})"
+        old_value = "{}"
+        clause = " ON DUPLICATE KEY UPDATE "
+    else:
+        new_value = "excluded.{}"
+        old_value = f"{table}.{{}}"
+        clause = f" ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET "
+    assignments = []
+    for column in update_columns:
+        value = new_value.format(column)
+        if column in keep_on_null:
+            value = f"COALESCE({value}, {old_value.format(column)})"
+        assignments.append(f"{column} = {value}")
+    return sql + clause + ", ".join(assignments)
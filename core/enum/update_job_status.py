@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class UpdateJobStatus(Enum):
+    RUNNING = "running"  # 运行中
+    COMPLETED = "completed"  # 已完成
+    FAILED = "failed"  # 异常中断
+
+
+class UpdateJobTickerStatus(Enum):
+    DONE = "done"  # 已更新
+    SKIPPED = "skipped"  # 已有最新数据，跳过
+    FAILED = "failed"  # 更新失败，续跑时重试
@@ -40,8 +40,12 @@ class TickerScoreFilter:
         if maTurnover[length - 1] < 5 * 1000 * 1000:
             return False
 
-        KScoreData = TickerScoreRepository().get_items_by_ticker_id(ticker["id"])
-        kScore = pd.DataFrame(KScoreData)
+        if KScoreData is None:
+            KScoreData = TickerScoreRepository().get_scores(ticker["id"], limit=length)
+        else:
+            # 批量预取的评分（按 time_key 升序），只取与K线等长的最近部分
+            KScoreData = KScoreData[-length:]
+        kScore = pd.DataFrame([item.model_dump() for item in KScoreData])
         maS = UtilsHelper().wma(kScore["score"].values, len5)
         maM = UtilsHelper().wma(kScore["score"].values, len10)
         maL = UtilsHelper().wma(kScore["score"].values, len20)
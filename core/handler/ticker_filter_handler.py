@@ -5,10 +5,17 @@ from dateutil.relativedelta import relativedelta
 
 from core.enum.ticker_k_type import TickerKType
 from core.filter import Filter
+from core.service.ticker_indicator_repository import TickerIndicatorRepository
+from core.service.ticker_score_repository import TickerScoreRepository
+from core.service.ticker_strategy_repository import TickerStrategyRepository
+from core.service.ticker_valuation_repository import TickerValuationRepository
 from core.utils.utils import UtilsHelper
 
 from .ticker_k_line_handler import TickerKLineHandler
 
+# 每批预取评分、策略、指标、估值的股票数
+FILTER_BATCH_SIZE = 200
+
 
 class TickerFilterHandler:
     rule = None
@@ -27,39 +34,54 @@ class TickerFilterHandler:
     def run(self, tickers: Optional[list] = None):
         """
         运行
+
+        评分、策略、指标、估值按批（FILTER_BATCH_SIZE只）预取，每批每张表一次查询
         """
         result = []
+        tickers = tickers or []
         total = len(tickers)
-        for i in range(total):
-            ticker = tickers[i]
-            UtilsHelper().run_process(
-                i,
-                total,
-                "recommend",
-                "[total:{total}]({id}){code}".format(
-                    id=ticker["id"], code=ticker["code"], total=len(result)
-                ),
-            )
-
-            # 使用TickerKLine从在线API获取K线数据
-            ticker_kline = TickerKLineHandler()
-            kLineData = ticker_kline.get_history_kl(
-                ticker["code"], ticker["source"], self.startDate, self.endDate
-            )
-            strategyData = self.APIHelper.tickerStrategy().getItemsByTickerId(
-                ticker["id"], TickerKType.DAY.value
+        score_repo = TickerScoreRepository()
+        strategy_repo = TickerStrategyRepository()
+        indicator_repo = TickerIndicatorRepository()
+        valuation_repo = TickerValuationRepository()
+        ticker_kline = TickerKLineHandler()
+        for offset in range(0, total, FILTER_BATCH_SIZE):
+            batch = tickers[offset : offset + FILTER_BATCH_SIZE]
+            ids = [ticker["id"] for ticker in batch]
+            strategies = strategy_repo.get_many_by_ticker_ids(
+                ids, TickerKType.DAY.value
             )
-            indicatorData = self.APIHelper.tickerIndicator().getItemsByTickerId(
-                ticker["id"], TickerKType.DAY.value
+            indicators = indicator_repo.get_many_by_ticker_ids(
+                ids, TickerKType.DAY.value
             )
-            scoreData = self.APIHelper.tickerScore().getItemsByTickerId(ticker["id"])
-            valuationData = self.APIHelper.tickerValuation().getItemsByTickerId(
-                ticker["id"]
-            )
-            filter = Filter(self.rule).calculate(
-                ticker, kLineData, strategyData, indicatorData, scoreData, valuationData
-            )
-            if filter:
-                print(ticker["code"] + ":" + ticker["name"] + "\n")
-                result.append(ticker)
+            scores = score_repo.get_many_by_ticker_ids(ids, start=self.startDate)
+            valuations = valuation_repo.get_many_by_ticker_ids(ids)
+
+            for i, ticker in enumerate(batch, offset):
+                UtilsHelper().run_process(
+                    i,
+                    total,
+                    "recommend",
+                    "[total:{total}]({id}){code}".format(
+                        id=ticker["id"], code=ticker["code"], total=len(result)
+                    ),
+                )
+
+                # 使用TickerKLine从在线API获取K线数据
+                kLineData, _ = ticker_kline.get_kl(
+                    ticker["code"], ticker["source"], self.startDate, self.endDate
+                )
+                if kLineData is None:
+                    kLineData = []
+                filter = Filter(self.rule).calculate(
+                    ticker,
+                    kLineData,
+                    strategies[ticker["id"]],
+                    indicators[ticker["id"]],
+                    scores[ticker["id"]],
+                    valuations[ticker["id"]],
+                )
+                if filter:
+                    print(ticker["code"] + ":" + ticker["name"] + "\n")
+                    result.append(ticker)
         return result
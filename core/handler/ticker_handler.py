@@ -6,6 +6,7 @@ import os
 from time import sleep
 from typing import Any, Optional
 
+from core.database.sqlite_helper import sqlite_performance_enabled
 from core.models.ticker import Ticker, ticker_to_dict
 from core.service.ticker_repository import TickerRepository
 from core.utils.data_sources.xueqiu_source import XueqiuTicker
@@ -90,7 +91,8 @@ class TickerHandler:
                     if (i + 1) % batch_size == 0:
                         try:
                             db_adapter.commit()
-                            if DB_TYPE == "sqlite":
+                            # WAL 模式下读写互不阻塞，无需让出锁
+                            if DB_TYPE == "sqlite" and not sqlite_performance_enabled():
                                 sleep(0.1)  # 短暂暂停
                         except Exception as e:
                             logger.error(f"提交批量数据出错: {e}", exc_info=True)
@@ -1,27 +1,43 @@
-from typing import Optional
+from typing import Any, Optional
 
 from core.enum.ticker_k_type import TickerKType
 from core.indicator import Indicator
 from core.models.ticker import Ticker
 from core.service.ticker_indicator_repository import TickerIndicatorRepository
+from core.utils.feature_store import FeatureStore
 
 
 class TickerIndicatorHandler:
     updateTime = ""
     indicators = None
 
-    def __init__(self, updateTime: str, indicators: Optional[list] = None):
+    def __init__(
+        self,
+        updateTime: str,
+        indicators: Optional[list] = None,
+        db_connection: Optional[Any] = None,
+    ):
         self.updateTime = updateTime
+        self.db_connection = db_connection
         if indicators is not None:
             self.indicators = indicators
 
-    def calculate(self, kLineData: Optional[list] = None):
+    def calculate(
+        self,
+        kLineData: Optional[list] = None,
+        context: Optional[FeatureStore] = None,
+    ):
         """
         计算指标
         """
-        return Indicator(self.indicators).calculate(kLineData)
+        return Indicator(self.indicators).calculate(kLineData, context)
 
-    def update_ticker_indicator(self, ticker: Ticker, kLineData: Optional[list] = None):
+    def update_ticker_indicator(
+        self,
+        ticker: Ticker,
+        kLineData: Optional[list] = None,
+        context: Optional[FeatureStore] = None,
+    ):
         """
         更新指标
         """
@@ -30,10 +46,9 @@ class TickerIndicatorHandler:
             print("无数据")
             return
 
-        indicators = self.calculate(kLineData)
-        for indicatorKey in indicators:
-            result = indicators[indicatorKey]
-            TickerIndicatorRepository().update_item(
-                ticker.id, indicatorKey, TickerKType.DAY.value, self.updateTime, result
-            )
+        indicators = self.calculate(kLineData, context)
+        # 一条 UPSERT 语句写入全部键
+        TickerIndicatorRepository(self.db_connection).bulk_upsert(
+            ticker.id, TickerKType.DAY.value, self.updateTime, indicators
+        )
         return indicators
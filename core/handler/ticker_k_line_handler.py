@@ -1,17 +1,28 @@
 """
 股票K线数据处理模块
 """
-import time
-from threading import Lock
+import os
+from datetime import date
 from typing import Optional
 
+import numpy as np
+
 from core.enum.ticker_type import TickerType
-from core.schema.k_line import KLine
+from core.schema.k_line import KLine, KLineFrame
 from core.utils.data_sources import (
     DongcaiKLineSource,
     SinaKLineSource,
     XueqiuKLineSource,
 )
+from core.utils.k_line_store import KLineStore, slice_by_date
+from core.utils.lru_cache import LRUCache
+from core.utils.rate_limiter import acquire_source
+
+_default_store = KLineStore.from_env()
+
+
+def _entry_size(entry) -> int:
+    return entry[0].nbytes
 
 
 class TickerKLineHandler:
@@ -19,10 +30,21 @@ class TickerKLineHandler:
 
     TICKER_TYPES = [TickerType.STOCK, TickerType.IDX, TickerType.ETF, TickerType.PLATE]
 
-    # K线缓存，key为(code, source, start_date, end_date)
-    # Kline cache, key: (code, source, start_date, end_date)
-    _kl_cache: dict = {}
-    _kl_cache_lock = Lock()
+    # K线缓存，key为(code, source)，值为(KLineFrame, 实际用的source, 开始日期, 结束日期)
+    # Kline cache, key: (code, source), value: (frame, used_source, start, end)
+    _kl_cache = LRUCache(
+        max_entries=int(os.getenv("KLINE_CACHE_MAX_ENTRIES", "512")),
+        max_bytes=int(os.getenv("KLINE_CACHE_MAX_MB", "256")) * 1024 * 1024,
+        ttl=300,  # 5分钟
+        sizeof=_entry_size,
+    )
+
+    def __init__(self, store: Optional[KLineStore] = None):
+        """
+        Args:
+            store: 本地K线存储，默认按 KLINE_STORE_PATH 创建，为空字符串时不启用
+        """
+        self.store = store if store is not None else _default_store
 
     def get_kl_on_time(
         self, code: str, source: int
@@ -61,22 +83,89 @@ class TickerKLineHandler:
         source: int,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-    ) -> (Optional[list[KLine]], Optional[int]):
-        """获取历史K线数据，返回(数据, 实际用的source)，5分钟内缓存"""
+    ) -> (Optional[KLineFrame], Optional[int]):
+        """获取历史K线数据，返回(KLineFrame, 实际用的source)，5分钟内缓存
+
+        缓存按 (code, source) 保存最近一次拉取的区间，被其包含的请求直接截取返回。
+        启用本地K线存储时只向数据源请求本地最后几根K线之后的增量，区间数据从本地读取。
+        缓存中的 KLineFrame 为多个调用方共享，需要修改时先 copy()
+        """
         if not start_date or not end_date:
             print("获取历史数据需要提供开始和结束日期")
             return None, None
-        cache_key = (code, source, start_date, end_date)
-        now = time.time()
-        with self._kl_cache_lock:
-            cache_entry = self._kl_cache.get(cache_key)
-            if cache_entry:
-                print(
-                    f"缓存命中 code:{code} source:{source} start_date:{start_date} end_date:{end_date}"
-                )
-                data, used_source, ts = cache_entry
-                if now - ts < 300:  # 5分钟=300秒
-                    return data, used_source
+        cache_key = (code, source)
+        cache_entry = self._kl_cache.get(
+            cache_key, accept=lambda e: e[2] <= start_date and e[3] >= end_date
+        )
+        if cache_entry is not None:
+            print(
+                f"缓存命中 code:{code} source:{source} start_date:{start_date} end_date:{end_date}"
+            )
+            data, used_source, _, _ = cache_entry
+            return slice_by_date(data, start_date, end_date), used_source
+
+        if self.store is not None:
+            result, used_source = self._get_kl_from_store(
+                code, source, start_date, end_date
+            )
+        else:
+            result, used_source = self._fetch_kl(code, source, start_date, end_date)
+        if result is None or len(result) == 0:
+            print(f"所有数据源均无数据 code:{code}")
+            return None, None
+        self._kl_cache.put(cache_key, (result, used_source, start_date, end_date))
+        return result, used_source
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        """K线缓存统计，供监控使用"""
+        return cls._kl_cache.stats()
+
+    def _get_kl_from_store(
+        self, code: str, source: int, start_date: str, end_date: str
+    ) -> (Optional[KLineFrame], Optional[int]):
+        """优先读取本地K线，只拉取增量并写回本地"""
+        stored, meta = self.store.load(code)
+        if stored is not None and (len(stored) < 2 or meta["start"] > start_date):
+            # 本地数据不足以覆盖请求区间，整段重新拉取
+            stored = None
+
+        if stored is None:
+            data, used_source = self._fetch_kl(code, source, start_date, end_date)
+            if data is None:
+                return None, None
+            merged = self.store.merge(code, data, start_date, used_source)
+            return slice_by_date(merged, start_date, end_date), used_source
+
+        last_key = stored.time_key[-1]
+        if last_key >= end_date and end_date < date.today().strftime("%Y-%m-%d"):
+            # 请求区间已完整落在本地
+            return slice_by_date(stored, start_date, end_date), meta["source"]
+
+        # 最后一根可能是盘中K线，从倒数第二根开始重新请求，并用它检查前复权价格是否变化
+        check = stored[-2]
+        delta, used_source = self._fetch_kl(code, source, check.time_key, end_date)
+        if delta is None:
+            # 数据源不可用时直接使用本地数据
+            return slice_by_date(stored, start_date, end_date), meta["source"]
+
+        if not _same_bar(check, delta):
+            # 发生除权等导致历史价格调整，整段重新拉取
+            data, used_source = self._fetch_kl(
+                code, used_source, meta["start"], end_date
+            )
+            if data is None:
+                return slice_by_date(stored, start_date, end_date), meta["source"]
+            self.store.save(code, data, meta["start"], used_source)
+            return slice_by_date(data, start_date, end_date), used_source
+
+        merged = self.store.merge(code, delta, start_date, used_source)
+        return slice_by_date(merged, start_date, end_date), used_source
+
+    def _fetch_kl(
+        self, code: str, source: int, start_date: str, end_date: str
+    ) -> (Optional[KLineFrame], Optional[int]):
+        """依次尝试各数据源拉取 [start_date, end_date] 的K线"""
         tried = set()
         for i in range(3):
             s = (source + i - 1) % 3 + 1  # 1,2,3循环
@@ -92,22 +181,29 @@ class TickerKLineHandler:
                     data_source = XueqiuKLineSource()
                 else:
                     continue
+                # 按数据源限流，并发拉取时各线程共享同一个令牌桶
+                acquire_source(s)
                 data = data_source.get_kl(code, start_date, end_date)
                 if data is not None and len(data) > 0:
-                    # 处理历史数据
-                    result = []
-                    for i in range(len(data)):
-                        if (
-                            data[i].time_key >= start_date
-                            and data[i].time_key <= end_date
-                        ):
-                            result.append(data[i])
+                    # 处理历史数据，按日期过滤后一次性转换为列式数据
+                    result = KLineFrame.from_klines(
+                        item
+                        for item in data
+                        if item.time_key >= start_date and item.time_key <= end_date
+                    )
                     if len(result) > 0:
-                        with self._kl_cache_lock:
-                            self._kl_cache[cache_key] = (result, s, now)
                         return result, s
             except Exception as e:
                 print(f"源{s}获取历史K线异常: {e}")
                 continue
-        print(f"所有数据源均无数据 code:{code}")
         return None, None
+
+
+def _same_bar(bar: KLine, frame: KLineFrame) -> bool:
+    """frame 中同一日期的K线收盘价是否与 bar 一致"""
+    keys = frame.time_key
+    index = int(np.searchsorted(keys, bar.time_key))
+    if index >= len(frame) or keys[index] != bar.time_key:
+        return False
+    close = frame.close[index]
+    return abs(close - bar.close) <= 1e-6 * max(1.0, abs(bar.close))
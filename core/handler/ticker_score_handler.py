@@ -4,7 +4,7 @@
 TickerScore处理程序 - 负责股票评分计算和数据库更新
 """
 
-from typing import Optional
+from typing import Any, Optional
 
 from core.models.ticker import Ticker
 from core.models.ticker_score import TickerScore
@@ -20,13 +20,17 @@ class TickerScoreHandler:
 
     rule = None
 
-    def __init__(self, rule: Optional[list] = None):
+    def __init__(
+        self, rule: Optional[list] = None, db_connection: Optional[Any] = None
+    ):
         """
         初始化TickerScore
 
         Args:
             rule: 可选评分规则
+            db_connection: 可选的数据库连接，如 UnitOfWork
         """
+        self.db_connection = db_connection
         if rule is not None:
             self.rule = rule
 
@@ -87,15 +91,7 @@ class TickerScoreHandler:
         # 按照时间排序结果（确保最新数据在最后）
         result.sort(key=lambda x: x.time_key)
 
-        # 获取最新的一条记录
-        latest_score = result[-1]
-
-        # 将TickerScore对象转换为字典格式用于数据库更新
-        from core.models.ticker_score import ticker_score_to_dict
-
-        latest_score_dict = ticker_score_to_dict(latest_score)
-
-        # 只更新最新的一条记录到数据库
-        TickerScoreRepository().update_items(ticker.id, [latest_score_dict])
+        # 追加保存新K线的评分，已保存的历史不重复写入
+        TickerScoreRepository(self.db_connection).append_items(ticker.id, result)
 
         return result
@@ -1,13 +1,14 @@
 import math
-from typing import Optional
+from typing import Any, Optional
 
 from core.enum.ticker_k_type import TickerKType
 from core.models.ticker import Ticker
 from core.models.ticker_strategy import TickerStrategy
-from core.schema.k_line import KLine
+from core.schema.k_line import KLine, KLineFrame, as_kline_frame
 from core.service.ticker_strategy_repository import TickerStrategyRepository
 from core.strategy import DEFAULT_STRATEGIES
 from core.strategy.base_strategy import BaseStrategy
+from core.utils.feature_store import FeatureStore
 from core.utils.utils import UtilsHelper
 
 
@@ -27,41 +28,60 @@ class StrategyCalculator:
         for item in self.group:
             self.group_map[item.get_key()] = item
 
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(
+        self,
+        kl_data: list[KLine] | KLineFrame,
+        context: Optional[FeatureStore] = None,
+    ):
         """计算所有策略结果
 
         Args:
-            kl_data: K线数据列表
+            kl_data: K线数据列表或 KLineFrame，只转换一次供所有策略共享
+            context: 共享的特征缓存，为 None 时新建一个供本次所有策略使用
 
         Returns:
             dict: 策略计算结果字典
         """
+        kl_data = as_kline_frame(kl_data)
+        context = FeatureStore.resolve(kl_data, context)
         result = {}
         for item in self.group:
-            res = self.calculate_by_key(item.get_key(), kl_data)
+            res = self.calculate_by_key(item.get_key(), kl_data, context)
             result[item.get_key()] = res
         return result
 
-    def calculate_by_key(self, strategy_key: str, kl_data: list[KLine]):
+    def calculate_by_key(
+        self,
+        strategy_key: str,
+        kl_data: list[KLine],
+        context: Optional[FeatureStore] = None,
+    ):
         """根据策略键名计算策略结果
 
         Args:
             strategy_key: 策略键名
             kl_data: K线数据列表
+            context: 共享的特征缓存
 
         Returns:
             dict: 策略计算结果
         """
         if self.group_map[strategy_key] is None:
             raise Exception("error，找不到策略", strategy_key)
-        return self.calculate_strategy(self.group_map[strategy_key], kl_data)
+        return self.calculate_strategy(self.group_map[strategy_key], kl_data, context)
 
-    def calculate_strategy(self, strategy_obj: TickerStrategy, kl_data: list[KLine]):
+    def calculate_strategy(
+        self,
+        strategy_obj: TickerStrategy,
+        kl_data: list[KLine],
+        context: Optional[FeatureStore] = None,
+    ):
         """计算单个策略的交易结果
 
         Args:
             strategy_obj: 策略对象
             kl_data: K线数据列表
+            context: 共享的特征缓存
 
         Returns:
             dict: 策略交易结果
@@ -89,6 +109,7 @@ class StrategyCalculator:
             "days": 0,  # 当前状态持续时间
             "profit": 0,  # 当前状态利润
         }
+        kl_data = as_kline_frame(kl_data)
         length = len(kl_data)
         status = 0  # 当前交易状态
         unit = 1  # 交易股份数量
@@ -99,14 +120,18 @@ class StrategyCalculator:
         start_k_index = 0  # 本次交易开始的K线
         close = 0  # 最后交易日的价格
 
-        pos_data = strategy_obj.calculate(kl_data)
+        pos_data = strategy_obj.calculate(kl_data, context=context)
         if len(pos_data) != length:
             raise Exception("策略数据错误,数据长度不符", length, len(pos_data))
 
+        open_data = kl_data.open.tolist()
+        close_data = kl_data.close.tolist()
+        time_keys = kl_data.time_key
+
         trade_data = []
         for i in range(length):
-            open_price = kl_data[i].open
-            close = kl_data[i].close
+            open_price = open_data[i]
+            close = close_data[i]
 
             # 出现信号第二天，进行操作
             if result["days"] == 1 and status == 1:
@@ -117,7 +142,7 @@ class StrategyCalculator:
                         ini_price = open_price
                     start_price = open_price
                     start_k_index = i
-                    start_time = kl_data[i].time_key
+                    start_time = time_keys[i]
                     profit = 0
 
             elif result["days"] == 1 and status == -1:
@@ -141,11 +166,9 @@ class StrategyCalculator:
                             "start_date": start_time.strftime("%Y-%m-%d %H:%M:%S")
                             if hasattr(start_time, "strftime")
                             else start_time,
-                            "end_date": kl_data[i].time_key.strftime(
-                                "%Y-%m-%d %H:%M:%S"
-                            )
-                            if hasattr(kl_data[i].time_key, "strftime")
-                            else kl_data[i].time_key,
+                            "end_date": time_keys[i].strftime("%Y-%m-%d %H:%M:%S")
+                            if hasattr(time_keys[i], "strftime")
+                            else time_keys[i],
                             "buy": start_price,
                             "unit": unit,
                             "sell": open_price,
@@ -159,7 +182,7 @@ class StrategyCalculator:
 
                 # 记录做空时的状态
                 start_price = open_price
-                start_time = kl_data[i].time_key
+                start_time = time_keys[i]
                 profit = 0
                 unit = UtilsHelper().calcu_integer(self.profit_init, abs(start_price))
 
@@ -232,20 +255,31 @@ class TickerStrategyHandler:
     updateTime = ""
     strategies = None
 
-    def __init__(self, strategies: Optional[list] = None):
+    def __init__(
+        self, strategies: Optional[list] = None, db_connection: Optional[Any] = None
+    ):
         """
         初始化
+
+        Args:
+            strategies: 可选的策略列表
+            db_connection: 可选的数据库连接，如 UnitOfWork
         """
         self.strategies = strategies if strategies is not None else DEFAULT_STRATEGIES
+        self.db_connection = db_connection
 
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(self, kl_data: list[KLine], context: Optional[FeatureStore] = None):
         """
         计算策略
         """
-        return StrategyCalculator(self.strategies).calculate(kl_data)
+        return StrategyCalculator(self.strategies).calculate(kl_data, context)
 
     def update_ticker_strategy(
-        self, ticker: Ticker, kl_data: list[KLine], updateTime: str = None
+        self,
+        ticker: Ticker,
+        kl_data: list[KLine],
+        updateTime: str = None,
+        context: Optional[FeatureStore] = None,
     ):
         """
         更新策略
@@ -256,10 +290,9 @@ class TickerStrategyHandler:
             print("无数据")
             return
 
-        strategiesResult = self.calculate(kl_data)
-        for strategyKey in strategiesResult:
-            result = strategiesResult[strategyKey]
-            TickerStrategyRepository().update_item(
-                ticker.id, strategyKey, TickerKType.DAY.value, updateTime, result
-            )
+        strategiesResult = self.calculate(kl_data, context)
+        # 一条 UPSERT 语句写入全部键
+        TickerStrategyRepository(self.db_connection).bulk_upsert(
+            ticker.id, TickerKType.DAY.value, updateTime, strategiesResult
+        )
         return strategiesResult
@@ -12,7 +12,12 @@ class TickerValuationHandler:
     updateTime = ""
     valuations = None
 
-    def __init__(self, updateTime: str, valuations: Optional[list] = None):
+    def __init__(
+        self,
+        updateTime: str,
+        valuations: Optional[list] = None,
+        db_connection: Optional[Any] = None,
+    ):
         """
         初始化TickerValuation处理类
 
@@ -22,6 +27,7 @@ class TickerValuationHandler:
             db_connection: 可选的数据库连接
         """
         self.updateTime = updateTime
+        self.db_connection = db_connection
         if valuations is not None:
             self.valuations = valuations
 
@@ -50,6 +56,8 @@ class TickerValuationHandler:
             估值结果字典
         """
         valuations = self.calculate(ticker)
+        # 所有键共用一个仓库（一个数据库连接）
+        repository = TickerValuationRepository(self.db_connection)
         for valuationKey in valuations:
             result = valuations[valuationKey]
             if result is not None and isinstance(result, dict):
@@ -59,7 +67,5 @@ class TickerValuationHandler:
                     if hasattr(self.updateTime, "strftime")
                     else str(self.updateTime)
                 )
-                TickerValuationRepository().update_item(
-                    ticker.id, valuationKey, time_key, result
-                )
+                repository.update_item(ticker.id, valuationKey, time_key, result)
         return valuations
@@ -1,3 +1,10 @@
+from typing import Optional
+
+import numpy as np
+
+from core.schema.k_line import KLineBatch, as_kline_frame
+from core.utils.feature_store import FeatureStore
+
 from .bull_bear_power_indicator import BullBearPowerIndicator
 from .cci_indicator import CCIIndicator
 from .ema_indicator import EMAIndicator
@@ -49,14 +56,19 @@ class Indicator:
         item = self.group_map[key]
         return item.get_group().value if item.get_group() is not None else 2
 
-    def calculate(self, kl_data):
+    def calculate(self, kl_data, context: Optional[FeatureStore] = None):
+        # 只转换一次，各指标共享同一份列式数据和特征缓存
+        kl_data = as_kline_frame(kl_data)
+        context = FeatureStore.resolve(kl_data, context)
         result = {}
         for item in self.group:
-            res = self.calculate_by_key(item.get_key(), kl_data)
+            res = self.calculate_by_key(item.get_key(), kl_data, context)
             result[item.get_key()] = res
         return result
 
-    def calculate_by_key(self, indicator_key, kl_data):
+    def calculate_by_key(
+        self, indicator_key, kl_data, context: Optional[FeatureStore] = None
+    ):
         if self.group_map[indicator_key] is None:
             raise Exception("error，找不到指标", indicator_key)
         result = {
@@ -64,8 +76,9 @@ class Indicator:
             "status": 0,  # 当前状态-1:做空 1:做多
             "days": 0,  # 当前状态持续时间
         }
+        kl_data = as_kline_frame(kl_data)
         length = len(kl_data)
-        data = self.group_map[indicator_key].calculate(kl_data)
+        data = self.group_map[indicator_key].calculate(kl_data, context=context)
         result["score"] = data["score"]
         pos_data = data["posData"]
 
@@ -80,3 +93,68 @@ class Indicator:
                 break
             result["days"] += 1
         return result
+
+    def calculate_batch(self, batch: KLineBatch) -> list[dict]:
+        """
+        批量计算多只股票的全部指标
+
+        每个指标在整个 (n_tickers, n_bars) 矩阵上计算一次，不支持向量化的指标逐行计算。
+
+        Args:
+            batch: 按行填充的批量K线，每行至少一根K线
+
+        Returns:
+            list[dict]: 每只股票一个 {指标键名: 结果}，结果与 calculate_by_key 相同
+        """
+        lengths = batch.lengths
+        if np.any(lengths < 1):
+            raise ValueError("批量计算的每只股票至少需要一根K线")
+        rows = np.arange(len(batch))
+        columns = np.arange(batch.shape[1])
+        valid = columns[None, :] < lengths[:, None]
+
+        result = [{} for _ in rows]
+        for item in self.group:
+            data = item.calculate_batch(batch)
+            pos_data = data["posData"]
+            status = pos_data[rows, lengths - 1]
+            # 最后一次与当前状态不同的位置，之后即为当前状态的持续天数
+            changed = (pos_data != status[:, None]) & valid
+            last_changed = np.where(changed, columns, -1).max(axis=1, initial=-1)
+            days = lengths - 1 - last_changed
+            for row in rows:
+                result[row][item.get_key()] = {
+                    "score": data["score"][row],
+                    "status": int(status[row]),
+                    "days": int(days[row]),
+                    "history": pos_data[row, : lengths[row]].tolist(),
+                }
+        return result
+
+    def init_states(self, kl_data) -> dict:
+        """
+        为组内每个指标建立流式状态，返回 {指标键名: state}，可整体 JSON 序列化
+        """
+        kl_data = as_kline_frame(kl_data)
+        return {item.get_key(): item.init_state(kl_data) for item in self.group}
+
+    def update_states(self, states: dict, bar, replace_last: bool = False) -> dict:
+        """
+        用一根K线推进组内所有指标的流式状态
+
+        Args:
+            states: init_states 返回的状态，原地更新
+            bar: 新K线
+            replace_last: 为 True 时替换最后一根K线（盘中刷新），否则追加
+
+        Returns:
+            dict: {指标键名: {"score", "status", "days"}}
+        """
+        result = {}
+        for key, state in states.items():
+            item = self.group_map[key]
+            if replace_last:
+                result[key] = item.replace_last(state, bar)
+            else:
+                result[key] = item.update(state, bar)
+        return result
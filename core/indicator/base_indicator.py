@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 from core.enum.indicator_group import IndicatorGroup
+from core.utils.streaming import StreamingMixin
 
 
-class BaseIndicator(ABC):
+class BaseIndicator(StreamingMixin, ABC):
     @abstractmethod
     def get_key(self) -> str:
         """返回指标唯一键名"""
@@ -15,6 +18,34 @@ class BaseIndicator(ABC):
         pass
 
     @abstractmethod
-    def calculate(self, kl_data) -> dict:
-        """计算指标，返回 dict(posData, score)"""
+    def calculate(self, kl_data, context=None) -> dict:
+        """计算指标，返回 dict(posData, score)
+
+        Indicator 传入的 kl_data 为 KLineFrame，可直接读取 close/high 等列数组；
+        context 为同一份K线上共享的 FeatureStore，为 None 时各指标自行创建
+        """
         pass
+
+    def calculate_batch(self, batch) -> dict:
+        """批量计算多只股票
+
+        Args:
+            batch (KLineBatch): 按行填充的批量K线
+
+        Returns:
+            dict: posData 为 (n_tickers, n_bars) 的 int 数组（填充区为0），
+                score 为各行最后一根K线处的数值。默认逐行调用 calculate，
+                可向量化的指标覆盖此方法
+        """
+        pos_data = np.zeros(batch.shape, dtype=np.int64)
+        score = []
+        for row in range(len(batch)):
+            result = self.calculate(batch.frame(row))
+            pos_data[row, : batch.lengths[row]] = result["posData"]
+            score.append(result["score"])
+        return {"posData": pos_data, "score": score}
+
+    def stream_recalculate(self, kl_data) -> tuple:
+        """未实现 stream_step 的指标按全量计算结果取最后一根K线"""
+        result = self.calculate(kl_data)
+        return result["score"], result["posData"]
@@ -1,9 +1,12 @@
-from typing import Any
+from typing import Optional
+
+import numpy as np
 
 from core.enum.indicator_group import IndicatorGroup
 from core.indicator.base_indicator import BaseIndicator
 from core.schema.k_line import KLine
-from core.utils.utils import UtilsHelper
+from core.utils import batch_kernels, kernels
+from core.utils.feature_store import FeatureStore
 
 
 class BullBearPowerIndicator(BaseIndicator):
@@ -16,34 +19,41 @@ class BullBearPowerIndicator(BaseIndicator):
     def get_group(self) -> IndicatorGroup:
         return IndicatorGroup.POWER
 
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(self, kl_data: list[KLine], context: Optional[FeatureStore] = None):
         """
         计算指标
         """
         length = len(kl_data)
-        close_data = []
-        high_data = []
-        low_data = []
-        pos_data = []
-        for kl_item in kl_data:
-            high_data.append(kl_item.high)
-            low_data.append(kl_item.low)
-            close_data.append(kl_item.close)
-
-        atr_data = UtilsHelper().ratr(kl_data, self.atr_day)
-        lowest_data = UtilsHelper().lowest(low_data, self.day_count)
-        highest_data = UtilsHelper().highest(high_data, self.day_count)
-
-        score = 0
-        for i in range(length):
-            bull_trend = (
-                (close_data[i] - lowest_data[i]) / atr_data[i] if atr_data[i] > 0 else 0
-            )
-            bear_trend = (
-                (highest_data[i] - close_data[i]) / atr_data[i]
-                if atr_data[i] > 0
-                else 0
-            )
-            score = bull_trend - bear_trend
-            pos_data.append(1 if score > 0 else (-1 if score < 0 else 0))
-        return {"posData": pos_data, "score": score}
+        features = FeatureStore.resolve(kl_data, context)
+        close_data = features.frame.close
+
+        atr_data = np.asarray(features.ratr(self.atr_day))
+        lowest_data = np.asarray(features.lowest(self.day_count))
+        highest_data = np.asarray(features.highest(self.day_count))
+
+        score_data = self._score(close_data, atr_data, lowest_data, highest_data)
+        pos_data = kernels.compare_sign(score_data, 0)
+
+        score = score_data[length - 1] if length > 0 else 0
+        return {"posData": pos_data.tolist(), "score": score}
+
+    def calculate_batch(self, batch):
+        atr_data = batch_kernels.rma(
+            batch_kernels.tr(batch.high, batch.low, batch.close), self.atr_day
+        )
+        score_data = self._score(
+            batch.close,
+            atr_data,
+            batch_kernels.lowest(batch.low, self.day_count),
+            batch_kernels.highest(batch.high, self.day_count),
+        )
+        pos_data = kernels.compare_sign(score_data, 0)
+        return {"posData": pos_data, "score": batch.last(score_data)}
+
+    def _score(self, close_data, atr_data, lowest_data, highest_data):
+        positive = atr_data > 0
+        bull_trend = np.zeros(close_data.shape, dtype=np.float64)
+        bear_trend = np.zeros(close_data.shape, dtype=np.float64)
+        np.divide(close_data - lowest_data, atr_data, out=bull_trend, where=positive)
+        np.divide(highest_data - close_data, atr_data, out=bear_trend, where=positive)
+        return bull_trend - bear_trend
@@ -1,6 +1,12 @@
+from typing import Optional
+
+import numpy as np
+
 from core.enum.indicator_group import IndicatorGroup
 from core.indicator.base_indicator import BaseIndicator
-from core.utils.utils import UtilsHelper
+from core.utils import batch_kernels
+from core.utils.feature_store import FeatureStore
+from core.utils.streaming import push_window, window_avedev, window_sma
 
 
 class CCIIndicator(BaseIndicator):
@@ -15,11 +21,11 @@ class CCIIndicator(BaseIndicator):
     def get_group(self):
         return IndicatorGroup.POWER
 
-    def calculate(self, kl_data):
+    def calculate(self, kl_data, context: Optional[FeatureStore] = None):
         length = len(kl_data)
         pos_data = []
 
-        cci = UtilsHelper().cci(kl_data, self.day_count)
+        cci = FeatureStore.resolve(kl_data, context).cci(self.day_count)
 
         for i in range(length):
             if i < 2:
@@ -43,3 +49,59 @@ class CCIIndicator(BaseIndicator):
             pos_data.append(status)
 
         return {"posData": pos_data, "score": cci[length - 1]}
+
+    def calculate_batch(self, batch):
+        typ_data = (batch.high + batch.low + batch.close) / 3
+        typ_ave_data = batch_kernels.avedev(typ_data, self.day_count)
+        cci = np.zeros(batch.shape, dtype=np.float64)
+        np.divide(
+            typ_data - batch_kernels.sma(typ_data, self.day_count),
+            0.015 * typ_ave_data,
+            out=cci,
+            where=typ_ave_data > 0,
+        )
+        cci[:, :1] = 0
+
+        # 穿越规则依赖上一根的状态，按时间循环、在股票维度上向量化
+        pos_data = np.zeros(batch.shape, dtype=np.int64)
+        for i in range(2, batch.shape[1]):
+            last, cur = cci[:, i - 1], cci[:, i]
+            up = (
+                ((last < -100) & (cur >= -100))
+                | ((last < 0) & (cur >= 0))
+                | ((last < 100) & (cur >= 100))
+            )
+            down = (
+                ((last > -100) & (cur <= -100))
+                | ((last > 0) & (cur <= 0))
+                | ((last > 100) & (cur <= 100))
+            )
+            pos_data[:, i] = np.where(up, 1, np.where(down, -1, pos_data[:, i - 1]))
+        return {"posData": pos_data, "score": batch.last(cci)}
+
+    def stream_step(self, core, bar, i):
+        core = core or {"typs": [], "cci": 0, "pos": 0}
+        typ = (bar.high + bar.low + bar.close) / 3
+        typs = push_window(core["typs"], typ, self.day_count)
+        mean = window_sma(typs)
+        ave = window_avedev(typs, mean)
+        cci = (typ - mean) / (0.015 * ave) if i > 0 and ave > 0 else 0.0
+
+        last = core["cci"]
+        if i < 2:
+            pos = 0
+        elif (
+            (last < -100 and cci >= -100)
+            or (last < 0 and cci >= 0)
+            or (last < 100 and cci >= 100)
+        ):
+            pos = 1
+        elif (
+            (last > -100 and cci <= -100)
+            or (last > 0 and cci <= 0)
+            or (last > 100 and cci <= 100)
+        ):
+            pos = -1
+        else:
+            pos = core["pos"]
+        return {"typs": typs, "cci": cci, "pos": pos}, cci, pos
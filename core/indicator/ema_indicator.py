@@ -1,7 +1,11 @@
+from typing import Optional
+
 from core.enum.indicator_group import IndicatorGroup
 from core.indicator.base_indicator import BaseIndicator
 from core.schema.k_line import KLine
-from core.utils.utils import UtilsHelper
+from core.utils import batch_kernels, kernels
+from core.utils.feature_store import FeatureStore
+from core.utils.streaming import compare_sign, ema_step
 
 
 class EMAIndicator(BaseIndicator):
@@ -16,19 +20,24 @@ class EMAIndicator(BaseIndicator):
     def get_group(self):
         return IndicatorGroup.BASE
 
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(self, kl_data: list[KLine], context: Optional[FeatureStore] = None):
         length = len(kl_data)
-        close_data = []
-        pos_data = []
-        for kl_item in kl_data:
-            close_data.append(kl_item.close)
-
-        ma = UtilsHelper().ema(close_data, self.day_count)
-        for i in range(length):
-            if i < 2:
-                pos_data.append(0)
-                continue
-            close = close_data[i]
-            pos_data.append(1 if close > ma[i] else (-1 if close < ma[i] else 0))
-
-        return {"posData": pos_data, "score": ma[length - 1]}
+        features = FeatureStore.resolve(kl_data, context)
+        close_data = features.frame.close
+
+        ma = features.ema(self.day_count)
+        pos_data = kernels.compare_sign(close_data, ma)
+        pos_data[:2] = 0
+
+        return {"posData": pos_data.tolist(), "score": ma[length - 1]}
+
+    def calculate_batch(self, batch):
+        ma = batch_kernels.ema(batch.close, self.day_count)
+        pos_data = kernels.compare_sign(batch.close, ma)
+        pos_data[:, :2] = 0
+        return {"posData": pos_data, "score": batch.last(ma)}
+
+    def stream_step(self, core, bar, i):
+        ma = ema_step(core["ema"] if core else 0, bar.close, i, self.day_count)
+        pos = 0 if i < 2 else compare_sign(bar.close, ma)
+        return {"ema": ma}, ma, pos
@@ -1,6 +1,13 @@
+from typing import Optional
+
+import numpy as np
+
 from core.enum.indicator_group import IndicatorGroup
 from core.indicator.base_indicator import BaseIndicator
 from core.schema.k_line import KLine
+from core.utils import batch_kernels
+from core.utils.feature_store import FeatureStore
+from core.utils.streaming import ma_step, push_window
 from core.utils.utils import UtilsHelper
 
 
@@ -15,48 +22,79 @@ class KDJIndicator(BaseIndicator):
     def get_group(self):
         return IndicatorGroup.POWER
 
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(self, kl_data: list[KLine], context: Optional[FeatureStore] = None):
         length = len(kl_data)
-        close_data = []
-        high_data = []
-        low_data = []
-        rsv_data = []
-        j_data = []
-        pos_data = []
-        for kl_item in kl_data:
-            high_data.append(kl_item.high)
-            low_data.append(kl_item.low)
-            close_data.append(kl_item.close)
-
-        lowest_data = UtilsHelper().lowest(low_data, self.P1)
-        highest_data = UtilsHelper().highest(high_data, self.P1)
-
-        for i in range(length):
-            divid = highest_data[i] - lowest_data[i]
-            rsv = (close_data[i] - lowest_data[i]) / divid if divid > 0 else 0
-            rsv = rsv * 100
-            rsv_data.append(rsv)
-
-        k_data = UtilsHelper().ma(rsv_data, self.P2, 1)
-        d_data = UtilsHelper().ma(k_data, self.P3, 1)
-
-        for i in range(length):
-            j_value = 3 * k_data[i] - 2 * d_data[i]
-            j_data.append(j_value)
-
-            if i < 2:
-                pos_data.append(0)
-                continue
-
-            if j_value > 100 and k_data[i] > 90 and d_data[i] > 80:
-                pos_data.append(-1)
-            elif j_value < 0 and k_data[i] < 10 and d_data[i] < 20:
-                pos_data.append(1)
-            elif j_value > k_data[i]:
-                pos_data.append(1)
-            elif j_value < k_data[i]:
-                pos_data.append(-1)
-            else:
-                pos_data.append(0)
-
-        return {"posData": pos_data, "score": j_data[length - 1]}
+        features = FeatureStore.resolve(kl_data, context)
+        close_data = features.frame.close
+
+        lowest_data = np.asarray(features.lowest(self.P1))
+        highest_data = np.asarray(features.highest(self.P1))
+
+        divid = highest_data - lowest_data
+        rsv_data = np.zeros(length, dtype=np.float64)
+        np.divide(close_data - lowest_data, divid, out=rsv_data, where=divid > 0)
+        rsv_data = rsv_data * 100
+
+        k_data = np.asarray(UtilsHelper().ma(rsv_data, self.P2, 1))
+        d_data = np.asarray(UtilsHelper().ma(k_data, self.P3, 1))
+        j_data = 3 * k_data - 2 * d_data
+
+        pos_data = self._pos(j_data, k_data, d_data)
+        pos_data[:2] = 0
+
+        return {"posData": pos_data.tolist(), "score": j_data[length - 1]}
+
+    def _pos(self, j_data, k_data, d_data):
+        return np.select(
+            [
+                (j_data > 100) & (k_data > 90) & (d_data > 80),
+                (j_data < 0) & (k_data < 10) & (d_data < 20),
+                j_data > k_data,
+                j_data < k_data,
+            ],
+            [-1, 1, 1, -1],
+            default=0,
+        )
+
+    def calculate_batch(self, batch):
+        lowest_data = batch_kernels.lowest(batch.low, self.P1)
+        highest_data = batch_kernels.highest(batch.high, self.P1)
+
+        divid = highest_data - lowest_data
+        rsv_data = np.zeros(batch.shape, dtype=np.float64)
+        np.divide(batch.close - lowest_data, divid, out=rsv_data, where=divid > 0)
+        rsv_data = rsv_data * 100
+
+        k_data = batch_kernels.ma(rsv_data, self.P2, 1)
+        d_data = batch_kernels.ma(k_data, self.P3, 1)
+        j_data = 3 * k_data - 2 * d_data
+
+        pos_data = self._pos(j_data, k_data, d_data)
+        pos_data[:, :2] = 0
+        return {"posData": pos_data, "score": batch.last(j_data)}
+
+    def stream_step(self, core, bar, i):
+        core = core or {"lows": [], "highs": [], "k": 0, "d": 0}
+        lows = push_window(core["lows"], bar.low, self.P1)
+        highs = push_window(core["highs"], bar.high, self.P1)
+        lowest = min(lows)
+        divid = max(highs) - lowest
+        rsv = (bar.close - lowest) / divid * 100 if divid > 0 else 0.0
+
+        k = ma_step(core["k"], rsv, i, self.P2, 1)
+        d = ma_step(core["d"], k, i, self.P3, 1)
+        j = 3 * k - 2 * d
+
+        if i < 2:
+            pos = 0
+        elif j > 100 and k > 90 and d > 80:
+            pos = -1
+        elif j < 0 and k < 10 and d < 20:
+            pos = 1
+        elif j > k:
+            pos = 1
+        elif j < k:
+            pos = -1
+        else:
+            pos = 0
+        return {"lows": lows, "highs": highs, "k": k, "d": d}, j, pos
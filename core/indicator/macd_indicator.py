@@ -1,6 +1,13 @@
+from typing import Optional
+
+import numpy as np
+
 from core.enum.indicator_group import IndicatorGroup
 from core.indicator.base_indicator import BaseIndicator
 from core.schema.k_line import KLine
+from core.utils import batch_kernels, kernels
+from core.utils.feature_store import FeatureStore
+from core.utils.streaming import compare_sign, ema_step
 from core.utils.utils import UtilsHelper
 
 
@@ -20,25 +27,34 @@ class MACDIndicator(BaseIndicator):
     def get_group(self):
         return IndicatorGroup.POWER
 
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(self, kl_data: list[KLine], context: Optional[FeatureStore] = None):
         length = len(kl_data)
-        close_data = []
-        dif = []
-        macd = []
-        pos_data = []
-        for kl_item in kl_data:
-            close_data.append(kl_item.close)
-
-        ema_s = UtilsHelper().ema(close_data, self.dif_count)
-        ema_l = UtilsHelper().ema(close_data, self.day_count)
+        features = FeatureStore.resolve(kl_data, context)
 
-        for i in range(length):
-            dif.append(ema_s[i] - ema_l[i])
+        ema_s = features.ema(self.dif_count)
+        ema_l = features.ema(self.day_count)
+        dif = np.subtract(ema_s, ema_l)
 
         ema_dif = UtilsHelper().ema(dif, self.m)
-
-        for i in range(length):
-            macd.append((dif[i] - ema_dif[i]) * 2)
-            pos_data.append(1 if macd[i] > 0 else (-1 if macd[i] < 0 else 0))
-
-        return {"posData": pos_data, "score": macd[length - 1]}
+        macd = (dif - np.asarray(ema_dif)) * 2
+        pos_data = kernels.compare_sign(macd, 0)
+
+        return {"posData": pos_data.tolist(), "score": macd[length - 1]}
+
+    def calculate_batch(self, batch):
+        dif = batch_kernels.ema(batch.close, self.dif_count) - batch_kernels.ema(
+            batch.close, self.day_count
+        )
+        macd = (dif - batch_kernels.ema(dif, self.m)) * 2
+        pos_data = kernels.compare_sign(macd, 0)
+        return {"posData": pos_data, "score": batch.last(macd)}
+
+    def stream_step(self, core, bar, i):
+        core = core or {"ema_s": 0, "ema_l": 0, "ema_dif": 0}
+        ema_s = ema_step(core["ema_s"], bar.close, i, self.dif_count)
+        ema_l = ema_step(core["ema_l"], bar.close, i, self.day_count)
+        dif = ema_s - ema_l
+        ema_dif = ema_step(core["ema_dif"], dif, i, self.m)
+        macd = (dif - ema_dif) * 2
+        core = {"ema_s": ema_s, "ema_l": ema_l, "ema_dif": ema_dif}
+        return core, macd, compare_sign(macd, 0)
@@ -1,7 +1,13 @@
-import pandas as pd
+from typing import Optional
+
+import numpy as np
 
 from core.enum.indicator_group import IndicatorGroup
 from core.indicator.base_indicator import BaseIndicator
+from core.schema.k_line import as_kline_frame
+from core.utils import batch_kernels
+from core.utils.feature_store import FeatureStore
+from core.utils.streaming import ma_step
 from core.utils.utils import UtilsHelper
 
 
@@ -14,40 +20,66 @@ class RSIIndicator(BaseIndicator):
     def get_group(self):
         return IndicatorGroup.POWER
 
-    def calculate(self, kl_data):
+    def calculate(self, kl_data, context: Optional[FeatureStore] = None):
         length = len(kl_data)
-        pos_data = []
-        up_temp = []
-        down_temp = []
-        rsi_data = []
-        k_line = pd.DataFrame(kl_data)
-
-        for i in range(length):
-            if i < 1:
-                up_temp.append(0)
-                down_temp.append(0)
-                continue
-            close = k_line["close"][i]
-            last_close = k_line["close"][i - 1]
-            up_temp.append(max(close - last_close, 0))
-            down_temp.append(abs(close - last_close))
-
-        ma_up = UtilsHelper().ma(up_temp, self.day_count, 1)
-        ma_down = UtilsHelper().ma(down_temp, self.day_count, 1)
-        for i in range(length):
-            if i < 1:
-                pos_data.append(0)
-                rsi_data.append(0)
-                continue
-            rsi = (ma_up[i] / ma_down[i]) * 100 if ma_down[i] > 0 else 100
-            rsi_data.append(rsi)
-            if rsi > 80:
-                pos_data.append(-1)
-            elif rsi > 50:
-                pos_data.append(1)
-            elif rsi > 20:
-                pos_data.append(-1)
-            else:
-                pos_data.append(1)
-
-        return {"posData": pos_data, "score": rsi_data[length - 1]}
+        close_data = as_kline_frame(kl_data).close
+
+        change = np.zeros(length, dtype=np.float64)
+        change[1:] = close_data[1:] - close_data[:-1]
+        up_temp = np.maximum(change, 0)
+        down_temp = np.abs(change)
+
+        ma_up = np.asarray(UtilsHelper().ma(up_temp, self.day_count, 1))
+        ma_down = np.asarray(UtilsHelper().ma(down_temp, self.day_count, 1))
+        rsi_data = self._rsi(ma_up, ma_down)
+        rsi_data[:1] = 0
+
+        pos_data = self._pos(rsi_data)
+        pos_data[:1] = 0
+
+        return {"posData": pos_data.tolist(), "score": rsi_data[length - 1]}
+
+    def calculate_batch(self, batch):
+        close_data = batch.close
+        change = np.zeros(batch.shape, dtype=np.float64)
+        change[:, 1:] = close_data[:, 1:] - close_data[:, :-1]
+
+        ma_up = batch_kernels.ma(np.maximum(change, 0), self.day_count, 1)
+        ma_down = batch_kernels.ma(np.abs(change), self.day_count, 1)
+        rsi_data = self._rsi(ma_up, ma_down)
+        rsi_data[:, :1] = 0
+
+        pos_data = self._pos(rsi_data)
+        pos_data[:, :1] = 0
+        return {"posData": pos_data, "score": batch.last(rsi_data)}
+
+    def _rsi(self, ma_up, ma_down):
+        rsi_data = np.full(ma_up.shape, 100, dtype=np.float64)
+        positive = ma_down > 0
+        rsi_data[positive] = (ma_up[positive] / ma_down[positive]) * 100
+        return rsi_data
+
+    def _pos(self, rsi_data):
+        return np.select(
+            [rsi_data > 80, rsi_data > 50, rsi_data > 20], [-1, 1, -1], default=1
+        )
+
+    def stream_step(self, core, bar, i):
+        core = core or {"last_close": bar.close, "ma_up": 0, "ma_down": 0}
+        change = bar.close - core["last_close"] if i > 0 else 0.0
+        ma_up = ma_step(core["ma_up"], max(change, 0), i, self.day_count, 1)
+        ma_down = ma_step(core["ma_down"], abs(change), i, self.day_count, 1)
+        core = {"last_close": bar.close, "ma_up": ma_up, "ma_down": ma_down}
+        if i == 0:
+            return core, 0.0, 0
+
+        rsi = ma_up / ma_down * 100 if ma_down > 0 else 100.0
+        if rsi > 80:
+            pos = -1
+        elif rsi > 50:
+            pos = 1
+        elif rsi > 20:
+            pos = -1
+        else:
+            pos = 1
+        return core, rsi, pos
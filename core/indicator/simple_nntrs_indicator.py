@@ -1,10 +1,13 @@
 import statistics
+from typing import Optional
 
-import pandas as pd
+import numpy as np
 
 from core.enum.indicator_group import IndicatorGroup
 from core.indicator.base_indicator import BaseIndicator
-from core.schema.k_line import KLine
+from core.schema.k_line import KLine, as_kline_frame
+from core.utils import batch_kernels
+from core.utils.feature_store import FeatureStore
 from core.utils.utils import UtilsHelper
 
 
@@ -58,7 +61,7 @@ class SimpleNNTRSIIndicator(BaseIndicator):
         up_temp = []
         down_temp = []
         rsi_data = []
-        k_line = pd.DataFrame(kl_data)
+        close_data = as_kline_frame(kl_data).close.tolist()
 
         # 计算上涨和下跌值
         for i in range(length):
@@ -66,8 +69,8 @@ class SimpleNNTRSIIndicator(BaseIndicator):
                 up_temp.append(0)
                 down_temp.append(0)
                 continue
-            close = k_line["close"][i]
-            last_close = k_line["close"][i - 1]
+            close = close_data[i]
+            last_close = close_data[i - 1]
             up_temp.append(max(close - last_close, 0))
             down_temp.append(abs(min(close - last_close, 0)))
 
@@ -213,7 +216,7 @@ class SimpleNNTRSIIndicator(BaseIndicator):
 
         return center, upper1, lower1, upper2, lower2
 
-    def calculate(self, kl_data):
+    def calculate(self, kl_data, context: Optional[FeatureStore] = None):
         """计算指标
 
         Args:
@@ -261,3 +264,34 @@ class SimpleNNTRSIIndicator(BaseIndicator):
             # - Reversions: 基于反转模式
 
         return {"posData": pos_data, "score": nn_output[-1]}  # 返回最新的指标值
+
+    def calculate_batch(self, batch):
+        """批量计算
+
+        趋势跟随信号只比较 NN-RSI 与50中线，不需要标准差带；
+        使用中值线时逐行计算
+        """
+        if self.use_median:
+            return super().calculate_batch(batch)
+
+        close_data = batch.close
+        change = np.zeros(batch.shape, dtype=np.float64)
+        change[:, 1:] = close_data[:, 1:] - close_data[:, :-1]
+        ma_up = batch_kernels.sma(np.maximum(change, 0), self.rsi_length)
+        ma_down = batch_kernels.sma(np.abs(np.minimum(change, 0)), self.rsi_length)
+
+        rsi_data = np.full(batch.shape, 100, dtype=np.float64)
+        positive = ma_down > 0
+        rsi_data[positive] = 100 - (100 / (1 + ma_up[positive] / ma_down[positive]))
+        rsi_data[:, :1] = 50
+
+        # 与逐点累加顺序一致：从当前点向前依次加上 rsi * (1 / nn_length)
+        nn_output = np.zeros(batch.shape, dtype=np.float64)
+        for j in range(self.nn_length):
+            nn_output[:, j:] += rsi_data[:, : batch.shape[1] - j] * (
+                1.0 / self.nn_length
+            )
+
+        pos_data = np.where(nn_output > 50, 1, -1)
+        pos_data[:, :1] = 0
+        return {"posData": pos_data, "score": batch.last(nn_output)}
@@ -1,6 +1,10 @@
+from typing import Optional
+
 from core.enum.indicator_group import IndicatorGroup
 from core.indicator.base_indicator import BaseIndicator
-from core.utils.utils import UtilsHelper
+from core.utils import batch_kernels, kernels
+from core.utils.feature_store import FeatureStore
+from core.utils.streaming import compare_sign, push_window, window_sma
 
 
 class SMAIndicator(BaseIndicator):
@@ -15,19 +19,25 @@ class SMAIndicator(BaseIndicator):
     def get_group(self):
         return IndicatorGroup.POWER
 
-    def calculate(self, kl_data):
+    def calculate(self, kl_data, context: Optional[FeatureStore] = None):
         length = len(kl_data)
-        close_data = []
-        pos_data = []
-        for kl_item in kl_data:
-            close_data.append(kl_item.close)
-
-        ma = UtilsHelper().sma(close_data, self.day_count)
-        for i in range(length):
-            if i < 2:
-                pos_data.append(0)
-                continue
-            close = close_data[i]
-            pos_data.append(1 if close > ma[i] else (-1 if close < ma[i] else 0))
-
-        return {"posData": pos_data, "score": ma[length - 1]}
+        features = FeatureStore.resolve(kl_data, context)
+        close_data = features.frame.close
+
+        ma = features.sma(self.day_count)
+        pos_data = kernels.compare_sign(close_data, ma)
+        pos_data[:2] = 0
+
+        return {"posData": pos_data.tolist(), "score": ma[length - 1]}
+
+    def calculate_batch(self, batch):
+        ma = batch_kernels.sma(batch.close, self.day_count)
+        pos_data = kernels.compare_sign(batch.close, ma)
+        pos_data[:, :2] = 0
+        return {"posData": pos_data, "score": batch.last(ma)}
+
+    def stream_step(self, core, bar, i):
+        window = push_window(core["window"] if core else [], bar.close, self.day_count)
+        ma = window_sma(window)
+        pos = 0 if i < 2 else compare_sign(bar.close, ma)
+        return {"window": window}, ma, pos
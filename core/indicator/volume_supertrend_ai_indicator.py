@@ -1,5 +1,19 @@
+from typing import Optional
+
+import numpy as np
+
 from core.enum.indicator_group import IndicatorGroup
 from core.indicator.base_indicator import BaseIndicator
+from core.utils import batch_kernels
+from core.utils.feature_store import FeatureStore
+from core.utils.streaming import (
+    ema_step,
+    push_window,
+    rma_step,
+    true_range,
+    window_sma,
+    window_wma,
+)
 from core.utils.utils import UtilsHelper
 
 
@@ -32,31 +46,58 @@ class VolumeSuperTrendAIIndicator(BaseIndicator):
     def get_group(self):
         return IndicatorGroup.POWER
 
-    def calculate(self, kl_data: list):
+    def calculate(self, kl_data: list, context: Optional[FeatureStore] = None):
         length = len(kl_data)
         if length < max(self.len, self.KNN_PriceLen, self.KNN_STLen) + self.n:
             # 数据不足
             return {"posData": [0] * length, "score": 0}
 
         # 提取数据
-        close_data = []
-        volume_data = []
-        highData = []
-        lowData = []
-        for klItem in kl_data:
-            close_data.append(klItem.close)
-            volume_data.append(klItem.volume)
-            highData.append(klItem.high)
-            lowData.append(klItem.low)
-
-        # 计算super_trend
-        posData = []
-        super_trend, direction = self._calculate_super_trend(
-            close_data, highData, lowData, volume_data
+        features = FeatureStore.resolve(kl_data, context)
+        frame = features.frame
+        close_data = frame.close.tolist()
+        volume_data = frame.volume.tolist()
+        highData = frame.high.tolist()
+        lowData = frame.low.tolist()
+
+        # 计算super_trend，同参数的策略可直接复用
+        super_trend, direction = features.memo(
+            ("super_trend", "hlcv", self.len, self.factor, self.maSrc),
+            lambda: self._calculate_super_trend(
+                close_data, highData, lowData, volume_data
+            ),
         )
 
+        price = features.wma(self.KNN_PriceLen)
+        posData = self._signal(super_trend, direction, price)
+        return {"posData": posData, "score": super_trend[-1]}
+
+    def calculate_batch(self, batch):
+        """批量计算：super_trend 递推在股票维度上向量化，KNN 分类逐行进行"""
+        lengths = batch.lengths
+        pos_data = np.zeros(batch.shape, dtype=np.int64)
+        score = [0] * len(batch)
+        ready = lengths >= max(self.len, self.KNN_PriceLen, self.KNN_STLen) + self.n
+        if not ready.any():
+            return {"posData": pos_data, "score": score}
+
+        super_trend, direction = self._calculate_super_trend_batch(batch)
+        utils = UtilsHelper()
+        for row in np.flatnonzero(ready):
+            length = lengths[row]
+            row_trend = super_trend[row, :length].tolist()
+            price = utils.wma(batch.close[row, :length], self.KNN_PriceLen)
+            pos_data[row, :length] = self._signal(
+                row_trend, direction[row, :length].tolist(), price
+            )
+            score[row] = row_trend[-1]
+        return {"posData": pos_data, "score": score}
+
+    def _signal(self, super_trend, direction, price):
+        """由 super_trend 方向和最新的 KNN 分类生成信号"""
+        length = len(super_trend)
+        posData = []
         # 计算KNN参数
-        price = self._calculate_wma(close_data, self.KNN_PriceLen)
         st = self._calculate_wma(super_trend, self.KNN_STLen)
 
         # 收集数据点及其对应标签
@@ -90,7 +131,7 @@ class VolumeSuperTrendAIIndicator(BaseIndicator):
                 else:
                     posData.append(direction[i])
 
-        return {"posData": posData, "score": super_trend[-1]}
+        return posData
 
     def _calculate_super_trend(self, close_data, highData, lowData, volume_data):
         length = len(close_data)
@@ -101,32 +142,13 @@ class VolumeSuperTrendAIIndicator(BaseIndicator):
         for i in range(length):
             vol_price.append(close_data[i] * volume_data[i])
 
-        if self.maSrc == "SMA":
-            vwma = [
-                utils.sma(vol_price, self.len)[i] / utils.sma(volume_data, self.len)[i]
-                if utils.sma(volume_data, self.len)[i] > 0
-                else close_data[i]
-                for i in range(length)
-            ]
-        elif self.maSrc == "EMA":
-            vwma = [
-                utils.ema(vol_price, self.len)[i] / utils.ema(volume_data, self.len)[i]
-                if utils.ema(volume_data, self.len)[i] > 0
-                else close_data[i]
-                for i in range(length)
-            ]
-        elif self.maSrc == "WMA":
-            vwma = [
-                utils.wma(vol_price, self.len)[i] / utils.wma(volume_data, self.len)[i]
-                if utils.wma(volume_data, self.len)[i] > 0
-                else close_data[i]
-                for i in range(length)
-            ]
-        elif self.maSrc == "RMA":
+        if self.maSrc in ("SMA", "EMA", "WMA", "RMA"):
+            # 均线只算一次，避免在逐点推导式里重复计算整条序列
+            ma = getattr(utils, self.maSrc.lower())
+            price_ma = ma(vol_price, self.len)
+            volume_ma = ma(volume_data, self.len)
             vwma = [
-                utils.rma(vol_price, self.len)[i] / utils.rma(volume_data, self.len)[i]
-                if utils.rma(volume_data, self.len)[i] > 0
-                else close_data[i]
+                price_ma[i] / volume_ma[i] if volume_ma[i] > 0 else close_data[i]
                 for i in range(length)
             ]
         else:  # VWMA
@@ -180,6 +202,142 @@ class VolumeSuperTrendAIIndicator(BaseIndicator):
 
         return super_trend, direction
 
+    def _calculate_super_trend_batch(self, batch):
+        """按行计算 super_trend，逐位对应 _calculate_super_trend"""
+        close_data = batch.close
+        vol_price = close_data * batch.volume
+
+        if self.maSrc in ("SMA", "EMA", "WMA", "RMA"):
+            ma = getattr(batch_kernels, self.maSrc.lower())
+            price_ma = ma(vol_price, self.len)
+            volume_ma = ma(batch.volume, self.len)
+            vwma = close_data.copy()
+            np.divide(price_ma, volume_ma, out=vwma, where=volume_ma > 0)
+        else:  # VWMA
+            vwma = batch_kernels.wma(vol_price, self.len)
+
+        tr_data = batch_kernels.tr(batch.high, batch.low, close_data)
+        atr = batch_kernels.rma(tr_data, self.len)
+        upper_band = vwma + self.factor * atr
+        lower_band = vwma - self.factor * atr
+
+        super_trend = np.zeros(batch.shape, dtype=np.float64)
+        direction = np.zeros(batch.shape, dtype=np.int64)
+        for i in range(1, batch.shape[1]):
+            last_close = close_data[:, i - 1]
+            last_lower = lower_band[:, i - 1]
+            last_upper = upper_band[:, i - 1]
+            keep_lower = (lower_band[:, i] > last_lower) | (last_close < last_lower)
+            lower_band[:, i] = np.where(keep_lower, lower_band[:, i], last_lower)
+            keep_upper = (upper_band[:, i] < last_upper) | (last_close > last_upper)
+            upper_band[:, i] = np.where(keep_upper, upper_band[:, i], last_upper)
+
+            close = close_data[:, i]
+            direction[:, i] = np.where(
+                super_trend[:, i - 1] == last_upper,
+                np.where(close > upper_band[:, i], 1, -1),
+                np.where(close < lower_band[:, i], -1, 1),
+            )
+            super_trend[:, i] = np.where(
+                direction[:, i] == 1, lower_band[:, i], upper_band[:, i]
+            )
+        return super_trend, direction
+
+    def stream_step(self, core, bar, i):
+        """
+        逐根推进 super_trend 与 KNN 标签
+
+        最新一根K线的信号与全量计算一致；全量计算会用最新的 KNN 结果重绘最后 n 根
+        K线，流式计算不回改历史，因此 days 可能与全量计算不同
+        """
+        core = core or {
+            "price_ma": [] if self.maSrc in ("SMA", "WMA", "VWMA") else 0,
+            "volume_ma": [] if self.maSrc in ("SMA", "WMA") else 0,
+            "atr": 0,
+            "close": bar.close,
+            "lower": 0,
+            "upper": 0,
+            "st": 0,
+            "closes": [],
+            "sts": [],
+            "recent": [],
+        }
+        close = bar.close
+        vol_price = close * bar.volume
+
+        # 计算加权移动平均价格
+        price_ma, volume_ma = core["price_ma"], core["volume_ma"]
+        if self.maSrc in ("SMA", "WMA"):
+            price_ma = push_window(price_ma, vol_price, self.len)
+            volume_ma = push_window(volume_ma, bar.volume, self.len)
+            window_ma = window_sma if self.maSrc == "SMA" else window_wma
+            price_value, volume_value = window_ma(price_ma), window_ma(volume_ma)
+        elif self.maSrc in ("EMA", "RMA"):
+            step = ema_step if self.maSrc == "EMA" else rma_step
+            price_ma = price_value = step(price_ma, vol_price, i, self.len)
+            volume_ma = volume_value = step(volume_ma, bar.volume, i, self.len)
+        if self.maSrc == "VWMA":
+            price_ma = push_window(price_ma, vol_price, self.len)
+            vwma = window_wma(price_ma)
+        else:
+            vwma = price_value / volume_value if volume_value > 0 else close
+
+        # 计算ATR与上下轨
+        last_close = core["close"]
+        tr = bar.high - bar.low if i == 0 else true_range(bar.high, bar.low, last_close)
+        atr = rma_step(core["atr"], tr, i, self.len)
+        upper = vwma + self.factor * atr
+        lower = vwma - self.factor * atr
+
+        if i == 0:
+            super_trend, direction = 0, 0
+        else:
+            if not (lower > core["lower"] or last_close < core["lower"]):
+                lower = core["lower"]
+            if not (upper < core["upper"] or last_close > core["upper"]):
+                upper = core["upper"]
+            if core["st"] == core["upper"]:
+                direction = 1 if close > upper else -1
+            else:
+                direction = -1 if close < lower else 1
+            super_trend = lower if direction == 1 else upper
+
+        # KNN 样本：super_trend 及当时的价格/趋势均线比较结果
+        closes = push_window(core["closes"], close, self.KNN_PriceLen)
+        sts = push_window(core["sts"], super_trend, self.KNN_STLen)
+        label = 1 if window_wma(closes) > window_wma(sts) else 0
+        recent = push_window(core["recent"], [super_trend, label], self.n)
+
+        core = {
+            "price_ma": price_ma,
+            "volume_ma": volume_ma,
+            "atr": atr,
+            "close": close,
+            "lower": lower,
+            "upper": upper,
+            "st": super_trend,
+            "closes": closes,
+            "sts": sts,
+            "recent": recent,
+        }
+        if i + 1 < max(self.len, self.KNN_PriceLen, self.KNN_STLen) + self.n:
+            # 数据不足
+            return core, 0, 0
+
+        label = self._knn_weighted(
+            [item[0] for item in recent],
+            [item[1] for item in recent],
+            self.k,
+            super_trend,
+        )
+        if label == 1 and direction == -1:
+            pos = 1
+        elif label == 0 and direction == 1:
+            pos = -1
+        else:
+            pos = direction
+        return core, super_trend, pos
+
     def _calculate_wma(self, data, dayCount):
         utils = UtilsHelper()
         return utils.wma(data, dayCount)
@@ -1,8 +1,12 @@
-import pandas as pd
+from typing import Optional
+
+import numpy as np
 
 from core.enum.indicator_group import IndicatorGroup
 from core.indicator.base_indicator import BaseIndicator
-from core.utils.utils import UtilsHelper
+from core.utils import batch_kernels, kernels
+from core.utils.feature_store import FeatureStore
+from core.utils.streaming import compare_sign, push_window
 
 
 class WMSRIndicator(BaseIndicator):
@@ -17,24 +21,36 @@ class WMSRIndicator(BaseIndicator):
     def get_group(self):
         return IndicatorGroup.POWER
 
-    def calculate(self, kl_data):
+    def calculate(self, kl_data, context: Optional[FeatureStore] = None):
         length = len(kl_data)
-        pos_data = []
-        data = []
-        k_line = pd.DataFrame(kl_data)
-        lowest_data = UtilsHelper().lowest(k_line["low"].values, self.day_count)
-        highest_data = UtilsHelper().highest(k_line["high"].values, self.day_count)
-
-        for i in range(length):
-            temp1 = highest_data[i] - k_line["close"][i]
-            temp2 = highest_data[i] - lowest_data[i]
-            wr = -100 * temp1 / temp2 if temp2 > 0 else -100
-            data.append(wr)
-            status = 0
-            if wr > -50:
-                status = 1
-            elif wr < -50:
-                status = -1
-            pos_data.append(status)
-
-        return {"posData": pos_data, "score": data[length - 1]}
+        features = FeatureStore.resolve(kl_data, context)
+        lowest_data = np.asarray(features.lowest(self.day_count))
+        highest_data = np.asarray(features.highest(self.day_count))
+
+        temp1 = highest_data - features.frame.close
+        temp2 = highest_data - lowest_data
+        data = np.full(length, -100, dtype=np.float64)
+        np.divide(-100 * temp1, temp2, out=data, where=temp2 > 0)
+        pos_data = kernels.compare_sign(data, -50)
+
+        return {"posData": pos_data.tolist(), "score": data[length - 1]}
+
+    def calculate_batch(self, batch):
+        lowest_data = batch_kernels.lowest(batch.low, self.day_count)
+        highest_data = batch_kernels.highest(batch.high, self.day_count)
+
+        temp1 = highest_data - batch.close
+        temp2 = highest_data - lowest_data
+        data = np.full(batch.shape, -100, dtype=np.float64)
+        np.divide(-100 * temp1, temp2, out=data, where=temp2 > 0)
+        pos_data = kernels.compare_sign(data, -50)
+        return {"posData": pos_data, "score": batch.last(data)}
+
+    def stream_step(self, core, bar, i):
+        core = core or {"lows": [], "highs": []}
+        lows = push_window(core["lows"], bar.low, self.day_count)
+        highs = push_window(core["highs"], bar.high, self.day_count)
+        highest = max(highs)
+        temp2 = highest - min(lows)
+        wr = -100 * (highest - bar.close) / temp2 if temp2 > 0 else -100.0
+        return {"lows": lows, "highs": highs}, wr, compare_sign(wr, -50)
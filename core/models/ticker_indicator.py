@@ -7,6 +7,8 @@ from typing import Any, Optional, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from core.utils.column_codec import decode_column, encode_column
+
 
 class TickerIndicatorBase(BaseModel):
     """指标基础模型，包含共有字段"""
@@ -74,11 +76,9 @@ def ticker_indicator_to_dict(
     else:
         result = indicator.model_dump(exclude_none=True)
 
-    # 处理JSON字段
+    # 处理JSON字段，数值序列使用紧凑编码
     if "history" in result and result["history"] is not None:
-        import json
-
-        result["history"] = json.dumps(result["history"])
+        result["history"] = encode_column(result["history"])
 
     return result
 
@@ -108,13 +108,11 @@ def dict_to_ticker_indicator(data: dict) -> TickerIndicator:
         # 如果已经是字典或列表对象，保持不变
         elif isinstance(json_value, (dict, list)):
             pass
-        # 尝试解析JSON字符串
+        # 尝试解析JSON字符串或紧凑编码
         elif isinstance(json_value, str):
             try:
-                import json
-
-                processed_data["history"] = json.loads(json_value)
-            except (ValueError, json.JSONDecodeError):
+                processed_data["history"] = decode_column(json_value)
+            except ValueError:
                 processed_data["history"] = None
 
     # 确保必要字段存在并有默认值
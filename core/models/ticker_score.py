@@ -5,6 +5,8 @@ from typing import Any, Optional, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from core.utils.column_codec import decode_column, encode_column
+
 
 class TickerScoreBase(BaseModel):
     """评分基础模型，包含共有字段"""
@@ -84,11 +86,9 @@ def ticker_score_to_dict(score: Any) -> dict:
     else:
         result = score.model_dump(exclude_none=True)
 
-    # 处理JSON字段
+    # 处理JSON字段，数值序列使用紧凑编码
     if "history" in result and result["history"] is not None:
-        import json
-
-        result["history"] = json.dumps(result["history"])
+        result["history"] = encode_column(result["history"])
 
     return result
 
@@ -118,13 +118,11 @@ def dict_to_ticker_score(data: dict) -> TickerScore:
         # 如果已经是字典或列表对象，保持不变
         elif isinstance(json_value, (dict, list)):
             pass
-        # 尝试解析JSON字符串
+        # 尝试解析JSON字符串或紧凑编码
         elif isinstance(json_value, str):
             try:
-                import json
-
-                processed_data["history"] = json.loads(json_value)
-            except (ValueError, json.JSONDecodeError):
+                processed_data["history"] = decode_column(json_value)
+            except ValueError:
                 processed_data["history"] = None
 
     # 确保必要字段存在并有默认值
@@ -5,6 +5,8 @@ from typing import Any, Optional, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from core.utils.column_codec import decode_column, encode_column
+
 
 class TickerStrategyBase(BaseModel):
     """策略基础模型，包含共有字段"""
@@ -78,16 +80,12 @@ def ticker_strategy_to_dict(
     else:
         result = strategy.model_dump(exclude_none=True)
 
-    # 处理JSON字段
+    # 处理JSON字段，数值序列使用紧凑编码
     if "data" in result and result["data"] is not None:
-        import json
-
-        result["data"] = json.dumps(result["data"])
+        result["data"] = encode_column(result["data"])
 
     if "pos_data" in result and result["pos_data"] is not None:
-        import json
-
-        result["pos_data"] = json.dumps(result["pos_data"])
+        result["pos_data"] = encode_column(result["pos_data"])
 
     return result
 
@@ -121,13 +119,11 @@ def dict_to_ticker_strategy(data: dict) -> TickerStrategy:
             if isinstance(json_value, dict):
                 continue
 
-            # 尝试解析JSON字符串
+            # 尝试解析JSON字符串或紧凑编码
             if isinstance(json_value, str):
                 try:
-                    import json
-
-                    processed_data[json_field] = json.loads(json_value)
-                except (ValueError, json.JSONDecodeError):
+                    processed_data[json_field] = decode_column(json_value)
+                except ValueError:
                     processed_data[json_field] = None
 
     # 确保必要字段存在并有默认值
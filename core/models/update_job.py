@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class UpdateJob(BaseModel):
+    """批量更新任务"""
+
+    id: int = Field(..., description="ID")
+    job_key: str = Field(..., description="任务键，任务名:最后交易日")
+    name: str = Field(..., description="任务名")
+    end_date: str = Field(..., description="最后交易日")
+    status: str = Field(default="running", description="任务状态")
+    total: int = Field(default=0, description="股票总数")
+    run_started_at: Optional[str] = Field(default=None, description="本次运行开始时间")
+    finished_at: Optional[str] = Field(default=None, description="完成时间")
+    create_time: Optional[str] = Field(default=None, description="创建时间")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+def dict_to_update_job(data: dict) -> UpdateJob:
+    """
+    将数据库记录转换为UpdateJob模型，时间字段统一为字符串
+
+    Args:
+        data: 来自数据库的字典数据
+
+    Returns:
+        UpdateJob模型实例
+    """
+    processed_data = dict(data)
+    for field in ("run_started_at", "finished_at", "create_time"):
+        value = processed_data.get(field)
+        if value is not None and not isinstance(value, str):
+            processed_data[field] = value.strftime("%Y-%m-%d %H:%M:%S")
+    return UpdateJob(**processed_data)
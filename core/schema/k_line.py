@@ -1,7 +1,9 @@
+import sys
 from dataclasses import dataclass
 from typing import TypedDict
 
 import numpy as np
+import pandas as pd
 
 
 @dataclass
@@ -72,3 +74,370 @@ def k_line_from_dict(data: KLineDict) -> KLine:
         turnover=data["turnover"],
         turnover_rate=data["turnover_rate"],
     )
+
+
+KLINE_COLUMNS = ("high", "low", "open", "close", "volume", "turnover", "turnover_rate")
+_COLUMN_INDEX = {name: i for i, name in enumerate(KLINE_COLUMNS)}
+
+
+def _field(item, name: str):
+    if isinstance(item, dict):
+        return item.get(name, "" if name == "time_key" else 0)
+    return getattr(item, name)
+
+
+class KLineFrame:
+    """
+    列式K线数据
+
+    以一个 (7, capacity) 的 float64 缓冲区按列保存 OHLCV、成交额与换手率，
+    time_key 单独保存为 object 数组。close/high 等列属性返回零拷贝视图，
+    下标访问和迭代返回 KLine，因此可以直接替换原有的 list[KLine]。
+    """
+
+    __slots__ = ("_values", "_time_key", "_length")
+
+    def __init__(self, capacity: int = 0):
+        self._values = np.empty((len(KLINE_COLUMNS), capacity), dtype=np.float64)
+        self._time_key = np.empty(capacity, dtype=object)
+        self._length = 0
+
+    @classmethod
+    def _wrap(cls, values: np.ndarray, time_key: np.ndarray) -> "KLineFrame":
+        frame = cls.__new__(cls)
+        frame._values = values
+        frame._time_key = time_key
+        frame._length = len(time_key)
+        return frame
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, time_key) -> "KLineFrame":
+        """
+        零拷贝包装 (7, n) 的列数组，行顺序同 KLINE_COLUMNS（如内存映射的本地文件）
+
+        Args:
+            values: 列数组，可为只读
+            time_key: 长度为 n 的时间序列
+        """
+        if values.ndim != 2 or values.shape != (len(KLINE_COLUMNS), len(time_key)):
+            raise ValueError(f"K线列数组形状不符: {values.shape}")
+        keys = np.empty(len(time_key), dtype=object)
+        keys[:] = list(time_key)
+        return cls._wrap(values, keys)
+
+    @classmethod
+    def from_klines(cls, kl_data) -> "KLineFrame":
+        """
+        由 KLine 列表、KLineDict 列表或具有同名属性的对象列表构建，
+        字典中缺失的数值列按0处理
+
+        Args:
+            kl_data: K线数据序列
+
+        Returns:
+            KLineFrame
+        """
+        if isinstance(kl_data, KLineFrame):
+            return kl_data.copy()
+        items = list(kl_data)
+        values = np.empty((len(KLINE_COLUMNS), len(items)), dtype=np.float64)
+        for row, name in enumerate(KLINE_COLUMNS):
+            values[row] = [_field(item, name) for item in items]
+        time_key = np.empty(len(items), dtype=object)
+        time_key[:] = [_field(item, "time_key") for item in items]
+        return cls._wrap(values, time_key)
+
+    @classmethod
+    def from_columns(cls, time_key, **columns) -> "KLineFrame":
+        """
+        由各列数组构建，未提供的列填0
+
+        Args:
+            time_key: 时间序列
+            columns: 列名到数组的映射，列名取自 KLINE_COLUMNS
+        """
+        unknown = set(columns) - set(KLINE_COLUMNS)
+        if unknown:
+            raise ValueError(f"未知的K线列: {sorted(unknown)}")
+        length = len(time_key)
+        values = np.zeros((len(KLINE_COLUMNS), length), dtype=np.float64)
+        for name, column in columns.items():
+            column = np.asarray(column, dtype=np.float64)
+            if column.shape != (length,):
+                raise ValueError(f"列 {name} 长度不符: {column.shape} != ({length},)")
+            values[_COLUMN_INDEX[name]] = column
+        keys = np.empty(length, dtype=object)
+        keys[:] = list(time_key)
+        return cls._wrap(values, keys)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self._row(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            return KLineFrame._wrap(
+                self._values[:, start:stop:step], self._time_key[start:stop:step]
+            )
+        return self._row(self._index(key))
+
+    def __setitem__(self, key, kline) -> None:
+        i = self._index(key)
+        self._values[:, i] = [_field(kline, name) for name in KLINE_COLUMNS]
+        self._time_key[i] = _field(kline, "time_key")
+
+    def __repr__(self) -> str:
+        if self._length == 0:
+            return "KLineFrame(0)"
+        return (
+            f"KLineFrame({self._length}, "
+            f"{self._time_key[0]} ~ {self._time_key[self._length - 1]})"
+        )
+
+    def _index(self, key) -> int:
+        i = int(key)
+        if i < 0:
+            i += self._length
+        if i < 0 or i >= self._length:
+            raise IndexError("KLineFrame 下标越界")
+        return i
+
+    def _row(self, i: int) -> KLine:
+        high, low, open_, close, volume, turnover, turnover_rate = self._values[:, i]
+        return KLine(
+            time_key=self._time_key[i],
+            high=high,
+            low=low,
+            open=open_,
+            close=close,
+            volume=volume,
+            turnover=turnover,
+            turnover_rate=turnover_rate,
+        )
+
+    def column(self, name: str) -> np.ndarray:
+        """按列名返回零拷贝视图"""
+        if name == "time_key":
+            return self._time_key[: self._length]
+        return self._values[_COLUMN_INDEX[name], : self._length]
+
+    @property
+    def time_key(self) -> np.ndarray:
+        return self._time_key[: self._length]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._values[0, : self._length]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._values[1, : self._length]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._values[2, : self._length]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._values[3, : self._length]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._values[4, : self._length]
+
+    @property
+    def turnover(self) -> np.ndarray:
+        return self._values[5, : self._length]
+
+    @property
+    def turnover_rate(self) -> np.ndarray:
+        return self._values[6, : self._length]
+
+    @property
+    def nbytes(self) -> int:
+        """估算占用的字节数（数值列加 time_key 字符串）"""
+        keys = self.time_key
+        key_size = sys.getsizeof(keys[0]) if self._length > 0 else 0
+        return (
+            self._values[:, : self._length].nbytes + keys.nbytes + key_size * len(keys)
+        )
+
+    def append(self, kline) -> None:
+        """
+        追加一根K线，容量不足时按倍数扩容（均摊 O(1)）
+
+        切片得到的视图容量等于长度，追加时会先复制，不会改写原数据。
+        """
+        capacity = self._values.shape[1]
+        if self._length == capacity:
+            new_capacity = max(8, capacity * 2)
+            values = np.empty((len(KLINE_COLUMNS), new_capacity), dtype=np.float64)
+            values[:, : self._length] = self._values[:, : self._length]
+            time_key = np.empty(new_capacity, dtype=object)
+            time_key[: self._length] = self._time_key[: self._length]
+            self._values = values
+            self._time_key = time_key
+        self._length += 1
+        self[self._length - 1] = kline
+
+    def copy(self) -> "KLineFrame":
+        return KLineFrame._wrap(
+            self._values[:, : self._length].copy(),
+            self._time_key[: self._length].copy(),
+        )
+
+    def to_klines(self) -> list[KLine]:
+        return list(self)
+
+    def to_dicts(self) -> list[KLineDict]:
+        return [k_line_to_dict(kline) for kline in self]
+
+    def to_dataframe(self):
+        """转换为 pandas DataFrame，列与 pd.DataFrame(list[KLine]) 一致"""
+        data = {"time_key": self.time_key.copy()}
+        for name in KLINE_COLUMNS:
+            data[name] = self.column(name).copy()
+        return pd.DataFrame(data)
+
+
+def to_kline(item) -> KLine:
+    """
+    将 KLine、KLineDict 或具有同名属性的对象转换为 KLine，数值列转为 float
+    """
+    return KLine(
+        time_key=_field(item, "time_key"),
+        **{name: float(_field(item, name)) for name in KLINE_COLUMNS},
+    )
+
+
+def as_kline_frame(kl_data) -> KLineFrame:
+    """
+    将K线数据转换为 KLineFrame，已是 KLineFrame 时原样返回（不复制）
+    """
+    if isinstance(kl_data, KLineFrame):
+        return kl_data
+    if kl_data is None:
+        return KLineFrame()
+    return KLineFrame.from_klines(kl_data)
+
+
+class KLineBatch:
+    """
+    多只股票的批量K线数据
+
+    各列为 (n_tickers, n_bars) 的 float64 二维数组，每行左对齐保存一只股票的K线，
+    lengths 为各行的实际长度，超出部分为填充值。指标计算都只依赖当前及之前的K线，
+    因此填充值不影响有效区间内的结果；from_frames 以各行最后一根K线填充。
+    """
+
+    __slots__ = ("_values", "_time_key", "lengths")
+
+    def __init__(self, values: np.ndarray, time_key: np.ndarray, lengths):
+        lengths = np.asarray(lengths, dtype=np.int64)
+        if values.shape[1:] != time_key.shape or values.shape[1] != len(lengths):
+            raise ValueError("批量K线的形状与行长度不符")
+        if np.any(lengths < 0) or np.any(lengths > values.shape[2]):
+            raise ValueError("批量K线的行长度越界")
+        self._values = values
+        self._time_key = time_key
+        self.lengths = lengths
+
+    @classmethod
+    def from_frames(cls, frames) -> "KLineBatch":
+        """
+        由多只股票的K线构建
+
+        Args:
+            frames: 每只股票的K线（list[KLine] 或 KLineFrame）组成的序列
+        """
+        frames = [as_kline_frame(frame) for frame in frames]
+        lengths = [len(frame) for frame in frames]
+        n_bars = max(lengths, default=0)
+        values = np.zeros((len(KLINE_COLUMNS), len(frames), n_bars), dtype=np.float64)
+        time_key = np.full((len(frames), n_bars), "", dtype=object)
+        for row, frame in enumerate(frames):
+            length = len(frame)
+            if length == 0:
+                continue
+            values[:, row, :length] = frame._values[:, :length]
+            values[:, row, length:] = frame._values[:, length - 1 : length]
+            time_key[row, :length] = frame.time_key
+        return cls(values, time_key, lengths)
+
+    @classmethod
+    def from_columns(cls, lengths, time_key=None, **columns) -> "KLineBatch":
+        """
+        由已填充好的二维列数组构建，未提供的列填0
+
+        Args:
+            lengths: 各行的实际长度
+            time_key: (n_tickers, n_bars) 的时间数组，可省略
+            columns: 列名到二维数组的映射，列名取自 KLINE_COLUMNS
+        """
+        unknown = set(columns) - set(KLINE_COLUMNS)
+        if unknown:
+            raise ValueError(f"未知的K线列: {sorted(unknown)}")
+        shape = None
+        for name, column in columns.items():
+            column = np.asarray(column, dtype=np.float64)
+            if column.ndim != 2 or (shape is not None and column.shape != shape):
+                raise ValueError(f"列 {name} 形状不符: {column.shape}")
+            shape = column.shape
+        if shape is None:
+            shape = (len(lengths), 0)
+        values = np.zeros((len(KLINE_COLUMNS), *shape), dtype=np.float64)
+        for name, column in columns.items():
+            values[_COLUMN_INDEX[name]] = column
+        keys = np.full(shape, "", dtype=object)
+        if time_key is not None:
+            keys[:] = time_key
+        return cls(values, keys, lengths)
+
+    def __len__(self) -> int:
+        return self._values.shape[1]
+
+    @property
+    def shape(self) -> tuple:
+        """(n_tickers, n_bars)"""
+        return self._values.shape[1:]
+
+    def column(self, name: str) -> np.ndarray:
+        """按列名返回 (n_tickers, n_bars) 的零拷贝视图"""
+        if name == "time_key":
+            return self._time_key
+        return self._values[_COLUMN_INDEX[name]]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._values[0]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._values[1]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._values[2]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._values[3]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._values[4]
+
+    def frame(self, row: int) -> KLineFrame:
+        """第 row 只股票有效区间的 KLineFrame 视图"""
+        length = int(self.lengths[row])
+        return KLineFrame._wrap(
+            self._values[:, row, :length], self._time_key[row, :length]
+        )
+
+    def last(self, data: np.ndarray) -> np.ndarray:
+        """取二维结果中每行最后一根有效K线处的值"""
+        return data[np.arange(len(self)), self.lengths - 1]
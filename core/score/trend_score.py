@@ -7,7 +7,7 @@ from core.enum.indicator_group import IndicatorGroup
 from core.indicator import Indicator as Helper
 from core.models.ticker import Ticker
 from core.models.ticker_score import TickerScore
-from core.schema.k_line import KLine
+from core.schema.k_line import KLine, KLineFrame, as_kline_frame
 from core.score.base_score import BaseScore
 
 
@@ -32,7 +32,7 @@ class TrendScore(BaseScore):
     def calculate(
         self,
         ticker: Ticker,
-        kl_data: list[KLine],
+        kl_data: list[KLine] | KLineFrame,
         strategyData: Optional[list] = None,
         indicatorData: Optional[list] = None,
         valuationData: Optional[list] = None,
@@ -51,6 +51,8 @@ class TrendScore(BaseScore):
             包含评分的结果列表
         """
         tickerId = ticker.id
+        # KLine对象或字典统一转换为列式数据
+        kl_data = as_kline_frame(kl_data)
         length = len(kl_data)
         if length == 0:
             print("无数据")
@@ -58,14 +60,7 @@ class TrendScore(BaseScore):
 
         # 初始化结果数组
         result = []
-        for i in range(length):
-            # 处理不同数据类型（KLine对象或字典）
-            kline_item = kl_data[i]
-            if hasattr(kline_item, "time_key"):  # KLine对象
-                time_key = kline_item.time_key
-            else:  # 字典
-                time_key = kline_item.get("time_key", "")
-
+        for time_key in kl_data.time_key:
             result.append(
                 {
                     "time_key": time_key,
@@ -341,7 +336,7 @@ class TrendScore(BaseScore):
 
         return decayed_signals
 
-    def _calculate_trend_factors(self, kl_data: list[KLine]):
+    def _calculate_trend_factors(self, kl_data: KLineFrame):
         """
         计算趋势强度和持续性
 
@@ -351,16 +346,8 @@ class TrendScore(BaseScore):
         if not kl_data:
             return [], []
 
-        # 处理不同数据类型（KLine对象或字典）
-        closes = []
-        volumes = []
-        for item in kl_data:
-            if hasattr(item, "close"):  # KLine对象
-                closes.append(item.close)
-                volumes.append(item.volume)
-            else:  # 字典
-                closes.append(item.get("close", 0))
-                volumes.append(item.get("volume", 0))
+        closes = kl_data.close.tolist()
+        volumes = kl_data.volume.tolist()
 
         trend_strength = []
         trend_persistence = []
@@ -412,7 +399,7 @@ class TrendScore(BaseScore):
 
         return trend_strength, trend_persistence
 
-    def _calculate_volume_price_confirmation(self, kl_data: list[KLine]):
+    def _calculate_volume_price_confirmation(self, kl_data: KLineFrame):
         """
         计算价格和交易量的确认关系
 
@@ -422,35 +409,24 @@ class TrendScore(BaseScore):
         if len(kl_data) < 2:
             return [0] * len(kl_data)
 
-        factors = [0]  # 第一个点没有前一天数据
-
-        for i in range(1, len(kl_data)):
-            # 处理不同数据类型（KLine对象或字典）
-            if hasattr(kl_data[i], "close"):  # KLine对象
-                price_change = kl_data[i].close - kl_data[i - 1].close
-                volume_change = kl_data[i].volume - kl_data[i - 1].volume
-            else:  # 字典
-                price_change = kl_data[i].get("close", 0) - kl_data[i - 1].get(
-                    "close", 0
-                )
-                volume_change = kl_data[i].get("volume", 0) - kl_data[i - 1].get(
-                    "volume", 0
-                )
-
-            # 价格上涨且成交量增加是强烈的做多信号 (+1.0)
-            if price_change > 0 and volume_change > 0:
-                factors.append(1.0)
-            # 价格上涨但成交量减少是弱做多信号 (+0.3)
-            elif price_change > 0 and volume_change <= 0:
-                factors.append(0.3)
-            # 价格下跌且成交量增加是强烈的做空信号 (-1.0)
-            elif price_change < 0 and volume_change > 0:
-                factors.append(-1.0)
+        price_change = np.diff(kl_data.close)
+        volume_change = np.diff(kl_data.volume)
+        factors = np.select(
+            [
+                # 价格上涨且成交量增加是强烈的做多信号 (+1.0)
+                (price_change > 0) & (volume_change > 0),
+                # 价格上涨但成交量减少是弱做多信号 (+0.3)
+                price_change > 0,
+                # 价格下跌且成交量增加是强烈的做空信号 (-1.0)
+                (price_change < 0) & (volume_change > 0),
+            ],
+            [1.0, 0.3, -1.0],
             # 价格下跌但成交量减少是弱做空信号 (-0.3)
-            else:
-                factors.append(-0.3)
+            default=-0.3,
+        )
 
-        return factors
+        # 第一个点没有前一天数据
+        return [0] + factors.tolist()
 
     def _calculate_enhanced_strategy_factor(self, data_point: dict):
         """
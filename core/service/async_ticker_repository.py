@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+"""
+股票、评分、策略、指标的异步只读仓库
+
+供 FastAPI 的 async 接口使用，查询与对应的同步仓库相同，经 AsyncDbAdapter
+在异步引擎上执行，不阻塞事件循环。写入仍由同步仓库完成（批量更新、UnitOfWork）。
+
+查询出错时记录日志后重新抛出，由接口返回 500，而不是当作股票不存在或没有数据。
+"""
+
+import logging
+from typing import Optional
+
+from core.database.async_db import AsyncDbAdapter
+from core.models.ticker import Ticker, dict_to_ticker
+from core.models.ticker_indicator import TickerIndicator, dict_to_ticker_indicator
+from core.models.ticker_score import TickerScore, dict_to_ticker_score
+from core.models.ticker_strategy import TickerStrategy, dict_to_ticker_strategy
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTickerRepository:
+    """异步股票仓库"""
+
+    table = "ticker"
+
+    def __init__(self, db: Optional[AsyncDbAdapter] = None):
+        """
+        Args:
+            db: 可选的异步数据库适配器，默认使用进程内共用的引擎
+        """
+        self.db = db if db is not None else AsyncDbAdapter()
+
+    async def get_by_code(self, code: str) -> Optional[Ticker]:
+        """根据股票代码获取股票信息"""
+        try:
+            sql = f"SELECT * FROM {self.table} WHERE code = :code"
+            result = await self.db.query_one(sql, {"code": code})
+            return dict_to_ticker(result) if result else None
+        except Exception as e:
+            logger.error(f"获取股票信息错误: {e}")
+            raise
+
+
+class AsyncTickerScoreRepository:
+    """异步评分仓库"""
+
+    table = "ticker_score"
+
+    def __init__(self, db: Optional[AsyncDbAdapter] = None):
+        self.db = db if db is not None else AsyncDbAdapter()
+
+    async def get_scores(
+        self,
+        ticker_id: int,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[TickerScore]:
+        """按时间范围获取评分历史，同 TickerScoreRepository.get_scores"""
+        conditions = ["ticker_id = :ticker_id"]
+        params = {"ticker_id": ticker_id}
+        if start is not None:
+            conditions.append("time_key >= :start")
+            params["start"] = start
+        if end is not None:
+            conditions.append("time_key <= :end")
+            params["end"] = end
+        sql = f"SELECT * FROM {self.table} WHERE {' AND '.join(conditions)}"
+        if limit is not None:
+            sql += f" ORDER BY time_key DESC LIMIT {int(limit)}"
+        else:
+            sql += " ORDER BY time_key"
+        try:
+            results = await self.db.query(sql, params)
+        except Exception as e:
+            logger.error(f"获取评分历史错误: {e}")
+            raise
+        if limit is not None:
+            results.reverse()
+        return [dict_to_ticker_score(item) for item in results]
+
+    async def get_latest_time_key(self, ticker_id: int) -> Optional[str]:
+        """获取股票已保存的最新评分时间键"""
+        try:
+            sql = f"SELECT MAX(time_key) AS time_key FROM {self.table} WHERE ticker_id = :ticker_id"
+            result = await self.db.query_one(sql, {"ticker_id": ticker_id})
+            return result["time_key"] if result else None
+        except Exception as e:
+            logger.error(f"获取最新评分时间错误: {e}")
+            raise
+
+
+class AsyncTickerStrategyRepository:
+    """异步策略仓库"""
+
+    table = "ticker_strategy"
+
+    def __init__(self, db: Optional[AsyncDbAdapter] = None):
+        self.db = db if db is not None else AsyncDbAdapter()
+
+    async def get_items_by_ticker_id(
+        self, ticker_id: int, kl_type: str
+    ) -> list[TickerStrategy]:
+        """根据股票ID和K线类型获取所有策略记录"""
+        try:
+            sql = f"SELECT * FROM {self.table} WHERE ticker_id = :ticker_id AND kl_type = :kl_type"
+            results = await self.db.query(
+                sql, {"ticker_id": ticker_id, "kl_type": kl_type}
+            )
+            return [dict_to_ticker_strategy(item) for item in results]
+        except Exception as e:
+            logger.error(f"获取策略记录列表错误: {e}")
+            raise
+
+
+class AsyncTickerIndicatorRepository:
+    """异步指标仓库"""
+
+    table = "ticker_indicator"
+
+    def __init__(self, db: Optional[AsyncDbAdapter] = None):
+        self.db = db if db is not None else AsyncDbAdapter()
+
+    async def get_items_by_ticker_id(
+        self, ticker_id: int, kl_type: str
+    ) -> list[TickerIndicator]:
+        """根据股票ID和K线类型获取所有指标记录"""
+        try:
+            sql = f"SELECT * FROM {self.table} WHERE ticker_id = :ticker_id AND kl_type = :kl_type"
+            results = await self.db.query(
+                sql, {"ticker_id": ticker_id, "kl_type": kl_type}
+            )
+            return [dict_to_ticker_indicator(item) for item in results]
+        except Exception as e:
+            logger.error(f"获取指标记录列表错误: {e}")
+            raise
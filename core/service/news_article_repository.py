@@ -7,10 +7,18 @@
 
 import hashlib
 import logging
+import os
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
 from ..database.db_adapter import DbAdapter
+from ..database.pagination import (
+    cached_total,
+    decode_cursor,
+    encode_cursor,
+    keyset_condition,
+    order_by,
+)
 from ..models.news_article import (
     ArticleStatus,
     NewsArticle,
@@ -22,6 +30,12 @@ from ..models.news_article import (
 
 logger = logging.getLogger(__name__)
 
+# 数据库类型，游标分页的排序需要按数据库处理 NULL 的位置
+DB_TYPE = os.getenv("DB_TYPE", "sqlite").lower()
+
+# 游标分页的排序键，与 query_articles 的排序一致，最后以 id 保证顺序唯一
+ARTICLE_SORT_FIELDS = ("-importance_score", "-published_at", "-crawled_at", "-id")
+
 
 class NewsArticleRepository:
     """新闻文章数据访问类"""
@@ -328,6 +342,43 @@ class NewsArticleRepository:
             logger.error(f"搜索新闻文章失败: {e}")
             return []
 
+    def _article_filters(
+        self,
+        search: Optional[str] = None,
+        source_id: Optional[int] = None,
+        hours: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> tuple[list[str], dict[str, Any]]:
+        """构建综合查询的筛选条件，返回 (条件列表, 参数字典)"""
+        where_clauses = []
+        params = {}
+
+        # 时间筛选
+        if hours:
+            cutoff_time = datetime.now() - timedelta(hours=hours)
+            where_clauses.append("crawled_at >= :cutoff_time")
+            params["cutoff_time"] = cutoff_time
+
+        # 新闻源筛选
+        if source_id:
+            where_clauses.append("source_id = :source_id")
+            params["source_id"] = source_id
+
+        # 状态筛选
+        if status:
+            where_clauses.append("status = :status")
+            params["status"] = status
+
+        # 搜索筛选
+        if search:
+            search_term = f"%{search}%"
+            where_clauses.append(
+                "(title LIKE :search OR content LIKE :search OR summary LIKE :search)"
+            )
+            params["search"] = search_term
+
+        return where_clauses, params
+
     async def query_articles(
         self,
         page: int = 1,
@@ -353,32 +404,9 @@ class NewsArticleRepository:
         """
         try:
             # 构建查询条件
-            where_clauses = []
-            params = {}
-
-            # 时间筛选
-            if hours:
-                cutoff_time = datetime.now() - timedelta(hours=hours)
-                where_clauses.append("crawled_at >= :cutoff_time")
-                params["cutoff_time"] = cutoff_time
-
-            # 新闻源筛选
-            if source_id:
-                where_clauses.append("source_id = :source_id")
-                params["source_id"] = source_id
-
-            # 状态筛选
-            if status:
-                where_clauses.append("status = :status")
-                params["status"] = status
-
-            # 搜索筛选
-            if search:
-                search_term = f"%{search}%"
-                where_clauses.append(
-                    "(title LIKE :search OR content LIKE :search OR summary LIKE :search)"
-                )
-                params["search"] = search_term
+            where_clauses, params = self._article_filters(
+                search, source_id, hours, status
+            )
 
             # 构建WHERE子句
             where_clause = (
@@ -413,6 +441,116 @@ class NewsArticleRepository:
             logger.error(f"查询新闻文章失败: {e}")
             return [], 0
 
+    async def query_articles_after(
+        self,
+        page_size: int = 20,
+        search: Optional[str] = None,
+        source_id: Optional[int] = None,
+        hours: Optional[int] = None,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[NewsArticle], Optional[str]]:
+        """
+        游标分页查询新闻文章，排序与 query_articles 相同并以 id 兜底，
+        见 core.database.pagination
+
+        Args:
+            page_size: 每页数量
+            search: 搜索关键词
+            source_id: 新闻源ID筛选
+            hours: 时间范围筛选（小时）
+            status: 状态筛选
+            cursor: 上一页返回的 next_cursor，为空时从第一页开始
+
+        Returns:
+            (文章列表, 下一页游标)，没有下一页时游标为 None
+
+        Raises:
+            ValueError: 游标无效
+        """
+        values = decode_cursor(cursor, ARTICLE_SORT_FIELDS) if cursor else None
+        try:
+            where_clauses, params = self._article_filters(
+                search, source_id, hours, status
+            )
+            keys = [(field[1:], True) for field in ARTICLE_SORT_FIELDS]
+            if values is not None:
+
+                def bind(value: Any) -> str:
+                    name = f"cursor_{len(params)}"
+                    params[name] = value
+                    return f":{name}"
+
+                where_clauses.append(keyset_condition(keys, values, bind))
+            where_clause = (
+                "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+            )
+            params["limit"] = page_size + 1
+
+            data_sql = f"""
+            SELECT * FROM news_articles
+            {where_clause}
+            ORDER BY {order_by(keys, DB_TYPE)}
+            LIMIT :limit
+            """
+            results = self.db.query(data_sql, params) or []
+
+            next_cursor = None
+            if len(results) > page_size:
+                results = results[:page_size]
+                last = results[-1]
+                next_cursor = encode_cursor(
+                    ARTICLE_SORT_FIELDS,
+                    [last[field[1:]] for field in ARTICLE_SORT_FIELDS],
+                )
+            return [dict_to_news_article(row) for row in results], next_cursor
+
+        except Exception as e:
+            logger.error(f"游标查询新闻文章失败: {e}")
+            return [], None
+
+    async def count_articles(
+        self,
+        search: Optional[str] = None,
+        source_id: Optional[int] = None,
+        hours: Optional[int] = None,
+        status: Optional[str] = None,
+        cached: bool = False,
+    ) -> int:
+        """
+        统计符合筛选条件的新闻文章数
+
+        Args:
+            search: 搜索关键词
+            source_id: 新闻源ID筛选
+            hours: 时间范围筛选（小时）
+            status: 状态筛选
+            cached: 是否使用短期缓存的结果（见 core.database.pagination）
+
+        Returns:
+            文章数，查询失败时为0
+        """
+
+        def count() -> int:
+            where_clauses, params = self._article_filters(
+                search, source_id, hours, status
+            )
+            where_clause = (
+                "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+            )
+            count_sql = f"SELECT COUNT(*) as total FROM news_articles {where_clause}"
+            count_result = self.db.query_one(count_sql, params)
+            return count_result["total"] if count_result else 0
+
+        try:
+            if cached:
+                key = ("news_articles", search, source_id, hours, status)
+                return cached_total(key, count)
+            return count()
+        except Exception as e:
+            logger.error(f"统计新闻文章失败: {e}")
+            return 0
+
     async def update_news_article(
         self, article_id: int, update_data: NewsArticleUpdate
     ) -> Optional[NewsArticle]:
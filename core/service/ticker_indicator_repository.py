@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 
+import contextlib
 import logging
 import os
+from collections.abc import Iterable
 from typing import Any, Optional
 
+from core.database.batch_read import chunk_ids, in_clause
 from core.database.db_adapter import DbAdapter
+from core.database.upsert import build_upsert_sql
 from core.indicator import Indicator
 from core.models.ticker_indicator import TickerIndicator as TickerIndicatorModel
 from core.models.ticker_indicator import (
@@ -68,6 +72,36 @@ class TickerIndicatorRepository:
             logger.error(f"获取指标记录列表错误: {e}")
             return []
 
+    def get_many_by_ticker_ids(
+        self, ticker_ids: Iterable[int], kl_type: str
+    ) -> dict[int, list[TickerIndicatorModel]]:
+        """批量获取多只股票指定K线类型的指标记录，每组ID一条 IN 查询
+
+        Args:
+            ticker_ids: 股票ID
+            kl_type: K线类型
+
+        Returns:
+            以股票ID为键的指标记录列表，没有记录的股票对应空列表
+        """
+        result: dict[int, list[TickerIndicatorModel]] = {}
+        for ids in chunk_ids(ticker_ids):
+            for ticker_id in ids:
+                result[ticker_id] = []
+            sql = (
+                f"SELECT * FROM {self.table} "
+                f"WHERE {in_clause('ticker_id', len(ids), PLACEHOLDER)} "
+                f"AND kl_type = {PLACEHOLDER}"
+            )
+            try:
+                rows = self.db.query(sql, (*ids, kl_type))
+            except Exception as e:
+                logger.error(f"批量获取指标记录错误: {e}")
+                continue
+            for row in rows:
+                result[row["ticker_id"]].append(dict_to_ticker_indicator(row))
+        return result
+
     def get_update_time_by_ticker_id(
         self, ticker_id: int, kl_type: str
     ) -> Optional[str]:
@@ -239,9 +273,70 @@ class TickerIndicatorRepository:
         Returns:
             None
         """
+        # bulk_upsert 失败时已记录日志并回滚
+        with contextlib.suppress(Exception):
+            self.bulk_upsert(ticker_id, kl_type, time_key, indicators)
+
+    def bulk_upsert(
+        self,
+        ticker_id: int,
+        kl_type: str,
+        time_key: str,
+        results: dict[str, dict[str, Any]],
+        commit: bool = True,
+    ) -> None:
+        """一条 UPSERT 语句写入一只股票的全部指标
+
+        依赖 UNIQUE (ticker_id, indicator_key, kl_type)，已存在的记录更新 time_key、
+        history（新值为空时保留原值）和 status，与 update_item 的结果一致
+
+        Args:
+            ticker_id: 股票ID
+            kl_type: K线类型
+            time_key: 时间键
+            results: 指标字典，键为指标键，值为指标数据
+            commit: 是否提交；批量写入多只股票时可由调用方统一提交
+
+        Returns:
+            None
+        """
+        if not results:
+            return
+        columns = (
+            "ticker_id",
+            "indicator_key",
+            "kl_type",
+            "time_key",
+            "history",
+            "status",
+        )
+        values = []
+        for indicator_key, entity in results.items():
+            db_data = ticker_indicator_to_dict(
+                TickerIndicatorCreate(
+                    ticker_id=ticker_id,
+                    indicator_key=indicator_key,
+                    kl_type=kl_type,
+                    time_key=time_key,
+                    history=entity.get("history"),
+                    status=entity.get("status", 1),
+                )
+            )
+            values.extend(db_data.get(column) for column in columns)
+        sql = build_upsert_sql(
+            DB_TYPE,
+            self.table,
+            columns,
+            ("ticker_id", "indicator_key", "kl_type"),
+            ("time_key", "history", "status"),
+            len(results),
+            keep_on_null=("history", "status"),
+        )
         try:
-            for indicator_key, entity in indicators.items():
-                self.update_item(ticker_id, indicator_key, kl_type, time_key, entity)
+            self.db.execute(sql, tuple(values))
+            if commit:
+                self.db.commit()
         except Exception as e:
             logger.error(f"批量更新指标记录错误: {e}")
             self.db.rollback()
+            raise
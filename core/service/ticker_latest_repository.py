@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+
+"""
+股票最新评分汇总表 ticker_latest
+
+每只股票一行，保存最新一根K线的评分和时间键，由评分写入（TickerScoreRepository）
+和新建股票（TickerRepository.create）维护。股票列表分页以 ticker 表为主表左关联
+该表，不再关联整段评分历史；没有汇总行的股票照常列出、评分为空，已有数据库可用
+scripts/refresh_ticker_latest.py 重建以补齐评分。
+"""
+
+import logging
+import os
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, Optional
+
+from core.database.db_adapter import DbAdapter
+from core.database.pagination import (
+    cached_total,
+    decode_cursor,
+    encode_cursor,
+    keyset_condition,
+    order_by,
+)
+from core.database.upsert import build_upsert_sql
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# 获取占位符类型
+DB_TYPE = os.getenv("DB_TYPE", "sqlite").lower()
+PLACEHOLDER = "?" if DB_TYPE == "sqlite" else "%s"
+
+# 股票代码的市场前缀，搜索不带前缀的代码时按各市场分别做前缀匹配
+MARKET_PREFIXES = ("SH.", "SZ.", "HK.", "US.")
+
+# 列表支持的排序字段
+SORT_FIELDS = {
+    "code": "t.code",
+    "name": "t.name",
+    "score": "tl.score",
+    "update_time": "tl.time_key",
+}
+
+
+def prefix_range(prefix: str) -> tuple[str, str]:
+    """前缀匹配对应的区间 [low, high)，可以使用普通 B 树索引"""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class TickerLatestRepository:
+    """
+    股票最新评分汇总表仓库类
+    """
+
+    table = "ticker_latest"
+
+    def __init__(self, db_connection: Optional[Any] = None):
+        """
+        初始化TickerLatest仓库
+
+        Args:
+            db_connection: 可选的数据库连接，如果未提供将使用DbAdapter创建新连接
+        """
+        if db_connection:
+            self.db = db_connection
+        else:
+            self.db = DbAdapter()
+
+    def upsert(
+        self,
+        ticker_id: int,
+        score: Optional[float] = None,
+        time_key: Optional[str] = None,
+        commit: bool = True,
+    ) -> None:
+        """写入股票的最新评分，score/time_key 为空时保留已有值（只确保该行存在）
+
+        Args:
+            ticker_id: 股票ID
+            score: 最新综合分数
+            time_key: 最新评分的时间键
+            commit: 是否提交；由调用方统一提交时传 False
+
+        Returns:
+            None
+        """
+        columns = ("ticker_id", "score", "time_key", "update_time")
+        sql = build_upsert_sql(
+            DB_TYPE,
+            self.table,
+            columns,
+            ("ticker_id",),
+            columns[1:],
+            1,
+            keep_on_null=("score", "time_key"),
+        )
+        update_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            self.db.execute(sql, (ticker_id, score, time_key, update_time))
+            if commit:
+                self.db.commit()
+        except Exception as e:
+            logger.error(f"更新最新评分错误: {e}")
+            self.db.rollback()
+            raise
+
+    def refresh(self) -> int:
+        """按 ticker 和 ticker_score 重建整张表
+
+        Returns:
+            重建后的行数
+        """
+        sql = f"""
+            INSERT INTO {self.table} (ticker_id, score, time_key, update_time)
+            SELECT t.id, s.score, s.time_key, {PLACEHOLDER}
+            FROM ticker t
+            LEFT JOIN (
+                SELECT ticker_id, MAX(time_key) AS time_key
+                FROM ticker_score GROUP BY ticker_id
+            ) m ON m.ticker_id = t.id
+            LEFT JOIN ticker_score s
+                ON s.ticker_id = m.ticker_id AND s.time_key = m.time_key
+        """
+        update_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            self.db.execute(f"DELETE FROM {self.table}")
+            self.db.execute(sql, (update_time,))
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"重建最新评分表错误: {e}")
+            self.db.rollback()
+            raise
+        result = self.db.query_one(f"SELECT COUNT(*) AS total FROM {self.table}")
+        return result["total"] if result else 0
+
+    def _search_condition(self, search: Optional[str]) -> tuple[str, list[Any]]:
+        """搜索条件：股票代码（可省略市场前缀）和名称按前缀匹配"""
+        search = (search or "").strip()
+        if not search:
+            return "", []
+        code = search.upper()
+        prefixes = (
+            [code]
+            if "." in code
+            else [code] + [f"{market}{code}" for market in MARKET_PREFIXES]
+        )
+        ranges = [("t.code", prefix) for prefix in prefixes]
+        ranges.append(("t.name", search))
+        clauses = []
+        params: list[Any] = []
+        for column, prefix in ranges:
+            clauses.append(f"({column} >= {PLACEHOLDER} AND {column} < {PLACEHOLDER})")
+            params.extend(prefix_range(prefix))
+        return f"AND ({' OR '.join(clauses)})", params
+
+    def _from_clause(self, search_condition: str) -> str:
+        return f"""
+            FROM ticker t
+            LEFT JOIN {self.table} tl ON tl.ticker_id = t.id
+            WHERE t.is_deleted = 0 AND t.status = 1 {search_condition}
+        """
+
+    def count(self, search: Optional[str] = None, cached: bool = False) -> int:
+        """有效股票总数
+
+        Args:
+            search: 搜索关键字
+            cached: 是否使用短期缓存的结果（见 core.database.pagination）
+
+        Returns:
+            总数
+        """
+        if cached:
+            return cached_total((self.table, search), lambda: self.count(search))
+        search_condition, params = self._search_condition(search)
+        result = self.db.query_one(
+            f"SELECT COUNT(*) AS total {self._from_clause(search_condition)}",
+            tuple(params),
+        )
+        return result.get("total", 0) if result else 0
+
+    def get_page(
+        self,
+        search: Optional[str] = None,
+        sort: Optional[Sequence[str]] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> tuple[int, list[dict[str, Any]]]:
+        """分页查询有效股票及其最新评分
+
+        搜索按前缀匹配股票代码（可省略市场前缀）和名称，使用 ticker 表的
+        code/name 索引；排序字段见 SORT_FIELDS，"-" 前缀表示降序
+
+        Args:
+            search: 搜索关键字
+            sort: 排序字段列表，如 ["-score", "code"]
+            limit: 每页条数
+            offset: 偏移量
+
+        Returns:
+            (总数, 当前页记录)，记录包含 code、name、score、update_time
+        """
+        total = self.count(search)
+        search_condition, params = self._search_condition(search)
+
+        sort_clauses = []
+        for sort_item in sort or []:
+            direction = "DESC" if sort_item.startswith("-") else "ASC"
+            field_name = sort_item.lstrip("+-")
+            if field_name in SORT_FIELDS:
+                sort_clauses.append(f"{SORT_FIELDS[field_name]} {direction}")
+        order_by_clause = f"ORDER BY {', '.join(sort_clauses or ['t.code'])}"
+
+        sql = f"""
+            SELECT t.code, t.name, tl.score AS score, tl.time_key AS update_time
+            {self._from_clause(search_condition)}
+            {order_by_clause}
+            LIMIT {PLACEHOLDER} OFFSET {PLACEHOLDER}
+        """
+        rows = self.db.query(sql, (*params, limit, offset))
+        return total, rows
+
+    def get_page_after(
+        self,
+        search: Optional[str] = None,
+        sort: Optional[Sequence[str]] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        """游标分页查询，见 core.database.pagination
+
+        Args:
+            search: 搜索关键字
+            sort: 排序字段列表，同 get_page；最后自动追加 id 保证顺序唯一
+            limit: 每页条数
+            cursor: 上一页返回的 next_cursor，为空时从第一页开始
+
+        Returns:
+            (当前页记录, 下一页游标)，没有下一页时游标为 None
+
+        Raises:
+            ValueError: 游标无效
+        """
+        fields = [
+            item if item[:1] in "+-" else f"+{item}"
+            for item in sort or []
+            if item.lstrip("+-") in SORT_FIELDS
+        ] or ["+code"]
+        fields.append("+id")
+        columns = {**SORT_FIELDS, "id": "t.id"}
+        keys = [(columns[field[1:]], field.startswith("-")) for field in fields]
+        search_condition, params = self._search_condition(search)
+        if cursor:
+            values = decode_cursor(cursor, fields)
+
+            def bind(value: Any) -> str:
+                params.append(value)
+                return PLACEHOLDER
+
+            search_condition += f" AND {keyset_condition(keys, values, bind)}"
+        sql = f"""
+            SELECT t.id AS id, t.code, t.name,
+                tl.score AS score, tl.time_key AS update_time
+            {self._from_clause(search_condition)}
+            ORDER BY {order_by(keys, DB_TYPE)}
+            LIMIT {PLACEHOLDER}
+        """
+        rows = self.db.query(sql, (*params, limit + 1))
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(fields, [last[field[1:]] for field in fields])
+        return rows, next_cursor
@@ -3,9 +3,11 @@
 import copy
 import logging
 import os
+from collections.abc import Iterable
 from datetime import datetime
 from typing import Any, Optional, Union
 
+from core.database.batch_read import chunk_ids, in_clause
 from core.database.db_adapter import DbAdapter
 from core.enum.ticker_group import get_group_id_by_code
 from core.models.ticker import (
@@ -15,6 +17,7 @@ from core.models.ticker import (
     dict_to_ticker,
     ticker_to_dict,
 )
+from core.service.ticker_latest_repository import TickerLatestRepository
 
 # 配置日志
 logging.basicConfig(
@@ -67,6 +70,32 @@ class TickerRepository:
             logger.error(f"获取股票信息错误: {e}")
             return None
 
+    def get_by_codes(self, codes: Iterable[str]) -> dict[str, Ticker]:
+        """
+        根据股票代码批量获取股票信息，每组代码一条 IN 查询
+
+        Args:
+            codes: 股票代码
+
+        Returns:
+            {股票代码: Ticker对象}形式的字典，不存在的代码不在结果中
+        """
+        result: dict[str, Ticker] = {}
+        for chunk in chunk_ids(codes):
+            sql = (
+                f"SELECT * FROM {self.table} "
+                f"WHERE {in_clause('code', len(chunk), PLACEHOLDER)}"
+            )
+            try:
+                rows = self.db.query(sql, tuple(chunk))
+            except Exception as e:
+                logger.error(f"批量获取股票信息错误: {e}")
+                continue
+            for row in rows:
+                ticker = dict_to_ticker(row)
+                result[ticker.code] = ticker
+        return result
+
     def get_like_code(self, code: str) -> Optional[Ticker]:
         """
         根据股票代码模糊查询股票信息
@@ -276,12 +305,18 @@ class TickerRepository:
             # 执行SQL
             self.db.execute(sql, tuple(values))
 
+            # 获取创建的记录
+            ticker = self.get_by_code(code)
+
+            # 股票列表从 ticker_latest 分页，尚无评分的新股票也需要一行
+            if ticker is not None:
+                TickerLatestRepository(self.db).upsert(ticker.id, commit=False)
+
             # 提交事务
             if commit:
                 self.db.commit()
 
-            # 获取创建的记录
-            return self.get_by_code(code)
+            return ticker
 
         except Exception as e:
             logger.error(f"创建股票记录错误: {e}")
@@ -410,6 +445,8 @@ class TickerRepository:
         try:
             sql = f"DELETE FROM {self.table} WHERE id = {PLACEHOLDER}"
             self.db.execute(sql, (id,))
+            sql = f"DELETE FROM {TickerLatestRepository.table} WHERE ticker_id = {PLACEHOLDER}"
+            self.db.execute(sql, (id,))
             self.db.commit()
             return True
         except Exception as e:
@@ -2,15 +2,21 @@
 
 import logging
 import os
-from typing import Any, Optional
+from collections.abc import Iterable, Sequence
+from typing import Any, Optional, Union
 
+from core.database.batch_read import chunk_ids, in_clause
 from core.database.db_adapter import DbAdapter
+from core.database.upsert import build_upsert_sql
 from core.models.ticker_score import TickerScore as TickerScoreModel
 from core.models.ticker_score import (
+    TickerScoreBase,
     TickerScoreCreate,
     dict_to_ticker_score,
     ticker_score_to_dict,
 )
+from core.service.ticker_latest_repository import TickerLatestRepository
+from core.utils.column_codec import decode_column
 
 # 配置日志
 logging.basicConfig(
@@ -22,6 +28,25 @@ logger = logging.getLogger(__name__)
 DB_TYPE = os.getenv("DB_TYPE", "sqlite").lower()
 PLACEHOLDER = "?" if DB_TYPE == "sqlite" else "%s"
 
+# 追加写入的列，与 UNIQUE (ticker_id, time_key) 冲突时更新除键以外的列
+SCORE_COLUMNS = (
+    "ticker_id",
+    "time_key",
+    "ma_buy",
+    "ma_sell",
+    "ma_score",
+    "in_buy",
+    "in_sell",
+    "in_score",
+    "strategy_buy",
+    "strategy_sell",
+    "strategy_score",
+    "score",
+    "history",
+)
+# 每条 UPSERT 语句的行数，避免超出数据库的参数个数限制
+APPEND_BATCH_SIZE = 200
+
 
 class TickerScoreRepository:
     """
@@ -59,6 +84,152 @@ class TickerScoreRepository:
             logger.error(f"获取评分记录列表错误: {e}")
             return []
 
+    def get_scores(
+        self,
+        ticker_id: int,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[TickerScoreModel]:
+        """按时间范围获取评分历史，按 time_key 升序，走 (ticker_id, time_key) 索引
+
+        Args:
+            ticker_id: 股票ID
+            start: 起始时间键（含），为空时不限
+            end: 结束时间键（含），为空时不限
+            limit: 只取范围内最近的若干条
+
+        Returns:
+            评分记录列表
+        """
+        conditions = [f"ticker_id = {PLACEHOLDER}"]
+        params: list[Any] = [ticker_id]
+        if start is not None:
+            conditions.append(f"time_key >= {PLACEHOLDER}")
+            params.append(start)
+        if end is not None:
+            conditions.append(f"time_key <= {PLACEHOLDER}")
+            params.append(end)
+        sql = f"SELECT * FROM {self.table} WHERE {' AND '.join(conditions)}"
+        if limit is not None:
+            sql += f" ORDER BY time_key DESC LIMIT {int(limit)}"
+        else:
+            sql += " ORDER BY time_key"
+        try:
+            results = self.db.query(sql, tuple(params))
+        except Exception as e:
+            logger.error(f"获取评分历史错误: {e}")
+            return []
+        if limit is not None:
+            results = list(reversed(results))
+        return [dict_to_ticker_score(item) for item in results]
+
+    def get_latest_time_key(self, ticker_id: int) -> Optional[str]:
+        """获取股票已保存的最新评分时间键
+
+        Args:
+            ticker_id: 股票ID
+
+        Returns:
+            最新时间键，没有评分时返回None
+        """
+        try:
+            sql = f"SELECT MAX(time_key) AS time_key FROM {self.table} WHERE ticker_id = {PLACEHOLDER}"
+            result = self.db.query_one(sql, (ticker_id,))
+            return result["time_key"] if result else None
+        except Exception as e:
+            logger.error(f"获取最新评分时间错误: {e}")
+            return None
+
+    def get_ticker_ids_by_time_key(self, time_key: str) -> set[int]:
+        """获取已有指定日期评分的股票ID，批量更新时一次查询得到可跳过的股票
+
+        Args:
+            time_key: 时间键
+
+        Returns:
+            股票ID集合
+        """
+        try:
+            sql = f"SELECT DISTINCT ticker_id FROM {self.table} WHERE time_key = {PLACEHOLDER}"
+            results = self.db.query(sql, (time_key,))
+            return {item["ticker_id"] for item in results}
+        except Exception as e:
+            logger.error(f"获取评分股票列表错误: {e}")
+            return set()
+
+    def get_many_by_ticker_ids(
+        self,
+        ticker_ids: Iterable[int],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> dict[int, list[TickerScoreModel]]:
+        """批量获取多只股票的评分历史，每组ID一条 IN 查询
+
+        Args:
+            ticker_ids: 股票ID
+            start: 起始时间键（含），为空时不限
+            end: 结束时间键（含），为空时不限
+            limit: 每只股票只保留范围内最近的若干条（读取后截取，需要时用 start 缩小读取范围）
+
+        Returns:
+            以股票ID为键、按 time_key 升序的评分列表，没有评分的股票对应空列表
+        """
+        result: dict[int, list[TickerScoreModel]] = {}
+        for ids in chunk_ids(ticker_ids):
+            for ticker_id in ids:
+                result[ticker_id] = []
+            conditions = [in_clause("ticker_id", len(ids), PLACEHOLDER)]
+            params: list[Any] = list(ids)
+            if start is not None:
+                conditions.append(f"time_key >= {PLACEHOLDER}")
+                params.append(start)
+            if end is not None:
+                conditions.append(f"time_key <= {PLACEHOLDER}")
+                params.append(end)
+            sql = (
+                f"SELECT * FROM {self.table} WHERE {' AND '.join(conditions)} "
+                "ORDER BY ticker_id, time_key"
+            )
+            try:
+                rows = self.db.query(sql, tuple(params))
+            except Exception as e:
+                logger.error(f"批量获取评分历史错误: {e}")
+                continue
+            for row in rows:
+                result[row["ticker_id"]].append(dict_to_ticker_score(row))
+        if limit is not None:
+            for ticker_id, scores in result.items():
+                result[ticker_id] = scores[-limit:] if limit > 0 else []
+        return result
+
+    def get_latest_time_keys(self, ticker_ids: Iterable[int]) -> dict[int, str]:
+        """批量获取多只股票已保存的最新评分时间键
+
+        Args:
+            ticker_ids: 股票ID
+
+        Returns:
+            以股票ID为键的最新时间键，没有评分的股票不在结果中
+        """
+        result: dict[int, str] = {}
+        for ids in chunk_ids(ticker_ids):
+            sql = (
+                f"SELECT ticker_id, MAX(time_key) AS time_key FROM {self.table} "
+                f"WHERE {in_clause('ticker_id', len(ids), PLACEHOLDER)} "
+                "GROUP BY ticker_id"
+            )
+            try:
+                rows = self.db.query(sql, tuple(ids))
+            except Exception as e:
+                logger.error(f"批量获取最新评分时间错误: {e}")
+                continue
+            result.update(
+                {row["ticker_id"]: row["time_key"] for row in rows if row["time_key"]}
+            )
+        return result
+
     def clear_items_by_ticker_id(self, ticker_id: int) -> None:
         """清除股票的所有评分记录
 
@@ -90,10 +261,8 @@ class TickerScoreRepository:
             item_data = item.copy()
             if "history" in item_data and isinstance(item_data["history"], str):
                 try:
-                    import json
-
-                    item_data["history"] = json.loads(item_data["history"])
-                except (ValueError, json.JSONDecodeError):
+                    item_data["history"] = decode_column(item_data["history"])
+                except ValueError:
                     item_data["history"] = None
 
             # 创建模型实例
@@ -156,10 +325,8 @@ class TickerScoreRepository:
                 # 🔥 修复history字段的JSON反序列化问题
                 if "history" in item_data and isinstance(item_data["history"], str):
                     try:
-                        import json
-
-                        item_data["history"] = json.loads(item_data["history"])
-                    except (ValueError, json.JSONDecodeError):
+                        item_data["history"] = decode_column(item_data["history"])
+                    except ValueError:
                         item_data["history"] = None
 
                 insert_items.append(item_data)
@@ -184,10 +351,8 @@ class TickerScoreRepository:
                 # 🔥 再次确保history字段正确处理
                 if "history" in item_data and isinstance(item_data["history"], str):
                     try:
-                        import json
-
-                        item_data["history"] = json.loads(item_data["history"])
-                    except (ValueError, json.JSONDecodeError):
+                        item_data["history"] = decode_column(item_data["history"])
+                    except ValueError:
                         item_data["history"] = None
 
                 score = TickerScoreCreate(**item_data)
@@ -206,8 +371,82 @@ class TickerScoreRepository:
 
             # 执行SQL
             self.db.execute(sql, tuple(all_values))
+
+            # 同步最新评分汇总表
+            latest = max(insert_items, key=lambda item: item.get("time_key") or "")
+            TickerLatestRepository(self.db).upsert(
+                ticker_id, latest.get("score"), latest.get("time_key"), commit=False
+            )
             self.db.commit()
 
         except Exception as e:
             logger.error(f"批量更新评分记录错误: {e}")
             self.db.rollback()
+
+    def append_items(
+        self,
+        ticker_id: int,
+        items: Sequence[Union[TickerScoreBase, dict[str, Any]]],
+        commit: bool = True,
+    ) -> int:
+        """追加评分历史，只写入不早于已保存最新时间键的K线
+
+        最新一根K线可能在盘中计算过，重新写入时按 UNIQUE (ticker_id, time_key)
+        覆盖；更早的历史保持不变。同一事务内更新 ticker_latest
+
+        Args:
+            ticker_id: 股票ID
+            items: 评分模型或评分数据字典，顺序不限
+            commit: 是否提交；批量写入多只股票时可由调用方统一提交
+
+        Returns:
+            写入的记录数
+        """
+        latest = self.get_latest_time_key(ticker_id) if items else None
+        rows = {}
+        for item in items:
+            if isinstance(item, dict):
+                item_data = {**item, "ticker_id": ticker_id}
+                if isinstance(item_data.get("history"), str):
+                    try:
+                        item_data["history"] = decode_column(item_data["history"])
+                    except ValueError:
+                        item_data["history"] = None
+                score = TickerScoreCreate(**item_data)
+            else:
+                score = TickerScoreCreate(
+                    **{**item.model_dump(), "ticker_id": ticker_id}
+                )
+            if latest is not None and score.time_key < latest:
+                continue
+            rows[score.time_key] = score
+        if not rows:
+            return 0
+
+        scores = [rows[time_key] for time_key in sorted(rows)]
+        try:
+            for offset in range(0, len(scores), APPEND_BATCH_SIZE):
+                batch = scores[offset : offset + APPEND_BATCH_SIZE]
+                values = []
+                for score in batch:
+                    db_data = {**score.model_dump(), **ticker_score_to_dict(score)}
+                    values.extend(db_data.get(column) for column in SCORE_COLUMNS)
+                sql = build_upsert_sql(
+                    DB_TYPE,
+                    self.table,
+                    SCORE_COLUMNS,
+                    ("ticker_id", "time_key"),
+                    SCORE_COLUMNS[2:],
+                    len(batch),
+                )
+                self.db.execute(sql, tuple(values))
+            TickerLatestRepository(self.db).upsert(
+                ticker_id, scores[-1].score, scores[-1].time_key, commit=False
+            )
+            if commit:
+                self.db.commit()
+        except Exception as e:
+            logger.error(f"追加评分记录错误: {e}")
+            self.db.rollback()
+            raise
+        return len(scores)
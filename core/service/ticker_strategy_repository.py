@@ -2,9 +2,12 @@
 
 import logging
 import os
+from collections.abc import Iterable
 from typing import Any, Optional
 
+from core.database.batch_read import chunk_ids, in_clause
 from core.database.db_adapter import DbAdapter
+from core.database.upsert import build_upsert_sql
 from core.models.ticker_strategy import TickerStrategy as TickerStrategyModel
 from core.models.ticker_strategy import (
     TickerStrategyCreate,
@@ -63,6 +66,36 @@ class TickerStrategyRepository:
             logger.error(f"获取策略记录列表错误: {e}")
             return []
 
+    def get_many_by_ticker_ids(
+        self, ticker_ids: Iterable[int], kl_type: str
+    ) -> dict[int, list[TickerStrategyModel]]:
+        """批量获取多只股票指定K线类型的策略记录，每组ID一条 IN 查询
+
+        Args:
+            ticker_ids: 股票ID
+            kl_type: K线类型
+
+        Returns:
+            以股票ID为键的策略记录列表，没有记录的股票对应空列表
+        """
+        result: dict[int, list[TickerStrategyModel]] = {}
+        for ids in chunk_ids(ticker_ids):
+            for ticker_id in ids:
+                result[ticker_id] = []
+            sql = (
+                f"SELECT * FROM {self.table} "
+                f"WHERE {in_clause('ticker_id', len(ids), PLACEHOLDER)} "
+                f"AND kl_type = {PLACEHOLDER}"
+            )
+            try:
+                rows = self.db.query(sql, (*ids, kl_type))
+            except Exception as e:
+                logger.error(f"批量获取策略记录错误: {e}")
+                continue
+            for row in rows:
+                result[row["ticker_id"]].append(dict_to_ticker_strategy(row))
+        return result
+
     def get_update_time_by_ticker_id(
         self, ticker_id: int, kl_type: str
     ) -> Optional[str]:
@@ -219,3 +252,69 @@ class TickerStrategyRepository:
         except Exception as e:
             logger.error(f"更新策略记录错误: {e}")
             self.db.rollback()
+
+    def bulk_upsert(
+        self,
+        ticker_id: int,
+        kl_type: str,
+        time_key: str,
+        results: dict[str, dict[str, Any]],
+        commit: bool = True,
+    ) -> None:
+        """一条 UPSERT 语句写入一只股票的全部策略
+
+        依赖 UNIQUE (ticker_id, strategy_key, kl_type)，已存在的记录更新 time_key、
+        data/pos_data（新值为空时保留原值）和 status，与 update_item 的结果一致
+
+        Args:
+            ticker_id: 股票ID
+            kl_type: K线类型
+            time_key: 时间键
+            results: 策略字典，键为策略键，值为策略结果
+            commit: 是否提交；批量写入多只股票时可由调用方统一提交
+
+        Returns:
+            None
+        """
+        if not results:
+            return
+        columns = (
+            "ticker_id",
+            "strategy_key",
+            "kl_type",
+            "time_key",
+            "data",
+            "pos_data",
+            "status",
+        )
+        values = []
+        for strategy_key, entity in results.items():
+            db_data = ticker_strategy_to_dict(
+                TickerStrategyCreate(
+                    ticker_id=ticker_id,
+                    strategy_key=strategy_key,
+                    kl_type=kl_type,
+                    time_key=time_key,
+                    data=entity.get("data"),
+                    pos_data=entity.get("pos_data"),
+                    status=entity.get("status", 1),
+                )
+            )
+            values.extend(db_data.get(column) for column in columns)
+        sql = build_upsert_sql(
+            DB_TYPE,
+            self.table,
+            columns,
+            ("ticker_id", "strategy_key", "kl_type"),
+            ("time_key", "data", "pos_data", "status"),
+            len(results),
+            keep_on_null=("data", "pos_data", "status"),
+        )
+        try:
+            self.db.execute(sql, tuple(values))
+            if commit:
+                self.db.commit()
+        except Exception as e:
+            logger.error(f"批量更新策略记录错误: {e}")
+            self.db.rollback()
+            raise
@@ -2,8 +2,10 @@
 
 import logging
 import os
+from collections.abc import Iterable
 from typing import Any, Optional
 
+from core.database.batch_read import chunk_ids, in_clause
 from core.database.db_adapter import DbAdapter
 from core.models.ticker_valuation import TickerValuation as TickerValuationModel
 from core.models.ticker_valuation import (
@@ -60,6 +62,34 @@ class TickerValuationRepository:
             logger.error(f"获取估值记录列表错误: {e}")
             return []
 
+    def get_many_by_ticker_ids(
+        self, ticker_ids: Iterable[int]
+    ) -> dict[int, list[TickerValuationModel]]:
+        """批量获取多只股票的估值记录，每组ID一条 IN 查询
+
+        Args:
+            ticker_ids: 股票ID
+
+        Returns:
+            以股票ID为键的估值记录列表，没有记录的股票对应空列表
+        """
+        result: dict[int, list[TickerValuationModel]] = {}
+        for ids in chunk_ids(ticker_ids):
+            for ticker_id in ids:
+                result[ticker_id] = []
+            sql = (
+                f"SELECT * FROM {self.table} "
+                f"WHERE {in_clause('ticker_id', len(ids), PLACEHOLDER)}"
+            )
+            try:
+                rows = self.db.query(sql, tuple(ids))
+            except Exception as e:
+                logger.error(f"批量获取估值记录错误: {e}")
+                continue
+            for row in rows:
+                result[row["ticker_id"]].append(dict_to_ticker_valuation(row))
+        return result
+
     def get_update_time_by_ticker_id(self, ticker_id: int) -> Optional[str]:
         """获取股票估值最早更新时间
 
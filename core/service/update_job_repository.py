@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+import logging
+import os
+from datetime import datetime
+from typing import Any, Optional
+
+from core.database.db_adapter import DbAdapter
+from core.database.upsert import build_upsert_sql
+from core.enum.update_job_status import UpdateJobStatus, UpdateJobTickerStatus
+from core.models.update_job import UpdateJob, dict_to_update_job
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# 获取占位符类型
+DB_TYPE = os.getenv("DB_TYPE", "sqlite").lower()
+PLACEHOLDER = "?" if DB_TYPE == "sqlite" else "%s"
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class UpdateJobRepository:
+    """
+    批量更新任务台账，记录任务及任务内每只股票的处理状态和耗时
+    """
+
+    table = "update_job"
+    ticker_table = "update_job_ticker"
+
+    def __init__(self, db_connection: Optional[Any] = None):
+        """
+        初始化UpdateJob仓库
+
+        Args:
+            db_connection: 可选的数据库连接，如果未提供将使用DbAdapter创建新连接
+        """
+        if db_connection:
+            self.db = db_connection
+        else:
+            self.db = DbAdapter()
+
+    def get_by_key(self, job_key: str) -> Optional[UpdateJob]:
+        """根据任务键获取任务"""
+        sql = f"SELECT * FROM {self.table} WHERE job_key = {PLACEHOLDER}"
+        result = self.db.query_one(sql, (job_key,))
+        return dict_to_update_job(result) if result else None
+
+    def get_latest(self, name: str) -> Optional[UpdateJob]:
+        """获取指定任务名最近一次的任务"""
+        sql = (
+            f"SELECT * FROM {self.table} WHERE name = {PLACEHOLDER} "
+            "ORDER BY id DESC LIMIT 1"
+        )
+        result = self.db.query_one(sql, (name,))
+        return dict_to_update_job(result) if result else None
+
+    def start(self, name: str, end_date: str, total: int) -> UpdateJob:
+        """
+        开始或续跑任务：任务键为 name:end_date，已存在时重置为运行中，
+        并清除失败记录以便重试
+
+        Args:
+            name: 任务名，如 all、zh、hk
+            end_date: 最后交易日
+            total: 股票总数
+
+        Returns:
+            UpdateJob
+        """
+        job_key = f"{name}:{end_date}"
+        now = datetime.now().strftime(TIME_FORMAT)
+        job = self.get_by_key(job_key)
+        if job is None:
+            sql = (
+                f"INSERT INTO {self.table} "
+                "(job_key, name, end_date, status, total, run_started_at) "
+                f"VALUES ({', '.join([PLACEHOLDER] * 6)})"
+            )
+            self.db.execute(
+                sql,
+                (job_key, name, end_date, UpdateJobStatus.RUNNING.value, total, now),
+            )
+        else:
+            sql = (
+                f"UPDATE {self.table} SET status = {PLACEHOLDER}, total = {PLACEHOLDER}, "
+                f"run_started_at = {PLACEHOLDER}, finished_at = NULL "
+                f"WHERE id = {PLACEHOLDER}"
+            )
+            self.db.execute(sql, (UpdateJobStatus.RUNNING.value, total, now, job.id))
+            sql = (
+                f"DELETE FROM {self.ticker_table} "
+                f"WHERE job_id = {PLACEHOLDER} AND status = {PLACEHOLDER}"
+            )
+            self.db.execute(sql, (job.id, UpdateJobTickerStatus.FAILED.value))
+        self.db.commit()
+        return self.get_by_key(job_key)
+
+    def finish(self, job_id: int, status: UpdateJobStatus) -> None:
+        """结束任务"""
+        sql = (
+            f"UPDATE {self.table} SET status = {PLACEHOLDER}, finished_at = {PLACEHOLDER} "
+            f"WHERE id = {PLACEHOLDER}"
+        )
+        now = datetime.now().strftime(TIME_FORMAT)
+        self.db.execute(sql, (status.value, now, job_id))
+        self.db.commit()
+
+    def get_finished_ticker_ids(self, job_id: int) -> set[int]:
+        """
+        获取任务中已更新或已跳过的股票ID，续跑时一次查询得到全部可跳过的股票
+        """
+        sql = (
+            f"SELECT ticker_id FROM {self.ticker_table} "
+            f"WHERE job_id = {PLACEHOLDER} AND status IN ({PLACEHOLDER}, {PLACEHOLDER})"
+        )
+        results = self.db.query(
+            sql,
+            (
+                job_id,
+                UpdateJobTickerStatus.DONE.value,
+                UpdateJobTickerStatus.SKIPPED.value,
+            ),
+        )
+        return {item["ticker_id"] for item in results}
+
+    def record(self, job_id: int, entries: list[dict[str, Any]]) -> None:
+        """
+        批量记录股票处理结果，一次提交
+
+        按 (job_id, ticker_id) 写入或覆盖，同一只股票重复记录时保留最后一次的结果
+
+        Args:
+            job_id: 任务ID
+            entries: 每项包含 ticker_id、status（UpdateJobTickerStatus）、
+                started_at/finished_at（datetime，可选）、duration（秒）、error
+
+        Raises:
+            Exception: 写入失败，整批回滚，由调用方决定如何处理
+        """
+        if not entries:
+            return
+        columns = (
+            "job_id",
+            "ticker_id",
+            "status",
+            "started_at",
+            "finished_at",
+            "duration",
+            "error",
+        )
+        sql = build_upsert_sql(
+            DB_TYPE, self.ticker_table, columns, columns[:2], columns[2:], 1
+        )
+        try:
+            for entry in entries:
+                started_at = entry.get("started_at")
+                finished_at = entry.get("finished_at") or datetime.now()
+                self.db.execute(
+                    sql,
+                    (
+                        job_id,
+                        entry["ticker_id"],
+                        entry["status"].value,
+                        started_at.strftime(TIME_FORMAT) if started_at else None,
+                        finished_at.strftime(TIME_FORMAT),
+                        round(entry.get("duration", 0), 3),
+                        entry.get("error"),
+                    ),
+                )
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"记录任务进度错误: {e}")
+            self.db.rollback()
+            raise
+
+    def progress(self, job: UpdateJob, now: Optional[datetime] = None) -> dict:
+        """
+        统计任务进度，按本次运行的完成速度估算剩余时间
+
+        Returns:
+            dict: 任务信息及 done/skipped/failed/remaining/percent、
+                elapsed（本次运行秒数）、avg_duration、eta（秒，无法估算时为 None）
+        """
+        sql = (
+            f"SELECT status, COUNT(*) AS count, SUM(duration) AS duration "
+            f"FROM {self.ticker_table} WHERE job_id = {PLACEHOLDER} GROUP BY status"
+        )
+        counts = {status.value: 0 for status in UpdateJobTickerStatus}
+        total_duration = 0.0
+        for item in self.db.query(sql, (job.id,)):
+            counts[item["status"]] = item["count"]
+            if item["status"] == UpdateJobTickerStatus.DONE.value:
+                total_duration = float(item["duration"] or 0)
+
+        sql = (
+            f"SELECT COUNT(*) AS count FROM {self.ticker_table} "
+            f"WHERE job_id = {PLACEHOLDER} AND finished_at >= {PLACEHOLDER} "
+            f"AND status != {PLACEHOLDER}"
+        )
+        result = self.db.query_one(
+            sql,
+            (job.id, job.run_started_at, UpdateJobTickerStatus.SKIPPED.value),
+        )
+        finished_this_run = result["count"] if result else 0
+
+        finished = sum(counts.values())
+        remaining = max(job.total - finished, 0)
+        if job.status == UpdateJobStatus.RUNNING.value:
+            end = now or datetime.now()
+        else:
+            end = datetime.strptime(job.finished_at, TIME_FORMAT)
+        started = datetime.strptime(job.run_started_at, TIME_FORMAT)
+        elapsed = int((end - started).total_seconds())
+        eta = None
+        if job.status == UpdateJobStatus.RUNNING.value and finished_this_run > 0:
+            eta = round(elapsed / finished_this_run * remaining)
+        return {
+            "job_key": job.job_key,
+            "name": job.name,
+            "end_date": job.end_date,
+            "status": job.status,
+            "total": job.total,
+            "done": counts[UpdateJobTickerStatus.DONE.value],
+            "skipped": counts[UpdateJobTickerStatus.SKIPPED.value],
+            "failed": counts[UpdateJobTickerStatus.FAILED.value],
+            "remaining": remaining,
+            "percent": round(finished / job.total * 100, 2) if job.total else 100.0,
+            "run_started_at": job.run_started_at,
+            "elapsed": elapsed,
+            "avg_duration": (
+                round(total_duration / counts[UpdateJobTickerStatus.DONE.value], 3)
+                if counts[UpdateJobTickerStatus.DONE.value]
+                else 0
+            ),
+            "eta": eta,
+        }
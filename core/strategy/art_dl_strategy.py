@@ -2,8 +2,11 @@
 ART双线策略模块
 """
 
+from typing import Optional
+
 from core.schema.k_line import KLine
 from core.strategy.base_strategy import BaseStrategy
+from core.utils.feature_store import FeatureStore
 from core.utils.utils import UtilsHelper
 
 
@@ -38,21 +41,20 @@ class ArtDLStrategy(BaseStrategy):
         """
         return "ART_DL_strategy"
 
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(self, kl_data: list[KLine], context: Optional[FeatureStore] = None):
         """计算ART双线策略
 
         Args:
             kl_data: K线数据列表
+            context: 共享的特征缓存，为 None 时自行创建
 
         Returns:
             list: 策略仓位数据列表 [-1, 0, 1]
         """
-        art_data = UtilsHelper().ratr(kl_data, self.day_count)
+        features = FeatureStore.resolve(kl_data, context)
+        art_data = features.ratr(self.day_count)
         loss_data = []
-        close_data = []
-
-        for kl_item in kl_data:
-            close_data.append(kl_item.close)
+        close_data = features.frame.close.tolist()
 
         for art_item in art_data:
             loss_data.append(art_item * self.multi)
@@ -3,11 +3,16 @@
 """
 from abc import ABC, abstractmethod
 
-from core.schema.k_line import KLine
+from core.schema.k_line import KLine, KLineFrame
+from core.utils.streaming import StreamingMixin
 
 
-class BaseStrategy(ABC):
-    """策略基类，定义了策略类的基本接口"""
+class BaseStrategy(StreamingMixin, ABC):
+    """策略基类，定义了策略类的基本接口
+
+    流式接口 init_state/update/replace_last 见 StreamingMixin，score 固定为 None。
+    策略没有增量实现，每次更新都全量重算
+    """
 
     def get_params(self):
         """获取策略参数，可选实现
@@ -36,13 +41,18 @@ class BaseStrategy(ABC):
         pass
 
     @abstractmethod
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(self, kl_data: list[KLine] | KLineFrame, context=None):
         """计算策略结果，必须实现
 
         Args:
-            kl_data (list): K线数据列表
+            kl_data (list | KLineFrame): K线数据，StrategyCalculator 传入的是 KLineFrame
+            context (FeatureStore): 同一份K线上共享的特征缓存，为 None 时自行创建
 
         Returns:
             list: 策略计算结果
         """
         pass
+
+    def stream_recalculate(self, kl_data) -> tuple:
+        """流式更新时全量计算，结果取最后一根K线"""
+        return None, self.calculate(kl_data)
@@ -2,8 +2,11 @@
 布林带双线策略模块
 """
 
+from typing import Optional
+
 from core.schema.k_line import KLine
 from core.strategy.base_strategy import BaseStrategy
+from core.utils.feature_store import FeatureStore
 from core.utils.utils import UtilsHelper
 
 
@@ -38,23 +41,22 @@ class BollDLStrategy(BaseStrategy):
         """
         return "BOLL_DL_strategy"
 
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(self, kl_data: list[KLine], context: Optional[FeatureStore] = None):
         """计算布林带双线策略
 
         Args:
             kl_data: K线数据列表
+            context: 共享的特征缓存，为 None 时自行创建
 
         Returns:
             list: 策略仓位数据列表 [-1, 0, 1]
         """
         loss_data = []
-        close_data = []
-
-        for kl_item in kl_data:
-            close_data.append(kl_item.close)
+        features = FeatureStore.resolve(kl_data, context)
+        close_data = features.frame.close.tolist()
 
-        sma_data = UtilsHelper().sma(close_data, self.day_count)
-        dev_data = UtilsHelper().stddev(close_data, self.day_count)
+        sma_data = features.sma(self.day_count)
+        dev_data = features.stddev(self.day_count)
 
         for dev_item in dev_data:
             loss_data.append(dev_item * self.multi)
@@ -2,8 +2,11 @@
 CCI-MACD策略模块
 """
 
+from typing import Optional
+
 from core.schema.k_line import KLine
 from core.strategy.base_strategy import BaseStrategy
+from core.utils.feature_store import FeatureStore
 from core.utils.utils import UtilsHelper
 
 
@@ -58,26 +61,24 @@ class CCIMacdStrategy(BaseStrategy):
         """
         return "CCI_MACD_strategy"
 
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(self, kl_data: list[KLine], context: Optional[FeatureStore] = None):
         """计算CCI-MACD策略
 
         Args:
             kl_data: K线数据列表
+            context: 共享的特征缓存，为 None 时自行创建
 
         Returns:
             list: 策略仓位数据列表 [-1, 0, 1]
         """
         length = len(kl_data)
-        close_data = []
+        features = FeatureStore.resolve(kl_data, context)
         pos_data = []
         utils = UtilsHelper()
 
-        for kl_item in kl_data:
-            close_data.append(kl_item.close)
-
         # 计算CCI指标
-        cci_1 = utils.cci(kl_data, self.cci_p1)
-        cci_2 = utils.cci(kl_data, self.cci_p2)
+        cci_1 = features.cci(self.cci_p1)
+        cci_2 = features.cci(self.cci_p2)
 
         # 计算TED (CCI1 + CCI2的EMA)
         cci_sum = []
@@ -87,8 +88,8 @@ class CCIMacdStrategy(BaseStrategy):
         ted = utils.ema(cci_sum, self.cci_m)
 
         # 计算MACD
-        ema_short = utils.ema(close_data, self.macd_short)
-        ema_long = utils.ema(close_data, self.macd_long)
+        ema_short = features.ema(self.macd_short)
+        ema_long = features.ema(self.macd_long)
 
         dif = []
         for i in range(length):
@@ -2,8 +2,11 @@
 CCI-WMA策略模块
 """
 
+from typing import Optional
+
 from core.schema.k_line import KLine
 from core.strategy.base_strategy import BaseStrategy
+from core.utils.feature_store import FeatureStore
 from core.utils.utils import UtilsHelper
 
 
@@ -47,30 +50,28 @@ class CCIWmaStrategy(BaseStrategy):
         """
         return "CCI_WMA_strategy"
 
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(self, kl_data: list[KLine], context: Optional[FeatureStore] = None):
         """计算CCI-WMA策略
 
         Args:
             kl_data: K线数据列表
+            context: 共享的特征缓存，为 None 时自行创建
 
         Returns:
             list: 策略仓位数据列表 [-1, 0, 1]
         """
         length = len(kl_data)
-        close_data = []
+        features = FeatureStore.resolve(kl_data, context)
         stop_data = [0, 0]
         pos_data = []
 
-        for kl_item in kl_data:
-            close_data.append(kl_item.close)
-
-        cci_s = UtilsHelper().cci(kl_data, self.cci_s_len)
-        cci_m = UtilsHelper().cci(kl_data, self.cci_m_len)
-        cci_l = UtilsHelper().cci(kl_data, self.cci_l_len)
+        cci_s = features.cci(self.cci_s_len)
+        cci_m = features.cci(self.cci_m_len)
+        cci_l = features.cci(self.cci_l_len)
 
-        ma_s = UtilsHelper().wma(close_data, self.cci_s_len)
-        ma_m = UtilsHelper().wma(close_data, self.cci_m_len)
-        ma_l = UtilsHelper().wma(close_data, self.cci_l_len)
+        ma_s = features.wma(self.cci_s_len)
+        ma_m = features.wma(self.cci_m_len)
+        ma_l = features.wma(self.cci_l_len)
 
         # 计算趋势停损点
         for i in range(2, len(kl_data)):
@@ -2,9 +2,11 @@
 MA均线策略模块
 """
 
+from typing import Optional
+
 from core.schema.k_line import KLine
 from core.strategy.base_strategy import BaseStrategy
-from core.utils.utils import UtilsHelper
+from core.utils.feature_store import FeatureStore
 
 
 class MaBaseStrategy(BaseStrategy):
@@ -35,23 +37,23 @@ class MaBaseStrategy(BaseStrategy):
     def get_key(self):
         return "MA_Base_strategy"
 
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(self, kl_data: list[KLine], context: Optional[FeatureStore] = None):
         """计算MA策略
 
         Args:
             kl_data: K线数据列表
+            context: 共享的特征缓存，为 None 时自行创建
 
         Returns:
             list: 策略仓位数据列表 [-1, 0, 1]
         """
         length = len(kl_data)
-        close_data = []
+        features = FeatureStore.resolve(kl_data, context)
+        close_data = features.frame.close.tolist()
         pos_data = []
-        for kl_item in kl_data:
-            close_data.append(kl_item.close)
 
-        ma_m = UtilsHelper().ema(close_data, self.p2)
-        ma_l = UtilsHelper().ema(close_data, self.p3)
+        ma_m = features.ema(self.p2)
+        ma_l = features.ema(self.p3)
 
         status = 0
         for i in range(length):
@@ -2,10 +2,12 @@
 Volume SuperTrend AI策略模块
 """
 
+from typing import Optional
+
 from core.indicator.volume_supertrend_ai_indicator import VolumeSuperTrendAIIndicator
 from core.schema.k_line import KLine
 from core.strategy.base_strategy import BaseStrategy
-from core.utils.utils import UtilsHelper
+from core.utils.feature_store import FeatureStore
 
 
 class VolumeSuperTrendAIStrategy(BaseStrategy):
@@ -153,11 +155,12 @@ class VolumeSuperTrendAIStrategy(BaseStrategy):
         """
         return "Volume_SuperTrend_AI_strategy"
 
-    def calculate(self, kl_data: list[KLine]):
+    def calculate(self, kl_data: list[KLine], context: Optional[FeatureStore] = None):
         """计算Volume SuperTrend AI策略
 
         Args:
             kl_data (list): K线数据列表
+            context (FeatureStore): 共享的特征缓存，为 None 时自行创建
 
         Returns:
             list: 策略仓位数据列表 [-1, 0, 1]
@@ -171,23 +174,16 @@ class VolumeSuperTrendAIStrategy(BaseStrategy):
             return [0] * length
 
         # 获取指标数据
-        indicator_result = self.indicator.calculate(kl_data)
+        features = FeatureStore.resolve(kl_data, context)
+        indicator_result = self.indicator.calculate(kl_data, context=features)
         indicator_pos_data = indicator_result["posData"]
 
-        # 准备数据
-        closeData = []
-        volumeData = []
-        for klItem in kl_data:
-            closeData.append(klItem.close)
-            volumeData.append(klItem.volume)
-
         # 计算成交量均值用于过滤
-        utils = UtilsHelper()
-        utils.sma(volumeData, 20)
+        features.sma(20, "volume")
 
         # 计算长期趋势用于过滤
         if self.trend_filter:
-            utils.ema(closeData, self.ma_period)
+            features.ema(self.ma_period)
 
         # 生成交易信号
         pos_data = []
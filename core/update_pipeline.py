@@ -0,0 +1,468 @@
+"""
+多股票并发更新流水线
+
+把逐只股票的“拉取 → 计算 → 写库”拆成三个阶段并行执行：
+
+    拉取：线程池并发请求K线和估值，各数据源按令牌桶限流（见 core.utils.rate_limiter）
+    计算：进程池计算策略、指标和评分，纯CPU计算，不访问网络和数据库
+    写库：单个写线程按批写入，数据库连接只在该线程中创建和使用，单只股票的写入
+          在同一事务中完成，多只股票合并提交
+
+同时在途的股票数有上限，拉取快于计算或写库时自动等待，内存占用不随股票总数增长。
+指定任务名时由写线程把每只股票的结果记入任务台账，任务中断后可续跑并查询进度。
+"""
+import functools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Optional
+
+from dateutil.relativedelta import relativedelta
+
+from core.database.db_adapter import DbAdapter
+from core.database.sqlite_writer import get_sqlite_writer
+from core.database.unit_of_work import UnitOfWork
+from core.enum.ticker_k_type import TickerKType
+from core.enum.update_job_status import UpdateJobStatus, UpdateJobTickerStatus
+from core.handler.ticker_indicator_handler import TickerIndicatorHandler
+from core.handler.ticker_score_handler import TickerScoreHandler
+from core.handler.ticker_strategy_handler import TickerStrategyHandler
+from core.handler.ticker_valuation_handler import TickerValuationHandler
+from core.models.ticker import Ticker
+from core.schema.k_line import KLineFrame
+from core.service.ticker_indicator_repository import TickerIndicatorRepository
+from core.service.ticker_score_repository import TickerScoreRepository
+from core.service.ticker_strategy_repository import TickerStrategyRepository
+from core.service.ticker_valuation_repository import TickerValuationRepository
+from core.service.update_job_repository import UpdateJobRepository
+from core.utils.feature_store import FeatureStore
+
+if TYPE_CHECKING:
+    from core.data_source_helper import DataSourceHelper
+
+
+class PipelineConfig:
+    """流水线并发与批量配置"""
+
+    def __init__(
+        self,
+        fetch_workers: int = 8,
+        compute_workers: Optional[int] = None,
+        write_batch: int = 50,
+        max_pending: Optional[int] = None,
+    ):
+        """
+        Args:
+            fetch_workers: 拉取线程数
+            compute_workers: 计算进程数，默认为CPU核数，为0时在本进程的单个线程中计算
+            write_batch: 写线程每批写入的股票数
+            max_pending: 同时在途（已开始拉取、尚未写库）的股票数上限，
+                默认为拉取线程数、计算进程数与写入批量之和的两倍
+        """
+        if compute_workers is None:
+            compute_workers = os.cpu_count() or 1
+        self.fetch_workers = max(fetch_workers, 1)
+        self.compute_workers = max(compute_workers, 0)
+        self.write_batch = max(write_batch, 1)
+        self.max_pending = max_pending or 2 * (
+            self.fetch_workers + self.compute_workers + self.write_batch
+        )
+
+    @classmethod
+    def from_env(cls) -> "PipelineConfig":
+        """
+        按环境变量 UPDATE_FETCH_WORKERS、UPDATE_COMPUTE_WORKERS、UPDATE_WRITE_BATCH、
+        UPDATE_MAX_PENDING 创建，未设置的使用默认值
+        """
+
+        def _int(name: str) -> Optional[int]:
+            value = os.getenv(name)
+            return int(value) if value else None
+
+        kwargs = {
+            "fetch_workers": _int("UPDATE_FETCH_WORKERS"),
+            "compute_workers": _int("UPDATE_COMPUTE_WORKERS"),
+            "write_batch": _int("UPDATE_WRITE_BATCH"),
+            "max_pending": _int("UPDATE_MAX_PENDING"),
+        }
+        return cls(**{k: v for k, v in kwargs.items() if v is not None})
+
+
+def calculate_ticker_data(
+    ticker: Ticker,
+    end_date: str,
+    kl_data: KLineFrame,
+    valuation_data: Optional[dict] = None,
+    indicators: Optional[list] = None,
+    score_rule: Optional[list] = None,
+) -> dict[str, Any]:
+    """
+    计算一只股票的策略、指标和评分，不读写数据库，可在子进程中执行
+
+    Returns:
+        dict: ticker/end_date/strategy/indicator/valuation/score 及特征缓存命中统计，
+            score 按 time_key 升序
+    """
+    features = FeatureStore(kl_data)
+    strategy_data = TickerStrategyHandler().calculate(kl_data, features)
+    indicator_data = TickerIndicatorHandler(end_date, indicators).calculate(
+        kl_data, features
+    )
+    score_data = TickerScoreHandler(score_rule).calculate(
+        ticker, kl_data, strategy_data, indicator_data, valuation_data
+    )
+    score_data.sort(key=lambda x: x.time_key)
+    return {
+        "ticker": ticker,
+        "end_date": end_date,
+        "strategy": strategy_data,
+        "indicator": indicator_data,
+        "valuation": valuation_data,
+        "score": score_data,
+        "hits": features.hits,
+        "misses": features.misses,
+    }
+
+
+def write_ticker_result(uow: UnitOfWork, result: dict[str, Any]) -> None:
+    """
+    写入一只股票的计算结果：全部策略、指标、新计算的估值，以及新K线的评分，
+    与 TickerStrategyHandler 等 update_* 方法写入的数据相同
+
+    Args:
+        uow: 工作单元，调用方负责在 uow.ticker() 范围内调用
+        result: calculate_ticker_data 的返回值
+    """
+    ticker = result["ticker"]
+    end_date = result["end_date"]
+    TickerStrategyRepository(uow).bulk_upsert(
+        ticker.id, TickerKType.DAY.value, end_date, result["strategy"]
+    )
+    TickerIndicatorRepository(uow).bulk_upsert(
+        ticker.id, TickerKType.DAY.value, end_date, result["indicator"]
+    )
+    valuation_repo = TickerValuationRepository(uow)
+    for key, value in (result["valuation"] or {}).items():
+        if value is not None and isinstance(value, dict):
+            valuation_repo.update_item(ticker.id, key, end_date, value)
+    if result["score"]:
+        TickerScoreRepository(uow).append_items(ticker.id, result["score"])
+
+
+class TickerResultWriter:
+    """
+    单线程批量写库
+
+    各仓库共用一个连接，策略和指标每只股票一条 UPSERT 语句；每只股票的写入要么
+    全部成功、要么全部回滚（见 UnitOfWork），每 group_size 只股票提交一次，
+    每批结束时提交剩余部分。启用 SQLite 单写线程时交由写线程执行，见 sqlite_writer。
+    """
+
+    def __init__(
+        self, db_connection: Optional[Any] = None, group_size: Optional[int] = None
+    ):
+        """
+        Args:
+            db_connection: 可选的数据库连接，默认从连接池借出
+            group_size: 每次提交包含的股票数，默认同 UnitOfWork 取环境变量
+                DB_GROUP_COMMIT，为0时每批提交一次
+        """
+        self.db = db_connection
+        self.sqlite_writer = get_sqlite_writer() if db_connection is None else None
+        if self.db is None and self.sqlite_writer is None:
+            self.db = DbAdapter()
+        self.group_size = group_size
+
+    def write(self, results: list[dict[str, Any]]) -> dict[int, str]:
+        """
+        写入一批计算结果
+
+        Returns:
+            dict: 写入失败的股票ID与错误信息，失败股票的写入已回滚
+        """
+        failures = {}
+        if self.sqlite_writer is not None:
+            futures = [
+                (
+                    result["ticker"].id,
+                    self.sqlite_writer.submit(
+                        functools.partial(write_ticker_result, result=result)
+                    ),
+                )
+                for result in results
+            ]
+            for ticker_id, future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    failures[ticker_id] = str(e)
+            return failures
+        with UnitOfWork(self.db, self.group_size) as uow:
+            for result in results:
+                try:
+                    with uow.ticker():
+                        write_ticker_result(uow, result)
+                except Exception as e:
+                    failures[result["ticker"].id] = str(e)
+        return failures
+
+
+class UpdatePipeline:
+    """并发更新多只股票，用法见模块说明"""
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        helper: "DataSourceHelper",
+        config: Optional[PipelineConfig] = None,
+        writer_factory=TickerResultWriter,
+    ):
+        """
+        Args:
+            helper: 提供最后交易日、K线拉取和指标/评分配置的 DataSourceHelper
+            config: 并发配置，默认按环境变量创建
+            writer_factory: 在写线程中创建写入器的函数，写入器需提供 write(results)，
+                返回写入失败的股票ID与错误信息
+        """
+        self.helper = helper
+        self.config = config or PipelineConfig.from_env()
+        self.writer_factory = writer_factory
+
+    def _compute_executor(self) -> Executor:
+        if self.config.compute_workers == 0:
+            return ThreadPoolExecutor(max_workers=1)
+        # spawn 启动的子进程不继承父进程中拉取线程持有的锁
+        return ProcessPoolExecutor(
+            max_workers=self.config.compute_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def run(
+        self,
+        tickers: list[Ticker],
+        days: Optional[int] = 600,
+        end_date: Optional[str] = None,
+        job_name: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """
+        更新一组股票，已有最后交易日评分的股票跳过
+
+        指定 job_name 时在任务台账（update_job/update_job_ticker）中记录每只股票的
+        状态和耗时，同一任务名在同一交易日再次运行时跳过已完成的股票、重试失败的股票。
+
+        Args:
+            tickers: 股票列表
+            days: 拉取的历史天数
+            end_date: 最后交易日，默认由 helper 获取
+            job_name: 任务名，为 None 时不记录台账
+
+        Returns:
+            dict: total/updated/skipped/failed 数量及耗时（秒），记录台账时含 job_key，
+                没有K线数据的股票计入 skipped
+
+        Raises:
+            写线程出错（创建写入器、写入或记录台账失败）时停止提交新股票，
+            在途股票收尾后抛出该异常，任务台账记为失败；记录已有评分的跳过股票
+            失败时直接抛出，任务台账同样记为失败
+        """
+        started = time.monotonic()
+        end_date = end_date or self.helper._get_end_date()
+        start_date = (
+            datetime.strptime(end_date, "%Y-%m-%d") - relativedelta(days=days)
+        ).strftime("%Y-%m-%d")
+        total = len(tickers)
+        stats = {"total": total, "updated": 0, "skipped": 0, "failed": 0}
+
+        # 一次查询得到可跳过的股票，不再逐只查询评分历史
+        scored_ids = TickerScoreRepository().get_ticker_ids_by_time_key(end_date)
+        job, jobs, finished_ids = None, None, set()
+        if job_name is not None:
+            jobs = UpdateJobRepository()
+            job = jobs.start(job_name, end_date, total)
+            finished_ids = jobs.get_finished_ticker_ids(job.id)
+            stats["job_key"] = job.job_key
+        work = []
+        newly_skipped = []
+        for ticker in tickers:
+            if ticker.id in finished_ids:
+                stats["skipped"] += 1
+            elif ticker.id in scored_ids:
+                stats["skipped"] += 1
+                newly_skipped.append(
+                    {"ticker_id": ticker.id, "status": UpdateJobTickerStatus.SKIPPED}
+                )
+            else:
+                work.append(ticker)
+        if jobs is not None:
+            try:
+                jobs.record(job.id, newly_skipped)
+            except Exception:
+                jobs.finish(job.id, UpdateJobStatus.FAILED)
+                raise
+
+        pending = threading.BoundedSemaphore(self.config.max_pending)
+        write_queue: queue.Queue = queue.Queue()
+        writer_errors: list[Exception] = []
+        compute_pool = self._compute_executor()
+
+        stats_keys = {
+            UpdateJobTickerStatus.DONE: "updated",
+            UpdateJobTickerStatus.SKIPPED: "skipped",
+            UpdateJobTickerStatus.FAILED: "failed",
+        }
+
+        def outcome(ticker: Ticker, started_at: datetime, **kwargs) -> dict:
+            return {"ticker": ticker, "started_at": started_at, **kwargs}
+
+        def on_computed(future, ticker: Ticker, started_at: datetime) -> None:
+            try:
+                write_queue.put(outcome(ticker, started_at, result=future.result()))
+            except Exception as e:
+                write_queue.put(outcome(ticker, started_at, error=f"计算数据失败 {e}"))
+
+        def fetch(index: int, ticker: Ticker) -> None:
+            started_at = datetime.now()
+            try:
+                # 相邻股票交替使用数据源，分摊各数据源的请求量
+                kl_data = self.helper._fetch_ticker_kl(
+                    ticker, start_date, end_date, index % 2 + 1
+                )
+                if not kl_data:
+                    write_queue.put(outcome(ticker, started_at))
+                    return
+                valuation_data = TickerValuationHandler(
+                    end_date, self.helper.valuations
+                ).calculate(ticker)
+                future = compute_pool.submit(
+                    calculate_ticker_data,
+                    ticker,
+                    end_date,
+                    kl_data.copy(),
+                    valuation_data,
+                    self.helper.indicators,
+                    self.helper.score_rule,
+                )
+                future.add_done_callback(lambda f: on_computed(f, ticker, started_at))
+            except Exception as e:
+                write_queue.put(outcome(ticker, started_at, error=f"更新数据失败 {e}"))
+
+        def write_batch(writer, ledger, batch: list[dict]) -> None:
+            results = [item["result"] for item in batch if "result" in item]
+            try:
+                failures = writer.write(results) or {}
+            except Exception as e:
+                failures = {item["ticker"].id: str(e) for item in batch}
+            for item in batch:
+                if "result" in item and item["ticker"].id in failures:
+                    item["error"] = f"写入数据失败 {failures[item['ticker'].id]}"
+            entries = []
+            for item in batch:
+                ticker = item["ticker"]
+                finished_at = datetime.now()
+                if "error" in item:
+                    print(f"[{ticker.id}]{ticker.code} {item['error']}")
+                    status = UpdateJobTickerStatus.FAILED
+                elif "result" in item:
+                    status = UpdateJobTickerStatus.DONE
+                else:
+                    print(f"[{ticker.id}]{ticker.code} 无K线数据，跳过")
+                    status = UpdateJobTickerStatus.SKIPPED
+                entries.append(
+                    {
+                        "ticker_id": ticker.id,
+                        "status": status,
+                        "started_at": item["started_at"],
+                        "finished_at": finished_at,
+                        "duration": (finished_at - item["started_at"]).total_seconds(),
+                        "error": item.get("error"),
+                    }
+                )
+            if ledger is not None:
+                ledger.record(job.id, entries)
+            # 台账记录成功后再计数，写线程出错时整批按失败计
+            for item, entry in zip(batch, entries):
+                stats[stats_keys[entry["status"]]] += 1
+                if entry["status"] == UpdateJobTickerStatus.DONE:
+                    result = item["result"]
+                    self.helper.feature_stats["hits"] += result["hits"]
+                    self.helper.feature_stats["misses"] += result["misses"]
+            done = stats["updated"] + stats["skipped"] + stats["failed"]
+            print(f"更新进度 {done}/{total}")
+            for _ in batch:
+                pending.release()
+
+        def write_loop() -> None:
+            batch: list = []
+            stopping = False
+            ledger = None
+            try:
+                # 数据库连接只在写线程中创建和使用
+                writer = self.writer_factory()
+                ledger = UpdateJobRepository() if job is not None else None
+                while not stopping:
+                    batch = [write_queue.get()]
+                    while len(batch) < self.config.write_batch:
+                        try:
+                            batch.append(write_queue.get(timeout=0.5))
+                        except queue.Empty:
+                            break
+                    if batch[-1] is self._STOP:
+                        stopping = True
+                        batch.pop()
+                    if batch:
+                        write_batch(writer, ledger, batch)
+                    batch = []
+            except Exception as e:
+                # 写线程出错后不再写库：本批和之后到达的股票记为失败并归还在途名额，
+                # 主线程停止提交新股票，收尾后抛出该异常
+                print(f"写库线程异常 {e}")
+                writer_errors.append(e)
+                for _ in batch:
+                    stats["failed"] += 1
+                    pending.release()
+                while not stopping:
+                    if write_queue.get() is self._STOP:
+                        stopping = True
+                    else:
+                        stats["failed"] += 1
+                        pending.release()
+            finally:
+                # 台账连接在写线程中关闭，出错时异常连同栈帧交给主线程，不能等垃圾回收
+                if ledger is not None:
+                    ledger.db.close()
+
+        writer_thread = threading.Thread(target=write_loop, daemon=True)
+        writer_thread.start()
+        status = UpdateJobStatus.FAILED
+        try:
+            with ThreadPoolExecutor(max_workers=self.config.fetch_workers) as pool:
+                for index, ticker in enumerate(work):
+                    pending.acquire()
+                    if writer_errors:
+                        pending.release()
+                        break
+                    pool.submit(fetch, index, ticker)
+                # 等待所有在途股票写入完成
+                for _ in range(self.config.max_pending):
+                    pending.acquire()
+            if writer_errors:
+                raise writer_errors[0]
+            status = UpdateJobStatus.COMPLETED
+        finally:
+            compute_pool.shutdown(wait=True)
+            write_queue.put(self._STOP)
+            writer_thread.join()
+            if jobs is not None:
+                jobs.finish(job.id, status)
+
+        stats["elapsed"] = round(time.monotonic() - started, 2)
+        print(
+            f"更新完成 {stats['updated']} 只，跳过 {stats['skipped']} 只，"
+            f"失败 {stats['failed']} 只，耗时 {stats['elapsed']} 秒"
+        )
+        return stats
@@ -0,0 +1,183 @@
+"""
+按行计算的批量内核
+
+输入为 (n_tickers, n_bars) 的二维数组，每行一只股票，沿 axis=1 计算，输出同形状的
+float64 数组。运算顺序与 core.utils.kernels 及 UtilsHelper 的一维实现相同，
+因此每行结果与单独计算逐位一致。递推类计算按时间循环、在股票维度上向量化。
+"""
+import numpy as np
+
+from core.utils import kernels
+from core.utils.kernels import _block_scans, _check_window, window_counts
+
+
+def as_float_matrix(data) -> np.ndarray:
+    """
+    将输入转换为二维连续 float64 数组（已满足条件时不复制）。
+    """
+    x = np.ascontiguousarray(data, dtype=np.float64)
+    if x.ndim != 2:
+        raise ValueError(f"批量计算需要二维数组: {x.shape}")
+    return x
+
+
+def rolling_sum(data, day_count: int) -> np.ndarray:
+    """
+    按行滑动求和。
+    """
+    day_count = _check_window(day_count)
+    x = as_float_matrix(data)
+    rows, length = x.shape
+    result = np.empty((rows, length), dtype=np.float64)
+    warm = min(day_count, length)
+    result[:, :warm] = np.cumsum(x[:, :warm], axis=1)
+    if length > day_count:
+        prefix, suffix = _block_scans(x, day_count, np.add)
+        end = np.arange(day_count, length)
+        start = end - day_count + 1
+        result[:, day_count:] = np.where(
+            start % day_count == 0, prefix[:, end], suffix[:, start] + prefix[:, end]
+        )
+    return result
+
+
+def sma(data, day_count: int) -> np.ndarray:
+    """
+    按行简单移动平均。
+    """
+    x = as_float_matrix(data)
+    mean = rolling_sum(x, day_count) / window_counts(x.shape[1], day_count)
+    return np.clip(mean, lowest(x, day_count), highest(x, day_count))
+
+
+def wma(data, day_count: int) -> np.ndarray:
+    """
+    按行加权移动平均。np.convolve 只支持一维，逐行调用 kernels.wma。
+    """
+    x = as_float_matrix(data)
+    result = np.empty_like(x)
+    for row in range(len(x)):
+        result[row] = kernels.wma(x[row], day_count)
+    return result
+
+
+def avedev(data, day_count: int) -> np.ndarray:
+    """
+    按行平均绝对偏差，首列固定为0。
+    """
+    day_count = _check_window(day_count)
+    x = as_float_matrix(data)
+    rows, length = x.shape
+    result = np.zeros((rows, length), dtype=np.float64)
+    if length == 0:
+        return result
+    mean = sma(x, day_count)
+    warm = min(day_count, length)
+    mask = np.tri(warm, dtype=np.float64)
+    diffs = np.abs(x[:, None, :warm] - mean[:, :warm, None]) * mask
+    result[:, :warm] = diffs.sum(axis=2) / window_counts(warm, day_count)
+    if length > day_count:
+        windows = np.lib.stride_tricks.sliding_window_view(x[:, 1:], day_count, axis=1)
+        result[:, day_count:] = np.abs(windows - mean[:, day_count:, None]).mean(axis=2)
+    result[:, 0] = 0.0
+    return result
+
+
+def _rolling_extreme(x: np.ndarray, day_count: int, ufunc: np.ufunc) -> np.ndarray:
+    """
+    按行的 van Herk/Gil-Werman 滑动极值，见 kernels._rolling_extreme。
+    """
+    rows, length = x.shape
+    result = np.empty((rows, length), dtype=np.float64)
+    warm = min(day_count - 1, length)
+    if warm > 0:
+        result[:, :warm] = ufunc.accumulate(x[:, :warm], axis=1)
+    if length < day_count:
+        return result
+    if day_count == 1:
+        result[:] = x
+        return result
+
+    prefix, suffix = _block_scans(x, day_count, ufunc)
+    end = np.arange(day_count - 1, length)
+    start = end - day_count + 1
+    result[:, day_count - 1 :] = ufunc(suffix[:, start], prefix[:, end])
+    return result
+
+
+def highest(data, day_count: int) -> np.ndarray:
+    """
+    按行滑动最高值。
+    """
+    return _rolling_extreme(as_float_matrix(data), _check_window(day_count), np.maximum)
+
+
+def lowest(data, day_count: int) -> np.ndarray:
+    """
+    按行滑动最低值。
+    """
+    return _rolling_extreme(as_float_matrix(data), _check_window(day_count), np.minimum)
+
+
+def _recursive(data, step) -> np.ndarray:
+    # 转置为 (n_bars, n_tickers)，使每个时间点的一列股票数据连续
+    x = as_float_matrix(data).T
+    result = np.empty_like(x)
+    if len(x) == 0:
+        return result.T
+    result[0] = step(0, x[0], None)
+    for i in range(1, len(x)):
+        result[i] = step(i, x[i], result[i - 1])
+    return np.ascontiguousarray(result.T)
+
+
+def ema(data, day_count: int) -> np.ndarray:
+    """
+    按行指数移动平均，对应 UtilsHelper.ema。
+    """
+
+    def step(i, value, prev):
+        if i == 0:
+            return value
+        calcu_day = day_count if i >= day_count - 1 else i + 1
+        return (2 * value + (calcu_day - 1) * prev) / (calcu_day + 1)
+
+    return _recursive(data, step)
+
+
+def ma(data, day_count: int, weight: float) -> np.ndarray:
+    """
+    按行一般移动平均，对应 UtilsHelper.ma。
+    """
+
+    def step(i, value, prev):
+        if i == 0:
+            return value
+        calcu_day = day_count if i >= day_count - 1 else i + 1
+        return (weight * value + (calcu_day - weight) * prev) / calcu_day
+
+    return _recursive(data, step)
+
+
+def rma(data, day_count: int) -> np.ndarray:
+    """
+    按行 RMA 平滑移动平均，首列固定为0，对应 UtilsHelper.rma。
+    """
+
+    def step(i, value, prev):
+        if i == 0:
+            return np.zeros_like(value)
+        return (value + (day_count - 1) * prev) / day_count
+
+    return _recursive(data, step)
+
+
+def tr(high, low, close) -> np.ndarray:
+    """
+    按行真实波动幅度，对应 UtilsHelper.tr（首列沿用其取值方式，rma 不使用该值）。
+    """
+    high, low, close = (as_float_matrix(x) for x in (high, low, close))
+    last_close = np.roll(close, 1, axis=1)
+    return np.maximum(
+        np.maximum(high - low, np.abs(last_close - high)), np.abs(last_close - low)
+    )
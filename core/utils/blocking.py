@@ -0,0 +1,45 @@
+"""
+在有界线程池中执行阻塞调用
+
+async 接口中仍需调用同步代码（数据源 HTTP 请求、指标计算、同步仓库）时，
+用 run_blocking 交给专用线程池执行，事件循环可以继续处理其他请求。线程数由
+API_BLOCKING_WORKERS 控制（默认8），超出的调用排队等待，不会无限制地创建线程。
+"""
+import asyncio
+import functools
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, TypeVar
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """进程内共用的阻塞调用线程池"""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("API_BLOCKING_WORKERS", "8")),
+                    thread_name_prefix="blocking",
+                )
+    return _executor
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    在线程池中执行 fn(*args, **kwargs) 并等待结果
+
+    Returns:
+        fn 的返回值，fn 抛出的异常原样抛出
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_blocking_executor(), functools.partial(fn, *args, **kwargs)
+    )
@@ -0,0 +1,144 @@
+"""
+历史序列列的紧凑编码
+
+ticker_indicator.history、ticker_strategy.pos_data 等列保存逐K线的序列（如 600 个
+-1/0/1），按 JSON 文本存储时体积大、解析慢。encode_column 把一维数值序列编码为：
+
+    ~<编码名>:<base64(zlib(二进制))>
+
+- i8：取值在 int8 范围内的整数序列（持仓、信号），每个值 1 字节，
+  zlib 压缩连续相同的值
+- f32：浮点序列，按 float32 存储（有精度损失），NaN 原样保留
+
+其他值（字典、嵌套列表、含 None 的序列等）仍按 JSON 存储。编码结果是 ASCII 文本，
+可直接存入 SQLite/MySQL/PostgreSQL 的 TEXT 列；JSON 文本不会以 ~ 开头，
+decode_column 按前缀区分，新旧数据可以混存。
+
+环境变量 COLUMN_CODEC=json 时只写 JSON（读取仍支持两种格式）。
+可用 register_codec 增加编码，编码名写入数据，已写入的编码不能改名。
+"""
+import base64
+import json
+import os
+import zlib
+from typing import Any, Optional
+
+import numpy as np
+
+PREFIX = "~"
+
+
+class ColumnCodec:
+    """一维数值序列编码基类"""
+
+    name = ""
+
+    def encode(self, array: np.ndarray) -> Optional[bytes]:
+        """
+        编码序列
+
+        Args:
+            array: np.asarray 转换后的一维数组
+
+        Returns:
+            bytes: 编码结果，不适用于该序列时返回 None
+        """
+        raise NotImplementedError
+
+    def decode(self, payload: bytes) -> list:
+        """解码为 Python 列表"""
+        raise NotImplementedError
+
+
+class Int8Codec(ColumnCodec):
+    """int8 范围内的整数序列"""
+
+    name = "i8"
+
+    def encode(self, array: np.ndarray) -> Optional[bytes]:
+        if array.dtype.kind not in "iu":
+            return None
+        if array.min() < -128 or array.max() > 127:
+            return None
+        return zlib.compress(array.astype(np.int8).tobytes())
+
+    def decode(self, payload: bytes) -> list:
+        return np.frombuffer(zlib.decompress(payload), dtype=np.int8).tolist()
+
+
+class Float32Codec(ColumnCodec):
+    """浮点序列，按 float32 存储"""
+
+    name = "f32"
+
+    def encode(self, array: np.ndarray) -> Optional[bytes]:
+        if array.dtype.kind != "f":
+            return None
+        return zlib.compress(array.astype("<f4").tobytes())
+
+    def decode(self, payload: bytes) -> list:
+        array = np.frombuffer(zlib.decompress(payload), dtype="<f4")
+        return array.astype(np.float64).tolist()
+
+
+_codecs: dict[str, ColumnCodec] = {}
+
+
+def register_codec(codec: ColumnCodec) -> None:
+    """注册编码，编码时按注册顺序选用第一个适用的编码"""
+    if not codec.name or ":" in codec.name:
+        raise ValueError(f"无效的编码名: {codec.name!r}")
+    _codecs[codec.name] = codec
+
+
+register_codec(Int8Codec())
+register_codec(Float32Codec())
+
+
+def compact_enabled() -> bool:
+    return os.getenv("COLUMN_CODEC", "compact").lower() != "json"
+
+
+def encode_column(value: Any, compact: Optional[bool] = None) -> Optional[str]:
+    """
+    编码列值，一维数值序列使用紧凑编码，其余使用 JSON
+
+    Args:
+        value: 列值
+        compact: 是否使用紧凑编码，默认取环境变量 COLUMN_CODEC
+
+    Returns:
+        str: 编码后的文本，value 为 None 时返回 None
+    """
+    if value is None:
+        return None
+    if compact is None:
+        compact = compact_enabled()
+    if compact and isinstance(value, list) and value:
+        array = np.asarray(value)
+        if array.ndim == 1:
+            for codec in _codecs.values():
+                payload = codec.encode(array)
+                if payload is not None:
+                    encoded = base64.b64encode(payload).decode("ascii")
+                    return f"{PREFIX}{codec.name}:{encoded}"
+    return json.dumps(value)
+
+
+def decode_column(text: str) -> Any:
+    """
+    解码 encode_column 的结果，兼容 JSON 文本
+
+    Raises:
+        ValueError: 无法解码
+    """
+    if not text.startswith(PREFIX):
+        return json.loads(text)
+    name, _, encoded = text[len(PREFIX) :].partition(":")
+    codec = _codecs.get(name)
+    if codec is None:
+        raise ValueError(f"未知的列编码: {name}")
+    try:
+        return codec.decode(base64.b64decode(encoded, validate=True))
+    except (zlib.error, ValueError) as e:
+        raise ValueError(f"列编码 {name} 解码失败: {e}") from e
@@ -10,83 +10,30 @@ import akshare as ak
 from core.schema.k_line import KLine
 
 from .base_source import BaseSource
+from .spot_snapshot import SpotSnapshot, spot_snapshot
 
 
 class DongcaiKLineSource(BaseSource):
     """东方财富数据源K线数据处理类"""
 
-    def _get_zh_data_on_time(self, code: str) -> Optional[KLine]:
-        """获取中国A股实时数据"""
-        tickers = ak.stock_zh_a_spot_em()
-        for i in range(len(tickers)):
-            ticker_code: str = tickers["代码"][i]
-            if ticker_code.startswith("0") or ticker_code.startswith("3"):
-                ticker_code = f"SZ.{str(ticker_code)}"
-            elif (
-                ticker_code.startswith("6")
-                or ticker_code.startswith("7")
-                or ticker_code.startswith("9")
-            ):
-                ticker_code = f"SH.{str(ticker_code)}"
-            if ticker_code == code:
-                return KLine(
-                    time_key=datetime.date.today().strftime("%Y-%m-%d"),
-                    high=tickers["最高"][i],
-                    low=tickers["最低"][i],
-                    open=tickers["今开"][i],
-                    close=tickers["最新价"][i],
-                    volume=tickers["成交量"][i],
-                    turnover=tickers["成交额"][i],
-                    turnover_rate=tickers["换手率"][i],
-                )
-        return None
+    def __init__(self, snapshot: Optional[SpotSnapshot] = None):
+        """
+        Args:
+            snapshot: 实时行情快照，默认使用进程内共享的 spot_snapshot
+        """
+        self.snapshot = snapshot if snapshot is not None else spot_snapshot
 
-    def _get_hk_data_on_time(self, code: str) -> Optional[KLine]:
-        """获取港股实时数据"""
-        tickers = ak.stock_hk_spot_em()
-        for i in range(len(tickers)):
-            ticker_code = f"HK.{tickers['代码'][i]}"
-            if ticker_code == code:
-                return KLine(
-                    time_key=datetime.date.today().strftime("%Y-%m-%d"),
-                    high=tickers["最高"][i],
-                    low=tickers["最低"][i],
-                    open=tickers["今开"][i],
-                    close=tickers["最新价"][i],
-                    volume=tickers["成交量"][i],
-                    turnover=tickers["成交额"][i],
-                    turnover_rate=0,
-                )
-        return None
+    def get_kl_on_time(self, code: str) -> Optional[KLine]:
+        """获取实时K线数据，从按市场缓存的行情快照中按代码查找"""
+        return self.snapshot.get(code)
 
-    def _get_us_data_on_time(self, code: str) -> Optional[KLine]:
-        """获取美股实时数据"""
-        tickers = ak.stock_us_spot_em()
-        for i in range(len(tickers)):
-            ticker_code = f"US.{tickers['代码'][i][4:]}"
-            if ticker_code == code:
-                return KLine(
-                    time_key=datetime.date.today().strftime("%Y-%m-%d"),
-                    high=tickers["最高价"][i],
-                    low=tickers["最低价"][i],
-                    open=tickers["开盘价"][i],
-                    close=tickers["最新价"][i],
-                    volume=tickers["成交量"][i],
-                    turnover=tickers["成交额"][i],
-                    turnover_rate=tickers["换手率"][i],
-                )
-        return None
+    def get_kl_on_time_many(self, codes: list[str]) -> dict[str, KLine]:
+        """批量获取实时K线，每个市场的行情表最多下载一次
 
-    def get_kl_on_time(self, code: str) -> Optional[KLine]:
-        """获取实时K线数据"""
-        data = None
-        if code.startswith("US"):
-            data = self._get_us_data_on_time()
-        elif code.startswith("HK"):
-            data = self._get_hk_data_on_time()
-        elif code.startswith("SZ") or code.startswith("SH"):
-            data = self._get_zh_data_on_time()
-        return data
+        Returns:
+            dict: {代码: KLine}，只包含找到的代码
+        """
+        return self.snapshot.get_many(codes)
 
     def get_kl(
         self, code: str, start_date: str, end_date: Optional[str] = None
@@ -0,0 +1,174 @@
+"""
+东方财富全市场实时行情快照
+
+stock_zh_a_spot_em 等接口每次都会下载整个市场的行情表。SpotSnapshot 按市场缓存
+这张表，在 interval 秒内只下载一次，并按统一格式的代码（SZ.000001、HK.00700、
+US.AAPL）建立字典索引，供所有实时K线查询共享。
+"""
+import datetime
+import os
+import time
+from collections.abc import Callable
+from threading import Lock
+from typing import Optional
+
+import akshare as ak
+
+from core.schema.k_line import KLine
+
+# 各市场行情表的列名：(代码, 最高, 最低, 开盘, 最新价, 成交量, 成交额, 换手率)
+_COLUMNS = {
+    "ZH": ("代码", "最高", "最低", "今开", "最新价", "成交量", "成交额", "换手率"),
+    "HK": ("代码", "最高", "最低", "今开", "最新价", "成交量", "成交额", None),
+    "US": ("代码", "最高价", "最低价", "开盘价", "最新价", "成交量", "成交额", "换手率"),
+}
+
+
+def market_of(code: str) -> Optional[str]:
+    """由带市场前缀的代码得到行情表所属市场"""
+    if code.startswith("SZ") or code.startswith("SH"):
+        return "ZH"
+    if code.startswith("HK"):
+        return "HK"
+    if code.startswith("US"):
+        return "US"
+    return None
+
+
+def normalize_code(market: str, raw_code: str) -> Optional[str]:
+    """
+    将行情表中的代码转换为带市场前缀的格式，无法识别时返回 None
+
+    A股按首位区分深市（0/3）和沪市（6/7/9），美股代码形如 105.AAPL
+    """
+    raw_code = str(raw_code)
+    if market == "ZH":
+        if raw_code.startswith(("0", "3")):
+            return f"SZ.{raw_code}"
+        if raw_code.startswith(("6", "7", "9")):
+            return f"SH.{raw_code}"
+        return None
+    if market == "HK":
+        return f"HK.{raw_code}"
+    if market == "US":
+        return f"US.{raw_code.split('.', 1)[-1]}"
+    return None
+
+
+def index_spot_table(market: str, table, time_key: str) -> dict[str, KLine]:
+    """
+    将行情表按列一次性转换为 {代码: KLine}
+
+    Args:
+        market: ZH/HK/US
+        table: akshare 返回的 DataFrame
+        time_key: 实时K线的日期
+    """
+    code, high, low, open_, close, volume, turnover, turnover_rate = _COLUMNS[market]
+    rate_column = table[turnover_rate] if turnover_rate else [0] * len(table)
+    result = {}
+    for row in zip(
+        table[code],
+        table[high],
+        table[low],
+        table[open_],
+        table[close],
+        table[volume],
+        table[turnover],
+        rate_column,
+    ):
+        normalized = normalize_code(market, row[0])
+        if normalized is None:
+            continue
+        result[normalized] = KLine(
+            time_key=time_key,
+            high=row[1],
+            low=row[2],
+            open=row[3],
+            close=row[4],
+            volume=row[5],
+            turnover=row[6],
+            turnover_rate=row[7],
+        )
+    return result
+
+
+class SpotSnapshot:
+    """按市场缓存的实时行情快照，线程安全，同一市场并发请求只下载一次"""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        fetchers: Optional[dict[str, Callable]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            interval: 快照有效期（秒），默认取环境变量 SPOT_SNAPSHOT_INTERVAL，未设置为60
+            fetchers: 市场到行情表下载函数的映射，默认使用 akshare 东方财富接口
+            clock: 计时函数，测试时可替换
+        """
+        if interval is None:
+            interval = float(os.getenv("SPOT_SNAPSHOT_INTERVAL", "60"))
+        self.interval = interval
+        self.fetchers = fetchers or {
+            "ZH": ak.stock_zh_a_spot_em,
+            "HK": ak.stock_hk_spot_em,
+            "US": ak.stock_us_spot_em,
+        }
+        self._clock = clock
+        self._locks = {market: Lock() for market in self.fetchers}
+        # market -> (下载时间, {代码: KLine})
+        self._tables: dict[str, tuple[float, dict[str, KLine]]] = {}
+        self.downloads = 0
+
+    def table(self, market: str) -> dict[str, KLine]:
+        """
+        取某个市场的行情索引，过期时重新下载
+        """
+        with self._locks[market]:
+            cached = self._tables.get(market)
+            now = self._clock()
+            if cached is not None and now - cached[0] < self.interval:
+                return cached[1]
+            table = self.fetchers[market]()
+            self.downloads += 1
+            index = index_spot_table(
+                market, table, datetime.date.today().strftime("%Y-%m-%d")
+            )
+            self._tables[market] = (now, index)
+            return index
+
+    def get(self, code: str) -> Optional[KLine]:
+        """获取一只股票的实时K线，不在行情表中时返回 None"""
+        market = market_of(code)
+        if market is None:
+            return None
+        return self.table(market).get(code)
+
+    def get_many(self, codes: list[str]) -> dict[str, KLine]:
+        """
+        批量获取实时K线，每个市场最多下载一次
+
+        Returns:
+            dict: {代码: KLine}，只包含找到的代码
+        """
+        result = {}
+        for code in codes:
+            market = market_of(code)
+            if market is None:
+                continue
+            bar = self.table(market).get(code)
+            if bar is not None:
+                result[code] = bar
+        return result
+
+    def invalidate(self, market: Optional[str] = None) -> None:
+        """使快照失效，market 为 None 时清空所有市场"""
+        if market is None:
+            self._tables.clear()
+        else:
+            self._tables.pop(market, None)
+
+
+spot_snapshot = SpotSnapshot()
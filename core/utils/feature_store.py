@@ -0,0 +1,150 @@
+"""
+单只股票的特征缓存
+
+同一批K线上，指标、策略与评分会反复计算相同的基础序列（如 EMA(close, 13)、
+SMA(close, 20)、RMA(TR)、典型价格）。FeatureStore 按 (primitive, source, params)
+缓存这些序列，在一次股票更新中由 Indicator、StrategyCalculator 等共享。
+
+缓存结果以 tuple 返回，调用方只读使用；需要修改时请先复制为 list。
+"""
+from collections.abc import Callable
+from typing import Optional
+
+from core.schema.k_line import KLINE_COLUMNS, KLineFrame, as_kline_frame
+from core.utils.utils import UtilsHelper
+
+# 可作为 source 的派生序列，按 UtilsHelper 中同名方法计算
+DERIVED_SOURCES = ("typ", "tr")
+
+# 以单个序列为输入、返回等长序列的 UtilsHelper 方法
+SERIES_PRIMITIVES = (
+    "sum_list",
+    "sma",
+    "ema",
+    "wma",
+    "rma",
+    "ma",
+    "hma",
+    "stddev",
+    "avedev",
+    "highest",
+    "lowest",
+)
+
+
+class FeatureStore:
+    """
+    按 (primitive, source, params) 记忆化的特征缓存，生命周期为一次股票更新
+    """
+
+    def __init__(self, kl_data):
+        self.frame: KLineFrame = as_kline_frame(kl_data)
+        self.hits = 0
+        self.misses = 0
+        self._cache: dict[tuple, tuple] = {}
+        self._utils = UtilsHelper()
+
+    @classmethod
+    def resolve(cls, kl_data, context: Optional["FeatureStore"] = None):
+        """
+        返回可用的特征缓存：传入了 context 则直接使用，否则为 kl_data 新建一个
+
+        Args:
+            kl_data: K线数据
+            context: 调用方共享的特征缓存，须基于同一份K线数据创建
+        """
+        if context is not None:
+            return context
+        return cls(kl_data)
+
+    def memo(self, key: tuple, compute: Callable[[], object]):
+        """
+        通用记忆化入口，供指标缓存 SuperTrend 等复合结果
+
+        Args:
+            key: 缓存键，约定首元素为特征名
+            compute: 未命中时调用的计算函数
+        """
+        if key in self._cache:
+            self.hits += 1
+            return self._cache[key]
+        self.misses += 1
+        value = compute()
+        if isinstance(value, list):
+            value = tuple(value)
+        self._cache[key] = value
+        return value
+
+    def source(self, name: str):
+        """
+        取原始列（close/high/...，零拷贝视图）或派生序列（typ/tr）
+        """
+        if name in KLINE_COLUMNS:
+            return self.frame.column(name)
+        if name in DERIVED_SOURCES:
+            return self.memo(
+                ("source", name), lambda: getattr(self._utils, name)(self.frame)
+            )
+        raise ValueError(f"未知的特征数据源: {name}")
+
+    def get(self, primitive: str, source: str = "close", *params):
+        """
+        计算并缓存 primitive(source, *params)
+
+        Args:
+            primitive: UtilsHelper 中的序列方法名，如 ema/sma/wma/rma/highest
+            source: 数据源列名或派生序列名
+            params: 方法的其余参数，如周期
+        """
+        if primitive not in SERIES_PRIMITIVES:
+            raise ValueError(f"不支持的特征计算: {primitive}")
+        return self.memo(
+            (primitive, source, *params),
+            lambda: getattr(self._utils, primitive)(self.source(source), *params),
+        )
+
+    def sma(self, day_count: int, source: str = "close"):
+        return self.get("sma", source, day_count)
+
+    def ema(self, day_count: int, source: str = "close"):
+        return self.get("ema", source, day_count)
+
+    def wma(self, day_count: int, source: str = "close"):
+        return self.get("wma", source, day_count)
+
+    def stddev(self, day_count: int, source: str = "close"):
+        return self.get("stddev", source, day_count)
+
+    def highest(self, day_count: int, source: str = "high"):
+        return self.get("highest", source, day_count)
+
+    def lowest(self, day_count: int, source: str = "low"):
+        return self.get("lowest", source, day_count)
+
+    def typ(self):
+        return self.source("typ")
+
+    def ratr(self, day_count: int):
+        """真实波动幅度均值，即 RMA(TR)"""
+        return self.get("rma", "tr", day_count)
+
+    def cci(self, day_count: int):
+        return self.memo(
+            ("cci", "typ", day_count),
+            lambda: self._utils.cci(self.frame, day_count),
+        )
+
+    def stats(self) -> dict:
+        """
+        命中统计
+
+        Returns:
+            dict: hits/misses/size/hit_rate
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._cache),
+            "hit_rate": round(self.hits / total, 4) if total > 0 else 0,
+        }
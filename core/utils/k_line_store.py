@@ -0,0 +1,141 @@
+"""
+本地K线存储
+
+每只股票一个列式文件，按市场分区（代码前缀 SH/SZ/HK/US）分目录保存：
+
+    <root>/<market>/<code>.npy   (7, n) float64，行顺序同 KLINE_COLUMNS，读取时内存映射
+    <root>/<market>/<code>.json  time_key 列表、已覆盖的起始日期和数据源
+
+写入时先落临时文件再 os.replace；读取时校验两个文件的长度一致，不一致按无数据处理，
+由调用方重新拉取。
+"""
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+import numpy as np
+
+from core.schema.k_line import KLINE_COLUMNS, KLineFrame
+
+DEFAULT_ROOT = "data/kline"
+
+
+class KLineStore:
+    """按股票保存K线的本地列式存储"""
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = Path(root)
+        self._lock = Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["KLineStore"]:
+        """
+        按环境变量 KLINE_STORE_PATH 创建，未设置时使用 data/kline，设为空字符串时不启用
+        """
+        root = os.getenv("KLINE_STORE_PATH", DEFAULT_ROOT)
+        return cls(root) if root else None
+
+    def _paths(self, code: str) -> tuple[Path, Path]:
+        market = code.split(".", 1)[0] if "." in code else "OTHER"
+        directory = self.root / market
+        return directory / f"{code}.npy", directory / f"{code}.json"
+
+    def load(self, code: str) -> tuple[Optional[KLineFrame], dict]:
+        """
+        读取一只股票的全部K线
+
+        Returns:
+            tuple: (内存映射的只读 KLineFrame, 元数据)，无数据时为 (None, {})
+        """
+        values_path, meta_path = self._paths(code)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            values = np.load(values_path, mmap_mode="r")
+            return KLineFrame.from_values(values, meta["time_key"]), meta
+        except (OSError, ValueError, KeyError):
+            return None, {}
+
+    def read(
+        self,
+        code: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Optional[KLineFrame]:
+        """
+        读取 [start_date, end_date] 区间的K线，返回只读视图
+        """
+        frame, _ = self.load(code)
+        if frame is None:
+            return None
+        return slice_by_date(frame, start_date, end_date)
+
+    def save(self, code: str, frame: KLineFrame, start_date: str, source: int) -> None:
+        """
+        覆盖保存一只股票的K线
+
+        Args:
+            code: 股票代码
+            frame: 按 time_key 升序的K线
+            start_date: 本地数据已覆盖的起始日期，早于该日期的请求需要重新拉取
+            source: 数据源
+        """
+        if len(frame) == 0:
+            return
+        values_path, meta_path = self._paths(code)
+        values = np.stack([frame.column(name) for name in KLINE_COLUMNS])
+        meta = {
+            "start": start_date,
+            "source": source,
+            "time_key": [str(key) for key in frame.time_key],
+        }
+        with self._lock:
+            values_path.parent.mkdir(parents=True, exist_ok=True)
+            values_tmp = values_path.with_name(values_path.name + ".tmp")
+            meta_tmp = meta_path.with_name(meta_path.name + ".tmp")
+            with open(values_tmp, "wb") as f:
+                np.save(f, values)
+            meta_tmp.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(values_tmp, values_path)
+            os.replace(meta_tmp, meta_path)
+
+    def merge(
+        self, code: str, delta: KLineFrame, start_date: str, source: int
+    ) -> KLineFrame:
+        """
+        将增量K线合并到本地数据：与增量重叠的日期以增量为准
+
+        Returns:
+            KLineFrame: 合并后的全部K线
+        """
+        stored, meta = self.load(code)
+        if stored is not None and len(delta) > 0:
+            keys = stored.time_key
+            head = stored[: int(np.searchsorted(keys, delta.time_key[0], "left"))]
+            tail = stored[int(np.searchsorted(keys, delta.time_key[-1], "right")) :]
+            delta = concat_frames([head, delta, tail])
+            start_date = min(start_date, meta.get("start", start_date))
+        self.save(code, delta, start_date, source)
+        return delta
+
+
+def slice_by_date(
+    frame: KLineFrame, start_date: Optional[str] = None, end_date: Optional[str] = None
+) -> KLineFrame:
+    """按 time_key 升序二分截取 [start_date, end_date]，返回视图"""
+    keys = frame.time_key
+    start = int(np.searchsorted(keys, start_date, "left")) if start_date else 0
+    end = int(np.searchsorted(keys, end_date, "right")) if end_date else len(frame)
+    return frame[start:end]
+
+
+def concat_frames(frames: list[KLineFrame]) -> KLineFrame:
+    """按顺序拼接多个 KLineFrame"""
+    return KLineFrame.from_columns(
+        np.concatenate([frame.time_key for frame in frames]),
+        **{
+            name: np.concatenate([frame.column(name) for frame in frames])
+            for name in KLINE_COLUMNS
+        },
+    )
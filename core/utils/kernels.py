@@ -0,0 +1,234 @@
+"""
+滑动窗口计算内核
+
+基于 NumPy 的向量化实现，输入为一维 float64 连续数组，输出为等长的 float64 数组。
+所有函数保持与 UtilsHelper 原有实现一致的预热语义：当 i < day_count - 1 时，
+窗口收缩为 i + 1 个数据点。
+"""
+from collections.abc import Sequence
+from typing import Union
+
+import numpy as np
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+def as_float_array(data: ArrayLike) -> np.ndarray:
+    """
+    将输入转换为一维连续 float64 数组（已满足条件时不复制）。
+    """
+    return np.ascontiguousarray(data, dtype=np.float64).reshape(-1)
+
+
+def _check_window(day_count: int) -> int:
+    day_count = int(day_count)
+    if day_count < 1:
+        raise ValueError(f"窗口长度必须大于0: {day_count}")
+    return day_count
+
+
+def window_counts(length: int, day_count: int) -> np.ndarray:
+    """
+    每个位置实际使用的窗口长度：min(i + 1, day_count)。
+    """
+    return np.minimum(np.arange(1, length + 1, dtype=np.float64), day_count)
+
+
+def _block_scans(
+    x: np.ndarray, day_count: int, ufunc: np.ufunc
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    沿最后一维按窗口长度分块，返回每个位置的块内前缀累积与后缀累积（形状与 x 相同）。
+
+    完整窗口 [start, end] 不与块对齐时跨越相邻两块，其累积为 suffix[start] 与
+    prefix[end] 的合并；两者都只包含窗口内的元素。
+    """
+    *lead, length = x.shape
+    blocks = -(-length // day_count)
+    padded = np.zeros((*lead, blocks * day_count), dtype=np.float64)
+    padded[..., :length] = x
+    grid = padded.reshape(*lead, blocks, day_count)
+    prefix = ufunc.accumulate(grid, axis=-1).reshape(*lead, -1)[..., :length]
+    suffix = ufunc.accumulate(grid[..., ::-1], axis=-1)[..., ::-1]
+    return prefix, suffix.reshape(*lead, -1)[..., :length]
+
+
+def rolling_sum(data: ArrayLike, day_count: int) -> np.ndarray:
+    """
+    滑动求和。
+
+    按块内前缀和与后缀和合并，每个窗口只累加窗口内的元素：舍入误差不随序列长度
+    累积，NaN 也只影响包含它的窗口（累加和差分做不到这两点）。
+    """
+    day_count = _check_window(day_count)
+    x = as_float_array(data)
+    length = len(x)
+    if length == 0:
+        return x.copy()
+    result = np.empty(length, dtype=np.float64)
+    warm = min(day_count, length)
+    result[:warm] = np.cumsum(x[:warm])
+    if length > day_count:
+        prefix, suffix = _block_scans(x, day_count, np.add)
+        end = np.arange(day_count, length)
+        start = end - day_count + 1
+        result[day_count:] = np.where(
+            start % day_count == 0, prefix[end], suffix[start] + prefix[end]
+        )
+    return result
+
+
+def sma(data: ArrayLike, day_count: int) -> np.ndarray:
+    """
+    简单移动平均。
+
+    结果限定在窗口最低值与最高值之间：价格不变的窗口均值恰好等于该价格，
+    与价格比较时不会因舍入翻转方向。
+    """
+    x = as_float_array(data)
+    if len(x) == 0:
+        return x.copy()
+    mean = rolling_sum(x, day_count) / window_counts(len(x), day_count)
+    return np.clip(mean, lowest(x, day_count), highest(x, day_count))
+
+
+def wma(data: ArrayLike, day_count: int) -> np.ndarray:
+    """
+    加权移动平均，权重为 calcu_day, calcu_day - 1, ..., 1。
+
+    完整窗口使用卷积计算；预热区间的窗口恰好从序列起点开始，
+    等价于以 1..i+1 为权重的前缀加权和。
+    """
+    day_count = _check_window(day_count)
+    x = as_float_array(data)
+    length = len(x)
+    if length == 0:
+        return x.copy()
+
+    # 首个完整窗口（i = day_count - 1）同样走前缀公式，保证与更长周期预热值逐位相同，
+    # 避免均线交叉判断在相等处因舍入而翻转
+    result = np.empty(length, dtype=np.float64)
+    warm = min(day_count, length)
+    idx = np.arange(1, warm + 1, dtype=np.float64)
+    result[:warm] = np.cumsum(idx * x[:warm]) / (idx * (idx + 1) / 2)
+    if length > day_count:
+        # np.convolve 会翻转卷积核，降序权重使 x[i] 对应最大权重 day_count
+        weights = np.arange(day_count, 0, -1, dtype=np.float64)
+        full = np.convolve(x, weights, mode="valid")
+        result[day_count:] = full[1:] / (day_count * (day_count + 1) / 2)
+    return result
+
+
+def rolling_var(data: ArrayLike, day_count: int) -> np.ndarray:
+    """
+    滑动总体方差（除以实际窗口长度）。
+
+    先以全序列均值中心化，再用平方累加和计算，降低大数相减带来的精度损失。
+    低于累加舍入误差上界的结果（如停牌期间价格不变的窗口）视为0。
+    NaN 只影响包含它的窗口。
+    """
+    day_count = _check_window(day_count)
+    x = as_float_array(data)
+    length = len(x)
+    if length == 0:
+        return x.copy()
+    finite = x[np.isfinite(x)]
+    centered = x - (finite.mean() if len(finite) else 0.0)
+    squares = centered * centered
+    counts = window_counts(length, day_count)
+    mean = rolling_sum(centered, day_count) / counts
+    mean_sq = rolling_sum(squares, day_count) / counts
+    var = mean_sq - mean * mean
+    bound = np.cumsum(np.nan_to_num(squares, nan=0.0, posinf=0.0))
+    tolerance = 8 * np.finfo(np.float64).eps * bound / counts
+    var[var <= tolerance] = 0.0
+    return var
+
+
+def stddev(data: ArrayLike, day_count: int) -> np.ndarray:
+    """
+    滑动标准差，首个元素固定为0。
+    """
+    result = np.sqrt(rolling_var(data, day_count))
+    if len(result) > 0:
+        result[0] = 0.0
+    return result
+
+
+def avedev(data: ArrayLike, day_count: int) -> np.ndarray:
+    """
+    平均绝对偏差，首个元素固定为0。
+
+    绝对值无法用累加和差分，完整窗口通过滑动视图一次性向量化计算。
+    """
+    day_count = _check_window(day_count)
+    x = as_float_array(data)
+    length = len(x)
+    if length == 0:
+        return x.copy()
+    mean = sma(x, day_count)
+    result = np.empty(length, dtype=np.float64)
+    warm = min(day_count, length)
+    # 预热区间（含首个完整窗口）的窗口都是序列前缀，用下三角掩码一次算完
+    mask = np.tri(warm, dtype=np.float64)
+    diffs = np.abs(x[None, :warm] - mean[:warm, None]) * mask
+    result[:warm] = diffs.sum(axis=1) / window_counts(warm, day_count)
+    if length > day_count:
+        windows = np.lib.stride_tricks.sliding_window_view(x[1:], day_count)
+        result[day_count:] = np.abs(windows - mean[day_count:, None]).mean(axis=1)
+    result[0] = 0.0
+    return result
+
+
+def _rolling_extreme(x: np.ndarray, day_count: int, ufunc: np.ufunc) -> np.ndarray:
+    """
+    van Herk/Gil-Werman 算法：按窗口长度分块，块内前缀与后缀极值合并，
+    每个元素只做常数次比较，整体 O(n)。
+    """
+    length = len(x)
+    result = np.empty(length, dtype=np.float64)
+    warm = min(day_count - 1, length)
+    if warm > 0:
+        result[:warm] = ufunc.accumulate(x[:warm])
+    if length < day_count:
+        return result
+    if day_count == 1:
+        result[:] = x
+        return result
+
+    prefix, suffix = _block_scans(x, day_count, ufunc)
+    end = np.arange(day_count - 1, length)
+    start = end - day_count + 1
+    result[day_count - 1 :] = ufunc(suffix[start], prefix[end])
+    return result
+
+
+def highest(data: ArrayLike, day_count: int) -> np.ndarray:
+    """
+    滑动最高值。
+    """
+    day_count = _check_window(day_count)
+    x = as_float_array(data)
+    if len(x) == 0:
+        return x.copy()
+    return _rolling_extreme(x, day_count, np.maximum)
+
+
+def lowest(data: ArrayLike, day_count: int) -> np.ndarray:
+    """
+    滑动最低值。
+    """
+    day_count = _check_window(day_count)
+    x = as_float_array(data)
+    if len(x) == 0:
+        return x.copy()
+    return _rolling_extreme(x, day_count, np.minimum)
+
+
+def compare_sign(value: ArrayLike, base: ArrayLike) -> np.ndarray:
+    """
+    逐元素比较：value > base 为1，value < base 为-1，相等或含 NaN 为0（int 数组）。
+    """
+    value = np.asarray(value, dtype=np.float64)
+    base = np.asarray(base, dtype=np.float64)
+    return (value > base).astype(np.int64) - (value < base).astype(np.int64)
@@ -0,0 +1,165 @@
+"""
+有界 LRU 缓存
+
+按条数和估算字节数限制容量，条目写入后超过 ttl 秒即失效，并统计命中、未命中、
+淘汰和过期次数供监控使用。线程安全，可在 uvicorn 工作进程和并发更新任务中共享。
+"""
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from threading import RLock
+from typing import Any, Optional
+
+
+class LRUCache:
+    """按条数/字节数限制的线程安全 LRU 缓存，支持 TTL"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            max_entries: 最大条数
+            max_bytes: 最大估算字节数，为 None 时不限制
+            ttl: 条目有效期（秒），为 None 时不过期
+            sizeof: 估算单个值占用字节数的函数
+            clock: 计时函数，测试时可替换
+        """
+        if max_entries < 1:
+            raise ValueError(f"缓存条数上限必须大于0: {max_entries}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self._lock = RLock()
+        # key -> (value, size, expire_at)
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(
+        self,
+        key,
+        default=None,
+        accept: Optional[Callable[[Any], bool]] = None,
+    ):
+        """
+        读取缓存，命中时将条目移到最近使用的位置
+
+        Args:
+            key: 缓存键
+            default: 未命中时的返回值
+            accept: 可选的校验函数，返回 False 时按未命中处理（条目保留），
+                用于区间包含等需要比较值内容的查找
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None or (accept is not None and not accept(entry[0])):
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value) -> bool:
+        """
+        写入缓存，超出容量时依次淘汰最久未使用的条目
+
+        Returns:
+            bool: 是否写入（单个值超过字节上限时不缓存）
+        """
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return False
+            expire_at = self._clock() + self.ttl if self.ttl is not None else None
+            self._entries[key] = (value, size, expire_at)
+            self._bytes += size
+            self.purge_expired()
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            return True
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            return self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """
+        清除全部过期条目
+
+        Returns:
+            int: 清除的条数
+        """
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            expired = [key for key, e in self._entries.items() if self._expired(e)]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry)
+
+    def stats(self) -> dict:
+        """
+        缓存统计
+
+        Returns:
+            dict: entries/bytes/hits/misses/evictions/expirations/hit_rate 及容量上限
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / total, 4) if total > 0 else 0,
+            }
+
+    def _expired(self, entry) -> bool:
+        return entry[2] is not None and self._clock() >= entry[2]
+
+    def _remove(self, key):
+        value, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        return value
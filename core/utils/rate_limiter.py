@@ -0,0 +1,88 @@
+"""
+令牌桶限流
+
+每个数据源一个令牌桶，按 rate（次/秒）补充令牌，最多积累 burst 个。并发拉取时
+各线程在请求前调用 acquire()，令牌不足时阻塞等待，保证对同一数据源的请求速率不超限。
+"""
+import os
+import time
+from collections.abc import Callable
+from threading import Lock
+from typing import Optional
+
+
+class TokenBucket:
+    """线程安全的令牌桶"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            rate: 每秒补充的令牌数，小于等于0时不限流
+            burst: 令牌桶容量，即允许的瞬时并发请求数
+            clock: 计时函数，测试时可替换
+            sleep: 等待函数，测试时可替换
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = Lock()
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        取走令牌，不足时阻塞到补足为止
+
+        Returns:
+            float: 本次等待的秒数
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= tokens
+            # 令牌允许透支，等待时间由透支量决定，后来的线程排在后面
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+# 数据源编号与环境变量名，编号同 Ticker.source：1东方财富 2新浪 3雪球
+_SOURCE_ENV = {1: "DONGCAI", 2: "SINA", 3: "XUEQIU"}
+_DEFAULT_RATE = {1: 5.0, 2: 2.0, 3: 2.0}
+
+
+def source_limiters_from_env() -> dict[int, TokenBucket]:
+    """
+    按环境变量创建各数据源的令牌桶
+
+    RATE_LIMIT_<SOURCE> 为每秒请求数（0 表示不限流），RATE_BURST_<SOURCE> 为桶容量，
+    SOURCE 取 DONGCAI/SINA/XUEQIU
+    """
+    limiters = {}
+    for source, name in _SOURCE_ENV.items():
+        rate = float(os.getenv(f"RATE_LIMIT_{name}", str(_DEFAULT_RATE[source])))
+        burst = float(os.getenv(f"RATE_BURST_{name}", "1"))
+        limiters[source] = TokenBucket(rate, burst)
+    return limiters
+
+
+source_limiters = source_limiters_from_env()
+
+
+def acquire_source(source: int, limiters: Optional[dict] = None) -> float:
+    """请求数据源前取令牌，未配置的数据源不限流"""
+    limiter = (limiters if limiters is not None else source_limiters).get(source)
+    return limiter.acquire() if limiter is not None else 0.0
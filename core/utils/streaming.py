@@ -0,0 +1,194 @@
+"""
+流式（增量）计算的单步函数
+
+每个函数对应 UtilsHelper 中的一种序列计算，输入上一步的结果和第 i 根K线的值，
+返回第 i 步的结果，预热语义（i < day_count - 1 时窗口收缩为 i + 1）与全量计算一致。
+状态只使用 float/int/list，便于直接 JSON 序列化。
+"""
+from typing import Optional
+
+from core.schema.k_line import (
+    KLine,
+    KLineFrame,
+    as_kline_frame,
+    k_line_to_dict,
+    to_kline,
+)
+
+
+def ema_step(prev: float, value: float, i: int, day_count: int) -> float:
+    """EMA 单步，对应 UtilsHelper.ema"""
+    if i == 0:
+        return value
+    calcu_day = day_count if i >= day_count - 1 else i + 1
+    return (2 * value + (calcu_day - 1) * prev) / (calcu_day + 1)
+
+
+def ma_step(prev: float, value: float, i: int, day_count: int, weight: float) -> float:
+    """一般移动平均单步，对应 UtilsHelper.ma"""
+    if i == 0:
+        return value
+    calcu_day = day_count if i >= day_count - 1 else i + 1
+    return (weight * value + (calcu_day - weight) * prev) / calcu_day
+
+
+def rma_step(prev: float, value: float, i: int, day_count: int) -> float:
+    """RMA 单步，对应 UtilsHelper.rma（首个值固定为0）"""
+    if i == 0:
+        return 0
+    return (value + (day_count - 1) * prev) / day_count
+
+
+def push_window(window: list, value: float, day_count: int) -> list:
+    """返回追加 value 并截断到 day_count 的新窗口，不修改原列表"""
+    window = window + [value]
+    if len(window) > day_count:
+        del window[: len(window) - day_count]
+    return window
+
+
+def window_sma(window: list) -> float:
+    return sum(window) / len(window)
+
+
+def window_wma(window: list) -> float:
+    """窗口加权平均，最新值权重最大，对应 UtilsHelper.wma"""
+    size = len(window)
+    total = 0.0
+    for j, value in enumerate(window):
+        total += value * (j + 1)
+    return total / (size * (size + 1) / 2)
+
+
+def window_avedev(window: list, mean: float) -> float:
+    return sum(abs(value - mean) for value in window) / len(window)
+
+
+def compare_sign(value: float, base: float) -> int:
+    """标量版 kernels.compare_sign：大于为1，小于为-1，其余为0"""
+    if value > base:
+        return 1
+    if value < base:
+        return -1
+    return 0
+
+
+def true_range(high: float, low: float, last_close: float) -> float:
+    """真实波动幅度，对应 UtilsHelper.tr"""
+    return max(max(high - low, abs(last_close - high)), abs(last_close - low))
+
+
+class StreamingMixin:
+    """
+    指标/策略的流式计算接口
+
+    init_state(history) 用历史K线建立状态，update(state, bar) 追加一根新K线，
+    replace_last(state, bar) 用盘中最新价替换最后一根K线，二者都返回最新的
+    {"score", "status", "days"}。状态为普通 dict，可 JSON 序列化后在下次启动时恢复。
+
+    指标和策略实例在多只股票间共享（如 default_indicators），因此状态由调用方持有，
+    不保存在实例上。
+
+    子类必须实现 stream_recalculate(kl_data)，全量计算并返回 (score, pos_data)。
+    状态中保存全部K线，每次 update/replace_last 都全量重算，策略均按此方式更新。
+
+    指标可另外实现 stream_step(core, bar, i)，由上一步的内部状态 core（首根K线时为
+    None，不得修改）推进到第 i 根K线，返回 (新的内部状态, score, status)，从而获得
+    O(1)/O(window) 的增量更新：状态中同时保存最后一根K线之前（prev）和之后（cur）
+    的结果，replace_last 从 prev 重新推进一步。
+    """
+
+    def supports_streaming(self) -> bool:
+        """是否实现了增量计算（stream_step）"""
+        return callable(getattr(self, "stream_step", None))
+
+    def init_state(self, kl_data) -> dict:
+        """
+        用历史K线初始化流式状态
+
+        Args:
+            kl_data: 历史K线（list[KLine] 或 KLineFrame）
+
+        Returns:
+            dict: 可序列化的状态
+        """
+        frame = as_kline_frame(kl_data)
+        if not self.supports_streaming():
+            state = {"key": self.get_key(), "bars": frame.to_dicts(), "result": None}
+            self._replay(state)
+            return state
+        state = {"key": self.get_key(), "length": 0, "prev": None, "cur": None}
+        for bar in frame:
+            self.update(state, bar)
+        return state
+
+    def update(self, state: dict, bar) -> dict:
+        """
+        追加一根新K线
+
+        Args:
+            state: init_state 返回的状态，原地更新
+            bar: 新K线（KLine、KLineDict 或同名属性对象）
+
+        Returns:
+            dict: 最新的 {"score", "status", "days"}
+        """
+        bar = to_kline(bar)
+        if "bars" in state:
+            state["bars"].append(k_line_to_dict(bar))
+            return self._replay(state)
+        state["prev"] = state["cur"]
+        state["cur"] = self._advance(state["prev"], bar, state["length"])
+        state["length"] += 1
+        return self.stream_result(state)
+
+    def replace_last(self, state: dict, bar) -> dict:
+        """
+        替换最后一根K线（如盘中实时K线多次刷新）
+
+        Args:
+            state: init_state 返回的状态，原地更新
+            bar: 替换后的K线
+
+        Returns:
+            dict: 最新的 {"score", "status", "days"}
+        """
+        bar = to_kline(bar)
+        if "bars" in state:
+            if not state["bars"]:
+                raise ValueError("流式状态中没有可替换的K线")
+            state["bars"][-1] = k_line_to_dict(bar)
+            return self._replay(state)
+        if state["length"] == 0:
+            raise ValueError("流式状态中没有可替换的K线")
+        state["cur"] = self._advance(state["prev"], bar, state["length"] - 1)
+        return self.stream_result(state)
+
+    def stream_result(self, state: dict) -> dict:
+        """读取状态中最新的结果"""
+        if "bars" in state:
+            return dict(state["result"]) if state["result"] else {}
+        cur = state["cur"]
+        if cur is None:
+            return {}
+        return {"score": cur["score"], "status": cur["status"], "days": cur["days"]}
+
+    def _advance(self, prev: Optional[dict], bar: KLine, i: int) -> dict:
+        core, score, status = self.stream_step(prev["core"] if prev else None, bar, i)
+        status = int(status)
+        days = prev["days"] + 1 if prev and prev["status"] == status else 1
+        return {"core": core, "score": score, "status": status, "days": days}
+
+    def _replay(self, state: dict) -> dict:
+        if not state["bars"]:
+            state["result"] = None
+            return {}
+        score, pos_data = self.stream_recalculate(KLineFrame.from_klines(state["bars"]))
+        status = pos_data[-1]
+        days = 0
+        for pos in reversed(pos_data):
+            if pos != status:
+                break
+            days += 1
+        state["result"] = {"score": score, "status": int(status), "days": days}
+        return dict(state["result"])
@@ -1,12 +1,22 @@
 import math
 import sys
 
-from core.schema.k_line import KLine
+import numpy as np
+
+from core.schema.k_line import KLine, as_kline_frame
+from core.utils import kernels
+
+
+def _as_list(data):
+    # 递推类计算逐元素访问，列表比 NumPy 标量访问快得多
+    return data.tolist() if isinstance(data, np.ndarray) else data
 
 
 class UtilsHelper:
     """
     工具类，提供常用的数学和数据处理方法。
+
+    滑动窗口类计算委托给 core.utils.kernels 的向量化实现，这里保留列表接口以兼容旧调用方。
     """
 
     def run_process(self, index: int, total: int, title: str, message: str) -> None:
@@ -110,84 +120,37 @@ class UtilsHelper:
         """
         计算滑动求和。
         """
-        result = []
-        length = len(data)
-        for i in range(length):
-            calcu_day = day_count
-            if i < day_count - 1:
-                calcu_day = i + 1
-            s = 0
-            for j in range(calcu_day):
-                s += data[i - j]
-            result.append(s)
-        return result
+        return kernels.rolling_sum(data, day_count).tolist()
 
     def avedev(self, data: list[float], day_count: int) -> list[float]:
         """
         平均绝对偏差。
         """
-        result = [0]
-        length = len(data)
-        sma_data = self.sma(data, day_count)
-        for i in range(1, length):
-            calcu_day = day_count
-            if i < day_count - 1:
-                calcu_day = i + 1
-            s = 0
-            for j in range(calcu_day):
-                s += abs(data[i - j] - sma_data[i])
-            result.append(s / calcu_day)
-        return result
+        return kernels.avedev(data, day_count).tolist()
 
     def stddev(self, data: list[float], day_count: int) -> list[float]:
         """
         标准差。
         """
-        result = [0]
-        length = len(data)
-        sma_data = self.sma(data, day_count)
-        for i in range(1, length):
-            calcu_day = day_count
-            if i < day_count - 1:
-                calcu_day = i + 1
-            s = 0
-            for j in range(calcu_day):
-                s += (data[i - j] - sma_data[i]) ** 2
-            result.append(math.sqrt(s / calcu_day))
-        return result
+        return kernels.stddev(data, day_count).tolist()
 
     def highest(self, data: list[float], day_count: int) -> list[float]:
         """
         滑动最高值。
         """
-        result = []
-        length = len(data)
-        for i in range(length):
-            calcu_day = day_count
-            if i < day_count - 1:
-                calcu_day = i + 1
-            sub_arr = data[i - calcu_day + 1 : i + 1]
-            result.append(max(sub_arr))
-        return result
+        return kernels.highest(data, day_count).tolist()
 
     def lowest(self, data: list[float], day_count: int) -> list[float]:
         """
         滑动最低值。
         """
-        result = []
-        length = len(data)
-        for i in range(length):
-            calcu_day = day_count
-            if i < day_count - 1:
-                calcu_day = i + 1
-            sub_arr = data[i - calcu_day + 1 : i + 1]
-            result.append(min(sub_arr))
-        return result
+        return kernels.lowest(data, day_count).tolist()
 
     def rma(self, data: list[float], day_count: int) -> list[float]:
         """
         RMA 平滑移动平均。
         """
+        data = _as_list(data)
         result = []
         length = len(data)
         for i in range(length):
@@ -203,22 +166,13 @@ class UtilsHelper:
         """
         简单移动平均。
         """
-        result = [data[0]]
-        length = len(data)
-        for i in range(1, length):
-            calcu_day = day_count
-            if i < day_count - 1:
-                calcu_day = i + 1
-            s = 0
-            for j in range(calcu_day):
-                s += data[i - j]
-            result.append(s / calcu_day)
-        return result
+        return kernels.sma(data, day_count).tolist()
 
     def ema(self, data: list[float], day_count: int) -> list[float]:
         """
         指数移动平均。
         """
+        data = _as_list(data)
         result = [data[0]]
         length = len(data)
         for i in range(1, length):
@@ -233,25 +187,13 @@ class UtilsHelper:
         """
         加权移动平均。
         """
-        result = [data[0]]
-        length = len(data)
-        for i in range(1, length):
-            calcu_day = day_count
-            if i < day_count - 1:
-                calcu_day = i + 1
-            norm = 0
-            s = 0
-            for j in range(calcu_day):
-                weight = (calcu_day - j) * calcu_day
-                norm += weight
-                s += data[i - j] * weight
-            result.append(s / norm)
-        return result
+        return kernels.wma(data, day_count).tolist()
 
     def ma(self, data: list[float], day_count: int, weight: float) -> list[float]:
         """
         一般移动平均。
         """
+        data = _as_list(data)
         result = [data[0]]
         length = len(data)
         for i in range(1, length):
@@ -281,35 +223,28 @@ class UtilsHelper:
         """
         成交量加权移动平均。
         """
-        result = []
-        data = []
-        volume_data = []
-        length = len(kl_data)
-        for kl_item in kl_data:
-            volume_data.append(kl_item.volume)
-            data.append(kl_item.close * kl_item.volume)
-        ma_data = self.sma(data, day_count)
-        ma_volume = self.sma(volume_data, day_count)
-        for i in range(length):
-            vwma = ma_data[i] / ma_volume[i] if ma_volume[i] > 0 else 0
-            result.append(vwma)
-        return result
+        frame = as_kline_frame(kl_data)
+        ma_data = kernels.sma(frame.close * frame.volume, day_count)
+        ma_volume = kernels.sma(frame.volume, day_count)
+        positive = ma_volume > 0
+        result = np.zeros(len(frame), dtype=np.float64)
+        np.divide(ma_data, ma_volume, out=result, where=positive)
+        return result.tolist()
 
     def tr(self, kl_data: list[KLine]) -> list[float]:
         """
         真实波动幅度（True Range）。
-        """
-        result = []
-        length = len(kl_data)
-        for i in range(length):
-            day_value = kl_data[i]
-            last_day_value = kl_data[i - 1]
-            high = day_value.high
-            low = day_value.low
-            last_close = last_day_value.close
-            res = max(max((high - low), abs(last_close - high)), abs(last_close - low))
-            result.append(res)
-        return result
+
+        首根K线的前收盘价沿用原实现取最后一根（kl_data[-1]），后续 rma 不使用该值。
+        """
+        frame = as_kline_frame(kl_data)
+        high = frame.high
+        low = frame.low
+        last_close = np.roll(frame.close, 1)
+        result = np.maximum(
+            np.maximum(high - low, np.abs(last_close - high)), np.abs(last_close - low)
+        )
+        return result.tolist()
 
     def ratr(self, kl_data: list[KLine], day_count: int) -> list[float]:
         """
@@ -322,33 +257,27 @@ class UtilsHelper:
         """
         典型价格。
         """
-        result = []
-        length = len(kl_data)
-        for i in range(length):
-            day_value = kl_data[i]
-            high = day_value.high
-            low = day_value.low
-            close = day_value.close
-            result.append((high + low + close) / 3)
-        return result
+        frame = as_kline_frame(kl_data)
+        return ((frame.high + frame.low + frame.close) / 3).tolist()
 
     def cci(self, kl_data: list[KLine], day_count: int) -> list[float]:
         """
         商品通道指数（CCI）。
         """
-        result = [0]
-        length = len(kl_data)
-        typ_data = self.typ(kl_data)
-        typ_ma_data = self.sma(typ_data, day_count)
-        type_ave_data = self.avedev(typ_data, day_count)
-        for i in range(1, length):
-            cci = (
-                (typ_data[i] - typ_ma_data[i]) / (0.015 * type_ave_data[i])
-                if type_ave_data[i] > 0
-                else 0
-            )
-            result.append(cci)
-        return result
+        frame = as_kline_frame(kl_data)
+        typ_data = (frame.high + frame.low + frame.close) / 3
+        typ_ma_data = kernels.sma(typ_data, day_count)
+        type_ave_data = kernels.avedev(typ_data, day_count)
+        result = np.zeros(len(frame), dtype=np.float64)
+        np.divide(
+            typ_data - typ_ma_data,
+            0.015 * type_ave_data,
+            out=result,
+            where=type_ave_data > 0,
+        )
+        if len(result) > 0:
+            result[0] = 0
+        return result.tolist()
 
     def get_week_line(self, kl_data: list[KLine]) -> list[dict]:
         """
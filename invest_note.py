@@ -5,6 +5,11 @@ import sys
 import matplotlib
 
 from core.analysis.advanced_backtest_engine import AdvancedBacktestEngine
+from core.analysis.batch_evaluator import (
+    BatchStrategyEvaluator,
+    leaderboard,
+    write_results,
+)
 from core.analysis.strategy_evaluator import StrategyEvaluator
 from core.data_source_helper import DataSourceHelper
 from core.strategy import DEFAULT_STRATEGIES
@@ -67,6 +72,18 @@ def get_ticker_code():
 
     return code
 
+def create_backtest_engine():
+    """策略分析使用的回测引擎，包括跟踪止损等风险管理参数"""
+    return AdvancedBacktestEngine(
+        initial_capital=100000,
+        position_sizing='fixed',
+        max_position_pct=1,
+        stop_loss_pct=0.05,
+        trailing_stop_pct=0.05,  # 添加跟踪止损参数
+        slippage_pct=0.001,
+        commission_pct=0.0003
+    )
+
 def analyze_strategies(code, days=250):
     """分析股票的多个策略表现"""
     dataSource = DataSourceHelper()
@@ -76,19 +93,12 @@ def analyze_strategies(code, days=250):
     if kl_data is None or len(kl_data) == 0:
         print(f"无法获取股票 {code} 的K线数据")
         return
+    # 市场环境分析按字典访问K线
+    kl_data = kl_data.to_dicts()
 
     # 初始化策略评估器
     evaluator = StrategyEvaluator()
-    # 设置回测引擎参数，包括跟踪止损等风险管理参数
-    evaluator.backtest_engine = AdvancedBacktestEngine(
-        initial_capital=100000,
-        position_sizing='fixed',
-        max_position_pct=1,
-        stop_loss_pct=0.05,
-        trailing_stop_pct=0.05,  # 添加跟踪止损参数
-        slippage_pct=0.001,
-        commission_pct=0.0003
-    )
+    evaluator.backtest_engine = create_backtest_engine()
 
     # 准备策略列表
     strategies = DEFAULT_STRATEGIES
@@ -154,6 +164,41 @@ def analyze_strategies(code, days=250):
             print(f"持仓时间: {last_equity_point['entry_date'].strftime('%Y-%m-%d')}")
             print("-" * 60)
 
+def analyze_strategies_batch(codes, days=250, output=None):
+    """批量评估多只股票的策略表现，写出结果表并打印跨股票排行榜"""
+    dataSource = DataSourceHelper()
+    output = output or 'output/strategy_batch.csv'
+
+    print(f"\n开始批量分析 {len(codes)} 只股票的策略表现...")
+    engine = create_backtest_engine()
+    # K线边加载边提交到进程池
+    with BatchStrategyEvaluator(DEFAULT_STRATEGIES, engine=engine) as batch:
+        table = batch.run((code, dataSource.get_kline_data(code, days)) for code in codes)
+
+    failed = table[table['error'].notna()]
+    for row in failed.itertuples():
+        print(f"股票 {row.code} 评估失败: {row.error}")
+
+    path = write_results(table, output)
+    print(f"结果已写入: {path}")
+
+    board = leaderboard(table)
+    print("\n策略排行榜:")
+    print("-" * 60)
+    for strategy, row in board.iterrows():
+        print(f"{strategy:30} 股票数: {int(row['tickers']):4d} 平均评分: {row['total_score']:6.2f} "
+              f"平均收益: {row['total_return']:7.2%} 盈利占比: {row['positive_ratio']:6.2%}")
+    print("-" * 60)
+
+def parse_code_list(arg):
+    """解析逗号分隔的股票代码列表，@开头时从文件读取（每行一个代码）"""
+    if arg.startswith('@'):
+        with open(arg[1:], encoding='utf-8') as f:
+            items = f.read().split()
+    else:
+        items = arg.split(',')
+    return [item.strip() for item in items if item.strip()]
+
 def update_batch_tickers():
     """批量更新股票数据菜单"""
     print("\n请选择批量更新方式：")
@@ -333,6 +378,28 @@ def run_command_line_mode():
             print("错误：缺少参数")
             print_help()
 
+    elif sys.argv[1] == '-sb':
+        if len(sys.argv) >= 3:
+            codes = parse_code_list(sys.argv[2])
+            args = sys.argv[3:]
+            output = None
+            for flag in ('-o', '--output'):
+                if flag in args:
+                    index = args.index(flag)
+                    if index + 1 < len(args):
+                        output = args[index + 1]
+                    args = args[:index] + args[index + 2:]
+            days = 250
+            if args:
+                try:
+                    days = int(args[0])
+                except ValueError:
+                    pass
+            analyze_strategies_batch(codes, days, output)
+        else:
+            print("错误：缺少股票代码列表")
+            print_help()
+
     elif sys.argv[1] == '-h' or sys.argv[1] == '--help':
         print_help()
 
@@ -349,6 +416,10 @@ def print_help():
     print("  -all:                 更新所有股票数据")
     print("  -prefix [前缀]:        更新指定前缀的股票数据")
     print("  -s [市场] [代码] [天数]:  策略分析股票 (市场: zh/hk/us, 天数可选，默认250)")
+    print("  -sb [代码列表] [天数] [-o/--output 文件路径]: 批量策略分析并输出排行榜")
+    print("                        [代码列表]: 逗号分隔的完整代码（如 SH.600000,HK.00700），")
+    print("                                    或 @文件路径（每行一个代码）")
+    print("                        [-o/--output]: 结果表路径，.parquet 或 .csv，默认 output/strategy_batch.csv")
     print("  -hs, --high-score [阈值] [-e/--export] [-o/--output 文件路径]: 显示高评分股票")
     print("                        [阈值]: 评分阈值，可选，默认75")
     print("                        [-e/--export]: 导出到JSON，可选")
@@ -364,6 +435,7 @@ def print_help():
     print("  python investNote.py -a hk 00700   # 分析港股00700")
     print("  python investNote.py -a us AAPL    # 分析美股AAPL")
     print("  python investNote.py -ao zh 600000 600  # 分时分析上证股票600000，数据范围600天")
+    print("  python investNote.py -sb SH.600000,SZ.000001 500 -o output/strategies.parquet  # 批量策略分析")
     print("  python investNote.py -hs 80        # 显示评分大于等于80的股票")
     print("  python investNote.py -hs 80 -e     # 显示评分大于等于80的股票并导出到JSON")
     print("  python investNote.py -hs -e -o output/mystocks.json  # 导出评分大于等于75的股票到指定文件")
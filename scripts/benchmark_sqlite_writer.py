@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+"""
+对比 SQLite 默认配置与性能模式（WAL + 单写线程）下的更新吞吐
+
+多个写入线程模拟批量更新和 API 请求同时写入策略、指标，读取线程模拟 API 查询：
+
+- 默认配置：每个写入线程各自的连接、每只股票一个事务
+- 性能模式：WAL、synchronous=NORMAL，所有写入交给 SqliteWriter 合并提交
+
+用法：
+    python scripts/benchmark_sqlite_writer.py --tickers 400 --writers 4 --readers 2
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.database.sqlite_helper import SqliteHelper  # noqa: E402
+from core.database.sqlite_writer import SqliteWriter  # noqa: E402
+from core.database.unit_of_work import UnitOfWork  # noqa: E402
+from core.service.ticker_indicator_repository import (  # noqa: E402
+    TickerIndicatorRepository,
+)
+from core.service.ticker_strategy_repository import (  # noqa: E402
+    TickerStrategyRepository,
+)
+
+SCHEMA = project_root / "sql" / "create_table_sqlite.sql"
+STRATEGIES = {
+    f"strategy_{i}": {"data": {"buy": list(range(20))}, "pos_data": {"pos": i}}
+    for i in range(20)
+}
+INDICATORS = {
+    f"indicator_{i}": {"history": [{"value": v} for v in range(30)]} for i in range(10)
+}
+
+
+def write_ticker(uow, ticker_id: int) -> None:
+    TickerStrategyRepository(uow).bulk_upsert(
+        ticker_id, "K_DAY", "2024-06-28", STRATEGIES
+    )
+    TickerIndicatorRepository(uow).bulk_upsert(
+        ticker_id, "K_DAY", "2024-06-28", INDICATORS
+    )
+
+
+def create_db(directory: str, name: str) -> str:
+    path = str(Path(directory) / name)
+    helper = SqliteHelper(path)
+    helper.conn.executescript(SCHEMA.read_text(encoding="utf-8"))
+    helper.close()
+    return path
+
+
+def run(path: str, performance: bool, tickers: int, writers: int, readers: int):
+    """返回写入耗时、每秒写入股票数、读取次数和写入失败数"""
+    writer = (
+        SqliteWriter(lambda: SqliteHelper(path, performance=True))
+        if performance
+        else None
+    )
+    errors = []
+    reads = [0] * readers
+    done = threading.Event()
+
+    def write_loop(ids: list[int]) -> None:
+        helper = None if performance else SqliteHelper(path)
+        for ticker_id in ids:
+            try:
+                if writer is not None:
+                    writer.submit(
+                        lambda uow, i=ticker_id: write_ticker(uow, i)
+                    ).result()
+                else:
+                    with UnitOfWork(helper) as uow, uow.ticker():
+                        write_ticker(uow, ticker_id)
+            except Exception as e:
+                errors.append(e)
+
+    def read_loop(index: int) -> None:
+        helper = SqliteHelper(path, performance=performance)
+        sql = "SELECT * FROM ticker_strategy WHERE ticker_id = ?"
+        while not done.is_set():
+            try:
+                helper.query(sql, (random.randint(1, tickers),))
+                reads[index] += 1
+            except Exception:
+                pass
+
+    ids = list(range(1, tickers + 1))
+    write_threads = [
+        threading.Thread(target=write_loop, args=(ids[i::writers],))
+        for i in range(writers)
+    ]
+    read_threads = [
+        threading.Thread(target=read_loop, args=(i,)) for i in range(readers)
+    ]
+    for thread in read_threads:
+        thread.start()
+    started = time.perf_counter()
+    for thread in write_threads:
+        thread.start()
+    for thread in write_threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for thread in read_threads:
+        thread.join()
+    if writer is not None:
+        writer.close()
+    return elapsed, tickers / elapsed, sum(reads), len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 写入吞吐对比")
+    parser.add_argument("--tickers", type=int, default=400, help="写入的股票数")
+    parser.add_argument("--writers", type=int, default=4, help="写入线程数")
+    parser.add_argument("--readers", type=int, default=2, help="读取线程数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{args.tickers} 只股票，{args.writers} 个写入线程，{args.readers} 个读取线程")
+        print(f"{'模式':<8}{'耗时(秒)':>10}{'股票/秒':>10}{'读取次数':>10}{'失败':>6}")
+        for name, performance in (("默认", False), ("性能", True)):
+            path = create_db(directory, f"{name}.db")
+            elapsed, rate, reads, errors = run(
+                path, performance, args.tickers, args.writers, args.readers
+            )
+            print(f"{name:<8}{elapsed:>10.2f}{rate:>10.1f}{reads:>10}{errors:>6}")
+
+
+if __name__ == "__main__":
+    main()
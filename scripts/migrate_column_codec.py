@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+"""
+把已有的指标、策略、评分历史列从 JSON 转为紧凑编码（或用 --json 转回 JSON）
+
+按 id 分批读取和更新，每批提交一次，可重复执行：已是目标格式的值不会再次写入。
+
+用法：
+    python scripts/migrate_column_codec.py --dry-run
+    python scripts/migrate_column_codec.py --batch-size 1000
+    python scripts/migrate_column_codec.py --json
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.database.db_adapter import DbAdapter  # noqa: E402
+from core.utils.column_codec import decode_column, encode_column  # noqa: E402
+
+DB_TYPE = os.getenv("DB_TYPE", "sqlite").lower()
+PLACEHOLDER = "?" if DB_TYPE == "sqlite" else "%s"
+
+COLUMNS = {
+    "ticker_indicator": ("history",),
+    "ticker_strategy": ("data", "pos_data"),
+    "ticker_score": ("history",),
+}
+
+
+def migrate_table(
+    db,
+    table: str,
+    columns: tuple[str, ...],
+    compact: bool = True,
+    batch_size: int = 500,
+    dry_run: bool = False,
+) -> dict:
+    """
+    重新编码一张表的历史列
+
+    Returns:
+        dict: 行数、更新行数、无法解析的值数量，以及转换前后的总字节数
+    """
+    stats = {"rows": 0, "updated": 0, "errors": 0, "before": 0, "after": 0}
+    select_sql = (
+        f"SELECT id, {', '.join(columns)} FROM {table} "
+        f"WHERE id > {PLACEHOLDER} ORDER BY id LIMIT {int(batch_size)}"
+    )
+    last_id = 0
+    while True:
+        rows = db.query(select_sql, (last_id,))
+        if not rows:
+            break
+        for row in rows:
+            stats["rows"] += 1
+            changes = {}
+            for column in columns:
+                text = row[column]
+                if not text:
+                    continue
+                try:
+                    encoded = encode_column(decode_column(text), compact)
+                except ValueError:
+                    stats["errors"] += 1
+                    continue
+                stats["before"] += len(text)
+                stats["after"] += len(encoded)
+                if encoded != text:
+                    changes[column] = encoded
+            if changes and not dry_run:
+                assignments = ", ".join(f"{key} = {PLACEHOLDER}" for key in changes)
+                db.execute(
+                    f"UPDATE {table} SET {assignments} WHERE id = {PLACEHOLDER}",
+                    (*changes.values(), row["id"]),
+                )
+            if changes:
+                stats["updated"] += 1
+        if not dry_run:
+            db.commit()
+        last_id = rows[-1]["id"]
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="历史序列列编码迁移")
+    parser.add_argument("--json", action="store_true", help="转回 JSON 文本")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批行数")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不写入")
+    parser.add_argument("--tables", nargs="*", default=list(COLUMNS), help="要迁移的表")
+    args = parser.parse_args()
+
+    db = DbAdapter()
+    try:
+        for table in args.tables:
+            stats = migrate_table(
+                db,
+                table,
+                COLUMNS[table],
+                compact=not args.json,
+                batch_size=args.batch_size,
+                dry_run=args.dry_run,
+            )
+            ratio = stats["before"] / stats["after"] if stats["after"] else 0
+            print(
+                f"{table}: {stats['rows']} 行，更新 {stats['updated']} 行，"
+                f"无法解析 {stats['errors']} 个值，"
+                f"{stats['before']} → {stats['after']} 字节（{ratio:.1f}x）"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
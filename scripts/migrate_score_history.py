@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+"""
+为已有的 ticker_score 表加上 (ticker_id, time_key) 唯一索引
+
+评分改为按K线追加保存后依赖该约束做 UPSERT。旧表中同一股票同一时间键若有多条记录，
+先保留 id 最大的一条再建索引；索引已存在时跳过，可重复执行。
+
+用法：
+    python scripts/migrate_score_history.py --dry-run
+    python scripts/migrate_score_history.py
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.database.db_adapter import DbAdapter  # noqa: E402
+
+INDEX_NAME = "uk_ticker_score_ticker_time"
+
+DUPLICATE_SQL = (
+    "SELECT COUNT(*) AS count FROM ticker_score WHERE id NOT IN "
+    "(SELECT id FROM (SELECT MAX(id) AS id FROM ticker_score "
+    "GROUP BY ticker_id, time_key) AS keep_rows)"
+)
+DELETE_SQL = (
+    "DELETE FROM ticker_score WHERE id NOT IN "
+    "(SELECT id FROM (SELECT MAX(id) AS id FROM ticker_score "
+    "GROUP BY ticker_id, time_key) AS keep_rows)"
+)
+INDEX_SQL = f"CREATE UNIQUE INDEX {INDEX_NAME} ON ticker_score (ticker_id, time_key)"
+
+
+def migrate(db, dry_run: bool = False) -> dict:
+    """
+    删除重复评分并创建唯一索引
+
+    Returns:
+        dict: 重复记录数，以及是否新建了索引
+    """
+    duplicates = db.query_one(DUPLICATE_SQL)["count"]
+    stats = {"duplicates": duplicates, "indexed": False}
+    if dry_run:
+        return stats
+    if duplicates:
+        db.execute(DELETE_SQL)
+        db.commit()
+    try:
+        db.execute(INDEX_SQL)
+        db.commit()
+        stats["indexed"] = True
+    except Exception as e:
+        # 建表脚本中的 UNIQUE 约束或之前的迁移已建立索引
+        print(f"未创建索引（可能已存在）: {e}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="评分历史唯一索引迁移")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不写入")
+    args = parser.parse_args()
+
+    db = DbAdapter()
+    try:
+        stats = migrate(db, dry_run=args.dry_run)
+        print(
+            f"ticker_score: 重复记录 {stats['duplicates']} 条，"
+            f"{'已创建' if stats['indexed'] else '未创建'}唯一索引 {INDEX_NAME}"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+"""
+按 ticker 和 ticker_score 重建最新评分汇总表 ticker_latest
+
+新建 ticker_latest 表后执行一次以补齐已有股票的最新评分（未执行时股票列表照常
+返回这些股票，只是评分为空）；之后由评分写入和新建股票维护，数据不一致时也可
+重复执行。
+
+用法：
+    python scripts/refresh_ticker_latest.py
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.database.db_adapter import DbAdapter  # noqa: E402
+from core.service.ticker_latest_repository import (  # noqa: E402
+    TickerLatestRepository,
+)
+
+
+def main():
+    db = DbAdapter()
+    try:
+        total = TickerLatestRepository(db).refresh()
+        print(f"ticker_latest: 已重建 {total} 行")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
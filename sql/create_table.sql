@@ -1,10 +1,13 @@
 -- MySQL 8.0 版本 SQL 初始化脚本
 
 -- 删除已存在的表
+DROP TABLE IF EXISTS update_job_ticker;
+DROP TABLE IF EXISTS update_job;
 DROP TABLE IF EXISTS news_articles;
 DROP TABLE IF EXISTS news_sources;
 DROP TABLE IF EXISTS ticker_indicator;
 DROP TABLE IF EXISTS ticker_strategy;
+DROP TABLE IF EXISTS ticker_latest;
 DROP TABLE IF EXISTS ticker_score;
 DROP TABLE IF EXISTS ticker_valuation;
 DROP TABLE IF EXISTS ticker;
@@ -66,7 +69,7 @@ CREATE TABLE IF NOT EXISTS ticker_indicator (
     indicator_key VARCHAR(50) NOT NULL,
     kl_type VARCHAR(20) NOT NULL,
     time_key VARCHAR(20) NOT NULL,
-    history TEXT,  -- JSON 格式存储历史数据
+    history TEXT,  -- JSON 或紧凑编码存储历史数据（见 core/utils/column_codec.py）
     status INT DEFAULT 1,
     code VARCHAR(20),
     version INT DEFAULT 1,
@@ -87,7 +90,7 @@ CREATE TABLE IF NOT EXISTS ticker_strategy (
     kl_type VARCHAR(20) NOT NULL,
     time_key VARCHAR(20) NOT NULL,
     data TEXT,  -- JSON 格式存储策略数据
-    pos_data TEXT,  -- JSON 格式存储持仓数据
+    pos_data TEXT,  -- JSON 或紧凑编码存储持仓数据（见 core/utils/column_codec.py）
     status INT DEFAULT 1,
     code VARCHAR(20),
     version INT DEFAULT 1,
@@ -138,15 +141,29 @@ CREATE TABLE IF NOT EXISTS ticker_score (
     strategy_score FLOAT DEFAULT 0,
     score FLOAT DEFAULT 0,
     status INT DEFAULT 1,
-    history TEXT,  -- JSON 格式存储历史数据
+    history TEXT,  -- JSON 或紧凑编码存储历史数据（见 core/utils/column_codec.py）
     create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-    PRIMARY KEY (id)
+    PRIMARY KEY (id),
+    UNIQUE KEY (ticker_id, time_key)  -- 每根K线一条评分，按股票和时间范围查询走该索引
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
 
 -- 创建索引以提高查询性能
 CREATE INDEX idx_ticker_score_ticker_id ON ticker_score(ticker_id);
 CREATE INDEX idx_ticker_score_time_key ON ticker_score(time_key);
 
+-- 创建 ticker_latest 表（每只股票的最新评分，供股票列表分页排序）
+CREATE TABLE IF NOT EXISTS ticker_latest (
+    ticker_id INT NOT NULL,
+    score FLOAT DEFAULT NULL,
+    time_key VARCHAR(20) DEFAULT NULL,
+    update_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (ticker_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
+
+-- 二级索引隐含主键 ticker_id，按分数、更新时间排序分页时无需回表
+CREATE INDEX idx_ticker_latest_score ON ticker_latest(score, time_key);
+CREATE INDEX idx_ticker_latest_time_key ON ticker_latest(time_key, score);
+
 -- 创建 api_log 表
 CREATE TABLE IF NOT EXISTS api_log (
   id INT NOT NULL AUTO_INCREMENT,
@@ -159,6 +176,38 @@ CREATE TABLE IF NOT EXISTS api_log (
   PRIMARY KEY (id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
 
+-- 创建 update_job 表（批量更新任务，同一任务名同一交易日重复运行时续跑）
+CREATE TABLE IF NOT EXISTS update_job (
+    id INT NOT NULL AUTO_INCREMENT,
+    job_key VARCHAR(100) NOT NULL,  -- 任务名:最后交易日
+    name VARCHAR(50) NOT NULL,
+    end_date VARCHAR(20) NOT NULL,
+    status VARCHAR(20) DEFAULT 'running',  -- running/completed/failed
+    total INT DEFAULT 0,
+    run_started_at DATETIME,  -- 本次运行开始时间，用于估算剩余时间
+    finished_at DATETIME,
+    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id),
+    UNIQUE KEY (job_key)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
+
+-- 创建 update_job_ticker 表（任务内每只股票的处理状态和耗时）
+CREATE TABLE IF NOT EXISTS update_job_ticker (
+    id INT NOT NULL AUTO_INCREMENT,
+    job_id INT NOT NULL,
+    ticker_id INT NOT NULL,
+    status VARCHAR(20) NOT NULL,  -- done/skipped/failed
+    started_at DATETIME,
+    finished_at DATETIME,
+    duration DOUBLE DEFAULT 0,  -- 耗时（秒）
+    error TEXT,
+    PRIMARY KEY (id),
+    UNIQUE KEY (job_id, ticker_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
+
+CREATE INDEX idx_update_job_name ON update_job(name);
+CREATE INDEX idx_update_job_ticker_status ON update_job_ticker(job_id, status);
+
 -- 创建新闻源表（无外键约束）
 CREATE TABLE IF NOT EXISTS news_sources (
     id INT NOT NULL AUTO_INCREMENT,
@@ -230,6 +279,8 @@ CREATE INDEX idx_news_articles_source_id ON news_articles(source_id);
 CREATE INDEX idx_news_articles_status ON news_articles(status);
 CREATE INDEX idx_news_articles_published_at ON news_articles(published_at);
 CREATE INDEX idx_news_articles_crawled_at ON news_articles(crawled_at);
+-- 新闻列表排序及游标分页
+CREATE INDEX idx_news_articles_listing ON news_articles(importance_score, published_at, crawled_at, id);
 
 -- 插入默认市场数据
 INSERT INTO market (id, code, name, region, currency, timezone, open_time, close_time, trading_days, status) VALUES
@@ -1,10 +1,13 @@
 -- SQLite 版本 SQL 初始化脚本
 
 -- 删除已存在的表
+DROP TABLE IF EXISTS update_job_ticker;
+DROP TABLE IF EXISTS update_job;
 DROP TABLE IF EXISTS news_articles;
 DROP TABLE IF EXISTS news_sources;
 DROP TABLE IF EXISTS ticker_indicator;
 DROP TABLE IF EXISTS ticker_strategy;
+DROP TABLE IF EXISTS ticker_latest;
 DROP TABLE IF EXISTS ticker_score;
 DROP TABLE IF EXISTS ticker_valuation;
 DROP TABLE IF EXISTS ticker;
@@ -64,7 +67,7 @@ CREATE TABLE IF NOT EXISTS ticker_indicator (
     indicator_key TEXT NOT NULL,
     kl_type TEXT NOT NULL,
     time_key TEXT NOT NULL,
-    history TEXT,  -- JSON 格式存储历史数据
+    history TEXT,  -- JSON 或紧凑编码存储历史数据（见 core/utils/column_codec.py）
     status INTEGER DEFAULT 1,
     code TEXT,
     version INTEGER DEFAULT 1,
@@ -84,7 +87,7 @@ CREATE TABLE IF NOT EXISTS ticker_strategy (
     kl_type TEXT NOT NULL,
     time_key TEXT NOT NULL,
     data TEXT,  -- JSON 格式存储策略数据
-    pos_data TEXT,  -- JSON 格式存储持仓数据
+    pos_data TEXT,  -- JSON 或紧凑编码存储持仓数据（见 core/utils/column_codec.py）
     status INTEGER DEFAULT 1,
     code TEXT,
     version INTEGER DEFAULT 1,
@@ -133,14 +136,27 @@ CREATE TABLE IF NOT EXISTS ticker_score (
     strategy_score REAL DEFAULT 0,
     score REAL DEFAULT 0,
     status INTEGER DEFAULT 1,
-    history TEXT,  -- JSON 格式存储历史数据
-    create_time TEXT DEFAULT CURRENT_TIMESTAMP
+    history TEXT,  -- JSON 或紧凑编码存储历史数据（见 core/utils/column_codec.py）
+    create_time TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (ticker_id, time_key)  -- 每根K线一条评分，按股票和时间范围查询走该索引
 );
 
 -- 创建索引以提高查询性能
 CREATE INDEX IF NOT EXISTS idx_ticker_score_ticker_id ON ticker_score(ticker_id);
 CREATE INDEX IF NOT EXISTS idx_ticker_score_time_key ON ticker_score(time_key);
 
+-- 创建 ticker_latest 表（每只股票的最新评分，供股票列表分页排序）
+CREATE TABLE IF NOT EXISTS ticker_latest (
+    ticker_id INTEGER PRIMARY KEY,
+    score REAL DEFAULT NULL,
+    time_key TEXT DEFAULT NULL,
+    update_time TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 索引隐含 ticker_id，按分数、更新时间排序分页时无需回表
+CREATE INDEX IF NOT EXISTS idx_ticker_latest_score ON ticker_latest(score, time_key);
+CREATE INDEX IF NOT EXISTS idx_ticker_latest_time_key ON ticker_latest(time_key, score);
+
 -- 创建 api_log 表
 CREATE TABLE IF NOT EXISTS api_log (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -152,6 +168,35 @@ CREATE TABLE IF NOT EXISTS api_log (
   created_at TEXT DEFAULT CURRENT_TIMESTAMP
 );
 
+-- 创建 update_job 表（批量更新任务，同一任务名同一交易日重复运行时续跑）
+CREATE TABLE IF NOT EXISTS update_job (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_key TEXT NOT NULL UNIQUE,  -- 任务名:最后交易日
+    name TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    status TEXT DEFAULT 'running',  -- running/completed/failed
+    total INTEGER DEFAULT 0,
+    run_started_at TEXT,  -- 本次运行开始时间，用于估算剩余时间
+    finished_at TEXT,
+    create_time TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 创建 update_job_ticker 表（任务内每只股票的处理状态和耗时）
+CREATE TABLE IF NOT EXISTS update_job_ticker (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER NOT NULL,
+    ticker_id INTEGER NOT NULL,
+    status TEXT NOT NULL,  -- done/skipped/failed
+    started_at TEXT,
+    finished_at TEXT,
+    duration REAL DEFAULT 0,  -- 耗时（秒）
+    error TEXT,
+    UNIQUE (job_id, ticker_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_update_job_name ON update_job(name);
+CREATE INDEX IF NOT EXISTS idx_update_job_ticker_status ON update_job_ticker(job_id, status);
+
 -- 创建新闻源表（无外键约束）
 CREATE TABLE IF NOT EXISTS news_sources (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -221,6 +266,8 @@ CREATE INDEX IF NOT EXISTS idx_news_articles_source_id ON news_articles(source_i
 CREATE INDEX IF NOT EXISTS idx_news_articles_status ON news_articles(status);
 CREATE INDEX IF NOT EXISTS idx_news_articles_published_at ON news_articles(published_at);
 CREATE INDEX IF NOT EXISTS idx_news_articles_crawled_at ON news_articles(crawled_at);
+-- 新闻列表排序及游标分页
+CREATE INDEX IF NOT EXISTS idx_news_articles_listing ON news_articles(importance_score, published_at, crawled_at, id);
 
 -- 插入默认市场数据
 INSERT OR REPLACE INTO market (id, code, name, region, currency, timezone, open_time, close_time, trading_days, status) VALUES
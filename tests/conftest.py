@@ -26,6 +26,10 @@ os.environ["LOG_LEVEL"] = "WARNING"  # 减少测试时的日志输出
 # 导入应用
 from api.api import app  # noqa: E402
 from core.database.db_adapter import DbAdapter  # noqa: E402
+from core.database.sqlite_helper import SqliteHelper  # noqa: E402
+
+# SQLite 建表脚本
+SQLITE_SCHEMA = project_root / "sql" / "create_table_sqlite.sql"
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -88,6 +92,28 @@ def clean_database(test_database):
     # 测试后清理（如果需要）
 
 
+
+@pytest.fixture(scope="function")
+def sqlite_db_path(tmp_path):
+    """
+    按 sql/create_table_sqlite.sql 建好全部表的临时 SQLite 文件
+    返回文件路径，建表用的连接已关闭
+    """
+    path = str(tmp_path / "test.db")
+    helper = SqliteHelper(path)
+    helper.conn.executescript(SQLITE_SCHEMA.read_text(encoding="utf-8"))
+    helper.close()
+    return path
+
+
+@pytest.fixture(scope="function")
+def sqlite_helper(sqlite_db_path):
+    """
+    连接到 sqlite_db_path 的 SqliteHelper
+    """
+    return SqliteHelper(sqlite_db_path)
+
+
 # pytest配置
 def pytest_configure(config):
     """pytest配置钩子"""
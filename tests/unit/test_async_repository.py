@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+"""
+异步仓库与阻塞调用线程池单元测试
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from api.routers import ticker as ticker_router
+from core.data_source_helper import DataSourceHelper
+from core.database import connection_pool
+from core.database.async_db import AsyncDbAdapter
+from core.database.sqlite_helper import SqliteHelper
+from core.enum.ticker_k_type import TickerKType
+from core.models.ticker_score import TickerScore
+from core.service.async_ticker_repository import (
+    AsyncTickerRepository,
+    AsyncTickerScoreRepository,
+    AsyncTickerStrategyRepository,
+)
+from core.service.ticker_repository import TickerRepository
+from core.service.ticker_score_repository import TickerScoreRepository
+from core.service.ticker_strategy_repository import TickerStrategyRepository
+from core.utils import blocking
+from core.utils.blocking import run_blocking
+
+
+@pytest.fixture
+def db_path(sqlite_db_path):
+    helper = SqliteHelper(sqlite_db_path)
+    ticker = TickerRepository(helper).create("SH.600000", "浦发银行", {})
+    TickerScoreRepository(helper).append_items(
+        ticker.id,
+        [
+            TickerScore(id=0, ticker_id=0, time_key=f"2024-06-{day:02d}", score=day)
+            for day in range(1, 6)
+        ],
+    )
+    TickerStrategyRepository(helper).update_item(
+        ticker.id,
+        "MA",
+        TickerKType.DAY.value,
+        "2024-06-05",
+        {"data": [{"time_key": "2024-06-05", "type": 1}], "pos_data": []},
+    )
+    helper.close()
+    return sqlite_db_path
+
+
+@pytest.fixture
+def async_db(db_path):
+    return AsyncDbAdapter(create_async_engine(f"sqlite+aiosqlite:///{db_path}"))
+
+
+@pytest.mark.unit
+class TestAsyncRepository:
+    """异步仓库读取测试"""
+
+    @pytest.mark.asyncio
+    async def test_query_params(self, async_db):
+        """:name 参数查询与写入"""
+        rows = await async_db.query(
+            "SELECT code FROM ticker WHERE code = :code", {"code": "SH.600000"}
+        )
+        assert rows == [{"code": "SH.600000"}]
+        assert await async_db.query_one("SELECT 1 AS v WHERE 1 = 0") is None
+        count = await async_db.execute(
+            "UPDATE ticker SET name = :name WHERE code = :code",
+            {"name": "浦发", "code": "SH.600000"},
+        )
+        assert count == 1
+        await async_db.engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_same_as_sync(self, async_db, db_path):
+        """异步仓库与同步仓库读取结果一致"""
+        ticker = await AsyncTickerRepository(async_db).get_by_code("SH.600000")
+        assert ticker is not None and ticker.name == "浦发银行"
+        assert await AsyncTickerRepository(async_db).get_by_code("SH.000000") is None
+
+        scores = AsyncTickerScoreRepository(async_db)
+        helper = SqliteHelper(db_path)
+        try:
+            expected = TickerScoreRepository(helper).get_scores(ticker.id, limit=3)
+        finally:
+            helper.close()
+        result = await scores.get_scores(ticker.id, limit=3)
+        assert [item.time_key for item in result] == [
+            item.time_key for item in expected
+        ]
+        ranged = await scores.get_scores(
+            ticker.id, start="2024-06-02", end="2024-06-03"
+        )
+        assert [item.score for item in ranged] == [2.0, 3.0]
+        assert await scores.get_latest_time_key(ticker.id) == "2024-06-05"
+
+        strategies = await AsyncTickerStrategyRepository(
+            async_db
+        ).get_items_by_ticker_id(ticker.id, TickerKType.DAY.value)
+        assert [item.strategy_key for item in strategies] == ["MA"]
+        assert strategies[0].data == [{"time_key": "2024-06-05", "type": 1}]
+        await async_db.engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_query_error_raised(self, tmp_path):
+        """数据库出错时抛出异常，不当作股票不存在或没有数据"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'empty.db'}")
+        db = AsyncDbAdapter(engine)
+        with pytest.raises(Exception, match="no such table"):
+            await AsyncTickerRepository(db).get_by_code("SH.600000")
+        with pytest.raises(Exception, match="no such table"):
+            await AsyncTickerScoreRepository(db).get_scores(1)
+        with pytest.raises(Exception, match="no such table"):
+            await AsyncTickerStrategyRepository(db).get_items_by_ticker_id(1, "day")
+        await engine.dispose()
+
+    def test_route_returns_500(self, test_client, monkeypatch):
+        """查询出错时详情、实时和历史接口返回 500"""
+
+        async def broken(self, code):
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(AsyncTickerRepository, "get_by_code", broken)
+        for path in (
+            "/ticker/zh/600000",
+            "/ticker/zh/600000/on_time",
+            "/ticker/zh/600000/history",
+        ):
+            response = test_client.get(path)
+            assert response.status_code == 500
+            assert "database unavailable" in response.text
+
+
+@pytest.mark.unit
+class TestRunBlocking:
+    """阻塞调用线程池测试"""
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self):
+        """阻塞调用在线程池中执行，期间事件循环继续调度其他协程"""
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks.append(time.monotonic())
+
+        def work():
+            time.sleep(0.2)
+            return threading.current_thread().name
+
+        started = time.monotonic()
+        name, _ = await asyncio.gather(run_blocking(work), ticker())
+        assert name.startswith("blocking")
+        assert len(ticks) == 5 and ticks[-1] - started < 0.2
+
+    @pytest.mark.asyncio
+    async def test_bounded_workers(self, monkeypatch):
+        """同时执行的阻塞调用数不超过线程数，其余排队"""
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="blocking")
+        monkeypatch.setattr(blocking, "_executor", executor)
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def work(value):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return value * 2
+
+        try:
+            results = await asyncio.gather(*(run_blocking(work, i) for i in range(6)))
+        finally:
+            executor.shutdown()
+        assert results == [0, 2, 4, 6, 8, 10]
+        assert peak[0] == 2
+
+
+@pytest.mark.unit
+class TestTickerDataConcurrency:
+    """股票详情接口并发测试"""
+
+    @pytest.mark.asyncio
+    async def test_connection_per_call(self, db_path, monkeypatch):
+        """并发请求各自使用独立连接，请求结束后连接全部归还"""
+        monkeypatch.setenv("DB_TYPE", "sqlite")
+        monkeypatch.setenv("SQLITE_DB_PATH", db_path)
+        monkeypatch.setattr(connection_pool, "_pools", {})
+        executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="blocking")
+        monkeypatch.setattr(blocking, "_executor", executor)
+        active, shared = set(), []
+        lock = threading.Lock()
+
+        def get_ticker_data(self, code, days):
+            conn = id(self.ticker_repo.db.db)
+            with lock:
+                if conn in active:
+                    shared.append(code)
+                active.add(conn)
+            try:
+                time.sleep(0.01)
+                return self.ticker_repo.get_by_code(code), [], []
+            finally:
+                with lock:
+                    active.discard(conn)
+
+        monkeypatch.setattr(DataSourceHelper, "get_ticker_data", get_ticker_data)
+        try:
+            results = await asyncio.gather(
+                *(
+                    run_blocking(ticker_router._get_ticker_data, "SH.600000", 10)
+                    for _ in range(32)
+                )
+            )
+        finally:
+            executor.shutdown()
+        assert all(ticker.name == "浦发银行" for ticker, _, _ in results)
+        assert shared == []
+        stats = next(iter(connection_pool.pool_stats().values()))
+        assert stats["in_use"] == 0
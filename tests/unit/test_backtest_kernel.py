@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+"""
+回测内核回归测试
+内核结果展开后与逐K线的原实现逐项相等
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from core.analysis.advanced_backtest_engine import AdvancedBacktestEngine
+from core.analysis.backtest_kernel import CLOSE_TYPES, prepare_bars
+from core.schema.k_line import KLineFrame
+from tests.unit.backtest_reference import ReferenceBacktestEngine
+from tests.utils import random_walk_klines
+
+
+class FixedSignalStrategy:
+    """返回固定信号的策略"""
+
+    def __init__(self, signals):
+        self.signals = signals
+
+    def calculate(self, kl_data):
+        return list(self.signals)
+
+
+def _klines(seed, length=300):
+    """随机游走行情，日期含周末和长假空档"""
+    return random_walk_klines(
+        seed, length, gaps=(1, 1, 1, 3, 7), open_sigma=0.01, close_sigma=0.02, wick=0.02
+    )
+
+
+def _signals(seed, length=300, allow_short=True):
+    """有持续性的随机信号"""
+    rng = random.Random(seed)
+    choices = [-1, 0, 1] if allow_short else [0, 1]
+    signals, current = [], 0
+    for _ in range(length):
+        if rng.random() < 0.08:
+            current = rng.choice(choices)
+        signals.append(current)
+    return signals
+
+
+def _engines(**kwargs):
+    return AdvancedBacktestEngine(**kwargs), ReferenceBacktestEngine(**kwargs)
+
+
+@pytest.mark.unit
+class TestBacktestKernel:
+    """内核与原实现一致性测试"""
+
+    @pytest.mark.parametrize("sizing", ["fixed", "percent", "kelly", "volatility"])
+    @pytest.mark.parametrize("trailing", [None, 0.03])
+    @pytest.mark.parametrize("time_stop_days", [0, 5])
+    def test_matches_reference(self, sizing, trailing, time_stop_days):
+        """各仓位管理、跟踪止损、时间止损组合下结果逐项相等"""
+        klines = _klines(1)
+        strategy = FixedSignalStrategy(_signals(2))
+        kernel, reference = _engines(
+            position_sizing=sizing,
+            trailing_stop_pct=trailing,
+            time_stop_days=time_stop_days,
+        )
+        result = kernel.run_backtest(strategy, klines)
+        expected = reference.run_backtest(strategy, klines)
+
+        assert result["equity_curve"] == expected["equity_curve"]
+        assert result["trades"] == expected["trades"]
+        assert result["costs"] == expected["costs"]
+        assert result["metrics"] == expected["metrics"]
+        assert kernel.transaction_costs == reference.transaction_costs
+        assert {trade["close_type"] for trade in result["trades"]} <= set(CLOSE_TYPES)
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_pyramid_matches_reference(self, seed):
+        """金字塔加仓（含做空）结果逐项相等"""
+        klines = _klines(seed, 400)
+        strategy = FixedSignalStrategy(_signals(seed + 10, 400))
+        kernel, reference = _engines(
+            position_sizing="pyramid",
+            max_position_pct=0.3,
+            stop_loss_pct=0.08,
+            time_stop_days=30,
+        )
+        result = kernel.run_backtest(strategy, klines)
+        expected = reference.run_backtest(strategy, klines)
+        assert result["equity_curve"] == expected["equity_curve"]
+        assert result["trades"] == expected["trades"]
+        assert result["metrics"] == expected["metrics"]
+        assert max(point["pyramid_level"] for point in result["equity_curve"]) >= 1
+
+    def test_repeated_runs_accumulate_costs(self):
+        """同一引擎多次回测时交易成本统计与原实现同样累计"""
+        klines = _klines(3)
+        strategy = FixedSignalStrategy(_signals(4, allow_short=False))
+        kernel, reference = _engines()
+        for _ in range(2):
+            result = kernel.run_backtest(strategy, klines)
+            expected = reference.run_backtest(strategy, klines)
+        assert result["costs"] == expected["costs"]
+        assert kernel.total_commission == reference.total_commission
+
+    def test_columnar_result(self):
+        """列式结果与字典结果一致，接受 KLineFrame 且不改变引擎的成本统计"""
+        klines = _klines(5)
+        strategy = FixedSignalStrategy(_signals(6))
+        engine = AdvancedBacktestEngine(trailing_stop_pct=0.05)
+        columnar = engine.run_backtest_columnar(
+            strategy, KLineFrame.from_klines(klines)
+        )
+        assert engine.total_commission == 0
+        expected = ReferenceBacktestEngine(trailing_stop_pct=0.05).run_backtest(
+            strategy, klines
+        )
+
+        assert columnar.equity["total_value"].tolist() == [
+            point["total_value"] for point in expected["equity_curve"]
+        ]
+        assert columnar.trades["profit"].tolist() == [
+            trade["profit"] for trade in expected["trades"]
+        ]
+        assert [columnar.time_key[i] for i in columnar.trades["exit_index"]] == [
+            trade["exit_date"] for trade in expected["trades"]
+        ]
+
+    def test_prepare_bars(self):
+        """ATR 前若干根为0，时间戳按纳秒保存"""
+        klines = _klines(7, 20)
+        bars = prepare_bars(klines, [0] * 20, atr_period=5)
+        assert np.all(bars.atr[:4] == 0) and np.all(bars.atr[4:] > 0)
+        assert bars.date_ns.dtype == np.int64
+        assert len(bars) == 20
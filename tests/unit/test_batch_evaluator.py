@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+"""
+策略批量评估单元测试
+每只股票只分类一次市场环境，结果表与逐只评估一致，多进程与单进程结果相同
+"""
+
+import pandas as pd
+import pytest
+
+from core.analysis.advanced_backtest_engine import AdvancedBacktestEngine
+from core.analysis.batch_evaluator import (
+    RESULT_COLUMNS,
+    BatchStrategyEvaluator,
+    evaluate_ticker,
+    leaderboard,
+    write_results,
+)
+from core.analysis.market_regime import MarketRegimeClassifier
+from core.analysis.strategy_evaluator import StrategyEvaluator
+from core.strategy.boll_dl_strategy import BollDLStrategy
+from core.strategy.ma_base_strategy import MaBaseStrategy
+from tests.utils import random_walk_klines
+
+STRATEGIES = [MaBaseStrategy(), BollDLStrategy()]
+
+
+def _klines(seed, length=320):
+    """带趋势切换的随机游走行情"""
+    return random_walk_klines(seed, length, trend=0.004, volume_jitter=500)
+
+
+@pytest.mark.unit
+class TestRegimeReuse:
+    """市场环境分类复用测试"""
+
+    def test_classify_once_per_ticker(self, monkeypatch):
+        """评估多个策略时只分类一次，结果与逐个策略分类相同"""
+        klines = _klines(1)
+        calls = []
+        classify = MarketRegimeClassifier.classify
+
+        def counting(self, kl_data):
+            calls.append(len(kl_data))
+            return classify(self, kl_data)
+
+        monkeypatch.setattr(MarketRegimeClassifier, "classify", counting)
+        results = StrategyEvaluator().evaluate_strategies(STRATEGIES, klines)
+        assert len(calls) == 1
+
+        for strategy in STRATEGIES:
+            single = StrategyEvaluator().evaluate_strategy(strategy, klines)
+            key = strategy.get_key()
+            assert results[key]["rating"] == single["rating"]
+            assert (
+                results[key]["regime_analysis"]["regime_stats"]
+                == single["regime_analysis"]["regime_stats"]
+            )
+
+
+@pytest.mark.unit
+class TestBatchEvaluator:
+    """批量评估测试"""
+
+    def test_evaluate_ticker(self):
+        """每个策略一行，指标与 StrategyEvaluator 一致"""
+        klines = _klines(2)
+        engine = AdvancedBacktestEngine()
+        rows = evaluate_ticker("SH.600000", klines, STRATEGIES, engine)
+        assert [row["strategy"] for row in rows] == [s.get_key() for s in STRATEGIES]
+        assert all(set(row) == set(RESULT_COLUMNS) for row in rows)
+
+        expected = StrategyEvaluator().evaluate_strategy(MaBaseStrategy(), klines)
+        row = rows[0]
+        assert row["code"] == "SH.600000"
+        assert row["bars"] == len(klines)
+        assert row["start"] == klines[0]["time_key"]
+        assert row["end"] == klines[-1]["time_key"]
+        assert row["error"] is None
+        assert row["total_score"] == pytest.approx(expected["rating"]["total_score"])
+        metrics = expected["backtest_result"]["metrics"]
+        assert row["total_trades"] == metrics["total_trades"]
+        assert row["sharpe_ratio"] == pytest.approx(metrics["sharpe_ratio"])
+
+    def test_missing_klines(self):
+        """没有K线的股票记一行错误"""
+        rows = evaluate_ticker("SH.600001", None, STRATEGIES, AdvancedBacktestEngine())
+        assert len(rows) == 1
+        assert rows[0]["error"] and rows[0]["strategy"] is None
+
+    def test_process_pool(self):
+        """多进程结果按输入顺序排列，与单进程相同"""
+        tasks = [(f"SH.60000{i}", _klines(i)) for i in range(4)] + [("SH.600009", [])]
+        serial = BatchStrategyEvaluator(STRATEGIES, workers=0).run(tasks)
+        with BatchStrategyEvaluator(STRATEGIES, workers=2, max_pending=2) as batch:
+            parallel = batch.run(iter(tasks))
+            executor = batch._executor
+            # 再次运行复用同一进程池
+            again = batch.run(tasks[:2])
+            assert batch._executor is executor
+        assert batch._executor is None
+        assert list(serial.columns) == list(RESULT_COLUMNS)
+        assert len(serial) == 4 * len(STRATEGIES) + 1
+        pd.testing.assert_frame_equal(serial, parallel)
+        assert again["total_score"].tolist() == (
+            serial["total_score"][: 2 * len(STRATEGIES)].tolist()
+        )
+
+    def test_leaderboard_and_output(self, tmp_path):
+        """排行榜按策略汇总并跳过错误行，结果表可写成 CSV"""
+        tasks = [(f"SH.60000{i}", _klines(i)) for i in range(3)] + [("SH.600009", [])]
+        table = BatchStrategyEvaluator(STRATEGIES, workers=0).run(tasks)
+
+        board = leaderboard(table)
+        assert set(board.index) == {s.get_key() for s in STRATEGIES}
+        assert (board["tickers"] == 3).all()
+        assert board["total_score"].is_monotonic_decreasing
+        ma = table[table["strategy"] == MaBaseStrategy().get_key()]
+        assert board.loc[MaBaseStrategy().get_key(), "sharpe_ratio"] == pytest.approx(
+            ma["sharpe_ratio"].mean()
+        )
+        with pytest.raises(ValueError):
+            leaderboard(table, "unknown")
+
+        path = write_results(table, str(tmp_path / "out" / "strategies.csv"))
+        loaded = pd.read_csv(path)
+        assert list(loaded.columns) == list(RESULT_COLUMNS)
+        assert len(loaded) == len(table)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""
+批量指标计算单元测试
+以逐只股票的 calculate_by_key 为基准，验证批量结果逐位一致
+"""
+
+import numpy as np
+import pytest
+
+from core.indicator import Indicator
+from core.indicator.simple_nntrs_indicator import SimpleNNTRSIIndicator
+from core.indicator.volume_supertrend_ai_indicator import VolumeSuperTrendAIIndicator
+from core.schema.k_line import KLineBatch, KLineFrame
+from core.utils import batch_kernels, kernels
+from core.utils.utils import UtilsHelper
+
+
+def _frames(count: int, max_length: int) -> list[KLineFrame]:
+    rng = np.random.default_rng(count)
+    frames = []
+    for row in range(count):
+        length = int(rng.integers(1, max_length))
+        close = 30 + np.cumsum(rng.normal(0, 1, length))
+        if row == 0:
+            close[:] = 12.0  # 停牌价格不变
+        frames.append(
+            KLineFrame.from_columns(
+                [f"d{i}" for i in range(length)],
+                high=close + rng.uniform(0, 1, length),
+                low=close - rng.uniform(0, 1, length),
+                open=close,
+                close=close,
+                volume=rng.uniform(1e5, 2e5, length),
+            )
+        )
+    return frames
+
+
+@pytest.mark.unit
+class TestBatchKernels:
+    """测试按行内核与一维实现逐位一致"""
+
+    def test_matches_row_by_row(self):
+        """测试各内核的每一行与单独计算相同"""
+        data = 100 + np.cumsum(np.random.default_rng(1).normal(0, 1, (6, 80)), axis=1)
+        utils = UtilsHelper()
+        for day_count in (1, 3, 14, 100):
+            for index, row in enumerate(data):
+                for name in ("sma", "wma", "avedev", "highest", "lowest"):
+                    expected = getattr(kernels, name)(row, day_count)
+                    actual = getattr(batch_kernels, name)(data, day_count)[index]
+                    np.testing.assert_array_equal(actual, expected)
+                assert batch_kernels.ema(data, day_count)[index].tolist() == (
+                    utils.ema(row, day_count)
+                )
+                assert batch_kernels.ma(data, day_count, 1)[index].tolist() == (
+                    utils.ma(row, day_count, 1)
+                )
+                assert batch_kernels.rma(data, day_count)[index].tolist() == (
+                    utils.rma(row, day_count)
+                )
+
+    def test_requires_matrix(self):
+        """测试一维输入报错"""
+        with pytest.raises(ValueError):
+            batch_kernels.sma([1.0, 2.0], 2)
+
+
+@pytest.mark.unit
+class TestKLineBatch:
+    """测试批量K线容器"""
+
+    def test_from_frames(self):
+        """测试按行左对齐、以最后一根K线填充"""
+        frames = _frames(3, 20)
+        batch = KLineBatch.from_frames(frames)
+
+        assert len(batch) == 3
+        assert batch.shape[1] == max(len(frame) for frame in frames)
+        for row, frame in enumerate(frames):
+            assert batch.frame(row).to_klines() == frame.to_klines()
+            assert np.all(batch.close[row, len(frame) :] == frame.close[-1])
+        assert batch.last(batch.close).tolist() == [f.close[-1] for f in frames]
+
+    def test_from_columns(self):
+        """测试由二维数组构建及形状校验"""
+        batch = KLineBatch.from_columns([2, 1], close=[[1, 2], [3, 0]])
+        assert batch.frame(1).close.tolist() == [3]
+        with pytest.raises(ValueError):
+            KLineBatch.from_columns([3, 1], close=[[1, 2], [3, 0]])
+        with pytest.raises(ValueError):
+            KLineBatch.from_columns([2, 2], price=[[1, 2], [3, 0]])
+
+
+@pytest.mark.unit
+class TestIndicatorBatch:
+    """测试 Indicator.calculate_batch 与逐只计算一致"""
+
+    def test_default_indicators(self):
+        """测试默认指标组的 score/status/days/history 完全相同"""
+        frames = _frames(12, 260)
+        indicator = Indicator()
+        result = indicator.calculate_batch(KLineBatch.from_frames(frames))
+
+        for row, frame in enumerate(frames):
+            for key in result[row]:
+                assert result[row][key] == indicator.calculate_by_key(key, frame)
+
+    @pytest.mark.parametrize(
+        "item",
+        [
+            VolumeSuperTrendAIIndicator(maSrc="SMA"),
+            VolumeSuperTrendAIIndicator(maSrc="EMA"),
+            VolumeSuperTrendAIIndicator(maSrc="RMA"),
+            VolumeSuperTrendAIIndicator(maSrc="VWMA"),
+            SimpleNNTRSIIndicator(use_median=True),
+        ],
+    )
+    def test_indicator_variants(self, item):
+        """测试其他参数及逐行回退的指标"""
+        frames = _frames(5, 200)
+        indicator = Indicator([item])
+        result = indicator.calculate_batch(KLineBatch.from_frames(frames))
+
+        for row, frame in enumerate(frames):
+            expected = indicator.calculate_by_key(item.get_key(), frame)
+            assert result[row][item.get_key()] == expected
+
+    def test_empty_row(self):
+        """测试空行报错"""
+        batch = KLineBatch.from_frames(_frames(2, 10) + [[]])
+        with pytest.raises(ValueError):
+            Indicator().calculate_batch(batch)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+"""
+按股票ID批量读取单元测试
+批量读取的结果与逐只读取一致，查询次数只与分组数有关
+"""
+
+
+import pytest
+
+from core.data_source_helper import DataSourceHelper
+from core.database import batch_read
+from core.database.batch_read import chunk_ids, in_clause
+from core.enum.ticker_k_type import TickerKType
+from core.handler import ticker_filter_handler
+from core.handler.ticker_filter_handler import TickerFilterHandler
+from core.handler.ticker_k_line_handler import TickerKLineHandler
+from core.models.ticker_score import TickerScore
+from core.service.ticker_indicator_repository import TickerIndicatorRepository
+from core.service.ticker_repository import TickerRepository
+from core.service.ticker_score_repository import TickerScoreRepository
+from core.service.ticker_strategy_repository import TickerStrategyRepository
+from core.service.ticker_valuation_repository import TickerValuationRepository
+
+DAY = TickerKType.DAY.value
+
+
+@pytest.fixture
+def ticker_ids(sqlite_helper):
+    """5只股票，最后一只没有任何记录"""
+    ids = []
+    for i in range(5):
+        ticker = TickerRepository(sqlite_helper).create(
+            f"SH.{600000 + i}", f"股票{i}", {}
+        )
+        ids.append(ticker.id)
+        if i == 4:
+            continue
+        TickerScoreRepository(sqlite_helper).append_items(
+            ticker.id,
+            [
+                TickerScore(
+                    id=0, ticker_id=0, time_key=f"2024-06-{day:02d}", score=i + day
+                )
+                for day in range(1, 4 + i)
+            ],
+        )
+        TickerStrategyRepository(sqlite_helper).update_item(
+            ticker.id, "MA", DAY, "2024-06-05", {"data": [i], "pos_data": []}
+        )
+        TickerIndicatorRepository(sqlite_helper).update_item(
+            ticker.id, "MACD", DAY, "2024-06-05", {"history": [i]}
+        )
+        TickerValuationRepository(sqlite_helper).update_item(
+            ticker.id, "PE", "2024-06-05", {"target_price": 10.0 + i}
+        )
+    return ids
+
+
+class _CountingHelper:
+    """记录查询次数的数据库连接"""
+
+    def __init__(self, helper):
+        self.helper = helper
+        self.queries = 0
+
+    def query(self, sql, params=None):
+        self.queries += 1
+        return self.helper.query(sql, params)
+
+
+@pytest.mark.unit
+class TestChunk:
+    """ID分组测试"""
+
+    def test_chunk_ids(self):
+        """去重并保持顺序，按组大小切分"""
+        assert list(chunk_ids([3, 1, 3, 2, 1, 4], size=2)) == [[3, 1], [2, 4]]
+        assert list(chunk_ids([])) == []
+
+    def test_in_clause(self):
+        """按参数个数生成占位符"""
+        assert in_clause("ticker_id", 3, "?") == "ticker_id IN (?, ?, ?)"
+        assert in_clause("code", 1, "%s") == "code IN (%s)"
+
+
+@pytest.mark.unit
+class TestGetManyByTickerIds:
+    """批量读取测试"""
+
+    def test_scores_match_single_reads(self, sqlite_helper, ticker_ids):
+        """批量读取的评分与逐只读取一致，没有评分的股票为空列表"""
+        repository = TickerScoreRepository(sqlite_helper)
+        scores = repository.get_many_by_ticker_ids(ticker_ids)
+        assert list(scores) == ticker_ids
+        for ticker_id in ticker_ids:
+            expected = repository.get_scores(ticker_id)
+            assert [item.time_key for item in scores[ticker_id]] == [
+                item.time_key for item in expected
+            ]
+        assert scores[ticker_ids[4]] == []
+
+        limited = repository.get_many_by_ticker_ids(
+            ticker_ids, start="2024-06-02", limit=2
+        )
+        for ticker_id in ticker_ids:
+            expected = repository.get_scores(ticker_id, start="2024-06-02", limit=2)
+            assert [item.time_key for item in limited[ticker_id]] == [
+                item.time_key for item in expected
+            ]
+
+    def test_latest_time_keys(self, sqlite_helper, ticker_ids):
+        """批量获取最新评分时间，没有评分的股票不在结果中"""
+        repository = TickerScoreRepository(sqlite_helper)
+        latest = repository.get_latest_time_keys(ticker_ids)
+        assert latest == {
+            ticker_id: repository.get_latest_time_key(ticker_id)
+            for ticker_id in ticker_ids[:4]
+        }
+
+    def test_other_tables(self, sqlite_helper, ticker_ids):
+        """策略、指标、估值的批量读取与逐只读取一致"""
+        strategy_repo = TickerStrategyRepository(sqlite_helper)
+        indicator_repo = TickerIndicatorRepository(sqlite_helper)
+        valuation_repo = TickerValuationRepository(sqlite_helper)
+        strategies = strategy_repo.get_many_by_ticker_ids(ticker_ids, DAY)
+        indicators = indicator_repo.get_many_by_ticker_ids(ticker_ids, DAY)
+        valuations = valuation_repo.get_many_by_ticker_ids(ticker_ids)
+        for ticker_id in ticker_ids:
+            assert strategies[ticker_id] == strategy_repo.get_items_by_ticker_id(
+                ticker_id, DAY
+            )
+            assert indicators[ticker_id] == indicator_repo.get_items_by_ticker_id(
+                ticker_id, DAY
+            )
+            assert valuations[ticker_id] == valuation_repo.get_items_by_ticker_id(
+                ticker_id
+            )
+        assert strategies[ticker_ids[0]][0].data == [0]
+
+    def test_query_count(self, sqlite_helper, ticker_ids, monkeypatch):
+        """每组ID一条查询"""
+        monkeypatch.setattr(batch_read, "IN_CHUNK_SIZE", 2)
+        counting = _CountingHelper(sqlite_helper)
+        scores = TickerScoreRepository(counting).get_many_by_ticker_ids(ticker_ids)
+        assert counting.queries == 3
+        assert sum(len(items) for items in scores.values()) == 3 + 4 + 5 + 6
+
+    def test_tickers_by_codes(self, sqlite_helper, ticker_ids):
+        """按代码批量获取股票，不存在的代码不在结果中"""
+        tickers = TickerRepository(sqlite_helper).get_by_codes(
+            ["SH.600001", "SH.600003", "SH.699999"]
+        )
+        assert sorted(tickers) == ["SH.600001", "SH.600003"]
+        assert tickers["SH.600001"].id == ticker_ids[1]
+
+    def test_need_update_tickers(self, sqlite_helper, ticker_ids, monkeypatch):
+        """批量检查是否需要更新，最后交易日只取一次"""
+        data_helper = DataSourceHelper.__new__(DataSourceHelper)
+        data_helper.score_repo = TickerScoreRepository(sqlite_helper)
+        calls = []
+
+        def last_trading_date():
+            calls.append(1)
+            return "2024-06-05"
+
+        monkeypatch.setattr(data_helper, "_get_last_trading_date", last_trading_date)
+        monkeypatch.setattr(data_helper, "_is_market_open_now", lambda market: False)
+        tickers = TickerRepository(sqlite_helper).get_by_codes(
+            f"SH.{600000 + i}" for i in range(5)
+        )
+        need_update = data_helper._need_update_tickers(
+            [tickers[f"SH.{600000 + i}"] for i in range(5)]
+        )
+        assert [need_update[ticker_id] for ticker_id in ticker_ids] == [
+            True,
+            True,
+            False,
+            False,
+            True,
+        ]
+        assert len(calls) == 1
+
+    def test_filter_handler(self, sqlite_helper, ticker_ids, monkeypatch):
+        """筛选按批预取各表数据，K线经 get_kl 获取，无K线时传空列表"""
+        for name, repository in (
+            ("TickerScoreRepository", TickerScoreRepository),
+            ("TickerStrategyRepository", TickerStrategyRepository),
+            ("TickerIndicatorRepository", TickerIndicatorRepository),
+            ("TickerValuationRepository", TickerValuationRepository),
+        ):
+            monkeypatch.setattr(
+                ticker_filter_handler,
+                name,
+                lambda repository=repository: repository(sqlite_helper),
+            )
+        klines = {"SH.600000": [{"close": 1.0}]}
+
+        def get_kl(self, code, source, start_date, end_date):
+            assert (source, start_date) == (1, handler.startDate)
+            return klines.get(code), source if code in klines else None
+
+        class Rule:
+            def __init__(self):
+                self.calls = []
+
+            def calculate(self, ticker, kl_data, strategies, indicators, scores, _):
+                self.calls.append((ticker["code"], kl_data, len(scores)))
+                return ticker["id"] == ticker_ids[1]
+
+        monkeypatch.setattr(TickerKLineHandler, "get_kl", get_kl)
+        monkeypatch.setattr(ticker_filter_handler, "FILTER_BATCH_SIZE", 2)
+        rule = Rule()
+        handler = TickerFilterHandler(rule)
+        handler.startDate = "2024-06-01"
+        tickers = [
+            {"id": ticker_id, "code": f"SH.{600000 + i}", "name": "", "source": 1}
+            for i, ticker_id in enumerate(ticker_ids)
+        ]
+        assert handler.run(tickers) == [tickers[1]]
+        assert rule.calls[:2] == [
+            ("SH.600000", [{"close": 1.0}], 3),
+            ("SH.600001", [], 4),
+        ]
+        assert len(rule.calls) == len(ticker_ids)
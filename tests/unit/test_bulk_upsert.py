@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+"""
+批量 UPSERT 单元测试
+验证各数据库的语句形式，以及在 SQLite 上与逐条 update_item 写入结果一致
+"""
+
+
+import pytest
+
+from core.database.sqlite_helper import SqliteHelper
+from core.database.upsert import build_upsert_sql
+from core.service.ticker_indicator_repository import TickerIndicatorRepository
+from core.service.ticker_strategy_repository import TickerStrategyRepository
+
+
+def _rows(repository, ticker_id):
+    return sorted(
+        (
+            item.model_dump(exclude={"id", "create_time"})
+            for item in repository.get_items_by_ticker_id(ticker_id, "day")
+        ),
+        key=str,
+    )
+
+
+@pytest.mark.unit
+class TestBuildUpsertSql:
+    """语句生成测试"""
+
+    def test_sqlite_on_conflict(self):
+        """SQLite 使用 ON CONFLICT ... DO UPDATE 和 excluded"""
+        sql = build_upsert_sql(
+            "sqlite", "t", ("a", "b", "c"), ("a",), ("b", "c"), 2, keep_on_null=("c",)
+        )
+        assert sql == (
+            "INSERT INTO t (a, b, c) VALUES (?, ?, ?), (?, ?, ?) "
+            "ON CONFLICT (a) DO UPDATE SET b = excluded.b, "
+            "c = COALESCE(excluded.c, t.c)"
+        )
+
+    def test_mysql_on_duplicate_key(self):
+        """MySQL 使用 ON DUPLICATE KEY UPDATE 和 VALUES()"""
+        sql = build_upsert_sql(
+            "mysql", "t", ("a", "b"), ("a",), ("b",), 1, keep_on_null=("b",)
+        )
+        assert sql == (
+            "INSERT INTO t (a, b) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE b = COALESCE(VALUES(b), b)"
+        )
+
+    def test_postgres_placeholder(self):
+        """PostgreSQL 使用 %s 占位符和 ON CONFLICT"""
+        sql = build_upsert_sql("postgresql", "t", ("a", "b"), ("a",), ("b",), 1)
+        assert sql.startswith("INSERT INTO t (a, b) VALUES (%s, %s) ON CONFLICT (a)")
+
+    def test_empty_rows(self):
+        """没有数据时报错"""
+        with pytest.raises(ValueError):
+            build_upsert_sql("sqlite", "t", ("a",), ("a",), ("a",), 0)
+
+
+@pytest.mark.unit
+class TestBulkUpsert:
+    """仓库批量写入测试"""
+
+    STRATEGIES = {
+        "macd": {"data": {"buy": [1, 2]}, "pos_data": {"pos": 1}, "status": 1},
+        "ma": {"data": {"buy": []}, "pos_data": None},
+    }
+    STRATEGIES_NEXT = {
+        "macd": {"data": None, "pos_data": {"pos": 2}, "status": 2},
+        "ma": {"data": {"buy": [3]}, "pos_data": {"pos": 3}},
+        "boll": {"data": {"sell": [1]}},
+    }
+    INDICATORS = {
+        "rsi": {"history": [{"value": 50}]},
+        "kdj": {"history": [{"k": 1}], "status": 1},
+    }
+    INDICATORS_NEXT = {
+        "rsi": {"history": None, "status": 2},
+        "kdj": {"history": [{"k": 2}]},
+    }
+
+    def test_strategy_matches_update_item(self, sqlite_db_path):
+        """策略批量写入与逐条写入结果一致，新值为空时保留原值"""
+        bulk = TickerStrategyRepository(SqliteHelper(sqlite_db_path))
+        single = TickerStrategyRepository(SqliteHelper(sqlite_db_path))
+        for time_key, results in (
+            ("2024-06-27", self.STRATEGIES),
+            ("2024-06-28", self.STRATEGIES_NEXT),
+        ):
+            bulk.bulk_upsert(1, "day", time_key, results)
+            for key, value in results.items():
+                single.update_item(2, key, "day", time_key, value)
+
+        rows = _rows(bulk, 1)
+        assert len(rows) == 3
+        assert [{**row, "ticker_id": 2} for row in rows] == _rows(single, 2)
+        macd = bulk.get_item_by_ticker_id_and_strategy_key(1, "macd", "day")
+        assert macd.time_key == "2024-06-28"
+        assert macd.data == {"buy": [1, 2]}
+        assert macd.pos_data == {"pos": 2}
+        assert macd.status == 2
+
+    def test_indicator_matches_update_item(self, sqlite_db_path):
+        """指标批量写入与逐条写入结果一致"""
+        bulk = TickerIndicatorRepository(SqliteHelper(sqlite_db_path))
+        single = TickerIndicatorRepository(SqliteHelper(sqlite_db_path))
+        for time_key, results in (
+            ("2024-06-27", self.INDICATORS),
+            ("2024-06-28", self.INDICATORS_NEXT),
+        ):
+            bulk.bulk_upsert(1, "day", time_key, results)
+            for key, value in results.items():
+                single.update_item(2, key, "day", time_key, value)
+
+        rows = _rows(bulk, 1)
+        assert len(rows) == 2
+        assert [{**row, "ticker_id": 2} for row in rows] == _rows(single, 2)
+        rsi = bulk.get_item_by_ticker_id_and_indicator_key(1, "rsi", "day")
+        assert rsi.history == [{"value": 50}]
+        assert rsi.status == 2
+
+    def test_commit_deferred(self, sqlite_db_path):
+        """commit=False 时由调用方提交，回滚后不落库"""
+        repository = TickerIndicatorRepository(SqliteHelper(sqlite_db_path))
+        repository.bulk_upsert(1, "day", "2024-06-28", self.INDICATORS, commit=False)
+        repository.db.rollback()
+        assert repository.get_items_by_ticker_id(1, "day") == []
+        repository.bulk_upsert(1, "day", "2024-06-28", self.INDICATORS, commit=False)
+        repository.db.commit()
+        other = TickerIndicatorRepository(SqliteHelper(sqlite_db_path))
+        assert len(other.get_items_by_ticker_id(1, "day")) == 2
+
+    def test_empty_results(self, sqlite_db_path):
+        """没有数据时不执行语句"""
+        repository = TickerStrategyRepository(SqliteHelper(sqlite_db_path))
+        repository.bulk_upsert(1, "day", "2024-06-28", {})
+        assert repository.get_items_by_ticker_id(1, "day") == []
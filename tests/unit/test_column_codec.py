@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+"""
+历史序列列编码单元测试
+"""
+
+import json
+import math
+
+import numpy as np
+import pytest
+
+from core.models.ticker_indicator import (
+    TickerIndicatorCreate,
+    dict_to_ticker_indicator,
+    ticker_indicator_to_dict,
+)
+from core.models.ticker_strategy import (
+    TickerStrategyCreate,
+    dict_to_ticker_strategy,
+    ticker_strategy_to_dict,
+)
+from core.utils import column_codec
+from core.utils.column_codec import (
+    ColumnCodec,
+    decode_column,
+    encode_column,
+    register_codec,
+)
+
+
+def _positions(length: int = 600, seed: int = 0) -> list[int]:
+    rng = np.random.default_rng(seed)
+    return np.repeat(rng.integers(-1, 2, length // 4), 4).tolist()
+
+
+@pytest.mark.unit
+class TestColumnCodec:
+    """编码与解码测试"""
+
+    def test_int8_roundtrip(self):
+        """持仓序列按 i8 编码，解码后与原值相同且仍为 int"""
+        positions = _positions()
+        text = encode_column(positions, compact=True)
+        assert text.startswith("~i8:")
+        decoded = decode_column(text)
+        assert decoded == positions
+        assert {type(value) for value in decoded} == {int}
+
+    def test_int8_size(self):
+        """600 根K线的持仓序列比 JSON 小一个数量级"""
+        positions = _positions()
+        assert len(encode_column(positions, compact=True)) * 10 < len(
+            json.dumps(positions)
+        )
+
+    def test_float32_roundtrip(self):
+        """浮点序列按 float32 存储，保留 NaN"""
+        values = [1.5, -2.25, float("nan"), 3.14159]
+        text = encode_column(values, compact=True)
+        assert text.startswith("~f32:")
+        decoded = decode_column(text)
+        assert decoded[:2] == [1.5, -2.25]
+        assert math.isnan(decoded[2])
+        assert decoded[3] == pytest.approx(3.14159, rel=1e-6)
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            {"raw_score": 0.5},
+            [{"buy": 1.0}],
+            [1, None, -1],
+            [True, False],
+            [[1, 2], [3, 4]],
+            [1000, -1000],
+            ["a", "b"],
+            [],
+        ],
+    )
+    def test_json_fallback(self, value):
+        """非一维数值序列或超出 int8 范围时使用 JSON"""
+        text = encode_column(value, compact=True)
+        assert text == json.dumps(value)
+        assert decode_column(text) == value
+
+    def test_json_mode(self, monkeypatch):
+        """COLUMN_CODEC=json 时只写 JSON"""
+        monkeypatch.setenv("COLUMN_CODEC", "json")
+        assert encode_column([1, 0, -1]) == "[1, 0, -1]"
+        assert encode_column(None) is None
+
+    def test_invalid_payload(self):
+        """未知编码或损坏的数据抛出 ValueError"""
+        with pytest.raises(ValueError):
+            decode_column("~zz:AAAA")
+        with pytest.raises(ValueError):
+            decode_column("~i8:not-base64!")
+
+    def test_register_codec(self, monkeypatch):
+        """注册的编码可用于编码和解码"""
+
+        class BoolCodec(ColumnCodec):
+            name = "b1"
+
+            def encode(self, array):
+                if array.dtype.kind != "b":
+                    return None
+                return np.packbits(array).tobytes() + bytes([len(array)])
+
+            def decode(self, payload):
+                bits = np.unpackbits(np.frombuffer(payload[:-1], dtype=np.uint8))
+                return bits[: payload[-1]].astype(bool).tolist()
+
+        monkeypatch.setattr(column_codec, "_codecs", dict(column_codec._codecs))
+        register_codec(BoolCodec())
+        text = encode_column([True, False, True], compact=True)
+        assert text.startswith("~b1:")
+        assert decode_column(text) == [True, False, True]
+
+
+@pytest.mark.unit
+class TestModelConverters:
+    """模型转换测试"""
+
+    def test_indicator(self, monkeypatch):
+        """指标历史写入时编码、读取时解码"""
+        monkeypatch.delenv("COLUMN_CODEC", raising=False)
+        positions = _positions()
+        row = ticker_indicator_to_dict(
+            TickerIndicatorCreate(
+                ticker_id=1,
+                indicator_key="MACD",
+                kl_type="K_DAY",
+                time_key="2024-06-28",
+                history=positions,
+            )
+        )
+        assert row["history"].startswith("~i8:")
+        model = dict_to_ticker_indicator({**row, "id": 1})
+        assert model.history == positions
+
+    def test_strategy(self, monkeypatch):
+        """策略持仓序列编码，交易记录仍为 JSON；旧的 JSON 数据照常读取"""
+        monkeypatch.delenv("COLUMN_CODEC", raising=False)
+        positions = _positions()
+        trades = [{"start_date": "2024-01-02", "profit": 1.5}]
+        row = ticker_strategy_to_dict(
+            TickerStrategyCreate(
+                ticker_id=1,
+                strategy_key="MACD",
+                kl_type="K_DAY",
+                time_key="2024-06-28",
+                data=trades,
+                pos_data=positions,
+            )
+        )
+        assert row["pos_data"].startswith("~i8:")
+        assert row["data"] == json.dumps(trades)
+        model = dict_to_ticker_strategy({**row, "id": 1})
+        assert model.pos_data == positions
+        assert model.data == trades
+        legacy = dict_to_ticker_strategy({**row, "id": 1, "pos_data": "[1, 0]"})
+        assert legacy.pos_data == [1, 0]
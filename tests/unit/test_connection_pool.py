@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+"""
+数据库连接池单元测试
+用假连接验证复用、容量上限、健康检查和回收，并验证 DbAdapter 默认从池中借出连接
+"""
+
+import threading
+
+import pytest
+
+from core.database import connection_pool
+from core.database.connection_pool import ConnectionPool, PoolTimeoutError
+from core.data_source_helper import DataSourceHelper
+from core.database.db_adapter import DbAdapter
+from tests.utils import FakeClock
+
+
+class FakeCursor:
+    def __init__(self, helper):
+        self.helper = helper
+
+    def execute(self, sql):
+        if self.helper.broken:
+            raise RuntimeError("connection lost")
+
+    def fetchall(self):
+        return [(1,)]
+
+
+class FakeHelper:
+    def __init__(self):
+        self.broken = False
+        self.closed = False
+        self.rollbacks = 0
+        self.cursor = FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _pool(clock, **kwargs):
+    return ConnectionPool(FakeHelper, clock=clock, **kwargs)
+
+
+@pytest.mark.unit
+class TestConnectionPool:
+    """测试 ConnectionPool"""
+
+    def test_reuse(self, clock):
+        """测试归还的连接被复用，归还时回滚未提交事务"""
+        pool = _pool(clock, pool_size=2)
+        first = pool.acquire()
+        pool.release(first)
+        assert pool.acquire() is first
+        assert first.rollbacks == 1
+        stats = pool.stats()
+        assert (stats["created"], stats["checkouts"], stats["in_use"]) == (1, 2, 1)
+
+    def test_overflow_and_timeout(self, clock):
+        """测试超出常驻数量的连接归还时关闭，全部借出后等待超时"""
+        pool = _pool(clock, pool_size=1, max_overflow=1)
+        first, second = pool.acquire(), pool.acquire()
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire(timeout=0)
+
+        pool.release(first)
+        pool.release(second)
+        assert second.closed and not first.closed
+        stats = pool.stats()
+        assert (stats["idle"], stats["timeouts"], stats["closed"]) == (1, 1, 1)
+
+    def test_waits_for_release(self):
+        """测试无可用连接时等待其他线程归还"""
+        pool = ConnectionPool(FakeHelper, pool_size=1, max_overflow=0, timeout=5)
+        held = pool.acquire()
+        timer = threading.Timer(0.05, pool.release, args=(held,))
+        timer.start()
+        assert pool.acquire() is held
+        timer.join()
+        assert pool.stats()["waits"] >= 1
+
+    def test_ping_and_recycle(self, clock):
+        """测试空闲过久的连接借出前检查，损坏或超过存活时间的连接重建"""
+        pool = _pool(clock, pool_size=1, ping_interval=10, recycle=100)
+        helper = pool.acquire()
+        pool.release(helper)
+        clock.now = 20
+        helper.broken = True
+        replacement = pool.acquire()
+        assert replacement is not helper and helper.closed
+        assert pool.stats()["failed_pings"] == 1
+
+        clock.now = 200
+        pool.release(replacement)
+        assert replacement.closed and pool.stats()["recycled"] == 1
+
+    def test_discard(self, clock):
+        """测试重复归还被忽略，discard 时直接关闭"""
+        pool = _pool(clock)
+        helper = pool.acquire()
+        pool.release(helper, discard=True)
+        pool.release(helper)
+        assert helper.closed and pool.stats()["idle"] == 0
+
+
+@pytest.mark.unit
+class TestDbAdapterPool:
+    """测试 DbAdapter 使用连接池"""
+
+    def test_adapter_returns_connection(self, tmp_path, monkeypatch):
+        """测试 DbAdapter 关闭或被回收时归还连接，下一个仓库复用同一连接"""
+        monkeypatch.setenv("DB_TYPE", "sqlite")
+        monkeypatch.setenv("SQLITE_DB_PATH", str(tmp_path / "pool.db"))
+        monkeypatch.setattr(connection_pool, "_pools", {})
+
+        adapter = DbAdapter()
+        helper = adapter.db
+        adapter.execute("CREATE TABLE t (v INTEGER)")
+        adapter.commit()
+        del adapter
+        other = DbAdapter()
+        assert other.db is helper
+        assert other.query("SELECT * FROM t") == []
+        other.close()
+        other.close()
+
+        stats = next(iter(connection_pool.pool_stats().values()))
+        assert (stats["created"], stats["checkouts"], stats["idle"]) == (1, 2, 1)
+        assert DbAdapter(pooled=False).db is not helper
+
+    def test_data_source_helper_close(self, tmp_path, monkeypatch):
+        """测试 DataSourceHelper 关闭后归还各仓库借出的连接"""
+        monkeypatch.setenv("DB_TYPE", "sqlite")
+        monkeypatch.setenv("SQLITE_DB_PATH", str(tmp_path / "pool.db"))
+        monkeypatch.setattr(connection_pool, "_pools", {})
+
+        with DataSourceHelper() as helper:
+            stats = next(iter(connection_pool.pool_stats().values()))
+            assert stats["in_use"] == 3
+        stats = next(iter(connection_pool.pool_stats().values()))
+        assert (stats["in_use"], stats["idle"]) == (0, 3)
+        helper.close()
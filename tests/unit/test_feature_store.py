@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+"""
+特征缓存单元测试
+"""
+
+import numpy as np
+import pytest
+
+from core.handler.ticker_strategy_handler import StrategyCalculator
+from core.indicator import Indicator
+from core.schema.k_line import KLineFrame
+from core.utils.feature_store import FeatureStore
+from core.utils.utils import UtilsHelper
+
+
+def _frame(length: int) -> KLineFrame:
+    rng = np.random.default_rng(length)
+    close = 30 + np.cumsum(rng.normal(0, 1, length))
+    return KLineFrame.from_columns(
+        [f"d{i}" for i in range(length)],
+        high=close + 1,
+        low=close - 1,
+        open=close,
+        close=close,
+        volume=rng.uniform(1e5, 2e5, length),
+    )
+
+
+@pytest.mark.unit
+class TestFeatureStore:
+    """测试特征缓存的计算结果与命中统计"""
+
+    def test_matches_utils_helper(self):
+        """测试缓存结果与 UtilsHelper 直接计算一致"""
+        frame = _frame(80)
+        features = FeatureStore(frame)
+        utils = UtilsHelper()
+
+        assert list(features.ema(13)) == utils.ema(frame.close, 13)
+        assert list(features.wma(21)) == utils.wma(frame.close, 21)
+        assert list(features.lowest(9)) == utils.lowest(frame.low, 9)
+        assert list(features.ratr(5)) == utils.ratr(frame, 5)
+        assert list(features.cci(14)) == utils.cci(frame, 14)
+        assert list(features.sma(20, "volume")) == utils.sma(frame.volume, 20)
+
+    def test_hit_and_miss_counters(self):
+        """测试相同 (primitive, source, params) 只计算一次"""
+        features = FeatureStore(_frame(30))
+        first = features.ema(21)
+        second = features.ema(21)
+        features.ema(21, "high")
+
+        assert first is second
+        assert isinstance(first, tuple)
+        assert features.stats() == {
+            "hits": 1,
+            "misses": 2,
+            "size": 2,
+            "hit_rate": 0.3333,
+        }
+
+    def test_resolve(self):
+        """测试 resolve 优先使用传入的 context"""
+        frame = _frame(10)
+        features = FeatureStore(frame)
+        assert FeatureStore.resolve(frame, features) is features
+        assert FeatureStore.resolve(frame) is not features
+
+    def test_invalid_request(self):
+        """测试未知的数据源和计算方法"""
+        features = FeatureStore(_frame(10))
+        with pytest.raises(ValueError):
+            features.get("ema", "price", 5)
+        with pytest.raises(ValueError):
+            features.get("run_process", "close")
+
+    def test_shared_context_in_pipeline(self):
+        """测试指标与策略共享缓存时结果不变且有命中"""
+        frame = _frame(200)
+        features = FeatureStore(frame)
+
+        strategies = StrategyCalculator().calculate(frame, features)
+        indicators = Indicator().calculate(frame, features)
+
+        assert strategies == StrategyCalculator().calculate(frame)
+        assert indicators == Indicator().calculate(frame)
+        assert features.hits > 0
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+"""
+列式K线容器单元测试
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from core.handler.ticker_strategy_handler import StrategyCalculator
+from core.indicator import Indicator
+from core.schema.k_line import KLine, KLineFrame, as_kline_frame
+
+
+def _klines(length: int) -> list[KLine]:
+    rng = np.random.default_rng(length)
+    close = 50 + np.cumsum(rng.normal(0, 1, length))
+    return [
+        KLine(
+            time_key=(date(2024, 1, 1) + timedelta(days=i)).strftime("%Y-%m-%d"),
+            high=close[i] + 1,
+            low=close[i] - 1,
+            open=close[i] - 0.5,
+            close=close[i],
+            volume=1000.0 + i,
+            turnover=(1000.0 + i) * close[i],
+            turnover_rate=0.1,
+        )
+        for i in range(length)
+    ]
+
+
+@pytest.mark.unit
+class TestKLineFrame:
+    """测试 KLineFrame 的构建、访问和修改"""
+
+    def test_round_trip(self):
+        """测试 list[KLine] 与 KLineFrame 互转一致"""
+        klines = _klines(20)
+        frame = KLineFrame.from_klines(klines)
+
+        assert len(frame) == 20
+        assert frame.to_klines() == klines
+        assert frame[-1] == klines[-1]
+        assert list(frame.time_key) == [k.time_key for k in klines]
+
+    def test_accepts_dicts(self):
+        """测试字典输入，缺失的数值列按0处理"""
+        frame = KLineFrame.from_klines(
+            [{"time_key": "2024-01-01", "close": 10, "high": 11, "low": 9}]
+        )
+        assert frame.close[0] == 10
+        assert frame.turnover_rate[0] == 0
+        assert frame.to_dicts()[0]["high"] == 11
+
+    def test_column_is_view(self):
+        """测试列属性为零拷贝视图"""
+        frame = KLineFrame.from_klines(_klines(5))
+        frame.close[0] = 123.0
+        assert frame[0].close == 123.0
+
+    def test_slice_is_view_and_append_does_not_leak(self):
+        """测试切片共享内存，但在切片上追加不会改写原数据"""
+        frame = KLineFrame.from_klines(_klines(10))
+        head = frame[:5]
+        assert len(head) == 5
+        assert np.shares_memory(head.close, frame.close)
+
+        head.append(frame[9])
+        assert len(head) == 6
+        assert head[5] == frame[9]
+        assert frame[5] != frame[9]
+
+    def test_append_and_setitem(self):
+        """测试追加扩容和替换最后一根K线"""
+        klines = _klines(30)
+        frame = KLineFrame()
+        for kline in klines:
+            frame.append(kline)
+        assert frame.to_klines() == klines
+
+        frame[len(frame) - 1] = klines[0]
+        assert frame[-1] == klines[0]
+        with pytest.raises(IndexError):
+            frame[30]
+
+    def test_copy_is_independent(self):
+        """测试 copy 后修改互不影响"""
+        frame = KLineFrame.from_klines(_klines(5))
+        other = frame.copy()
+        other.close[0] = -1
+        assert frame.close[0] != -1
+
+    def test_from_columns(self):
+        """测试按列构建，未提供的列填0"""
+        frame = KLineFrame.from_columns(["a", "b"], close=[1, 2], volume=[3, 4])
+        assert frame[1].close == 2
+        assert frame.open.tolist() == [0, 0]
+        with pytest.raises(ValueError):
+            KLineFrame.from_columns(["a"], price=[1])
+        with pytest.raises(ValueError):
+            KLineFrame.from_columns(["a"], close=[1, 2])
+
+    def test_to_dataframe(self):
+        """测试转换为 DataFrame 的列与原列表一致"""
+        df = KLineFrame.from_klines(_klines(5)).to_dataframe()
+        assert list(df.columns) == [
+            "time_key",
+            "high",
+            "low",
+            "open",
+            "close",
+            "volume",
+            "turnover",
+            "turnover_rate",
+        ]
+        assert len(df) == 5
+
+    def test_as_kline_frame(self):
+        """测试已是 KLineFrame 时不复制"""
+        frame = KLineFrame.from_klines(_klines(3))
+        assert as_kline_frame(frame) is frame
+        assert len(as_kline_frame(None)) == 0
+
+
+@pytest.mark.unit
+class TestKLineFramePipeline:
+    """测试指标与策略对 list[KLine] 和 KLineFrame 输入结果一致"""
+
+    def test_indicator_and_strategy_results_match(self):
+        """测试两种输入的指标、策略结果相同"""
+        klines = _klines(150)
+        frame = KLineFrame.from_klines(klines)
+
+        assert Indicator().calculate(klines) == Indicator().calculate(frame)
+        assert StrategyCalculator().calculate(klines) == StrategyCalculator().calculate(
+            frame
+        )
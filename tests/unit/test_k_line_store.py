@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+"""
+本地K线存储单元测试
+用假数据源替换网络请求，验证增量拉取、复权检查和区间读取
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from core.handler.ticker_k_line_handler import TickerKLineHandler
+from core.schema.k_line import KLineFrame
+from core.utils.k_line_store import KLineStore, concat_frames, slice_by_date
+from core.utils.lru_cache import LRUCache
+
+CODE = "SH.600000"
+
+
+def _frame(start: int, length: int, offset: float = 0.0) -> KLineFrame:
+    days = [
+        (date(2024, 1, 1) + timedelta(days=i)).strftime("%Y-%m-%d")
+        for i in range(start, start + length)
+    ]
+    close = np.arange(start, start + length, dtype=np.float64) + 10 + offset
+    return KLineFrame.from_columns(
+        days, high=close + 1, low=close - 1, open=close, close=close, volume=close
+    )
+
+
+def _key(i: int) -> str:
+    return (date(2024, 1, 1) + timedelta(days=i)).strftime("%Y-%m-%d")
+
+
+class FakeSource:
+    """按请求区间从完整历史中截取数据，并记录请求"""
+
+    def __init__(self, history: KLineFrame):
+        self.history = history
+        self.calls = []
+
+    def __call__(self, code, source, start_date, end_date):
+        self.calls.append((start_date, end_date))
+        result = slice_by_date(self.history, start_date, end_date)
+        return (result.copy(), 1) if len(result) > 0 else (None, None)
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    monkeypatch.setattr(TickerKLineHandler, "_kl_cache", LRUCache(ttl=300))
+    return TickerKLineHandler(KLineStore(str(tmp_path)))
+
+
+@pytest.mark.unit
+class TestKLineStore:
+    """测试本地存储的读写"""
+
+    def test_save_and_load(self, tmp_path):
+        """测试保存后按内存映射读取，按市场分区存放"""
+        store = KLineStore(str(tmp_path))
+        frame = _frame(0, 30)
+        store.save(CODE, frame, _key(0), 2)
+
+        loaded, meta = store.load(CODE)
+        assert loaded.to_klines() == frame.to_klines()
+        assert meta["source"] == 2 and meta["start"] == _key(0)
+        assert (tmp_path / "SH" / f"{CODE}.npy").exists()
+        assert store.read(CODE, _key(5), _key(9)).to_klines() == frame[5:10].to_klines()
+        with pytest.raises(ValueError):
+            loaded.close[0] = 0
+
+    def test_missing_or_inconsistent(self, tmp_path):
+        """测试无数据或文件不一致时按无数据处理"""
+        store = KLineStore(str(tmp_path))
+        assert store.load(CODE) == (None, {})
+        store.save(CODE, _frame(0, 5), _key(0), 1)
+        (tmp_path / "SH" / f"{CODE}.json").write_text('{"time_key": []}')
+        assert store.load(CODE) == (None, {})
+
+    def test_merge_overlap(self, tmp_path):
+        """测试增量与本地重叠的日期以增量为准"""
+        store = KLineStore(str(tmp_path))
+        store.save(CODE, _frame(0, 10), _key(0), 1)
+        merged = store.merge(CODE, _frame(8, 5, offset=0.5), _key(0), 1)
+
+        assert list(merged.time_key) == [_key(i) for i in range(13)]
+        assert merged.close[7] == 17 and merged.close[8] == 18.5
+        assert concat_frames([_frame(0, 2), _frame(2, 2)]).close.tolist() == [
+            10,
+            11,
+            12,
+            13,
+        ]
+
+
+@pytest.mark.unit
+class TestTickerKLineHandlerStore:
+    """测试 get_kl 使用本地存储增量拉取"""
+
+    def test_delta_fetch(self, handler):
+        """测试首次整段拉取，之后只拉取最后两根之后的增量"""
+        source = FakeSource(_frame(0, 100))
+        handler._fetch_kl = source
+
+        frame, used = handler.get_kl(CODE, 1, _key(0), _key(59))
+        assert len(frame) == 60 and used == 1
+        assert source.calls == [(_key(0), _key(59))]
+
+        TickerKLineHandler._kl_cache.clear()
+        frame, _ = handler.get_kl(CODE, 1, _key(20), _key(99))
+        assert source.calls[-1] == (_key(58), _key(99))
+        assert frame.to_klines() == _frame(20, 80).to_klines()
+
+    def test_range_served_locally(self, handler):
+        """测试已落在本地的历史区间不访问数据源"""
+        source = FakeSource(_frame(0, 100))
+        handler._fetch_kl = source
+        handler.get_kl(CODE, 1, _key(0), _key(99))
+        TickerKLineHandler._kl_cache.clear()
+
+        frame, _ = handler.get_kl(CODE, 1, _key(10), _key(19))
+        assert len(source.calls) == 1
+        assert frame.to_klines() == _frame(10, 10).to_klines()
+
+    def test_adjustment_triggers_full_fetch(self, handler):
+        """测试已存K线价格变化（复权调整）时整段重新拉取"""
+        handler._fetch_kl = FakeSource(_frame(0, 60))
+        handler.get_kl(CODE, 1, _key(0), _key(59))
+        TickerKLineHandler._kl_cache.clear()
+
+        source = FakeSource(_frame(0, 80, offset=-1))
+        handler._fetch_kl = source
+        frame, _ = handler.get_kl(CODE, 1, _key(0), _key(79))
+        assert source.calls == [(_key(58), _key(79)), (_key(0), _key(79))]
+        assert frame.to_klines() == _frame(0, 80, offset=-1).to_klines()
+
+    def test_earlier_start_refetches(self, handler):
+        """测试请求早于本地覆盖范围时整段拉取"""
+        source = FakeSource(_frame(0, 100))
+        handler._fetch_kl = source
+        handler.get_kl(CODE, 1, _key(50), _key(99))
+        TickerKLineHandler._kl_cache.clear()
+
+        frame, _ = handler.get_kl(CODE, 1, _key(0), _key(99))
+        assert source.calls[-1] == (_key(0), _key(99))
+        assert len(frame) == 100
+
+    def test_source_unavailable(self, handler):
+        """测试数据源不可用时使用本地数据"""
+        handler._fetch_kl = FakeSource(_frame(0, 60))
+        handler.get_kl(CODE, 1, _key(0), _key(59))
+        TickerKLineHandler._kl_cache.clear()
+
+        handler._fetch_kl = lambda *args: (None, None)
+        frame, used = handler.get_kl(CODE, 3, _key(0), "2999-01-01")
+        assert len(frame) == 60 and used == 1
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+"""
+滑动窗口计算内核单元测试
+以 UtilsHelper 原有的逐窗口循环实现为基准，验证向量化内核的结果一致
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from core.utils import kernels
+from core.utils.utils import UtilsHelper
+
+
+def _window(i: int, day_count: int) -> int:
+    return day_count if i >= day_count - 1 else i + 1
+
+
+def ref_sum_list(data, day_count):
+    return [sum(data[i - j] for j in range(_window(i, day_count))) for i in range(len(data))]
+
+
+def ref_sma(data, day_count):
+    result = [data[0]]
+    for i in range(1, len(data)):
+        n = _window(i, day_count)
+        result.append(sum(data[i - j] for j in range(n)) / n)
+    return result
+
+
+def ref_wma(data, day_count):
+    result = [data[0]]
+    for i in range(1, len(data)):
+        n = _window(i, day_count)
+        norm = 0
+        s = 0
+        for j in range(n):
+            weight = (n - j) * n
+            norm += weight
+            s += data[i - j] * weight
+        result.append(s / norm)
+    return result
+
+
+def ref_stddev(data, day_count):
+    result = [0]
+    sma_data = ref_sma(data, day_count)
+    for i in range(1, len(data)):
+        n = _window(i, day_count)
+        s = sum((data[i - j] - sma_data[i]) ** 2 for j in range(n))
+        result.append(math.sqrt(s / n))
+    return result
+
+
+def ref_avedev(data, day_count):
+    result = [0]
+    sma_data = ref_sma(data, day_count)
+    for i in range(1, len(data)):
+        n = _window(i, day_count)
+        result.append(sum(abs(data[i - j] - sma_data[i]) for j in range(n)) / n)
+    return result
+
+
+def ref_highest(data, day_count):
+    return [max(data[i - _window(i, day_count) + 1 : i + 1]) for i in range(len(data))]
+
+
+def ref_lowest(data, day_count):
+    return [min(data[i - _window(i, day_count) + 1 : i + 1]) for i in range(len(data))]
+
+
+CASES = [
+    ("sum_list", ref_sum_list),
+    ("sma", ref_sma),
+    ("wma", ref_wma),
+    ("stddev", ref_stddev),
+    ("avedev", ref_avedev),
+    ("highest", ref_highest),
+    ("lowest", ref_lowest),
+]
+
+
+def _series(kind: str, length: int) -> list[float]:
+    rng = np.random.default_rng(length)
+    if kind == "walk":
+        return (100 + np.cumsum(rng.normal(0, 1, length))).tolist()
+    if kind == "flat":
+        return [12.34] * length
+    if kind == "volume":
+        return rng.normal(1e9, 1e7, length).tolist()
+    return rng.integers(-1, 2, length).astype(float).tolist()
+
+
+@pytest.mark.unit
+class TestKernelEquivalence:
+    """测试向量化内核与原循环实现等价"""
+
+    @pytest.mark.parametrize("name,ref", CASES)
+    @pytest.mark.parametrize("kind", ["walk", "flat", "volume", "signal"])
+    @pytest.mark.parametrize("length", [1, 2, 5, 21, 22, 250])
+    @pytest.mark.parametrize("day_count", [1, 2, 3, 14, 21, 365])
+    def test_matches_reference(self, name, ref, kind, length, day_count):
+        """测试各函数在不同序列和窗口下与基准实现一致"""
+        data = _series(kind, length)
+        expected = np.asarray(ref(data, day_count), dtype=np.float64)
+        actual = getattr(UtilsHelper(), name)(data, day_count)
+
+        assert isinstance(actual, list)
+        assert len(actual) == length
+        scale = max(1.0, float(np.max(np.abs(data))))
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9 * scale)
+
+    def test_accepts_numpy_input(self):
+        """测试可直接传入NumPy数组和pandas风格的values"""
+        data = np.array(_series("walk", 60))
+        np.testing.assert_allclose(
+            UtilsHelper().wma(data, 10), ref_wma(data.tolist(), 10), rtol=1e-12
+        )
+
+    def test_first_full_window_matches_longer_warmup(self):
+        """测试首个完整窗口与更长周期的预热值逐位相同，均线交叉判断不受舍入影响"""
+        data = _series("walk", 60)
+        assert kernels.wma(data, 21)[20] == kernels.wma(data, 34)[20]
+        assert kernels.sma(data, 21)[20] == kernels.sma(data, 34)[20]
+        assert kernels.avedev(data, 21)[20] == kernels.avedev(data, 34)[20]
+
+    def test_flat_window_stddev_is_zero(self):
+        """测试价格不变的窗口标准差为0"""
+        data = _series("walk", 30) + [15.0] * 30
+        result = kernels.stddev(data, 20)
+        assert np.all(result[-10:] == 0.0)
+
+    def test_flat_window_sign(self):
+        """测试随机游走后价格不变的窗口均线恰好等于价格，比较结果为0"""
+        for seed in range(20):
+            rng = np.random.default_rng(seed)
+            walk = 100 + np.cumsum(rng.normal(0, 1, 500))
+            data = np.concatenate([walk, np.full(40, walk[-1])])
+            for day_count in (5, 20, 30):
+                ma = kernels.sma(data, day_count)
+                assert np.all(ma[-10:] == data[-1])
+                assert np.all(kernels.compare_sign(data, ma)[-10:] == 0)
+
+    def test_nan_only_affects_its_windows(self):
+        """测试 NaN 只影响包含它的窗口"""
+        data = np.array(_series("walk", 80))
+        data[30] = np.nan
+        expected = np.array(_series("walk", 80))
+        for name in ("rolling_sum", "sma", "stddev", "highest", "lowest"):
+            actual = getattr(kernels, name)(data, 10)
+            reference = getattr(kernels, name)(expected, 10)
+            assert np.isnan(actual[30:40]).all()
+            np.testing.assert_allclose(actual[:30], reference[:30], rtol=1e-12)
+            np.testing.assert_allclose(actual[40:], reference[40:], rtol=1e-9)
+
+    def test_empty_input(self):
+        """测试空序列返回空结果"""
+        for name, _ in CASES:
+            assert getattr(UtilsHelper(), name)([], 5) == []
+
+    def test_invalid_window(self):
+        """测试非法窗口长度"""
+        with pytest.raises(ValueError):
+            kernels.sma([1.0, 2.0], 0)
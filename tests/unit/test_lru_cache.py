@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""
+有界 LRU 缓存单元测试
+"""
+
+import pytest
+
+from core.handler.ticker_k_line_handler import TickerKLineHandler
+from core.schema.k_line import KLineFrame
+from core.utils.lru_cache import LRUCache
+from tests.utils import FakeClock
+
+
+@pytest.mark.unit
+class TestLRUCache:
+    """测试容量限制、过期与统计"""
+
+    def test_max_entries_evicts_least_recent(self):
+        """测试超过条数上限时淘汰最久未使用的条目"""
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+
+        assert "b" not in cache
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_max_bytes(self):
+        """测试按字节数淘汰，超过上限的单个值不缓存"""
+        cache = LRUCache(max_entries=10, max_bytes=100, sizeof=lambda value: value)
+        cache.put("a", 60)
+        cache.put("b", 30)
+        cache.put("c", 30)
+        assert "a" not in cache
+        assert cache.stats()["bytes"] == 60
+        assert cache.put("d", 101) is False
+        assert "d" not in cache
+
+    def test_ttl_expiry(self):
+        """测试过期条目读取时移除，写入时统一清理"""
+        clock = FakeClock()
+        cache = LRUCache(ttl=10, clock=clock)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        clock.now = 10
+        assert cache.get("a") is None
+        cache.put("c", 3)
+
+        assert len(cache) == 1
+        stats = cache.stats()
+        assert stats["expirations"] == 2
+        assert stats["misses"] == 1
+
+    def test_accept_and_stats(self):
+        """测试校验函数拒绝时按未命中处理且保留条目"""
+        cache = LRUCache()
+        cache.put("a", (1, 5))
+        assert cache.get("a", accept=lambda value: value[1] >= 6) is None
+        assert cache.get("a", accept=lambda value: value[1] >= 5) == (1, 5)
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["hit_rate"] == 0.5
+        assert cache.pop("a") == (1, 5)
+        assert len(cache) == 0
+
+    def test_invalid_capacity(self):
+        """测试非法的条数上限"""
+        with pytest.raises(ValueError):
+            LRUCache(max_entries=0)
+
+
+@pytest.mark.unit
+class TestKLineCache:
+    """测试K线缓存的区间包含查找"""
+
+    def test_contained_range_served_from_cache(self, monkeypatch):
+        """测试更短的区间从已缓存的长区间截取"""
+        monkeypatch.setattr(TickerKLineHandler, "_kl_cache", LRUCache(ttl=300))
+        days = [f"2024-01-{i:02d}" for i in range(1, 31)]
+        frame = KLineFrame.from_columns(days, close=range(30))
+        calls = []
+
+        def fetch(code, source, start_date, end_date):
+            calls.append((start_date, end_date))
+            return frame, 2
+
+        handler = TickerKLineHandler()
+        handler.store = None
+        handler._fetch_kl = fetch
+        handler.get_kl("HK.00700", 1, "2024-01-01", "2024-01-30")
+        result, used = handler.get_kl("HK.00700", 1, "2024-01-11", "2024-01-20")
+
+        assert len(calls) == 1 and used == 2
+        assert list(result.time_key) == days[10:20]
+        handler.get_kl("HK.00700", 1, "2023-12-01", "2024-01-30")
+        assert len(calls) == 2
+        assert TickerKLineHandler.cache_stats()["entries"] == 1
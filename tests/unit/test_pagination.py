@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+"""
+游标分页单元测试
+逐页读取的结果与一次性排序的结果一致，含 NULL 和重复排序键
+"""
+
+import random
+
+import pytest
+
+from core.database import pagination
+from core.database.pagination import (
+    cached_total,
+    decode_cursor,
+    encode_cursor,
+    keyset_condition,
+    order_by,
+)
+from core.service.news_article_repository import NewsArticleRepository
+from core.service.ticker_latest_repository import TickerLatestRepository
+from core.service.ticker_repository import TickerRepository
+from core.utils.lru_cache import LRUCache
+
+
+@pytest.mark.unit
+class TestKeysetCondition:
+    """游标条件测试"""
+
+    def test_cursor_roundtrip(self):
+        """游标可往返，排序条件不一致时报错"""
+        cursor = encode_cursor(["-score", "+id"], [None, 3])
+        assert decode_cursor(cursor, ["-score", "+id"]) == [None, 3]
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, ["+score", "+id"])
+        with pytest.raises(ValueError):
+            decode_cursor("not a cursor", ["+id"])
+
+    @pytest.mark.parametrize(
+        "keys",
+        [
+            [("a", False), ("id", False)],
+            [("a", True), ("id", False)],
+            [("a", True), ("b", False), ("id", True)],
+            [("b", False), ("a", True), ("id", False)],
+        ],
+    )
+    @pytest.mark.parametrize("db_type", ["sqlite", "postgresql"])
+    def test_matches_offset(self, sqlite_helper, keys, db_type):
+        """逐页读取与 ORDER BY 全量结果一致，显式 NULLS FIRST/LAST 时同样一致"""
+        rng = random.Random(1)
+        sqlite_helper.conn.execute(
+            "CREATE TABLE t (id INTEGER PRIMARY KEY, a REAL, b TEXT)"
+        )
+        for i in range(1, 60):
+            a = rng.choice([None, 1.0, 2.0, 3.0])
+            b = rng.choice([None, "x", "y"])
+            sqlite_helper.execute(
+                "INSERT INTO t (id, a, b) VALUES (?, ?, ?)", (i, a, b)
+            )
+        order = order_by(keys, db_type)
+        expected = [
+            row["id"]
+            for row in sqlite_helper.query(f"SELECT id FROM t ORDER BY {order}")
+        ]
+
+        seen, values, params = [], None, []
+
+        def bind(value):
+            params.append(value)
+            return "?"
+
+        while True:
+            params.clear()
+            where = f"WHERE {keyset_condition(keys, values, bind)}" if values else ""
+            rows = sqlite_helper.query(
+                f"SELECT * FROM t {where} ORDER BY {order} LIMIT 7", tuple(params)
+            )
+            if not rows:
+                break
+            seen.extend(row["id"] for row in rows)
+            values = [rows[-1][key] for key, _ in keys]
+        assert seen == expected
+
+    def test_order_by(self):
+        """PostgreSQL 显式把 NULL 当作最小值排序"""
+        keys = [("score", True), ("id", False)]
+        assert order_by(keys, "sqlite") == "score DESC, id ASC"
+        assert order_by(keys, "mysql") == "score DESC, id ASC"
+        assert (
+            order_by(keys, "postgresql") == "score DESC NULLS LAST, id ASC NULLS FIRST"
+        )
+
+    def test_cached_total(self, monkeypatch):
+        """总数在有效期内只计算一次"""
+        now = [0.0]
+        cache = LRUCache(ttl=30, clock=lambda: now[0])
+        monkeypatch.setattr(pagination, "_total_cache", cache)
+        calls = []
+
+        def count():
+            calls.append(1)
+            return 10
+
+        assert cached_total("key", count) == 10
+        assert cached_total("key", count) == 10
+        now[0] = 31
+        assert cached_total("key", count) == 10
+        assert len(calls) == 2
+
+
+@pytest.mark.unit
+class TestTickerCursorPage:
+    """股票列表游标分页测试"""
+
+    def test_walk_pages(self, sqlite_helper):
+        """按分数降序逐页读取，与 OFFSET 分页结果一致"""
+        tickers = TickerRepository(sqlite_helper)
+        latest = TickerLatestRepository(sqlite_helper)
+        for i in range(23):
+            ticker = tickers.create(f"SH.{600000 + i}", f"股票{i}", {})
+            score = None if i % 5 == 0 else float(i % 4)
+            latest.upsert(ticker.id, score, "2024-06-28" if score else None)
+
+        total, expected = latest.get_page(sort=["-score"], limit=100)
+        assert total == 23
+        codes, cursor = [], ""
+        while True:
+            rows, cursor = latest.get_page_after(
+                sort=["-score"], limit=5, cursor=cursor
+            )
+            codes.extend(row["code"] for row in rows)
+            if cursor is None:
+                break
+        assert codes == [row["code"] for row in expected]
+        assert latest.count(cached=True) == 23
+
+    def test_invalid_cursor(self, sqlite_helper):
+        """排序条件变化后旧游标无效"""
+        latest = TickerLatestRepository(sqlite_helper)
+        cursor = encode_cursor(["-score", "+id"], [1.0, 1])
+        with pytest.raises(ValueError):
+            latest.get_page_after(sort=["code"], cursor=cursor)
+
+
+@pytest.mark.unit
+class TestNewsCursorPage:
+    """新闻列表游标分页测试"""
+
+    @pytest.mark.asyncio
+    async def test_walk_pages(self, sqlite_helper):
+        """按重要性、发布时间逐页读取，与 OFFSET 分页结果一致"""
+        rng = random.Random(2)
+        for i in range(30):
+            sqlite_helper.execute(
+                "INSERT INTO news_articles (title, url, url_hash, source_id, "
+                "published_at, importance_score) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    f"新闻{i}",
+                    f"https://example.com/{i}",
+                    f"hash{i}",
+                    1,
+                    rng.choice([None, "2024-06-27 10:00:00", "2024-06-28 10:00:00"]),
+                    rng.choice([0.0, 0.5, 1.0]),
+                ),
+            )
+        sqlite_helper.commit()
+        repository = NewsArticleRepository()
+        repository.db = sqlite_helper
+
+        expected, total = await repository.query_articles(page_size=100, hours=None)
+        ids, cursor = [], ""
+        while True:
+            articles, cursor = await repository.query_articles_after(
+                page_size=4, hours=None, cursor=cursor
+            )
+            ids.extend(article.id for article in articles)
+            if cursor is None:
+                break
+        assert sorted(ids) == sorted(article.id for article in expected)
+        assert len(ids) == total == 30
+        assert await repository.count_articles(cached=True) == 30
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+"""
+策略参数扫描单元测试
+扫描结果与逐组回测一致，多进程与单进程结果相同
+"""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from core.analysis.advanced_backtest_engine import AdvancedBacktestEngine
+from core.analysis.backtest_kernel import kernel_metrics, prepare_bars, run_kernel
+from core.analysis.param_sweep import (
+    ParamSweep,
+    SweepResult,
+    grid_params,
+    random_params,
+    rank_results,
+)
+from core.schema.k_line import KLineFrame
+from core.strategy.ma_base_strategy import MaBaseStrategy
+from tests.utils import random_walk_klines
+
+SPACE = {"p1": [5, 13], "p2": [8, 21], "p3": [34, 55]}
+
+
+def _klines(seed, length=500):
+    """带趋势切换的随机游走行情"""
+    return random_walk_klines(
+        seed, length, start=datetime.date(2022, 1, 3), trend=0.003, trend_bars=80
+    )
+
+
+def _metrics(params, klines):
+    """逐组回测的指标"""
+    engine = AdvancedBacktestEngine()
+    strategy = MaBaseStrategy()
+    strategy.set_params(params)
+    bars = prepare_bars(klines, strategy.calculate(klines), engine.atr_period)
+    return kernel_metrics(
+        bars, run_kernel(bars, engine.kernel_config()), engine.initial_capital
+    )
+
+
+@pytest.mark.unit
+class TestParams:
+    """参数空间测试"""
+
+    def test_grid_params(self):
+        """笛卡尔积，按条件过滤"""
+        assert len(grid_params(SPACE)) == 8
+        params = grid_params(SPACE, where=lambda p: p["p1"] < p["p2"])
+        assert len(params) == 6
+        assert {"p1": 13, "p2": 8, "p3": 34} not in params
+
+    def test_random_params(self):
+        """不重复抽样，种子相同结果相同，超过网格大小时返回整个网格"""
+        sample = random_params(SPACE, 5, seed=1)
+        assert len(sample) == 5
+        assert len({tuple(p.values()) for p in sample}) == 5
+        assert sample == random_params(SPACE, 5, seed=1)
+        assert len(random_params(SPACE, 100)) == 8
+
+    def test_rank_results(self):
+        """越大越好的指标降序、越小越好的升序，NaN 排最后"""
+        results = [
+            SweepResult({"p": i}, {"sharpe_ratio": v, "max_drawdown": v}, 10)
+            for i, v in enumerate([0.5, float("nan"), 1.5, -1.0])
+        ]
+        ranked = rank_results(results, "sharpe_ratio")
+        assert [r.params["p"] for r in ranked] == [2, 0, 3, 1]
+        ranked = rank_results(results, "max_drawdown")
+        assert [r.params["p"] for r in ranked] == [3, 0, 2, 1]
+        with pytest.raises(ValueError):
+            rank_results(results, "unknown")
+
+
+@pytest.mark.unit
+class TestKernelMetrics:
+    """列式指标测试"""
+
+    def test_matches_engine_metrics(self):
+        """与回测引擎的绩效指标一致"""
+        klines = _klines(1)
+        strategy = MaBaseStrategy()
+        engine = AdvancedBacktestEngine()
+        nested = engine.run_backtest(strategy, klines)["metrics"]
+        expected = nested["summary"] | nested["returns"] | nested["risk"]
+        bars = prepare_bars(klines, strategy.calculate(klines), engine.atr_period)
+        metrics = kernel_metrics(
+            bars, run_kernel(bars, engine.kernel_config()), engine.initial_capital
+        )
+        assert expected["total_trades"] > 0
+        for key, value in metrics.items():
+            if key == "total_return":
+                continue
+            assert value == pytest.approx(expected[key], rel=1e-9, abs=1e-12), key
+
+
+@pytest.mark.unit
+class TestParamSweep:
+    """参数扫描测试"""
+
+    def test_grid_matches_single_runs(self):
+        """共享特征缓存的扫描结果与逐组回测一致"""
+        klines = _klines(2)
+        with ParamSweep(MaBaseStrategy, klines, workers=0) as sweep:
+            results = sweep.grid(SPACE)
+        assert len(results) == 8
+        for result in results:
+            assert result.bars == len(klines)
+            assert result.metrics == pytest.approx(_metrics(result.params, klines))
+        values = [result.metrics["sharpe_ratio"] for result in results]
+        assert values == sorted(values, reverse=True)
+
+    def test_successive_halving(self):
+        """逐次减半在全部K线上给出最后的幸存者"""
+        klines = _klines(3, 900)
+        sweep = ParamSweep(MaBaseStrategy, KLineFrame.from_klines(klines), workers=0)
+        candidates = grid_params(SPACE)
+        results = sweep.successive_halving(candidates, eta=2, min_bars=100)
+        assert 1 <= len(results) < len(candidates)
+        assert all(result.bars == len(klines) for result in results)
+        grid_best = sweep.run(candidates)[0]
+        assert results[0].metrics["sharpe_ratio"] <= grid_best.metrics["sharpe_ratio"]
+
+        report = sweep.evaluate(results[0].params)
+        assert report["strategy_name"] == MaBaseStrategy().get_key()
+        assert (
+            report["backtest_result"]["metrics"]["total_trades"]
+            == results[0].metrics["total_trades"]
+        )
+
+    def test_process_pool_shared_memory(self):
+        """多进程经共享内存读取K线，结果与单进程相同，关闭后释放共享内存"""
+        klines = _klines(4)
+        with ParamSweep(MaBaseStrategy, klines, metric="total_return") as sweep:
+            sweep.workers = 2
+            parallel = sweep.random(SPACE, 6, seed=2)
+            shm = sweep._shm
+            assert shm is not None
+            assert np.ndarray((7, len(klines)), buffer=shm.buf)[3, 0] == pytest.approx(
+                klines[0]["close"]
+            )
+        assert sweep._shm is None and sweep._executor is None
+
+        serial = ParamSweep(MaBaseStrategy, klines, metric="total_return", workers=0)
+        expected = serial.random(SPACE, 6, seed=2)
+        assert [r.params for r in parallel] == [r.params for r in expected]
+        assert [r.metrics for r in parallel] == [r.metrics for r in expected]
+
+    def test_unknown_metric(self):
+        """未知的排序指标"""
+        with pytest.raises(ValueError):
+            ParamSweep(MaBaseStrategy, _klines(5, 50), metric="unknown", workers=0)
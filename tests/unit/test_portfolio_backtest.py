@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+"""
+组合回测单元测试
+日期对齐、按评分选股、调仓频率、每手股数与资金守恒
+"""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from core.analysis.portfolio_backtest import (
+    PortfolioBacktester,
+    PortfolioData,
+    lot_sizes_for,
+)
+from core.models.ticker import Ticker
+from tests.utils import random_walk_klines
+
+
+def _klines(seed, start, length):
+    """从 start 起连续的随机游走日线"""
+    return random_walk_klines(
+        seed,
+        length,
+        start=start,
+        price=10.0 + seed,
+        gaps=None,
+        close_sigma=0.02,
+        wick=0,
+    )
+
+
+def _universe(n_tickers=6, length=60):
+    """第一只股票晚上市10天，其余股票日期相同"""
+    start = datetime.date(2024, 1, 1)
+    klines = {}
+    for i in range(n_tickers):
+        offset = 10 if i == 0 else 0
+        klines[f"SH.60000{i}"] = _klines(
+            i, start + datetime.timedelta(days=offset), length - offset
+        )
+    return klines
+
+
+@pytest.mark.unit
+class TestPortfolioData:
+    """行情对齐测试"""
+
+    def test_from_klines(self):
+        """日期取并集，缺失的K线为 NaN，align 按各股票自己的K线对齐"""
+        klines = _universe()
+        data = PortfolioData.from_klines(klines)
+        assert data.close.shape == (60, 6)
+        assert data.dates[0] == "2024-01-01"
+        assert np.isnan(data.close[:10, 0]).all()
+        assert data.close[10, 0] == pytest.approx(klines["SH.600000"][0]["close"])
+        assert data.open[5, 1] == pytest.approx(klines["SH.600001"][5]["open"])
+
+        scores = data.align({"SH.600000": np.arange(50.0)})
+        assert np.isnan(scores[:10, 0]).all()
+        assert scores[10, 0] == 0.0 and scores[59, 0] == 49.0
+        assert np.isnan(scores[:, 1]).all()
+
+    def test_lot_sizes(self):
+        """优先使用 ticker.lot_size，无效时按市场取默认值"""
+        tickers = [
+            Ticker(id=1, code="HK.00700", name="腾讯", lot_size=500),
+            Ticker(id=2, code="US.AAPL", name="苹果", lot_size=-1),
+        ]
+        sizes = lot_sizes_for(tickers, ["HK.00700", "US.AAPL", "SZ.000001"])
+        assert sizes.tolist() == [500, 1, 100]
+
+
+@pytest.mark.unit
+class TestPortfolioBacktester:
+    """组合回测测试"""
+
+    def _run(self, scores=None, **kwargs):
+        data = PortfolioData.from_klines(_universe())
+        if scores is None:
+            # 评分固定为股票序号，越靠后越好
+            scores = np.tile(np.arange(6.0), (60, 1))
+        backtester = PortfolioBacktester(
+            initial_capital=100000, max_positions=3, **kwargs
+        )
+        return data, backtester.run(data, scores, np.array([100, 100, 100, 1, 1, 1]))
+
+    def test_top_n(self):
+        """持有评分最高的 max_positions 只股票，持股数为每手股数的整数倍"""
+        data, result = self._run(rebalance_every=10)
+        assert sorted(np.flatnonzero(result.holdings)) == [3, 4, 5]
+        assert result.equity["positions"].max() == 3
+        assert result.equity["positions"][0] == 0
+        lots = np.array([100, 100, 100, 1, 1, 1])
+        order_lots = lots[result.orders["ticker_index"]]
+        assert np.all(result.orders["shares"] % order_lots == 0)
+
+    def test_rebalance_days_and_cash(self):
+        """只在调仓日下单，现金与持仓市值之和等于总资产"""
+        data, result = self._run(rebalance_every=10)
+        assert set(result.orders["date_index"].tolist()) <= {1, 11, 21, 31, 41, 51}
+        holding = result.holdings @ data.close[-1]
+        assert result.equity["holding_value"][-1] == pytest.approx(holding)
+        assert result.equity["total_value"] == pytest.approx(
+            result.equity["cash"] + result.equity["holding_value"]
+        )
+        assert np.all(result.equity["cash"] >= 0)
+        assert result.metrics["total_orders"] == len(result.orders["shares"])
+        assert result.metrics["total_commission"] == pytest.approx(
+            result.orders["commission"].sum()
+        )
+
+    def test_uses_previous_scores(self):
+        """调仓使用前一日的评分，评分变化后下一次调仓换股"""
+        # 调仓日为第1、31日（下标），分别使用第0、30日的评分
+        scores = np.tile(np.arange(6.0), (60, 1))
+        scores[31:] = scores[31:, ::-1].copy()
+        data, result = self._run(scores=scores, rebalance_every=30)
+        first = result.orders["date_index"] == 1
+        assert sorted(result.orders["ticker_index"][first].tolist()) == [3, 4, 5]
+        assert sorted(np.flatnonzero(result.holdings)) == [3, 4, 5]
+
+        scores = np.tile(np.arange(6.0), (60, 1))
+        scores[30:] = scores[30:, ::-1].copy()
+        data, result = self._run(scores=scores, rebalance_every=30)
+        assert sorted(np.flatnonzero(result.holdings)) == [0, 1, 2]
+
+    def test_min_score_and_unlisted(self):
+        """低于最低评分或当日无K线的股票不入选"""
+        scores = np.tile(np.arange(6.0), (60, 1))
+        scores[:, 0] = 100.0
+        data, result = self._run(scores=scores, rebalance_every=1, min_score=4.0)
+        # 第一只股票第11日才上市
+        assert 0 not in result.orders["ticker_index"][result.orders["date_index"] < 10]
+        assert sorted(np.flatnonzero(result.holdings)) == [0, 4, 5]
+
+    def test_score_allocation(self):
+        """评分加权时评分高的股票分配更多资金"""
+        data, result = self._run(rebalance_every=60, allocation="score")
+        value = result.holdings * data.open[1] * (1 + 0.001)
+        assert value[5] > value[4] > value[3]
+
+    def test_invalid(self):
+        """参数与评分矩阵形状校验"""
+        with pytest.raises(ValueError):
+            PortfolioBacktester(allocation="unknown")
+        with pytest.raises(ValueError):
+            PortfolioBacktester(max_positions=0)
+        data = PortfolioData.from_klines(_universe())
+        with pytest.raises(ValueError):
+            PortfolioBacktester().run(data, np.zeros((3, 3)))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+评分历史追加写入与范围查询单元测试
+"""
+
+
+import pytest
+
+from core.models.ticker_score import TickerScore
+from core.service import ticker_score_repository
+from core.service.ticker_score_repository import TickerScoreRepository
+
+
+def _scores(days, score=50.0):
+    return [
+        TickerScore(
+            id=0,
+            ticker_id=0,
+            time_key=f"2024-06-{day:02d}",
+            score=score + day,
+            history=[1, 0, -1],
+        )
+        for day in days
+    ]
+
+
+@pytest.mark.unit
+class TestAppendScores:
+    """追加写入测试"""
+
+    def test_append_full_history(self, sqlite_helper):
+        """首次写入保存全部K线，按时间升序读回"""
+        repository = TickerScoreRepository(sqlite_helper)
+        assert repository.append_items(1, _scores([3, 1, 2])) == 3
+        scores = repository.get_scores(1)
+        assert [item.time_key for item in scores] == [
+            "2024-06-01",
+            "2024-06-02",
+            "2024-06-03",
+        ]
+        assert scores[0].history == [1, 0, -1]
+        assert repository.get_latest_time_key(1) == "2024-06-03"
+
+    def test_append_only_new_bars(self, sqlite_helper):
+        """再次写入时更早的历史不变，最新一根K线覆盖，新K线追加"""
+        repository = TickerScoreRepository(sqlite_helper)
+        repository.append_items(1, _scores(range(1, 6)))
+        ids = {item.time_key: item.id for item in repository.get_scores(1)}
+        assert repository.append_items(1, _scores(range(1, 8), score=70.0)) == 3
+        scores = repository.get_scores(1)
+        assert len(scores) == 7
+        assert scores[0].score == 51.0
+        assert scores[0].id == ids["2024-06-01"]
+        assert scores[4].score == 75.0
+        assert scores[4].id == ids["2024-06-05"]
+        assert scores[6].score == 77.0
+
+    def test_batches(self, sqlite_helper, monkeypatch):
+        """超过单条语句行数时分批写入"""
+        monkeypatch.setattr(ticker_score_repository, "APPEND_BATCH_SIZE", 4)
+        repository = TickerScoreRepository(sqlite_helper)
+        assert repository.append_items(1, _scores(range(1, 11))) == 10
+        assert len(repository.get_scores(1)) == 10
+
+    def test_dict_items(self, sqlite_helper):
+        """兼容 ticker_score_to_dict 生成的字典"""
+        repository = TickerScoreRepository(sqlite_helper)
+        item = {"time_key": "2024-06-01", "score": 60.0, "history": "[1, 2]"}
+        assert repository.append_items(1, [item]) == 1
+        assert repository.get_scores(1)[0].history == [1, 2]
+
+
+@pytest.mark.unit
+class TestScoreRange:
+    """范围查询测试"""
+
+    def test_range(self, sqlite_helper):
+        """按起止时间和条数查询，只返回该股票的记录"""
+        repository = TickerScoreRepository(sqlite_helper)
+        repository.append_items(1, _scores(range(1, 11)))
+        repository.append_items(2, _scores(range(1, 11)))
+        scores = repository.get_scores(1, "2024-06-03", "2024-06-05")
+        assert [item.time_key[-2:] for item in scores] == ["03", "04", "05"]
+        assert {item.ticker_id for item in scores} == {1}
+        latest = repository.get_scores(1, limit=2)
+        assert [item.time_key[-2:] for item in latest] == ["09", "10"]
+        assert repository.get_scores(3) == []
+        assert repository.get_latest_time_key(3) is None
+
+    def test_uses_index(self, sqlite_helper):
+        """范围查询走 (ticker_id, time_key) 唯一索引"""
+        plan = sqlite_helper.query(
+            "EXPLAIN QUERY PLAN SELECT * FROM ticker_score "
+            "WHERE ticker_id = ? AND time_key >= ? ORDER BY time_key",
+            (1, "2024-06-01"),
+        )
+        detail = " ".join(row["detail"] for row in plan)
+        assert "sqlite_autoindex_ticker_score" in detail
+        assert "TEMP B-TREE" not in detail
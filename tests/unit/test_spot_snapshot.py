@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""
+实时行情快照单元测试
+用构造的行情表替换 akshare 下载，验证代码规范化、缓存间隔和批量查询
+"""
+
+import pandas as pd
+import pytest
+
+from core.utils.data_sources import DongcaiKLineSource
+from core.utils.data_sources.spot_snapshot import SpotSnapshot, normalize_code
+from tests.utils import FakeClock
+
+
+def _zh_table():
+    return pd.DataFrame(
+        {
+            "代码": ["000001", "600000", "830799"],
+            "最高": [11.0, 8.2, 5.0],
+            "最低": [10.0, 7.9, 4.0],
+            "今开": [10.5, 8.0, 4.5],
+            "最新价": [10.8, 8.1, 4.8],
+            "成交量": [1000.0, 2000.0, 10.0],
+            "成交额": [10800.0, 16200.0, 48.0],
+            "换手率": [0.5, 0.2, 0.1],
+        }
+    )
+
+
+def _hk_table():
+    return pd.DataFrame(
+        {
+            "代码": ["00700"],
+            "最高": [380.0],
+            "最低": [370.0],
+            "今开": [372.0],
+            "最新价": [378.0],
+            "成交量": [5000.0],
+            "成交额": [1890000.0],
+        }
+    )
+
+
+def _us_table():
+    return pd.DataFrame(
+        {
+            "代码": ["105.AAPL"],
+            "最高价": [190.0],
+            "最低价": [185.0],
+            "开盘价": [186.0],
+            "最新价": [189.0],
+            "成交量": [3000.0],
+            "成交额": [567000.0],
+            "换手率": [0.3],
+        }
+    )
+
+
+@pytest.fixture
+def snapshot():
+    calls = []
+
+    def fetcher(market, build):
+        def fetch():
+            calls.append(market)
+            return build()
+
+        return fetch
+
+    snapshot = SpotSnapshot(
+        interval=60,
+        fetchers={
+            "ZH": fetcher("ZH", _zh_table),
+            "HK": fetcher("HK", _hk_table),
+            "US": fetcher("US", _us_table),
+        },
+        clock=FakeClock(),
+    )
+    snapshot.calls = calls
+    return snapshot
+
+
+@pytest.mark.unit
+class TestSpotSnapshot:
+    """测试全市场行情快照"""
+
+    def test_normalize_code(self):
+        """测试各市场代码规范化"""
+        assert normalize_code("ZH", "000001") == "SZ.000001"
+        assert normalize_code("ZH", "300750") == "SZ.300750"
+        assert normalize_code("ZH", "600000") == "SH.600000"
+        assert normalize_code("ZH", "830799") is None
+        assert normalize_code("HK", "00700") == "HK.00700"
+        assert normalize_code("US", "105.AAPL") == "US.AAPL"
+
+    def test_lookup(self, snapshot):
+        """测试按代码查找，港股换手率为0"""
+        bar = snapshot.get("SZ.000001")
+        assert (bar.close, bar.volume, bar.turnover_rate) == (10.8, 1000.0, 0.5)
+        assert snapshot.get("HK.00700").turnover_rate == 0
+        assert snapshot.get("US.AAPL").high == 190.0
+        assert snapshot.get("SH.688000") is None
+        assert snapshot.get("XX.1") is None
+
+    def test_download_once_per_interval(self, snapshot):
+        """测试有效期内同一市场只下载一次"""
+        snapshot.get("SZ.000001")
+        snapshot.get("SH.600000")
+        assert snapshot.calls == ["ZH"]
+
+        snapshot._clock.now = 60
+        snapshot.get("SH.600000")
+        assert snapshot.calls == ["ZH", "ZH"]
+        snapshot.invalidate("ZH")
+        snapshot.get("SH.600000")
+        assert snapshot.downloads == 3
+
+    def test_get_many(self, snapshot):
+        """测试批量查询每个市场最多下载一次"""
+        codes = ["SZ.000001", "SH.600000", "HK.00700", "US.AAPL", "SH.688000"]
+        result = DongcaiKLineSource(snapshot).get_kl_on_time_many(codes)
+
+        assert set(result) == {"SZ.000001", "SH.600000", "HK.00700", "US.AAPL"}
+        assert sorted(snapshot.calls) == ["HK", "US", "ZH"]
+        assert DongcaiKLineSource(snapshot).get_kl_on_time("HK.00700").close == 378.0
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+"""
+SQLite 性能配置与单写线程单元测试
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from core.database import sqlite_writer
+from core.database.sqlite_helper import SqliteHelper
+from core.database.sqlite_writer import SqliteWriter, run_write
+from core.service.ticker_strategy_repository import TickerStrategyRepository
+
+STRATEGY = {"macd": {"data": {"buy": [1]}}}
+
+
+def _count(sqlite_db_path):
+    sql = "SELECT COUNT(*) AS count FROM ticker_strategy"
+    return SqliteHelper(sqlite_db_path).query_one(sql)["count"]
+
+
+def _write(ticker_id):
+    def write(uow):
+        TickerStrategyRepository(uow).bulk_upsert(ticker_id, "day", "2024", STRATEGY)
+        return ticker_id
+
+    return write
+
+
+@pytest.mark.unit
+class TestPerformancePragmas:
+    """性能配置测试"""
+
+    def test_performance_mode(self, sqlite_db_path):
+        """启用后使用 WAL 和 synchronous=NORMAL"""
+        helper = SqliteHelper(sqlite_db_path, performance=True)
+        assert helper.query_one("PRAGMA journal_mode")["journal_mode"] == "wal"
+        assert helper.query_one("PRAGMA synchronous")["synchronous"] == 1
+        assert helper.query_one("PRAGMA busy_timeout")["timeout"] == 10000
+
+    def test_default_mode(self, sqlite_db_path, monkeypatch):
+        """默认不修改日志模式"""
+        monkeypatch.delenv("SQLITE_PERFORMANCE", raising=False)
+        helper = SqliteHelper(sqlite_db_path)
+        assert helper.query_one("PRAGMA journal_mode")["journal_mode"] == "delete"
+
+
+@pytest.mark.unit
+class TestSqliteWriter:
+    """单写线程测试"""
+
+    def test_concurrent_submit(self, sqlite_db_path):
+        """多个线程提交的写入由写线程合并提交"""
+        writer = SqliteWriter(lambda: SqliteHelper(sqlite_db_path, performance=True))
+        futures = []
+        lock = threading.Lock()
+
+        def submit(start):
+            for ticker_id in range(start, start + 25):
+                future = writer.submit(_write(ticker_id))
+                with lock:
+                    futures.append(future)
+
+        threads = [threading.Thread(target=submit, args=(i * 25,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(future.result() for future in futures) == list(range(100))
+        writer.close()
+        assert _count(sqlite_db_path) == 100
+        stats = writer.stats()
+        assert stats["jobs"] == 100
+        assert 1 <= stats["commits"] <= 100
+
+    def test_failed_job_isolated(self, sqlite_db_path):
+        """失败的任务只回滚自身，同一事务中的其他任务照常提交"""
+        writer = SqliteWriter(lambda: SqliteHelper(sqlite_db_path))
+
+        def failing(uow):
+            _write(2)(uow)
+            uow.execute("INSERT INTO missing_table VALUES (1)")
+
+        first = writer.submit(_write(1))
+        failed = writer.submit(failing)
+        last = writer.submit(_write(3))
+        assert first.result() == 1
+        with pytest.raises(sqlite3.OperationalError):
+            failed.result()
+        assert last.result() == 3
+        writer.close()
+        ids = SqliteHelper(sqlite_db_path).query(
+            "SELECT ticker_id FROM ticker_strategy"
+        )
+        assert sorted(row["ticker_id"] for row in ids) == [1, 3]
+        assert writer.stats()["failed"] == 1
+
+    def test_result_after_commit(self, sqlite_db_path):
+        """任务结果返回时数据已提交，其他连接可读到"""
+        writer = SqliteWriter(lambda: SqliteHelper(sqlite_db_path, performance=True))
+        writer.submit(_write(1)).result()
+        assert _count(sqlite_db_path) == 1
+        writer.close()
+
+    def test_factory_failure(self, sqlite_db_path):
+        """创建连接失败时已提交的任务全部失败，下次提交重新启动写线程"""
+        attempts = []
+
+        def factory():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise sqlite3.OperationalError("unable to open database file")
+            return SqliteHelper(sqlite_db_path)
+
+        writer = SqliteWriter(factory)
+        futures = [writer.submit(_write(i)) for i in range(3)]
+        for future in futures:
+            with pytest.raises(sqlite3.OperationalError):
+                future.result(timeout=5)
+        assert writer.submit(_write(9)).result(timeout=5) == 9
+        writer.close()
+        assert len(attempts) == 2
+        assert _count(sqlite_db_path) == 1
+
+    def test_loop_failure(self, sqlite_db_path, monkeypatch):
+        """写循环异常退出时本批和排队中的任务失败，连接被关闭"""
+        writer = SqliteWriter(lambda: SqliteHelper(sqlite_db_path), batch_size=1)
+        release = threading.Event()
+        calls = []
+
+        def broken(helper, batch):
+            calls.append(helper)
+            release.wait(5)
+            raise RuntimeError("writer crashed")
+
+        monkeypatch.setattr(writer, "_write", broken)
+        futures = [writer.submit(_write(i)) for i in range(3)]
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
+        assert calls[0].conn is None
+        assert writer.stats()["failed"] == 3
+        monkeypatch.undo()
+        assert writer.submit(_write(1)).result(timeout=5) == 1
+        writer.close()
+
+
+@pytest.mark.unit
+class TestRunWrite:
+    """run_write 测试"""
+
+    def test_disabled(self, sqlite_db_path, monkeypatch):
+        """未启用性能配置时在当前线程写入"""
+        monkeypatch.setenv("DB_TYPE", "sqlite")
+        monkeypatch.setenv("SQLITE_DB_PATH", sqlite_db_path)
+        monkeypatch.setenv("SQLITE_PERFORMANCE", "false")
+        assert sqlite_writer.get_sqlite_writer() is None
+        assert run_write(_write(1)) == 1
+        assert _count(sqlite_db_path) == 1
+
+    def test_enabled(self, sqlite_db_path, monkeypatch):
+        """启用性能配置时交由进程级写线程"""
+        monkeypatch.setenv("DB_TYPE", "sqlite")
+        monkeypatch.setenv("SQLITE_DB_PATH", sqlite_db_path)
+        monkeypatch.setenv("SQLITE_PERFORMANCE", "true")
+        monkeypatch.setattr(sqlite_writer, "_writer", None)
+        try:
+            assert run_write(_write(1)) == 1
+            writer = sqlite_writer.get_sqlite_writer()
+            assert writer.stats()["jobs"] == 1
+        finally:
+            sqlite_writer._writer.close()
+        assert _count(sqlite_db_path) == 1
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+"""
+流式指标计算单元测试
+以全量 calculate 为基准，验证 init_state/update/replace_last 的结果一致
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from core import data_source_helper
+from core.data_source_helper import DataSourceHelper
+from core.indicator import Indicator
+from core.indicator.bull_bear_power_indicator import BullBearPowerIndicator
+from core.indicator.volume_supertrend_ai_indicator import VolumeSuperTrendAIIndicator
+from core.schema.k_line import KLine, KLineFrame
+from core.strategy.ma_base_strategy import MaBaseStrategy
+from core.utils.lru_cache import LRUCache
+
+
+def _frame(length: int) -> KLineFrame:
+    rng = np.random.default_rng(length)
+    close = 30 + np.cumsum(rng.normal(0, 1, length))
+    return KLineFrame.from_columns(
+        [f"d{i}" for i in range(length)],
+        high=close + rng.uniform(0, 1, length),
+        low=close - rng.uniform(0, 1, length),
+        open=close,
+        close=close,
+        volume=rng.uniform(1e5, 2e5, length),
+    )
+
+
+def _assert_result(actual: dict, expected: dict, check_days: bool = True):
+    assert actual["score"] == pytest.approx(expected["score"], rel=1e-9, abs=1e-9)
+    assert actual["status"] == expected["status"]
+    if check_days:
+        assert actual["days"] == expected["days"]
+
+
+@pytest.mark.unit
+class TestStreamingIndicator:
+    """测试流式指标与全量计算一致"""
+
+    def test_matches_full_calculation(self):
+        """测试逐根推进后的 score/status/days 与全量计算一致"""
+        frame = _frame(260)
+        indicator = Indicator()
+        states = indicator.init_states(frame[:-1])
+        result = indicator.update_states(states, frame[-1])
+        expected = indicator.calculate(frame)
+
+        for key, value in result.items():
+            # SuperTrend 全量计算会重绘最后 n 根K线，days 不可比
+            check_days = not key.startswith("Volumesuper_trendAI")
+            _assert_result(value, expected[key], check_days)
+
+    def test_replace_last(self):
+        """测试替换最后一根K线等价于用替换后的数据全量计算"""
+        frame = _frame(150).copy()
+        indicator = Indicator()
+        states = indicator.init_states(frame)
+
+        last = frame[-1]
+        bar = KLine(
+            time_key=last.time_key,
+            high=last.high + 2,
+            low=last.low,
+            open=last.open,
+            close=last.close + 1.5,
+            volume=last.volume * 2,
+            turnover=0,
+            turnover_rate=0,
+        )
+        indicator.update_states(states, frame[-1], replace_last=True)
+        result = indicator.update_states(states, bar, replace_last=True)
+        frame[len(frame) - 1] = bar
+        expected = indicator.calculate(frame)
+
+        for key, value in result.items():
+            _assert_result(value, expected[key], not key.startswith("Volumesuper"))
+
+    def test_json_round_trip(self):
+        """测试状态 JSON 序列化后可继续推进"""
+        frame = _frame(200)
+        indicator = Indicator()
+        states = indicator.init_states(frame[:150])
+        restored = json.loads(json.dumps(states))
+
+        for i in range(150, 200):
+            indicator.update_states(states, frame[i])
+            result = indicator.update_states(restored, frame[i].__dict__)
+        assert result == indicator.update_states(states, frame[-1], True)
+
+    @pytest.mark.parametrize("ma_src", ["SMA", "EMA", "WMA", "RMA", "VWMA"])
+    def test_super_trend_latest_signal(self, ma_src):
+        """测试各均线类型下 SuperTrend 最新信号与全量计算一致"""
+        frame = _frame(300)
+        indicator = VolumeSuperTrendAIIndicator(maSrc=ma_src)
+        state = indicator.init_state(frame)
+        expected = indicator.calculate(frame)
+
+        result = indicator.stream_result(state)
+        assert result["score"] == pytest.approx(expected["score"], rel=1e-9)
+        assert result["status"] == expected["posData"][-1]
+
+    def test_super_trend_warm_up(self):
+        """测试数据不足时与全量计算一样输出0"""
+        indicator = VolumeSuperTrendAIIndicator()
+        state = indicator.init_state(_frame(50))
+        assert indicator.stream_result(state) == {"score": 0, "status": 0, "days": 50}
+
+    def test_fallback_recalculates(self):
+        """测试未实现增量计算的指标退化为全量重算"""
+        frame = _frame(80)
+        indicator = BullBearPowerIndicator()
+        assert not indicator.supports_streaming()
+
+        state = indicator.init_state(frame[:-1])
+        result = indicator.update(state, frame[-1])
+        expected = Indicator([indicator]).calculate_by_key(indicator.get_key(), frame)
+        _assert_result(result, expected)
+
+    def test_replace_without_bars(self):
+        """测试空状态不能替换最后一根K线"""
+        with pytest.raises(ValueError):
+            Indicator().update_states(
+                Indicator().init_states([]), _frame(1)[0], replace_last=True
+            )
+
+    def test_on_time_status(self, monkeypatch):
+        """测试盘中刷新复用缓存状态，结果与全量计算一致"""
+        frame = _frame(200).copy()
+        last = frame[-1]
+        refreshed = KLine(
+            time_key=last.time_key,
+            high=last.high + 1,
+            low=last.low,
+            open=last.open,
+            close=last.close + 0.5,
+            volume=last.volume * 2,
+            turnover=0,
+            turnover_rate=0,
+        )
+        frames = [frame, frame.copy()]
+        frames[1][len(frame) - 1] = refreshed
+        indicator = Indicator()
+        expected = [indicator.calculate(data) for data in frames]
+
+        class Repository:
+            def get_by_code(self, code):
+                return type("Ticker", (), {"code": code})()
+
+        init_calls = []
+        init_states = Indicator.init_states
+
+        def spy(self, kl_data):
+            init_calls.append(len(kl_data))
+            return init_states(self, kl_data)
+
+        monkeypatch.setattr(data_source_helper, "TickerRepository", Repository)
+        monkeypatch.setattr(Indicator, "init_states", spy)
+        monkeypatch.setattr(
+            DataSourceHelper,
+            "_get_on_time_kline_data",
+            lambda self, ticker, days: ("2024-01-02", frames.pop(0)),
+        )
+        monkeypatch.setattr(DataSourceHelper, "_indicator_states", LRUCache())
+        helper = object.__new__(DataSourceHelper)
+
+        for values in expected:
+            _, time_key, result = helper.get_indicator_status_on_time("SH.600000")
+            assert time_key == "2024-01-02"
+            for key, value in result.items():
+                _assert_result(value, values[key], not key.startswith("Volumesuper"))
+        assert init_calls == [len(frame) - 1]
+
+
+@pytest.mark.unit
+class TestStreamingStrategy:
+    """测试策略的流式接口"""
+
+    def test_strategy_status_and_days(self):
+        """测试策略流式结果的 status/days 与全量仓位序列一致"""
+        frame = _frame(200)
+        strategy = MaBaseStrategy()
+        assert not strategy.supports_streaming()
+        state = strategy.init_state(frame[:-1])
+        result = strategy.update(state, frame[-1])
+
+        pos_data = strategy.calculate(frame)
+        days = 0
+        for pos in reversed(pos_data):
+            if pos != pos_data[-1]:
+                break
+            days += 1
+        assert result == {"score": None, "status": pos_data[-1], "days": days}
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+"""
+最新评分汇总表与股票列表分页单元测试
+"""
+
+
+import pytest
+
+from core.models.ticker_score import TickerScore
+from core.service.ticker_latest_repository import TickerLatestRepository, prefix_range
+from core.service.ticker_repository import TickerRepository
+from core.service.ticker_score_repository import TickerScoreRepository
+
+TICKERS = {
+    "SH.600000": ("浦发银行", 80.0),
+    "SH.600036": ("招商银行", 90.0),
+    "SZ.000001": ("平安银行", 70.0),
+    "HK.00700": ("腾讯控股", None),
+    "US.AAPL": ("Apple", 60.0),
+}
+
+
+def _score(time_key, score):
+    return TickerScore(id=0, ticker_id=0, time_key=time_key, score=score)
+
+
+@pytest.fixture
+def helper(sqlite_helper):
+    tickers = TickerRepository(sqlite_helper)
+    scores = TickerScoreRepository(sqlite_helper)
+    for code, (name, score) in TICKERS.items():
+        ticker = tickers.create(code, name, {})
+        if score is not None:
+            scores.append_items(
+                ticker.id, [_score("2024-06-27", 10.0), _score("2024-06-28", score)]
+            )
+    return sqlite_helper
+
+
+@pytest.mark.unit
+class TestTickerLatest:
+    """汇总表维护测试"""
+
+    def test_maintained_by_writers(self, helper):
+        """新建股票插入空行，评分写入更新为最新一根K线"""
+        rows = helper.query(
+            "SELECT t.code, tl.score, tl.time_key FROM ticker_latest tl "
+            "JOIN ticker t ON t.id = tl.ticker_id"
+        )
+        latest = {row["code"]: (row["score"], row["time_key"]) for row in rows}
+        assert latest["SH.600036"] == (90.0, "2024-06-28")
+        assert latest["HK.00700"] == (None, None)
+        assert len(latest) == len(TICKERS)
+
+    def test_refresh(self, helper):
+        """重建结果与增量维护一致"""
+        before = helper.query("SELECT * FROM ticker_latest ORDER BY ticker_id")
+        assert TickerLatestRepository(helper).refresh() == len(TICKERS)
+        after = helper.query("SELECT * FROM ticker_latest ORDER BY ticker_id")
+        fields = ("ticker_id", "score", "time_key")
+        assert [[row[f] for f in fields] for row in after] == [
+            [row[f] for f in fields] for row in before
+        ]
+
+    def test_delete_ticker(self, helper):
+        """删除股票时同时删除汇总行"""
+        repository = TickerRepository(helper)
+        repository.delete_by_id(repository.get_by_code("US.AAPL").id)
+        assert TickerLatestRepository(helper).get_page()[0] == len(TICKERS) - 1
+        count = helper.query_one("SELECT COUNT(*) AS total FROM ticker_latest")
+        assert count["total"] == len(TICKERS) - 1
+
+
+@pytest.mark.unit
+class TestTickerPage:
+    """分页查询测试"""
+
+    def test_sort_by_score(self, helper):
+        """按分数降序分页，总数不受评分历史条数影响"""
+        repository = TickerLatestRepository(helper)
+        total, rows = repository.get_page(sort=["-score"], limit=2)
+        assert total == len(TICKERS)
+        assert [row["code"] for row in rows] == ["SH.600036", "SH.600000"]
+        assert rows[0]["update_time"] == "2024-06-28"
+        _, rows = repository.get_page(sort=["-score"], limit=2, offset=2)
+        assert [row["code"] for row in rows] == ["SZ.000001", "US.AAPL"]
+
+    def test_missing_latest_row(self, helper):
+        """没有汇总行的股票照常列出，评分为空"""
+        helper.execute(
+            "DELETE FROM ticker_latest WHERE ticker_id = "
+            "(SELECT id FROM ticker WHERE code = 'SH.600000')"
+        )
+        repository = TickerLatestRepository(helper)
+        total, rows = repository.get_page(search="600")
+        assert total == 2
+        assert [(row["code"], row["score"]) for row in rows] == [
+            ("SH.600000", None),
+            ("SH.600036", 90.0),
+        ]
+        rows, _ = repository.get_page_after(search="600", sort=["-score"])
+        assert [row["code"] for row in rows] == ["SH.600036", "SH.600000"]
+
+    def test_default_sort(self, helper):
+        """默认按代码排序，忽略不支持的字段"""
+        _, rows = TickerLatestRepository(helper).get_page(sort=["-unknown"])
+        assert [row["code"] for row in rows] == sorted(TICKERS)
+
+    @pytest.mark.parametrize(
+        "search, codes",
+        [
+            ("600", ["SH.600000", "SH.600036"]),
+            ("sh.60003", ["SH.600036"]),
+            ("00700", ["HK.00700"]),
+            ("aap", ["US.AAPL"]),
+            ("招商", ["SH.600036"]),
+            ("Apple", ["US.AAPL"]),
+            ("银行", []),
+        ],
+    )
+    def test_prefix_search(self, helper, search, codes):
+        """代码（可省略市场前缀）和名称按前缀匹配"""
+        total, rows = TickerLatestRepository(helper).get_page(search=search)
+        assert [row["code"] for row in rows] == codes
+        assert total == len(codes)
+
+    def test_excludes_inactive(self, helper):
+        """不返回已删除或停用的股票"""
+        helper.execute("UPDATE ticker SET is_deleted = 1 WHERE code = 'SH.600036'")
+        total, rows = TickerLatestRepository(helper).get_page(search="600")
+        assert total == 1
+        assert [row["code"] for row in rows] == ["SH.600000"]
+
+    def test_query_plan(self, helper):
+        """按分数排序走覆盖索引，搜索走 code/name 索引"""
+
+        def plan(sql, params=()):
+            rows = helper.query(f"EXPLAIN QUERY PLAN {sql}", params)
+            return " ".join(row["detail"] for row in rows)
+
+        detail = plan(
+            "SELECT t.code FROM ticker_latest tl JOIN ticker t ON t.id = tl.ticker_id "
+            "ORDER BY tl.score DESC LIMIT 10"
+        )
+        assert "COVERING INDEX idx_ticker_latest_score" in detail
+        assert "TEMP B-TREE" not in detail
+        low, high = prefix_range("SH.600")
+        detail = plan(
+            "SELECT id FROM ticker t WHERE (t.code >= ? AND t.code < ?) "
+            "OR (t.name >= ? AND t.name < ?)",
+            (low, high, low, high),
+        )
+        assert "idx_ticker_code" in detail
+        assert "idx_ticker_name" in detail
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+"""
+工作单元单元测试
+在临时 SQLite 库上验证单只股票写入的原子性、分组提交，以及写库线程按股票返回失败
+"""
+
+import sqlite3
+
+import pytest
+
+from core.database.sqlite_helper import SqliteHelper
+from core.database.unit_of_work import UnitOfWork, UnitOfWorkError
+from core.models.ticker import Ticker
+from core.service.ticker_strategy_repository import TickerStrategyRepository
+from core import update_pipeline
+from core.update_pipeline import TickerResultWriter
+
+STRATEGY = {"macd": {"data": {"buy": [1]}, "pos_data": {"pos": 1}}}
+
+
+def _count(sqlite_db_path, ticker_id):
+    """用独立连接读取，只能看到已提交的数据"""
+    sql = "SELECT COUNT(*) AS count FROM ticker_strategy WHERE ticker_id = ?"
+    return SqliteHelper(sqlite_db_path).query_one(sql, (ticker_id,))["count"]
+
+
+def _write(uow, ticker_id):
+    TickerStrategyRepository(uow).bulk_upsert(ticker_id, "day", "2024-06-28", STRATEGY)
+
+
+@pytest.mark.unit
+class TestUnitOfWork:
+    """事务范围测试"""
+
+    def test_failed_ticker_rolled_back(self, sqlite_db_path):
+        """一只股票出错只回滚该股票，其他股票照常提交"""
+        with UnitOfWork(SqliteHelper(sqlite_db_path), group_size=0) as uow:
+            with uow.ticker():
+                _write(uow, 1)
+            with pytest.raises(sqlite3.OperationalError), uow.ticker():
+                _write(uow, 2)
+                uow.execute("INSERT INTO missing_table VALUES (1)")
+            with uow.ticker():
+                _write(uow, 3)
+        assert [_count(sqlite_db_path, i) for i in (1, 2, 3)] == [1, 0, 1]
+
+    def test_swallowed_error_rolled_back(self, sqlite_db_path):
+        """仓库捕获错误并调用 rollback() 时，退出范围抛出 UnitOfWorkError 并回滚"""
+        with UnitOfWork(SqliteHelper(sqlite_db_path)) as uow:
+            with pytest.raises(UnitOfWorkError), uow.ticker():
+                _write(uow, 1)
+                try:
+                    uow.execute("UPDATE missing_table SET a = 1")
+                except Exception:
+                    uow.rollback()
+        assert _count(sqlite_db_path, 1) == 0
+
+    def test_group_commit(self, sqlite_db_path):
+        """每 group_size 只股票提交一次，退出时提交剩余部分"""
+        with UnitOfWork(SqliteHelper(sqlite_db_path), group_size=2) as uow:
+            for ticker_id in (1, 2, 3):
+                with uow.ticker():
+                    _write(uow, ticker_id)
+            assert uow.commits == 1
+            assert [_count(sqlite_db_path, i) for i in (1, 2, 3)] == [1, 1, 0]
+        assert uow.commits == 2
+        assert _count(sqlite_db_path, 3) == 1
+
+    def test_exception_rolls_back_pending(self, sqlite_db_path):
+        """范围外出错时回滚全部未提交的股票"""
+        with pytest.raises(ValueError):
+            with UnitOfWork(SqliteHelper(sqlite_db_path), group_size=0) as uow:
+                with uow.ticker():
+                    _write(uow, 1)
+                raise ValueError("中断")
+        assert _count(sqlite_db_path, 1) == 0
+
+    def test_nested_ticker(self, sqlite_db_path):
+        """不支持嵌套的股票范围"""
+        with UnitOfWork(SqliteHelper(sqlite_db_path)) as uow, uow.ticker():
+            with pytest.raises(RuntimeError), uow.ticker():
+                pass
+
+
+@pytest.mark.unit
+class TestTickerResultWriter:
+    """写库线程测试"""
+
+    @staticmethod
+    def _result(ticker_id, strategy):
+        return {
+            "ticker": Ticker(id=ticker_id, code=f"SH.{600000 + ticker_id}", name="t"),
+            "end_date": "2024-06-28",
+            "strategy": strategy,
+            "indicator": {"rsi": {"history": [{"value": 50}]}},
+            "valuation": None,
+            "score": [],
+        }
+
+    def test_failures_per_ticker(self, sqlite_db_path):
+        """失败的股票单独返回，同批其他股票写入成功"""
+        writer = TickerResultWriter(SqliteHelper(sqlite_db_path))
+        failures = writer.write(
+            [
+                self._result(1, STRATEGY),
+                # 无法序列化为 JSON
+                self._result(2, {"macd": {"data": {"buy": object()}}}),
+                self._result(3, STRATEGY),
+            ]
+        )
+        assert list(failures) == [2]
+        assert [_count(sqlite_db_path, i) for i in (1, 2, 3)] == [1, 0, 1]
+
+    def test_group_commit_setting(self, sqlite_db_path, monkeypatch):
+        """提交粒度与 UnitOfWork 一样默认取 DB_GROUP_COMMIT"""
+        monkeypatch.setenv("DB_GROUP_COMMIT", "2")
+        units = []
+
+        class RecordingUnitOfWork(UnitOfWork):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                units.append(self)
+
+        monkeypatch.setattr(update_pipeline, "UnitOfWork", RecordingUnitOfWork)
+        writer = TickerResultWriter(SqliteHelper(sqlite_db_path))
+        writer.write([self._result(i, STRATEGY) for i in (1, 2, 3)])
+        assert units[0].group_size == 2
+        assert units[0].commits == 2
+        assert [_count(sqlite_db_path, i) for i in (1, 2, 3)] == [1, 1, 1]
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+
+"""
+并发更新流水线单元测试
+用假数据源和内存写入器替换网络与数据库，验证限流、跳过、失败处理和计算结果
+"""
+
+import threading
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from core import update_pipeline
+from core.database.sqlite_helper import SqliteHelper
+from core.enum.update_job_status import UpdateJobStatus, UpdateJobTickerStatus
+from core.handler.ticker_indicator_handler import TickerIndicatorHandler
+from core.models.ticker import Ticker
+from core.schema.k_line import KLineFrame
+from core.service.update_job_repository import UpdateJobRepository
+from core.update_pipeline import PipelineConfig, UpdatePipeline
+from core.utils.rate_limiter import TokenBucket, acquire_source
+from tests.utils import FakeClock
+
+END_DATE = "2024-06-28"
+
+
+def _frame(seed: int, length: int = 120) -> KLineFrame:
+    rng = np.random.default_rng(seed)
+    close = 30 + np.cumsum(rng.normal(0, 1, length))
+    return KLineFrame.from_columns(
+        [f"2024-{i // 28 + 1:02d}-{i % 28 + 1:02d}" for i in range(length)],
+        high=close + 1,
+        low=close - 1,
+        open=close,
+        close=close,
+        volume=rng.uniform(1e5, 2e5, length),
+    )
+
+
+def _ticker(ticker_id: int) -> Ticker:
+    return Ticker(id=ticker_id, code=f"SH.{600000 + ticker_id}", name=f"t{ticker_id}")
+
+
+class FakeHelper:
+    """提供流水线所需接口的 DataSourceHelper 替身"""
+
+    valuations = None
+    indicators = None
+    score_rule = None
+
+    def __init__(self, fail_codes=(), empty_codes=()):
+        self.fail_codes = set(fail_codes)
+        self.empty_codes = set(empty_codes)
+        self.feature_stats = {"hits": 0, "misses": 0}
+        self.sources = {}
+        self.threads = set()
+
+    def _get_end_date(self):
+        return END_DATE
+
+    def _fetch_ticker_kl(self, ticker, start_date, end_date, source=None):
+        self.threads.add(threading.get_ident())
+        self.sources[ticker.id] = source
+        if ticker.code in self.fail_codes:
+            raise RuntimeError("network down")
+        if ticker.code in self.empty_codes:
+            return None
+        return _frame(ticker.id)
+
+
+class MemoryWriter:
+    results = []
+
+    def write(self, results):
+        MemoryWriter.results.extend(results)
+
+
+class FakeScoreRepository:
+    """ticker_id 为10的倍数的股票已有最后交易日评分"""
+
+    def get_ticker_ids_by_time_key(self, time_key):
+        assert time_key == END_DATE
+        return set(range(0, 1000, 10))
+
+
+@pytest.fixture
+def job_repository(sqlite_db_path, monkeypatch):
+    """基于临时 SQLite 文件的任务台账，每次调用新建连接（写线程需要独立连接）"""
+
+    def factory():
+        return UpdateJobRepository(SqliteHelper(sqlite_db_path))
+
+    monkeypatch.setattr(update_pipeline, "UpdateJobRepository", factory)
+    return factory
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(update_pipeline, "TickerScoreRepository", FakeScoreRepository)
+    MemoryWriter.results = []
+
+    def build(helper, **kwargs):
+        config = PipelineConfig(compute_workers=0, **kwargs)
+        return UpdatePipeline(helper, config, writer_factory=MemoryWriter)
+
+    return build
+
+
+@pytest.mark.unit
+class TestTokenBucket:
+    """测试令牌桶限流"""
+
+    def test_rate(self):
+        """测试超出容量后按速率排队等待"""
+        clock = FakeClock()
+        bucket = TokenBucket(2, burst=2, clock=clock, sleep=lambda seconds: None)
+        waits = [bucket.acquire() for _ in range(4)]
+        assert waits == [0.0, 0.0, 0.5, 1.0]
+
+        clock.now += 10
+        assert bucket.acquire() == 0.0
+
+    def test_unlimited(self):
+        """测试速率为0或未配置的数据源不限流"""
+        assert TokenBucket(0).acquire() == 0.0
+        assert acquire_source(9, {}) == 0.0
+
+
+@pytest.mark.unit
+class TestUpdatePipeline:
+    """测试 UpdatePipeline"""
+
+    def test_run(self, pipeline):
+        """测试并发拉取、跳过已更新股票，结果与逐只计算一致"""
+        helper = FakeHelper()
+        tickers = [_ticker(i) for i in range(1, 31)]
+        stats = pipeline(helper, fetch_workers=4, max_pending=5).run(tickers)
+
+        assert stats["total"] == 30
+        assert (stats["updated"], stats["skipped"], stats["failed"]) == (27, 3, 0)
+        assert len(MemoryWriter.results) == 27
+        assert helper.sources[1] == 1 and helper.sources[2] == 2
+        assert helper.feature_stats["misses"] > 0
+
+        result = next(r for r in MemoryWriter.results if r["ticker"].id == 7)
+        expected = TickerIndicatorHandler(END_DATE).calculate(_frame(7))
+        assert result["indicator"] == expected
+        assert result["score"][-1].time_key == _frame(7).time_key[-1]
+
+    def test_failures(self, pipeline):
+        """测试单只股票拉取失败不影响其他股票"""
+        helper = FakeHelper(fail_codes={"SH.600003"})
+        stats = pipeline(helper, fetch_workers=2).run([_ticker(i) for i in (1, 3, 5)])
+
+        assert (stats["updated"], stats["failed"]) == (2, 1)
+        assert sorted(r["ticker"].id for r in MemoryWriter.results) == [1, 5]
+
+    def test_no_kline(self, pipeline):
+        """测试没有K线数据的股票记为跳过"""
+        helper = FakeHelper(empty_codes={"SH.600003"})
+        stats = pipeline(helper).run([_ticker(i) for i in (1, 3, 5)])
+
+        assert (stats["updated"], stats["skipped"], stats["failed"]) == (2, 1, 0)
+        assert sorted(r["ticker"].id for r in MemoryWriter.results) == [1, 5]
+
+    def test_writer_factory_failure(self, pipeline, monkeypatch):
+        """测试创建写入器失败时不再提交新股票，run 抛出异常而不是一直等待"""
+        helper = FakeHelper()
+        built = pipeline(helper, fetch_workers=2, max_pending=3)
+
+        def broken():
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(built, "writer_factory", broken)
+        with pytest.raises(RuntimeError, match="database is locked"):
+            built.run([_ticker(i) for i in range(1, 31)])
+        assert len(helper.sources) <= 3
+
+    def test_config_from_env(self, monkeypatch):
+        """测试按环境变量配置"""
+        monkeypatch.setenv("UPDATE_FETCH_WORKERS", "3")
+        monkeypatch.setenv("UPDATE_COMPUTE_WORKERS", "0")
+        monkeypatch.delenv("UPDATE_WRITE_BATCH", raising=False)
+        config = PipelineConfig.from_env()
+        assert (config.fetch_workers, config.compute_workers) == (3, 0)
+        assert config.write_batch == 50
+
+
+@pytest.mark.unit
+class TestUpdateJobLedger:
+    """测试任务台账与断点续跑"""
+
+    def test_resume(self, pipeline, job_repository):
+        """测试续跑时跳过已完成股票、重试失败股票"""
+        tickers = [_ticker(i) for i in range(1, 13)]
+        helper = FakeHelper(fail_codes={"SH.600003", "SH.600005"})
+        stats = pipeline(helper, fetch_workers=3).run(tickers, job_name="zh")
+        assert stats["job_key"] == f"zh:{END_DATE}"
+        assert (stats["updated"], stats["skipped"], stats["failed"]) == (9, 1, 2)
+
+        repo = job_repository()
+        job = repo.get_latest("zh")
+        progress = repo.progress(job)
+        assert job.status == UpdateJobStatus.COMPLETED.value
+        assert (progress["done"], progress["skipped"], progress["failed"]) == (9, 1, 2)
+        assert progress["remaining"] == 0 and progress["eta"] is None
+
+        helper = FakeHelper()
+        MemoryWriter.results = []
+        stats = pipeline(helper, fetch_workers=3).run(tickers, job_name="zh")
+        assert (stats["updated"], stats["skipped"], stats["failed"]) == (2, 10, 0)
+        assert sorted(helper.sources) == [3, 5]
+        assert repo.get_finished_ticker_ids(job.id) == set(range(1, 13))
+
+    def test_ledger_failure(self, pipeline, job_repository, monkeypatch):
+        """测试写线程记录台账失败时在途股票记为失败，run 抛出异常，任务记为失败"""
+
+        def factory():
+            repo = job_repository()
+            record = repo.record
+
+            def broken(job_id, entries):
+                if threading.current_thread() is not threading.main_thread():
+                    raise RuntimeError("disk I/O error")
+                record(job_id, entries)
+
+            repo.record = broken
+            return repo
+
+        monkeypatch.setattr(update_pipeline, "UpdateJobRepository", factory)
+        helper = FakeHelper()
+        built = pipeline(helper, fetch_workers=2, max_pending=4)
+        with pytest.raises(RuntimeError, match="disk I/O error"):
+            built.run([_ticker(i) for i in range(1, 31)], job_name="zh")
+        assert len(helper.sources) < 27
+
+        job = job_repository().get_latest("zh")
+        assert job.status == UpdateJobStatus.FAILED.value
+
+    def test_record_upsert(self, job_repository):
+        """测试重复记录同一只股票时覆盖原结果，写入失败时整批回滚并抛出"""
+        repo = job_repository()
+        job = repo.start("us", END_DATE, 3)
+        repo.record(job.id, [{"ticker_id": 1, "status": UpdateJobTickerStatus.FAILED}])
+        repo.record(
+            job.id,
+            [
+                {"ticker_id": 1, "status": UpdateJobTickerStatus.DONE, "duration": 2},
+                {"ticker_id": 2, "status": UpdateJobTickerStatus.SKIPPED},
+            ],
+        )
+        progress = repo.progress(job)
+        assert (progress["done"], progress["skipped"], progress["failed"]) == (1, 1, 0)
+
+        with pytest.raises(KeyError):
+            repo.record(
+                job.id,
+                [{"ticker_id": 3, "status": UpdateJobTickerStatus.DONE}, {}],
+            )
+        assert repo.get_finished_ticker_ids(job.id) == {1, 2}
+
+    def test_progress_eta(self, job_repository):
+        """测试按本次运行的完成速度估算剩余时间"""
+        repo = job_repository()
+        job = repo.start("hk", END_DATE, 10)
+        now = datetime.strptime(job.run_started_at, "%Y-%m-%d %H:%M:%S")
+        repo.record(
+            job.id,
+            [
+                {"ticker_id": 1, "status": UpdateJobTickerStatus.SKIPPED},
+                {"ticker_id": 2, "status": UpdateJobTickerStatus.DONE, "duration": 3},
+                {"ticker_id": 3, "status": UpdateJobTickerStatus.DONE, "duration": 5},
+            ],
+        )
+        progress = repo.progress(job, now)
+        assert progress["remaining"] == 7 and progress["avg_duration"] == 4
+
+        later = datetime.fromtimestamp(now.timestamp() + 20)
+        assert repo.progress(job, later)["eta"] == 70
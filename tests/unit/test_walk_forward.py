@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+"""
+滚动前推评估单元测试
+窗口划分、逐窗口选参、样本外指标汇总，多进程与单进程结果相同
+"""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from core.analysis.advanced_backtest_engine import AdvancedBacktestEngine
+from core.analysis.backtest_kernel import kernel_metrics, prepare_bars, run_kernel
+from core.analysis.param_sweep import grid_params
+from core.analysis.strategy_evaluator import StrategyEvaluator
+from core.analysis.walk_forward import (
+    WalkForwardWindow,
+    walk_forward,
+    walk_forward_windows,
+)
+from core.strategy.ma_base_strategy import MaBaseStrategy
+from tests.utils import random_walk_klines
+
+SPACE = {"p1": [5, 13], "p2": [8, 21], "p3": [34, 55]}
+
+
+def _klines(seed, length=600):
+    """带趋势切换的随机游走行情"""
+    return random_walk_klines(
+        seed, length, start=datetime.date(2021, 1, 4), trend=0.003, trend_bars=70
+    )
+
+
+def _window_metrics(params, klines, start, stop):
+    """全序列信号截取 [start, stop) 后单独回测的指标"""
+    engine = AdvancedBacktestEngine()
+    strategy = MaBaseStrategy()
+    strategy.set_params(params)
+    bars = prepare_bars(klines, strategy.calculate(klines), engine.atr_period)
+    window = bars.window(start, stop)
+    return kernel_metrics(
+        window, run_kernel(window, engine.kernel_config()), engine.initial_capital
+    )
+
+
+@pytest.mark.unit
+class TestWindows:
+    """窗口划分测试"""
+
+    def test_rolling(self):
+        """滚动窗口按 step 前移，丢弃不足 test_bars 的尾部"""
+        windows = walk_forward_windows(100, 40, 20)
+        assert windows == [
+            WalkForwardWindow(0, 40, 40, 60),
+            WalkForwardWindow(20, 60, 60, 80),
+            WalkForwardWindow(40, 80, 80, 100),
+        ]
+        assert len(walk_forward_windows(99, 40, 20)) == 2
+        assert [w.test_start for w in walk_forward_windows(100, 40, 10, step=25)] == [
+            40,
+            65,
+            90,
+        ]
+
+    def test_anchored(self):
+        """扩展窗口的样本内区间从第一根K线开始"""
+        windows = walk_forward_windows(100, 40, 20, anchored=True)
+        assert [(w.train_start, w.train_stop) for w in windows] == [
+            (0, 40),
+            (0, 60),
+            (0, 80),
+        ]
+
+    def test_invalid(self):
+        """窗口长度必须为正，样本外窗口不能重叠"""
+        with pytest.raises(ValueError):
+            walk_forward_windows(100, 0, 20)
+        with pytest.raises(ValueError):
+            walk_forward_windows(100, 40, 20, step=10)
+
+
+@pytest.mark.unit
+class TestWalkForward:
+    """滚动前推评估测试"""
+
+    def test_fixed_params(self):
+        """不选参时各窗口指标与截取信号后的单独回测一致"""
+        klines = _klines(1)
+        strategy = MaBaseStrategy()
+        result = walk_forward(
+            strategy, klines, AdvancedBacktestEngine(), 200, 100, workers=0
+        )
+        assert [w["test_start"] for w in result["windows"]] == [
+            klines[i]["time_key"] for i in (200, 300, 400, 500)
+        ]
+        params = strategy.get_params()
+        for i, window in enumerate(result["windows"]):
+            start = 200 + 100 * i
+            assert window["params"] == params
+            assert window["test_metrics"] == pytest.approx(
+                _window_metrics(params, klines, start, start + 100)
+            )
+            assert window["train_metrics"] == pytest.approx(
+                _window_metrics(params, klines, start - 200, start)
+            )
+
+        metrics = result["metrics"]
+        assert metrics["windows"] == 4
+        assert metrics["total_trades"] == sum(
+            w["test_metrics"]["total_trades"] for w in result["windows"]
+        )
+        compounded = np.prod(
+            [1 + w["test_metrics"]["total_return"] for w in result["windows"]]
+        )
+        assert metrics["total_return"] == pytest.approx(compounded - 1)
+
+    def test_reoptimize(self):
+        """每个窗口选出样本内指标最好的参数"""
+        klines = _klines(2)
+        candidates = grid_params(SPACE)
+        result = walk_forward(
+            MaBaseStrategy(),
+            klines,
+            AdvancedBacktestEngine(),
+            200,
+            100,
+            candidates=candidates,
+            metric="total_return",
+            workers=0,
+        )
+        for i, window in enumerate(result["windows"]):
+            start = 200 + 100 * i
+            best = max(
+                _window_metrics(p, klines, start - 200, start)["total_return"]
+                for p in candidates
+            )
+            assert window["params"] in candidates
+            assert window["train_metrics"]["total_return"] == pytest.approx(best)
+            assert window["test_metrics"] == pytest.approx(
+                _window_metrics(window["params"], klines, start, start + 100)
+            )
+
+    def test_process_pool(self):
+        """多进程与单进程结果相同"""
+        klines = _klines(3)
+        kwargs = {"candidates": grid_params(SPACE), "anchored": True}
+        engine = AdvancedBacktestEngine()
+        serial = walk_forward(
+            MaBaseStrategy(), klines, engine, 150, 150, workers=0, **kwargs
+        )
+        parallel = walk_forward(
+            MaBaseStrategy(), klines, engine, 150, 150, workers=2, **kwargs
+        )
+        assert parallel == serial
+
+    def test_evaluator(self):
+        """StrategyEvaluator 的滚动前推评估入口，K线不足一个窗口时指标为0"""
+        evaluator = StrategyEvaluator()
+        report = evaluator.evaluate_walk_forward(
+            MaBaseStrategy(), _klines(4), train_bars=250, test_bars=50, workers=0
+        )
+        assert report["strategy_name"] == MaBaseStrategy().get_key()
+        assert report["metrics"]["windows"] == 7
+
+        empty = evaluator.evaluate_walk_forward(
+            MaBaseStrategy(), _klines(5, 100), workers=0
+        )
+        assert empty["windows"] == []
+        assert empty["metrics"]["windows"] == 0
+
+        with pytest.raises(ValueError):
+            evaluator.evaluate_walk_forward(
+                MaBaseStrategy(), _klines(5, 100), metric="unknown"
+            )
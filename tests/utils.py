@@ -1,5 +1,8 @@
 
+import datetime
 import importlib
+import random
+
 import pytest
 
 def check_optional_dependency(module_name: str, skip_reason: str = None):
@@ -24,3 +27,77 @@ def check_network_service(url: str, timeout: int = 5):
         return response.status_code < 400
     except Exception:
         return False
+
+
+class FakeClock:
+    """可手动拨动的时钟，now 为当前时间（秒）"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def random_walk_klines(
+    seed,
+    length,
+    start=datetime.date(2023, 1, 2),
+    price=20.0,
+    gaps=(1, 1, 1, 3),
+    trend=0.0,
+    trend_bars=60,
+    open_sigma=0.005,
+    close_sigma=0.015,
+    wick=0.01,
+    volume_jitter=0.0,
+):
+    """
+    可复现的随机游走日线
+
+    Args:
+        seed: 随机种子
+        length: K线数量
+        start: 起始日期，gaps 不为空时第一根K线在 start 之后
+        price: 初始价格
+        gaps: 相邻K线间隔天数的候选，为空时从 start 起逐日连续
+        trend: 每根K线的漂移，每 trend_bars 根K线在涨跌之间切换
+        trend_bars: 趋势切换周期
+        open_sigma: 开盘价相对前收盘的波动
+        close_sigma: 收盘价相对开盘价的波动
+        wick: 上下影线的最大幅度，为0时最高/最低价取开盘价和收盘价
+        volume_jitter: 成交量在1000之上的随机增量上限
+
+    Returns:
+        K线字典列表
+    """
+    rng = random.Random(seed)
+    day = start
+    klines = []
+    for i in range(length):
+        if gaps:
+            day += datetime.timedelta(days=rng.choice(gaps))
+        else:
+            day = start + datetime.timedelta(days=i)
+        drift = trend if (i // trend_bars) % 2 == 0 else -trend
+        open_price = price * (1 + rng.gauss(0, open_sigma))
+        close = open_price * (1 + drift + rng.gauss(0, close_sigma))
+        high, low = max(open_price, close), min(open_price, close)
+        if wick:
+            high *= 1 + rng.random() * wick
+            low *= 1 - rng.random() * wick
+        volume = 1000.0 + rng.random() * volume_jitter if volume_jitter else 1000.0
+        klines.append(
+            {
+                "time_key": day.strftime("%Y-%m-%d"),
+                "open": open_price,
+                "high": high,
+                "low": low,
+                "close": close,
+                "volume": volume,
+                "turnover": 20000.0,
+                "turnover_rate": 0.01,
+            }
+        )
+        price = close
+    return klines